@@ -0,0 +1,14 @@
+#!/bin/bash
+# ================================================================
+# build-icons.sh
+# Renders every extension's icons from its icon-spec.json, in
+# parallel, skipping extensions whose spec and engine are unchanged.
+#
+# Usage:
+#   ./build-icons.sh                  # build all
+#   ./build-icons.sh flipflow-extension --force
+# ================================================================
+
+set -e
+BASEDIR="$(cd "$(dirname "$0")" && pwd)"
+exec python3 "$BASEDIR/icon-engine/build_icons.py" "$@"
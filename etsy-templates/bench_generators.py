@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the workbook generators and the extension icons.
+Runs each target in a fresh interpreter (so peak RSS is its own) and records
+wall time, peak RSS, tracemalloc peak, cells and formulas written, cell
+styles registered and output bytes. Results can be saved as a baseline JSON
+and later runs compared against it: any metric that grows by more than the
+threshold is reported as a regression and the exit status is 1.
+
+Every target writes into a scratch directory - the committed workbooks and
+icons are never touched. Times and memory depend on the machine: refresh the
+baseline with --save-baseline when the benchmark host changes.
+
+Usage:  python bench_generators.py [TARGET ...] [--repeat 3] [--no-tracemalloc]
+                                   [--baseline bench_baseline.json] [--save-baseline]
+                                   [--threshold 0.15] [--json results.json]
+"""
+
+import argparse
+import contextlib
+import fnmatch
+import functools
+import glob
+import io
+import json
+import os
+import platform
+import runpy
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+DEFAULT_BASELINE = os.path.join(HERE, "bench_baseline.json")
+
+GENERATORS = {
+    "budget": ("create_budget_tracker.py", "monthly-budget-tracker.xlsx"),
+    "subscription": ("create_subscription_tracker.py", "subscription-tracker.xlsx"),
+    "debt": ("create_debt_calculator.py", "debt-payoff-calculator.xlsx"),
+}
+
+# name, unit, what a larger value means
+METRICS = [
+    ("wall_s", "s", "slower"),
+    ("peak_rss_mb", "MB", "more memory"),
+    ("tracemalloc_peak_mb", "MB", "more Python allocations"),
+    ("cells", "", "more cells"),
+    ("formulas", "", "more formulas"),
+    ("styles", "", "more cell styles"),
+    ("output_bytes", "B", "bigger output"),
+]
+
+
+def icon_specs():
+    """{"icons:<extension>": path} for every extension's icon-spec.json."""
+    specs = glob.glob(os.path.join(ROOT, "*", "icon-spec.json"))
+    return {f"icons:{os.path.basename(os.path.dirname(p))}": p for p in sorted(specs)}
+
+
+def targets():
+    found = {name: os.path.join(HERE, script) for name, (script, _) in GENERATORS.items()}
+    found.update(icon_specs())
+    return found
+
+
+def select(patterns):
+    available = targets()
+    if not patterns:
+        return list(available)
+    chosen = [name for name in available if any(fnmatch.fnmatch(name, p) for p in patterns)]
+    if not chosen:
+        raise SystemExit(f"no target matches {' '.join(patterns)}; "
+                         f"choose from {', '.join(available)}")
+    return chosen
+
+
+# ---------------------------------------------------------------------------
+# child side: run one target in this process and report its metrics
+# ---------------------------------------------------------------------------
+def _peak_rss_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _workbook_counts(wb):
+    from sheet_stream import streamed_counts
+    cells = formulas = 0
+    for ws in wb.worksheets:
+        streamed_cells, streamed_formulas = streamed_counts(ws)    # written at save time
+        cells += streamed_cells
+        formulas += streamed_formulas
+        for cell in ws._cells.values():
+            cells += 1
+            value = cell.value
+            if hasattr(value, "text") or (isinstance(value, str) and value.startswith("=")):
+                formulas += 1
+    return {"cells": cells, "formulas": formulas, "styles": len(wb._cell_styles)}
+
+
+def run_target(name, scratch, trace=False):
+    """Run *name* with its output redirected into *scratch*; returns a metrics dict."""
+    path = targets()[name]
+    if name in GENERATORS:
+        output = os.path.join(scratch, GENERATORS[name][1])
+        sys.argv = [path, output]
+        sys.path.insert(0, HERE)
+        run = functools.partial(runpy.run_path, path, run_name="__main__")
+    else:
+        # icons are rendered by the shared engine, into scratch instead of the extension
+        sys.path.insert(0, os.path.join(ROOT, "icon-engine"))
+        import icon_engine
+        output = scratch
+        run = functools.partial(icon_engine.render_extension, path, scratch)
+    if trace:
+        import tracemalloc
+        tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        module = run()
+    wall = time.perf_counter() - start
+    result = {"wall_s": wall, "peak_rss_mb": _peak_rss_mb()}
+    if trace:
+        result["tracemalloc_peak_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+
+    if name in GENERATORS:
+        result.update(_workbook_counts(module["wb"]))
+        result["output_bytes"] = os.path.getsize(output)
+    else:
+        result["output_bytes"] = sum(
+            os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(output)
+            for f in files)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# parent side
+# ---------------------------------------------------------------------------
+def measure(name, trace=False):
+    """One run of *name* in a fresh interpreter."""
+    with tempfile.TemporaryDirectory(prefix="bench-") as scratch:
+        command = [sys.executable, os.path.abspath(__file__), "--child", name, scratch]
+        if trace:
+            command.append("--trace")
+        done = subprocess.run(command, capture_output=True, text=True, cwd=scratch)
+    if done.returncode:
+        raise RuntimeError(f"{name} failed:\n{done.stderr.strip()}")
+    return json.loads(done.stdout.strip().splitlines()[-1])
+
+
+def benchmark(name, repeat=3, trace=True):
+    """Best of *repeat* untraced runs, plus one traced run for the tracemalloc peak."""
+    runs = [measure(name) for _ in range(repeat)]
+    result = dict(runs[0])
+    result["wall_s"] = min(r["wall_s"] for r in runs)
+    result["peak_rss_mb"] = min(r["peak_rss_mb"] for r in runs)
+    if trace:
+        result["tracemalloc_peak_mb"] = measure(name, trace=True)["tracemalloc_peak_mb"]
+    return result
+
+
+def compare(baseline, results, threshold):
+    """Regressions as (target, metric, before, after, message) tuples."""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get("targets", {}).get(name)
+        if before is None:
+            continue
+        for metric, _, meaning in METRICS:
+            old, new = before.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + threshold) and new - old > (0.05 if metric == "wall_s" else 0):
+                growth = f"+{(new - old) / old:.0%}" if old else "new"
+                regressions.append((name, metric, old, new, f"{meaning} ({growth})"))
+    return regressions
+
+
+def _format(metric, value):
+    if value is None:
+        return "-"
+    if metric == "wall_s":
+        return f"{value * 1000:,.0f} ms"
+    if metric.endswith("_mb"):
+        return f"{value:,.1f} MB"
+    if metric == "output_bytes":
+        return f"{value / 1024:,.1f} KB"
+    return f"{value:,}"
+
+
+def report(results):
+    columns = ["target"] + [metric for metric, _, _ in METRICS]
+    rows = [[name] + [_format(m, r.get(m)) for m in columns[1:]] for name, r in results.items()]
+    widths = [max(len(c), *(len(row[i]) for row in rows)) for i, c in enumerate(columns)]
+    print("  ".join(c.ljust(w) if i == 0 else c.rjust(w)
+                    for i, (c, w) in enumerate(zip(columns, widths))))
+    for row in rows:
+        print("  ".join(v.ljust(w) if i == 0 else v.rjust(w)
+                        for i, (v, w) in enumerate(zip(row, widths))))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("targets", nargs="*", help="target names or globs (default: all), "
+                        "e.g. debt 'icons:*'")
+    parser.add_argument("--repeat", type=int, default=3, help="untraced runs per target")
+    parser.add_argument("--no-tracemalloc", action="store_true",
+                        help="skip the traced run (tracemalloc slows Python ~2x)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write this run's numbers to --baseline instead of comparing")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="allowed growth per metric before it counts as a regression")
+    parser.add_argument("--json", help="also write the results here")
+    parser.add_argument("--list", action="store_true", help="list targets and exit")
+    parser.add_argument("--child", nargs=2, metavar=("TARGET", "SCRATCH"), help=argparse.SUPPRESS)
+    parser.add_argument("--trace", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_target(*args.child, trace=args.trace)))
+        return 0
+    if args.list:
+        for name, path in targets().items():
+            print(f"{name:<32} {os.path.relpath(path, ROOT)}")
+        return 0
+
+    results = {}
+    for name in select(args.targets):
+        results[name] = benchmark(name, args.repeat, trace=not args.no_tracemalloc)
+        print(f"  {name}: {results[name]['wall_s'] * 1000:,.0f} ms", file=sys.stderr)
+    report(results)
+    document = {"python": platform.python_version(), "machine": platform.machine(),
+                "targets": results}
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(document, f, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        saved = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                saved = json.load(f).get("targets", {})
+        document["targets"] = dict(saved, **results)
+        with open(args.baseline, "w") as f:
+            json.dump(document, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(baseline, results, args.threshold)
+    if not regressions:
+        print(f"\nNo regressions against {args.baseline} (threshold {args.threshold:.0%}).")
+        return 0
+    print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+    for name, metric, old, new, message in regressions:
+        print(f"  {name} {metric}: {_format(metric, old)} -> {_format(metric, new)}  {message}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: per-cell style objects vs shared objects vs StyleRegistry.
+Styles a grid of alternating-band data cells the way the generators do and
+reports cells per second for each approach.
+
+Usage:  python bench_style_registry.py [--rows 2000] [--cols 10] [--repeat 5]
+"""
+
+import argparse
+import time
+
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+
+from style_registry import StyleRegistry
+
+BAND_COLORS = ("F5F3FF", "FFFFFF")
+CURRENCY_FMT = '"$"#,##0.00'
+
+
+def side():
+    return Side(style="thin", color="D1D5DB")
+
+
+def per_cell_objects(ws, rows, cols):
+    """Baseline: build fresh style objects for every cell (old style_data_cell)."""
+    for r in range(1, rows + 1):
+        for c in range(1, cols + 1):
+            cell = ws.cell(row=r, column=c)
+            cell.font = Font(name="Aptos", color="1F2937", size=11)
+            cell.border = Border(left=side(), right=side(), top=side(), bottom=side())
+            cell.fill = PatternFill("solid", fgColor=BAND_COLORS[r % 2])
+            cell.alignment = Alignment(horizontal="right", vertical="center")
+            cell.number_format = CURRENCY_FMT
+
+
+def shared_objects(ws, rows, cols):
+    """Module-level style objects, still assigned attribute by attribute."""
+    font = Font(name="Aptos", color="1F2937", size=11)
+    border = Border(left=side(), right=side(), top=side(), bottom=side())
+    fills = [PatternFill("solid", fgColor=color) for color in BAND_COLORS]
+    align = Alignment(horizontal="right", vertical="center")
+    for r in range(1, rows + 1):
+        for c in range(1, cols + 1):
+            cell = ws.cell(row=r, column=c)
+            cell.font = font
+            cell.border = border
+            cell.fill = fills[r % 2]
+            cell.alignment = align
+            cell.number_format = CURRENCY_FMT
+
+
+def registry(ws, rows, cols):
+    """Interned bundles applied by style ID."""
+    styles = StyleRegistry()
+    border = Border(left=side(), right=side(), top=side(), bottom=side())
+    band = [
+        styles.register(font=Font(name="Aptos", color="1F2937", size=11),
+                        fill=PatternFill("solid", fgColor=color), border=border,
+                        alignment=Alignment(horizontal="right", vertical="center"),
+                        number_format=CURRENCY_FMT)
+        for color in BAND_COLORS
+    ]
+    for r in range(1, rows + 1):
+        for c in range(1, cols + 1):
+            styles.apply(ws.cell(row=r, column=c), band[r % 2])
+
+
+APPROACHES = [
+    ("per-cell objects", per_cell_objects),
+    ("shared objects", shared_objects),
+    ("style registry", registry),
+]
+
+
+def best_time(fn, rows, cols, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        ws = Workbook().active
+        start = time.perf_counter()
+        fn(ws, rows, cols)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--cols", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cells = args.rows * args.cols
+    print(f"Styling {cells:,} cells, best of {args.repeat}")
+    baseline = None
+    for name, fn in APPROACHES:
+        elapsed = best_time(fn, args.rows, args.cols, args.repeat)
+        rate = cells / elapsed
+        baseline = baseline or rate
+        print(f"  {name:<18} {elapsed * 1000:8.1f} ms  {rate:12,.0f} cells/s  "
+              f"x{rate / baseline:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Per-phase build tracing for the Etsy template generators.
+The generators mark each sheet-building phase; with tracing switched on,
+every phase becomes a timed span recording the cells and formulas it added
+and its memory delta, exported as Chrome-trace JSON (chrome://tracing or
+ui.perfetto.dev) and optionally as one cProfile dump per phase. Rows
+streamed with sheet_stream count in the phase that registers them, although
+their XML is produced while the workbook is written.
+
+Switched on by environment variables, so generator output is unchanged
+otherwise:
+
+    BUILD_TRACE=trace.json      Chrome trace (a directory: <generator>-trace.json in it)
+    BUILD_PROFILE=profiles/     <generator>-<NN>-<phase>.prof for every top-level phase
+
+In a generator:
+
+    trace = BuildTrace.from_env("budget", wb)
+    trace.phase("Instructions")          # ends the previous phase, starts this one
+    trace.step("schedule")               # same, one level down inside the phase
+    ...
+    with trace.span("consolidate CF"):   # nested span inside the current phase
+        consolidate_conditional_formatting(wb)
+    trace.finish()
+
+Memory deltas are resident-set deltas; run under `python -X tracemalloc` to
+get Python-heap deltas as well.
+
+Usage:  python build_trace.py TRACE.json [...]      # per-phase summary table
+"""
+
+import argparse
+import contextlib
+import cProfile
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+from sheet_stream import streamed_counts
+
+
+def _rss_bytes():
+    """Current resident set size, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def workbook_counts(wb):
+    """(cells, formulas) held by an openpyxl workbook or registered as streamed rows."""
+    cells = formulas = 0
+    for ws in wb.worksheets:
+        streamed_cells, streamed_formulas = streamed_counts(ws)
+        cells += len(ws._cells) + streamed_cells
+        formulas += sum(cell.data_type == "f" for cell in ws._cells.values()) + streamed_formulas
+    return cells, formulas
+
+
+class _Span:
+    __slots__ = ("name", "depth", "start", "cells", "formulas", "rss", "heap", "profile")
+
+    def __init__(self, name, depth, counts, profile):
+        self.name, self.depth, self.profile = name, depth, profile
+        self.cells, self.formulas = counts
+        self.rss = _rss_bytes()
+        self.heap = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        self.start = time.perf_counter_ns()
+
+
+class BuildTrace:
+    """Timed spans over one generator run; every method is a no-op when disabled."""
+
+    def __init__(self, name, workbook=None, trace_path=None, profile_dir=None):
+        self.name = name
+        self.workbook = workbook
+        self.trace_path = trace_path
+        self.profile_dir = profile_dir
+        self.enabled = bool(trace_path or profile_dir)
+        self.events = []
+        self._stack = []
+        self._phase = None
+        self._step = None
+        self._phases = 0
+        self._origin = time.perf_counter_ns()
+
+    @classmethod
+    def from_env(cls, name, workbook=None, environ=os.environ):
+        trace_path = environ.get("BUILD_TRACE")
+        if trace_path and os.path.isdir(trace_path):
+            trace_path = os.path.join(trace_path, f"{name}-trace.json")
+        return cls(name, workbook, trace_path, environ.get("BUILD_PROFILE"))
+
+    # -- spans ---------------------------------------------------------------
+    def phase(self, name):
+        """End the current top-level phase (if any) and start *name*."""
+        if not self.enabled:
+            return
+        if self._phase is not None:
+            self._close(self._phase)
+        self._step = None
+        self._phase = self._open(name)
+
+    def step(self, name):
+        """End the current step of this phase (if any) and start *name*."""
+        if not self.enabled:
+            return
+        if self._step is not None:
+            self._close(self._step)
+        self._step = self._open(name)
+
+    @contextlib.contextmanager
+    def span(self, name):
+        """A nested span inside the current phase."""
+        if not self.enabled:
+            yield
+            return
+        span = self._open(name)
+        try:
+            yield
+        finally:
+            self._close(span)
+
+    def finish(self):
+        """Close the last phase and write the trace; returns the events recorded."""
+        if not self.enabled:
+            return []
+        if self._phase is not None:
+            self._close(self._phase)
+            self._phase = self._step = None
+        if self.trace_path:
+            self.write(self.trace_path)
+            print(f"Build trace written to {self.trace_path}")
+        print(summary(self.events))
+        return self.events
+
+    def _counts(self):
+        return workbook_counts(self.workbook) if self.workbook is not None else (0, 0)
+
+    def _open(self, name):
+        profile = None
+        if self.profile_dir and not self._stack:
+            # cProfile cannot nest, so only top-level phases get a dump
+            profile = cProfile.Profile()
+        span = _Span(name, len(self._stack), self._counts(), profile)
+        self._stack.append(span)
+        if profile is not None:
+            profile.enable()
+        return span
+
+    def _close(self, span):
+        if span not in self._stack:              # already ended by a phase change
+            return
+        end = time.perf_counter_ns()
+        if span.profile is not None:
+            span.profile.disable()
+        while self._stack and self._stack[-1] is not span:
+            self._close(self._stack[-1])         # a phase change ends its open spans
+        self._stack.pop()
+        cells, formulas = self._counts()
+        args = {"cells": cells - span.cells, "formulas": formulas - span.formulas}
+        rss = _rss_bytes()
+        if rss is not None and span.rss is not None:
+            args["rss_delta_kb"] = (rss - span.rss) // 1024
+        if span.heap is not None and tracemalloc.is_tracing():
+            args["heap_delta_kb"] = (tracemalloc.get_traced_memory()[0] - span.heap) // 1024
+        if span.profile is not None:
+            self._phases += 1
+            os.makedirs(self.profile_dir, exist_ok=True)
+            slug = re.sub(r"[^A-Za-z0-9]+", "-", span.name).strip("-").lower()
+            path = os.path.join(self.profile_dir, f"{self.name}-{self._phases:02d}-{slug}.prof")
+            span.profile.dump_stats(path)
+            args["profile"] = path
+        self.events.append({
+            "name": span.name, "cat": "phase" if span.depth == 0 else "span", "ph": "X",
+            "ts": (span.start - self._origin) / 1000, "dur": (end - span.start) / 1000,
+            "pid": os.getpid(), "tid": span.depth, "args": args,
+        })
+
+    # -- export --------------------------------------------------------------
+    def write(self, path):
+        meta = [{"name": "process_name", "ph": "M", "pid": os.getpid(),
+                 "args": {"name": self.name}}]
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": meta + self.events, "displayTimeUnit": "ms"}, f, indent=1)
+
+
+def summary(events):
+    """Per-span table: time, share of the build, cells, formulas, memory."""
+    phases = [e for e in events if e.get("ph") == "X"]
+    total = sum(e["dur"] for e in phases if e["cat"] == "phase") or 1
+    lines = [f"{'phase':<38} {'ms':>9} {'share':>6} {'cells':>8} {'formulas':>9} {'rss KB':>9}"]
+    for e in sorted(phases, key=lambda e: e["ts"]):
+        indent = "  " * e["tid"]
+        args = e["args"]
+        lines.append(f"{indent + e['name']:<38} {e['dur'] / 1000:9.1f} "
+                     f"{e['dur'] / total:6.1%} {args['cells']:8,} {args['formulas']:9,} "
+                     f"{args.get('rss_delta_kb', 0):9,}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise build traces.")
+    parser.add_argument("traces", nargs="+")
+    args = parser.parse_args(argv)
+    for path in args.traces:
+        with open(path) as f:
+            events = json.load(f)["traceEvents"]
+        print(path)
+        print(summary(events))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Conditional-formatting consolidation for the Etsy template generators.
+Rules that differ only in the range they cover (e.g. the "Canceled row"
+FormulaRule added once per column) are merged into one rule with a
+multi-range sqref, and identical DXF styles are shared.
+
+Usage:  python cf_optimizer.py IN.xlsx [OUT.xlsx]
+"""
+
+import sys
+
+from openpyxl.formatting.formatting import ConditionalFormatting, ConditionalFormattingList
+from openpyxl.formula.translate import Translator
+from openpyxl.styles.differential import DifferentialStyleList
+from openpyxl.utils import get_column_letter
+from openpyxl.xml.functions import tostring
+
+# Rule types whose meaning does not depend on the other cells in the range.
+# Colour scales, data bars, icon sets, top-N, averages and duplicate checks
+# are computed over the whole range and must never be merged.
+MERGEABLE_TYPES = {
+    "cellIs", "expression", "containsText", "notContainsText", "beginsWith",
+    "endsWith", "containsBlanks", "notContainsBlanks", "containsErrors",
+    "notContainsErrors", "timePeriod",
+}
+
+# Formulas are compared after moving them to this far-away cell, so two rules
+# match when their relative references point the same way from their anchors.
+NORMAL_ORIGIN = "AAA100000"
+
+RULE_ATTRS = ("type", "operator", "stopIfTrue", "text", "timePeriod",
+              "percent", "bottom", "rank", "aboveAverage", "equalAverage", "stdDev")
+
+
+def move_formula(formula, origin, dest):
+    if origin == dest:
+        return formula
+    return Translator("=" + formula, origin=origin).translate_formula(dest)[1:]
+
+
+def dxf_key(dxf):
+    return tostring(dxf.to_tree()) if dxf is not None else None
+
+
+def sqref_anchor(sqref):
+    """Top-left cell of the first range: what relative references hang off."""
+    first = sqref.sorted()[0]
+    return f"{get_column_letter(first.min_col)}{first.min_row}"
+
+
+def _rule_key(rule, anchor):
+    return (
+        tuple(getattr(rule, attr) for attr in RULE_ATTRS),
+        dxf_key(rule.dxf),
+        tuple(move_formula(f, anchor, NORMAL_ORIGIN) for f in rule.formula),
+    )
+
+
+def _cells(sqref):
+    return {(row, col) for rng in sqref.ranges
+            for row in range(rng.min_row, rng.max_row + 1)
+            for col in range(rng.min_col, rng.max_col + 1)}
+
+
+def cells_to_sqref(cells):
+    """Cover a set of (row, col) cells with column-major rectangles."""
+    runs_by_col = {}
+    for col in sorted({col for _, col in cells}):
+        rows = sorted(row for row, c in cells if c == col)
+        runs = []
+        for row in rows:
+            if runs and runs[-1][1] == row - 1:
+                runs[-1][1] = row
+            else:
+                runs.append([row, row])
+        runs_by_col[col] = tuple(map(tuple, runs))
+
+    blocks = []   # [first_col, last_col, runs]
+    for col, runs in runs_by_col.items():
+        if blocks and blocks[-1][1] == col - 1 and blocks[-1][2] == runs:
+            blocks[-1][1] = col
+        else:
+            blocks.append([col, col, runs])
+
+    refs = []
+    for first, last, runs in blocks:
+        for top, bottom in runs:
+            ref = f"{get_column_letter(first)}{top}"
+            if (first, top) != (last, bottom):
+                ref += f":{get_column_letter(last)}{bottom}"
+            refs.append(ref)
+    return " ".join(refs)
+
+
+def consolidate_sheet(ws):
+    """Merge equivalent conditional-format rules on one sheet; returns rules saved."""
+    entries = []   # (priority, sqref, rule)
+    for cf in ws.conditional_formatting:
+        for rule in cf.rules:
+            entries.append((rule.priority, cf.sqref, rule))
+    entries.sort(key=lambda e: e[0])
+
+    by_key = {}
+    for entry in entries:
+        _, sqref, rule = entry
+        if rule.type in MERGEABLE_TYPES:
+            key = _rule_key(rule, sqref_anchor(sqref))
+        else:
+            key = ("unique", id(rule))
+        by_key.setdefault(key, []).append(entry)
+    groups = list(by_key.values())
+
+    # Candidate merges: the union must start where its first range starts,
+    # otherwise the relative references would hang off a different cell.
+    plans = []
+    for members in groups:
+        plan = None
+        if len(members) > 1:
+            cells = set().union(*(_cells(sqref) for _, sqref, _ in members))
+            sqref = cells_to_sqref(cells)
+            anchor = (f"{get_column_letter(min(c for _, c in cells))}"
+                      f"{min(r for r, _ in cells)}")
+            if sqref.split()[0].split(":")[0] == anchor:
+                plan = (sqref, anchor)
+        plans.append(plan)
+    _drop_reordering_merges(entries, groups, plans)
+
+    merged = []   # (priority, sqref string, rule)
+    for members, plan in zip(groups, plans):
+        if plan is None:
+            merged.extend((p, str(sqref), rule) for p, sqref, rule in members)
+            continue
+        sqref, anchor = plan
+        priority, old_sqref, rule = members[0]
+        rule.formula = [move_formula(f, sqref_anchor(old_sqref), anchor) for f in rule.formula]
+        merged.append((priority, sqref, rule))
+
+    saved = len(entries) - len(merged)
+    if saved:
+        cf_list = ConditionalFormattingList()
+        for new_priority, (_, sqref, rule) in enumerate(sorted(merged, key=lambda m: m[0]), 1):
+            rule.priority = new_priority
+            cf_list.add(ConditionalFormatting(sqref), rule)
+        ws.conditional_formatting = cf_list
+    return saved
+
+
+def _drop_reordering_merges(entries, groups, plans):
+    """
+    A merged rule takes the best priority of its members, so members move up.
+    Cancel any merge that would change the order in which two rules covering
+    the same cell are evaluated.
+    """
+    group_of = {id(rule): g for g, members in enumerate(groups) for _, _, rule in members}
+    per_cell = {}
+    for priority, sqref, rule in entries:
+        for cell in _cells(sqref):
+            per_cell.setdefault(cell, []).append((priority, rule))
+
+    while True:
+        new_priority = {}
+        for members, plan in zip(groups, plans):
+            for priority, _, rule in members:
+                new_priority[id(rule)] = members[0][0] if plan else priority
+        bad = set()
+        for stack in per_cell.values():
+            for (_, upper), (_, lower) in zip(stack, stack[1:]):
+                if new_priority[id(upper)] > new_priority[id(lower)]:
+                    bad.update(g for g in (group_of[id(upper)], group_of[id(lower)])
+                               if plans[g])
+        if not bad:
+            return
+        for g in bad:
+            plans[g] = None
+
+
+def dedupe_dxfs(wb):
+    """Share identical DXF objects and drop unused ones from the style table."""
+    by_key = {}
+    for ws in wb.worksheets:
+        for cf in ws.conditional_formatting:
+            for rule in cf.rules:
+                if rule.dxf is not None:
+                    rule.dxf = by_key.setdefault(dxf_key(rule.dxf), rule.dxf)
+    wb._differential_styles = DifferentialStyleList()
+
+
+def consolidate_conditional_formatting(wb):
+    """Run the consolidation pass over every sheet; returns rules removed."""
+    saved = sum(consolidate_sheet(ws) for ws in wb.worksheets)
+    dedupe_dxfs(wb)
+    return saved
+
+
+def count_rules(wb):
+    return sum(len(cf.rules) for ws in wb.worksheets for cf in ws.conditional_formatting)
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+    if not args:
+        print(__doc__.strip().splitlines()[-1].strip())
+        return 2
+    from openpyxl import load_workbook
+    src = args[0]
+    dst = args[1] if len(args) > 1 else src
+    wb = load_workbook(src)
+    before = count_rules(wb)
+    consolidate_conditional_formatting(wb)
+    print(f"{src}: {before} -> {count_rules(wb)} conditional-format rules")
+    wb.save(dst)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
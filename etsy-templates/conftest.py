@@ -0,0 +1,108 @@
+"""
+Shared pytest fixtures for the Etsy template test suites.
+
+Every workbook is built by its generator into a session temp directory and
+loaded at most once per session (once per worker under pytest-xdist), so
+the suites check what the create_*.py scripts emit now, not the committed
+files; test_xlsx_canonical checks that the committed files are current.
+Tests must treat these fixtures as read-only: build a RecalcEngine from
+the graph, or load a private copy, to try edits.
+
+Values, formulas, validations, conditional formats and style digests come
+from the parsed-workbook cache (workbook_cache, the *_parsed fixtures), as
+do the dependency graphs, so only the first run after a workbook changes
+pays for openpyxl. budget_wb and subscription_wb still load openpyxl
+Workbooks, for the styling and layout tests only: fills, fonts, borders,
+number formats, freeze panes, column widths, margins, merged cells and
+auto-filters are not in the cache.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+from openpyxl import load_workbook
+
+import workbook_cache
+from dependency_graph import DependencyGraph
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BUDGET_XLSX = os.path.join(HERE, "monthly-budget-tracker.xlsx")
+SUBSCRIPTION_XLSX = os.path.join(HERE, "subscription-tracker.xlsx")
+DEBT_XLSX = os.path.join(HERE, "debt-payoff-calculator.xlsx")
+
+# committed workbook -> the generator that writes it
+GENERATORS = {
+    BUDGET_XLSX: "create_budget_tracker.py",
+    SUBSCRIPTION_XLSX: "create_subscription_tracker.py",
+    DEBT_XLSX: "create_debt_calculator.py",
+}
+
+
+@pytest.fixture(scope="session")
+def built_xlsx(tmp_path_factory):
+    """{committed path: freshly generated copy} for every workbook."""
+    out_dir = tmp_path_factory.mktemp("workbooks")
+    built = {}
+    for committed, script in GENERATORS.items():
+        out = str(out_dir / os.path.basename(committed))
+        subprocess.run([sys.executable, os.path.join(HERE, script), out],
+                       check=True, capture_output=True, cwd=HERE)
+        built[committed] = out
+    return built
+
+
+def _workbook(path):
+    wb = load_workbook(path)
+    yield wb
+    wb.close()
+
+
+def _graph(path):
+    parsed = workbook_cache.load(path)
+    graph = DependencyGraph.from_parsed(parsed)
+    parsed.close()
+    return graph
+
+
+def _parsed(path):
+    parsed = workbook_cache.load(path)
+    yield parsed
+    parsed.close()
+
+
+@pytest.fixture(scope="session")
+def budget_parsed(built_xlsx):
+    """monthly-budget-tracker.xlsx from the parsed-workbook cache."""
+    yield from _parsed(built_xlsx[BUDGET_XLSX])
+
+
+@pytest.fixture(scope="session")
+def budget_wb(built_xlsx):
+    """monthly-budget-tracker.xlsx as an openpyxl Workbook, for styling and layout."""
+    yield from _workbook(built_xlsx[BUDGET_XLSX])
+
+
+@pytest.fixture(scope="session")
+def budget_graph(budget_parsed):
+    """Dependency graph of the budget tracker, for building RecalcEngines."""
+    return DependencyGraph.from_parsed(budget_parsed)
+
+
+@pytest.fixture(scope="session")
+def debt_graph(built_xlsx):
+    """Dependency graph of the debt payoff calculator."""
+    return _graph(built_xlsx[DEBT_XLSX])
+
+
+@pytest.fixture(scope="session")
+def subscription_parsed(built_xlsx):
+    """subscription-tracker.xlsx from the parsed-workbook cache."""
+    yield from _parsed(built_xlsx[SUBSCRIPTION_XLSX])
+
+
+@pytest.fixture(scope="session")
+def subscription_wb(built_xlsx):
+    """subscription-tracker.xlsx as an openpyxl Workbook, for styling and layout."""
+    yield from _workbook(built_xlsx[SUBSCRIPTION_XLSX])
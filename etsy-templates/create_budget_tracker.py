@@ -17,6 +17,14 @@ from openpyxl.chart.series import DataPoint
 from openpyxl.chart.label import DataLabelList
 from copy import copy
 import datetime
+import os
+import sys
+
+from build_trace import BuildTrace
+from cf_optimizer import consolidate_conditional_formatting
+from range_styles import merge_styled, range_background
+from style_registry import StyleRegistry
+from xlsx_canonical import save_canonical
 
 # ─── Color Palette ──────────────────────────────────────────────
 NAVY        = "1B2A4A"
@@ -86,6 +94,15 @@ font_negative = Font(name='Calibri', size=11, bold=True, color=RED)
 font_white    = Font(name='Calibri', size=11, color=WHITE)
 font_white_bold = Font(name='Calibri', size=12, bold=True, color=WHITE)
 font_link     = Font(name='Calibri', size=11, color="2563EB", underline='single')
+font_banner   = Font(name='Calibri', size=22, bold=True, color=WHITE)
+font_kpi      = Font(name='Calibri', size=18, bold=True, color=NAVY)
+font_kpi_positive = Font(name='Calibri', size=18, bold=True, color=EMERALD)
+font_kpi_negative = Font(name='Calibri', size=18, bold=True, color=RED)
+font_kpi_label = Font(name='Calibri', size=10, bold=True, color=GRAY_DARK)
+font_warning  = Font(name='Calibri', size=11, bold=True, color=AMBER)
+font_caption  = Font(name='Calibri', size=10, italic=True, color=GRAY_DARK)
+font_band     = Font(name='Calibri', size=10, bold=True, color=WHITE)
+font_label    = Font(name='Calibri', size=11, color=NAVY)
 
 align_center  = Alignment(horizontal='center', vertical='center', wrap_text=True)
 align_left    = Alignment(horizontal='left', vertical='center', wrap_text=True)
@@ -96,6 +113,30 @@ CURRENCY_FMT  = '"$"#,##0.00'
 PERCENT_FMT   = '0.0%'
 DATE_FMT      = 'MM/DD/YYYY'
 
+# Interned styles for the large pre-formatted grids, keyed by row parity
+# (0 = light band, 1 = white band)
+styles = StyleRegistry()
+BAND_FILLS = (light_fill, white_fill)
+TRANS_COLUMN_FORMATS = {
+    1: (align_center, DATE_FMT),       # Date
+    2: (None, None),                   # Description
+    3: (align_center, None),           # Category
+    4: (align_right, CURRENCY_FMT),    # Amount
+    5: (align_center, None),           # Payment Method
+    6: (None, None),                   # Notes
+}
+TRANS_STYLES = {
+    (parity, col): styles.register(font=font_body, fill=fill, border=thin_border,
+                                   alignment=align, number_format=fmt)
+    for parity, fill in enumerate(BAND_FILLS)
+    for col, (align, fmt) in TRANS_COLUMN_FORMATS.items()
+}
+MONEY_STYLES = [
+    styles.register(font=font_money, fill=fill, border=thin_border,
+                    alignment=align_right, number_format=CURRENCY_FMT)
+    for fill in BAND_FILLS
+]
+
 CATEGORIES = [
     "Housing", "Transportation", "Food & Groceries", "Utilities",
     "Insurance", "Healthcare", "Debt Payments", "Personal",
@@ -141,27 +182,21 @@ def style_range_as_header(ws, row, col_start, col_end, fill=None, font=None, bor
 
 def make_section_header(ws, row, col_start, col_end, text, fill=None):
     """Create a merged section header."""
-    _fill = fill or navy_fill
-    ws.merge_cells(start_row=row, start_column=col_start, end_row=row, end_column=col_end)
-    cell = ws.cell(row=row, column=col_start)
-    cell.value = text
-    cell.fill = _fill
-    cell.font = font_white_bold
-    cell.alignment = align_center
-    cell.border = medium_border
-    for c in range(col_start + 1, col_end + 1):
-        ws.cell(row=row, column=c).fill = _fill
-        ws.cell(row=row, column=c).border = medium_border
+    merge_styled(ws, f"{get_column_letter(col_start)}{row}:{get_column_letter(col_end)}{row}",
+                 text, font=font_white_bold, fill=fill or navy_fill,
+                 border=medium_border, alignment=align_center)
 
 
 # ═══════════════════════════════════════════════════════════════
 # CREATE WORKBOOK
 # ═══════════════════════════════════════════════════════════════
 wb = Workbook()
+trace = BuildTrace.from_env("budget", wb)
 
 # ───────────────────────────────────────────────────────────────
 # SHEET 1: INSTRUCTIONS
 # ───────────────────────────────────────────────────────────────
+trace.phase("Instructions")
 ws_inst = wb.active
 ws_inst.title = "Instructions"
 ws_inst.sheet_properties.tabColor = NAVY
@@ -174,33 +209,16 @@ ws_inst.column_dimensions['D'].width = 3
 
 set_print_settings(ws_inst)
 
-# Background fill for the whole visible area
-for r in range(1, 65):
-    for c in range(1, 5):
-        ws_inst.cell(row=r, column=c).fill = white_fill
-
 # ── Title Banner ──
-ws_inst.merge_cells('A1:D3')
-title_cell = ws_inst['A1']
-title_cell.value = "MONTHLY BUDGET TRACKER"
-title_cell.font = Font(name='Calibri', size=28, bold=True, color=WHITE)
-title_cell.fill = navy_fill
-title_cell.alignment = Alignment(horizontal='center', vertical='center')
-for r in range(1, 4):
-    for c in range(1, 5):
-        ws_inst.cell(row=r, column=c).fill = navy_fill
-        ws_inst.cell(row=r, column=c).border = Border()
+merge_styled(ws_inst, 'A1:D3', "MONTHLY BUDGET TRACKER",
+             font=Font(name='Calibri', size=28, bold=True, color=WHITE), fill=navy_fill,
+             alignment=Alignment(horizontal='center', vertical='center'))
 
 # Subtitle
-ws_inst.merge_cells('A4:D4')
-sub = ws_inst['A4']
-sub.value = "Your Complete Personal Finance Companion"
-sub.font = Font(name='Calibri', size=13, italic=True, color=NAVY_LIGHT)
-sub.fill = PatternFill(start_color=LIGHT_BLUE, end_color=LIGHT_BLUE, fill_type='solid')
-sub.alignment = Alignment(horizontal='center', vertical='center')
+merge_styled(ws_inst, 'A4:D4', "Your Complete Personal Finance Companion",
+             font=Font(name='Calibri', size=13, italic=True, color=NAVY_LIGHT), fill=light_fill,
+             alignment=Alignment(horizontal='center', vertical='center'))
 ws_inst.row_dimensions[4].height = 30
-for c in range(1, 5):
-    ws_inst.cell(row=4, column=c).fill = PatternFill(start_color=LIGHT_BLUE, end_color=LIGHT_BLUE, fill_type='solid')
 
 row = 6
 
@@ -224,7 +242,7 @@ row += 2
 # ── How To Use ──
 ws_inst.merge_cells(f'B{row}:C{row}')
 ws_inst.cell(row=row, column=2).value = "How To Use This Workbook"
-ws_inst.cell(row=row, column=2).font = Font(name='Calibri', size=14, bold=True, color=NAVY)
+ws_inst.cell(row=row, column=2).font = font_subtitle
 ws_inst.cell(row=row, column=2).border = Border(bottom=Side(style='medium', color=NAVY))
 ws_inst.cell(row=row, column=3).border = Border(bottom=Side(style='medium', color=NAVY))
 row += 2
@@ -247,12 +265,12 @@ steps = [
 for title, sheet_name, desc in steps:
     # Step title row with colored left bar
     ws_inst.cell(row=row, column=2).value = ">"
-    ws_inst.cell(row=row, column=2).font = Font(name='Calibri', size=11, bold=True, color=EMERALD)
+    ws_inst.cell(row=row, column=2).font = font_positive
     ws_inst.cell(row=row, column=2).fill = emerald_fill
     ws_inst.cell(row=row, column=2).alignment = align_center
     ws_inst.merge_cells(f'C{row}:C{row}')
     ws_inst.cell(row=row, column=3).value = f"{title}  (Sheet: \"{sheet_name}\")"
-    ws_inst.cell(row=row, column=3).font = Font(name='Calibri', size=11, bold=True, color=NAVY)
+    ws_inst.cell(row=row, column=3).font = font_header_dark
     ws_inst.cell(row=row, column=3).fill = emerald_fill
     row += 1
     # Description
@@ -266,15 +284,15 @@ for title, sheet_name, desc in steps:
 # ── Color Legend ──
 ws_inst.merge_cells(f'B{row}:C{row}')
 ws_inst.cell(row=row, column=2).value = "Color-Coded Legend"
-ws_inst.cell(row=row, column=2).font = Font(name='Calibri', size=14, bold=True, color=NAVY)
+ws_inst.cell(row=row, column=2).font = font_subtitle
 ws_inst.cell(row=row, column=2).border = Border(bottom=Side(style='medium', color=NAVY))
 ws_inst.cell(row=row, column=3).border = Border(bottom=Side(style='medium', color=NAVY))
 row += 2
 
 legend_items = [
-    (emerald_fill, Font(name='Calibri', size=11, bold=True, color=EMERALD), "Green", "Under budget / Positive cash flow"),
-    (red_fill_bg, Font(name='Calibri', size=11, bold=True, color=RED), "Red", "Over budget / Negative cash flow"),
-    (amber_fill, Font(name='Calibri', size=11, bold=True, color=AMBER), "Amber", "Approaching budget limit (within 10%)"),
+    (emerald_fill, font_positive, "Green", "Under budget / Positive cash flow"),
+    (red_fill_bg, font_negative, "Red", "Over budget / Negative cash flow"),
+    (amber_fill, font_warning, "Amber", "Approaching budget limit (within 10%)"),
     (navy_fill, font_white_bold, "Navy", "Section headers and titles"),
     (light_fill, font_body, "Light Blue", "Alternating row shading for readability"),
 ]
@@ -296,7 +314,7 @@ row += 1
 # ── Tips ──
 ws_inst.merge_cells(f'B{row}:C{row}')
 ws_inst.cell(row=row, column=2).value = "Budgeting Tips"
-ws_inst.cell(row=row, column=2).font = Font(name='Calibri', size=14, bold=True, color=NAVY)
+ws_inst.cell(row=row, column=2).font = font_subtitle
 ws_inst.cell(row=row, column=2).border = Border(bottom=Side(style='medium', color=NAVY))
 ws_inst.cell(row=row, column=3).border = Border(bottom=Side(style='medium', color=NAVY))
 row += 2
@@ -313,7 +331,7 @@ tips = [
 
 for i, tip in enumerate(tips, 1):
     ws_inst.cell(row=row, column=2).value = str(i)
-    ws_inst.cell(row=row, column=2).font = Font(name='Calibri', size=10, bold=True, color=WHITE)
+    ws_inst.cell(row=row, column=2).font = font_band
     ws_inst.cell(row=row, column=2).fill = navy_fill
     ws_inst.cell(row=row, column=2).alignment = align_center
     ws_inst.cell(row=row, column=2).border = thin_border
@@ -330,6 +348,10 @@ ws_inst.cell(row=row, column=2).value = "Do not modify cells with formulas (gray
 ws_inst.cell(row=row, column=2).font = Font(name='Calibri', size=10, italic=True, color=RED)
 ws_inst.cell(row=row, column=2).alignment = align_center
 
+# White background for the visible area, A1:D64 (a column style would run
+# past row 64)
+range_background(ws_inst, 'A1:D64', white_fill)
+
 # Freeze
 ws_inst.freeze_panes = 'A5'
 
@@ -337,6 +359,7 @@ ws_inst.freeze_panes = 'A5'
 # ───────────────────────────────────────────────────────────────
 # SHEET 2: DASHBOARD
 # ───────────────────────────────────────────────────────────────
+trace.phase("Dashboard")
 ws_dash = wb.create_sheet("Dashboard")
 ws_dash.sheet_properties.tabColor = EMERALD
 
@@ -348,14 +371,8 @@ for col, w in col_widths_dash.items():
     ws_dash.column_dimensions[col].width = w
 
 # ── Title Banner ──
-ws_dash.merge_cells('A1:H2')
-ws_dash['A1'].value = "FINANCIAL DASHBOARD"
-ws_dash['A1'].font = Font(name='Calibri', size=22, bold=True, color=WHITE)
-ws_dash['A1'].fill = navy_fill
-ws_dash['A1'].alignment = align_center
-for r in range(1, 3):
-    for c in range(1, 9):
-        ws_dash.cell(row=r, column=c).fill = navy_fill
+merge_styled(ws_dash, 'A1:H2', "FINANCIAL DASHBOARD",
+             font=font_banner, fill=navy_fill, alignment=align_center)
 
 # ── Summary KPI Cards ──
 row = 4
@@ -370,7 +387,7 @@ for i, (cs, ce) in enumerate(kpi_cols):
     ws_dash.merge_cells(start_row=row, start_column=cs, end_row=row, end_column=ce)
     cell = ws_dash.cell(row=row, column=cs)
     cell.value = kpi_labels[i]
-    cell.font = Font(name='Calibri', size=10, bold=True, color=GRAY_DARK)
+    cell.font = font_kpi_label
     cell.fill = light_fill
     cell.alignment = align_center
     cell.border = thin_border
@@ -393,19 +410,19 @@ for i, (cs, ce) in enumerate(kpi_cols):
 # Total Income
 ws_dash.cell(row=6, column=2).value = "=SUMPRODUCT((Transactions!D2:D501>0)*Transactions!D2:D501)"
 ws_dash.cell(row=6, column=2).number_format = CURRENCY_FMT
-ws_dash.cell(row=6, column=2).font = Font(name='Calibri', size=18, bold=True, color=EMERALD)
+ws_dash.cell(row=6, column=2).font = font_kpi_positive
 ws_dash.cell(row=6, column=2).alignment = align_center
 
 # Total Expenses
 ws_dash.cell(row=6, column=4).value = "=SUMPRODUCT((Transactions!D2:D501<0)*Transactions!D2:D501)*-1"
 ws_dash.cell(row=6, column=4).number_format = CURRENCY_FMT
-ws_dash.cell(row=6, column=4).font = Font(name='Calibri', size=18, bold=True, color=RED)
+ws_dash.cell(row=6, column=4).font = font_kpi_negative
 ws_dash.cell(row=6, column=4).alignment = align_center
 
 # Net Savings
 ws_dash.cell(row=6, column=6).value = "=B6-D6"
 ws_dash.cell(row=6, column=6).number_format = CURRENCY_FMT
-ws_dash.cell(row=6, column=6).font = Font(name='Calibri', size=18, bold=True, color=NAVY)
+ws_dash.cell(row=6, column=6).font = font_kpi
 ws_dash.cell(row=6, column=6).alignment = align_center
 
 # Row 7-8: second row of KPIs
@@ -414,7 +431,7 @@ for i, (cs, ce) in enumerate(kpi_cols):
     ws_dash.merge_cells(start_row=row, start_column=cs, end_row=row, end_column=ce)
     cell = ws_dash.cell(row=row, column=cs)
     cell.value = kpi_labels[i + 3]
-    cell.font = Font(name='Calibri', size=10, bold=True, color=GRAY_DARK)
+    cell.font = font_kpi_label
     cell.fill = light_fill
     cell.alignment = align_center
     cell.border = thin_border
@@ -432,17 +449,17 @@ for i, (cs, ce) in enumerate(kpi_cols):
 # Savings Rate
 ws_dash.cell(row=9, column=2).value = '=IF(B6=0,0,F6/B6)'
 ws_dash.cell(row=9, column=2).number_format = PERCENT_FMT
-ws_dash.cell(row=9, column=2).font = Font(name='Calibri', size=18, bold=True, color=NAVY)
+ws_dash.cell(row=9, column=2).font = font_kpi
 ws_dash.cell(row=9, column=2).alignment = align_center
 
 # Largest Expense Category
 ws_dash.cell(row=9, column=4).value = '=IFERROR(INDEX(\'Monthly Budget\'!B5:B16,MATCH(MAX(\'Monthly Budget\'!D5:D16),\'Monthly Budget\'!D5:D16,0)),"-")'
-ws_dash.cell(row=9, column=4).font = Font(name='Calibri', size=14, bold=True, color=NAVY)
+ws_dash.cell(row=9, column=4).font = font_subtitle
 ws_dash.cell(row=9, column=4).alignment = align_center
 
 # Placeholder for days remaining
 ws_dash.cell(row=9, column=6).value = '=DAY(EOMONTH(TODAY(),0))-DAY(TODAY())'
-ws_dash.cell(row=9, column=6).font = Font(name='Calibri', size=18, bold=True, color=NAVY)
+ws_dash.cell(row=9, column=6).font = font_kpi
 ws_dash.cell(row=9, column=6).alignment = align_center
 
 # Conditional formatting on net savings
@@ -450,10 +467,10 @@ green_font = Font(color=EMERALD)
 red_font = Font(color=RED)
 ws_dash.conditional_formatting.add('F6',
     CellIsRule(operator='greaterThanOrEqual', formula=['0'],
-               fill=emerald_fill, font=Font(name='Calibri', size=18, bold=True, color=EMERALD)))
+               fill=emerald_fill, font=font_kpi_positive))
 ws_dash.conditional_formatting.add('F6',
     CellIsRule(operator='lessThan', formula=['0'],
-               fill=red_fill_bg, font=Font(name='Calibri', size=18, bold=True, color=RED)))
+               fill=red_fill_bg, font=font_kpi_negative))
 
 # ── Category Breakdown ──
 row = 11
@@ -474,7 +491,7 @@ for idx, cat in enumerate(CATEGORIES):
     bref = f"'Monthly Budget'!C{5 + idx}"
     aref = f"'Monthly Budget'!D{5 + idx}"
 
-    ws_dash.cell(row=r, column=2, value=cat).font = Font(name='Calibri', size=11, bold=True, color=NAVY)
+    ws_dash.cell(row=r, column=2, value=cat).font = font_header_dark
     ws_dash.cell(row=r, column=2).fill = bg
     ws_dash.cell(row=r, column=2).border = thin_border
 
@@ -531,7 +548,7 @@ ws_dash.conditional_formatting.add(status_range,
     CellIsRule(operator='equal', formula=['"OVER BUDGET"'], fill=red_fill_bg, font=font_negative))
 ws_dash.conditional_formatting.add(status_range,
     CellIsRule(operator='equal', formula=['"Near Limit"'], fill=amber_fill,
-               font=Font(name='Calibri', size=11, bold=True, color=AMBER)))
+               font=font_warning))
 
 # Totals row
 total_row = 25
@@ -542,7 +559,7 @@ ws_dash.cell(row=total_row, column=2).alignment = align_center
 for c in range(3, 8):
     ws_dash.cell(row=total_row, column=c).fill = navy_fill
     ws_dash.cell(row=total_row, column=c).border = medium_border
-    ws_dash.cell(row=total_row, column=c).font = Font(name='Calibri', size=11, bold=True, color=WHITE)
+    ws_dash.cell(row=total_row, column=c).font = font_header
     ws_dash.cell(row=total_row, column=c).alignment = align_center
 
 ws_dash.cell(row=total_row, column=3).value = "=SUM(C13:C24)"
@@ -574,7 +591,7 @@ for i, h in enumerate(mc_headers):
 for mi, month in enumerate(MONTHS):
     r = row + 1 + mi
     bg = light_fill if mi % 2 == 0 else white_fill
-    ws_dash.cell(row=r, column=2, value=month).font = Font(name='Calibri', size=11, bold=True, color=NAVY)
+    ws_dash.cell(row=r, column=2, value=month).font = font_header_dark
     ws_dash.cell(row=r, column=2).fill = bg
     ws_dash.cell(row=r, column=2).border = thin_border
     ws_dash.cell(row=r, column=2).alignment = align_center
@@ -626,7 +643,7 @@ ws_dash.cell(row=atr, column=2).alignment = align_center
 for c in range(3, 7):
     ws_dash.cell(row=atr, column=c).fill = navy_fill
     ws_dash.cell(row=atr, column=c).border = medium_border
-    ws_dash.cell(row=atr, column=c).font = Font(name='Calibri', size=11, bold=True, color=WHITE)
+    ws_dash.cell(row=atr, column=c).font = font_header
     ws_dash.cell(row=atr, column=c).alignment = align_center
 ws_dash.cell(row=atr, column=3).value = "=SUM(C29:C40)"
 ws_dash.cell(row=atr, column=3).number_format = CURRENCY_FMT
@@ -646,6 +663,7 @@ ws_dash.freeze_panes = 'B3'
 # ───────────────────────────────────────────────────────────────
 # SHEET 3: MONTHLY BUDGET
 # ───────────────────────────────────────────────────────────────
+trace.phase("Monthly Budget")
 ws_budget = wb.create_sheet("Monthly Budget")
 ws_budget.sheet_properties.tabColor = "2563EB"
 
@@ -656,19 +674,13 @@ for col, w in col_widths_budget.items():
     ws_budget.column_dimensions[col].width = w
 
 # Title
-ws_budget.merge_cells('A1:G2')
-ws_budget['A1'].value = "MONTHLY BUDGET PLANNER"
-ws_budget['A1'].font = Font(name='Calibri', size=22, bold=True, color=WHITE)
-ws_budget['A1'].fill = navy_fill
-ws_budget['A1'].alignment = align_center
-for r in range(1, 3):
-    for c in range(1, 8):
-        ws_budget.cell(row=r, column=c).fill = navy_fill
+merge_styled(ws_budget, 'A1:G2', "MONTHLY BUDGET PLANNER",
+             font=font_banner, fill=navy_fill, alignment=align_center)
 
 # Month selector info
 ws_budget.merge_cells('B3:F3')
 ws_budget.cell(row=3, column=2).value = "Enter your budgeted amounts in column C. Actual spending is calculated automatically from the Transactions sheet."
-ws_budget.cell(row=3, column=2).font = Font(name='Calibri', size=10, italic=True, color=GRAY_DARK)
+ws_budget.cell(row=3, column=2).font = font_caption
 ws_budget.cell(row=3, column=2).alignment = align_center
 ws_budget.row_dimensions[3].height = 28
 
@@ -691,7 +703,7 @@ for idx, cat in enumerate(CATEGORIES):
 
     # Category name
     ws_budget.cell(row=r, column=2, value=cat)
-    ws_budget.cell(row=r, column=2).font = Font(name='Calibri', size=11, bold=True, color=NAVY)
+    ws_budget.cell(row=r, column=2).font = font_header_dark
     ws_budget.cell(row=r, column=2).fill = bg
     ws_budget.cell(row=r, column=2).border = thin_border
     ws_budget.cell(row=r, column=2).alignment = align_left
@@ -747,7 +759,7 @@ ws_budget.conditional_formatting.add(status_range_b,
     CellIsRule(operator='equal', formula=['"OVER BUDGET"'], fill=red_fill_bg, font=font_negative))
 ws_budget.conditional_formatting.add(status_range_b,
     CellIsRule(operator='equal', formula=['"Near Limit"'], fill=amber_fill,
-               font=Font(name='Calibri', size=11, bold=True, color=AMBER)))
+               font=font_warning))
 
 # Totals row
 tr = 17
@@ -758,7 +770,7 @@ ws_budget.cell(row=tr, column=2).alignment = align_center
 for c in range(3, 7):
     ws_budget.cell(row=tr, column=c).fill = navy_fill
     ws_budget.cell(row=tr, column=c).border = medium_border
-    ws_budget.cell(row=tr, column=c).font = Font(name='Calibri', size=11, bold=True, color=WHITE)
+    ws_budget.cell(row=tr, column=c).font = font_header
     ws_budget.cell(row=tr, column=c).alignment = align_center
 
 ws_budget.cell(row=tr, column=3).value = "=SUM(C5:C16)"
@@ -777,6 +789,7 @@ ws_budget.freeze_panes = 'B5'
 # ───────────────────────────────────────────────────────────────
 # SHEET 4: TRANSACTIONS
 # ───────────────────────────────────────────────────────────────
+trace.phase("Transactions")
 ws_trans = wb.create_sheet("Transactions")
 ws_trans.sheet_properties.tabColor = "F59E0B"
 
@@ -802,25 +815,10 @@ for i, h in enumerate(trans_headers):
 ws_trans.row_dimensions[1].height = 32
 
 # Pre-format 500 data rows
+# (date/amount formats, centred category and payment method)
 for r in range(2, 502):
-    bg = light_fill if r % 2 == 0 else white_fill
     for c in range(1, 7):
-        cell = ws_trans.cell(row=r, column=c)
-        cell.fill = bg
-        cell.border = thin_border
-        cell.font = font_body
-
-    # Date column formatting
-    ws_trans.cell(row=r, column=1).number_format = DATE_FMT
-    ws_trans.cell(row=r, column=1).alignment = align_center
-
-    # Amount formatting
-    ws_trans.cell(row=r, column=4).number_format = CURRENCY_FMT
-    ws_trans.cell(row=r, column=4).alignment = align_right
-
-    # Center-align category and payment method
-    ws_trans.cell(row=r, column=3).alignment = align_center
-    ws_trans.cell(row=r, column=5).alignment = align_center
+        styles.apply(ws_trans.cell(row=r, column=c), TRANS_STYLES[r % 2, c])
 
 # Data Validation: Category dropdown
 cat_list = '"' + ','.join(["Income"] + CATEGORIES) + '"'
@@ -893,6 +891,7 @@ ws_trans.auto_filter.ref = "A1:F501"
 # ───────────────────────────────────────────────────────────────
 # SHEET 5: ANNUAL OVERVIEW
 # ───────────────────────────────────────────────────────────────
+trace.phase("Annual Overview")
 ws_annual = wb.create_sheet("Annual Overview")
 ws_annual.sheet_properties.tabColor = "8B5CF6"
 
@@ -907,19 +906,13 @@ ws_annual.column_dimensions[get_column_letter(15)].width = 16  # Annual Total co
 ws_annual.column_dimensions[get_column_letter(16)].width = 14  # Monthly Avg col P
 
 # Title
-ws_annual.merge_cells('A1:P2')
-ws_annual['A1'].value = "ANNUAL FINANCIAL OVERVIEW"
-ws_annual['A1'].font = Font(name='Calibri', size=22, bold=True, color=WHITE)
-ws_annual['A1'].fill = navy_fill
-ws_annual['A1'].alignment = align_center
-for r in range(1, 3):
-    for c in range(1, 17):
-        ws_annual.cell(row=r, column=c).fill = navy_fill
+merge_styled(ws_annual, 'A1:P2', "ANNUAL FINANCIAL OVERVIEW",
+             font=font_banner, fill=navy_fill, alignment=align_center)
 
 # Year label
 ws_annual.merge_cells('B3:P3')
 ws_annual.cell(row=3, column=2).value = "Year: 2026  |  Enter monthly totals or let formulas auto-calculate from the Transactions sheet"
-ws_annual.cell(row=3, column=2).font = Font(name='Calibri', size=10, italic=True, color=GRAY_DARK)
+ws_annual.cell(row=3, column=2).font = font_caption
 ws_annual.cell(row=3, column=2).alignment = align_center
 
 # Headers row 4
@@ -950,7 +943,7 @@ ws_annual.cell(row=row, column=16).border = header_border
 # Income row
 row = 5
 make_section_header(ws_annual, row, 2, 2, "INCOME", fill=PatternFill(start_color=EMERALD, end_color=EMERALD, fill_type='solid'))
-ws_annual.cell(row=row, column=2).font = Font(name='Calibri', size=11, bold=True, color=WHITE)
+ws_annual.cell(row=row, column=2).font = font_header
 
 for mi in range(12):
     col = mi + 3
@@ -986,7 +979,7 @@ ws_annual.cell(row=row, column=16).alignment = align_right
 # Expense categories (rows 6-17, but let's add a small "Expenses" section header)
 row = 6
 # Section header for expenses
-ws_annual.cell(row=row, column=2, value="EXPENSES").font = Font(name='Calibri', size=10, bold=True, color=WHITE)
+ws_annual.cell(row=row, column=2, value="EXPENSES").font = font_band
 ws_annual.cell(row=row, column=2).fill = PatternFill(start_color=RED, end_color=RED, fill_type='solid')
 ws_annual.cell(row=row, column=2).alignment = align_center
 ws_annual.cell(row=row, column=2).border = thin_border
@@ -998,7 +991,7 @@ for idx, cat in enumerate(CATEGORIES):
     r = 7 + idx
     bg = light_fill if idx % 2 == 0 else white_fill
     ws_annual.cell(row=r, column=2, value=cat)
-    ws_annual.cell(row=r, column=2).font = Font(name='Calibri', size=11, color=NAVY)
+    ws_annual.cell(row=r, column=2).font = font_label
     ws_annual.cell(row=r, column=2).fill = bg
     ws_annual.cell(row=r, column=2).border = thin_border
     ws_annual.cell(row=r, column=2).alignment = align_left
@@ -1011,11 +1004,7 @@ for idx, cat in enumerate(CATEGORIES):
             f'*(Transactions!C2:C501="{cat}")'
             f'*(Transactions!D2:D501<0)*Transactions!D2:D501)*-1'
         )
-        ws_annual.cell(row=r, column=col).number_format = CURRENCY_FMT
-        ws_annual.cell(row=r, column=col).font = font_money
-        ws_annual.cell(row=r, column=col).fill = bg
-        ws_annual.cell(row=r, column=col).border = thin_border
-        ws_annual.cell(row=r, column=col).alignment = align_right
+        styles.apply(ws_annual.cell(row=r, column=col), MONEY_STYLES[idx % 2])
 
     # Annual total
     ws_annual.cell(row=r, column=15).value = f"=SUM(C{r}:N{r})"
@@ -1042,7 +1031,7 @@ ws_annual.cell(row=ter, column=2).alignment = align_center
 for col in range(3, 17):
     ws_annual.cell(row=ter, column=col).fill = navy_fill
     ws_annual.cell(row=ter, column=col).border = medium_border
-    ws_annual.cell(row=ter, column=col).font = Font(name='Calibri', size=11, bold=True, color=WHITE)
+    ws_annual.cell(row=ter, column=col).font = font_header
     ws_annual.cell(row=ter, column=col).alignment = align_right
     if col <= 14:
         ws_annual.cell(row=ter, column=col).value = f"=SUM({get_column_letter(col)}7:{get_column_letter(col)}18)"
@@ -1055,14 +1044,14 @@ for col in range(3, 17):
 # Net Savings row
 nsr = 20
 ws_annual.merge_cells(f'B{nsr}:B{nsr}')
-ws_annual.cell(row=nsr, column=2, value="NET SAVINGS").font = Font(name='Calibri', size=12, bold=True, color=WHITE)
+ws_annual.cell(row=nsr, column=2, value="NET SAVINGS").font = font_white_bold
 ws_annual.cell(row=nsr, column=2).fill = PatternFill(start_color=EMERALD, end_color=EMERALD, fill_type='solid')
 ws_annual.cell(row=nsr, column=2).border = medium_border
 ws_annual.cell(row=nsr, column=2).alignment = align_center
 for col in range(3, 17):
     ws_annual.cell(row=nsr, column=col).fill = PatternFill(start_color=EMERALD, end_color=EMERALD, fill_type='solid')
     ws_annual.cell(row=nsr, column=col).border = medium_border
-    ws_annual.cell(row=nsr, column=col).font = Font(name='Calibri', size=11, bold=True, color=WHITE)
+    ws_annual.cell(row=nsr, column=col).font = font_header
     ws_annual.cell(row=nsr, column=col).alignment = align_right
     cl = get_column_letter(col)
     ws_annual.cell(row=nsr, column=col).value = f"={cl}5-{cl}19"
@@ -1070,7 +1059,7 @@ for col in range(3, 17):
 
 # Savings Rate row
 srr = 21
-ws_annual.cell(row=srr, column=2, value="SAVINGS RATE").font = Font(name='Calibri', size=11, bold=True, color=NAVY)
+ws_annual.cell(row=srr, column=2, value="SAVINGS RATE").font = font_header_dark
 ws_annual.cell(row=srr, column=2).fill = light_fill
 ws_annual.cell(row=srr, column=2).border = thin_border
 ws_annual.cell(row=srr, column=2).alignment = align_center
@@ -1078,7 +1067,7 @@ for col in range(3, 17):
     cl = get_column_letter(col)
     ws_annual.cell(row=srr, column=col).value = f'=IF({cl}5=0,0,{cl}20/{cl}5)'
     ws_annual.cell(row=srr, column=col).number_format = PERCENT_FMT
-    ws_annual.cell(row=srr, column=col).font = Font(name='Calibri', size=11, bold=True, color=NAVY)
+    ws_annual.cell(row=srr, column=col).font = font_header_dark
     ws_annual.cell(row=srr, column=col).fill = light_fill
     ws_annual.cell(row=srr, column=col).border = thin_border
     ws_annual.cell(row=srr, column=col).alignment = align_center
@@ -1090,11 +1079,11 @@ for col in range(3, 17):
     ws_annual.conditional_formatting.add(cell_ref,
         CellIsRule(operator='greaterThanOrEqual', formula=['0'],
                    fill=PatternFill(start_color=EMERALD, end_color=EMERALD, fill_type='solid'),
-                   font=Font(name='Calibri', size=11, bold=True, color=WHITE)))
+                   font=font_header))
     ws_annual.conditional_formatting.add(cell_ref,
         CellIsRule(operator='lessThan', formula=['0'],
                    fill=PatternFill(start_color=RED, end_color=RED, fill_type='solid'),
-                   font=Font(name='Calibri', size=11, bold=True, color=WHITE)))
+                   font=font_header))
 
 ws_annual.freeze_panes = 'C5'
 
@@ -1107,11 +1096,16 @@ ws_annual.freeze_panes = 'C5'
 wb.active = 0
 
 # Save
-output_path = "/Users/timdunn/mobile_app_ideas/etsy-templates/monthly-budget-tracker.xlsx"
-wb.save(output_path)
+output_path = (sys.argv[1] if len(sys.argv) > 1 else
+               os.path.join(os.path.dirname(os.path.abspath(__file__)), "monthly-budget-tracker.xlsx"))
+trace.phase("save")
+with trace.span("consolidate conditional formatting"):
+    consolidate_conditional_formatting(wb)
+with trace.span("write xlsx"):
+    save_canonical(wb, output_path)
 print(f"SUCCESS: Workbook saved to {output_path}")
 print(f"Sheets: {wb.sheetnames}")
 print(f"Transactions sheet has {len(sample_transactions)} sample rows pre-filled")
 print(f"Categories: {len(CATEGORIES)}")
 print(f"Pre-formatted transaction rows: 500")
-
+trace.finish()
@@ -12,6 +12,14 @@ from openpyxl.styles import (
 from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.datavalidation import DataValidation
 from openpyxl.formatting.rule import CellIsRule, FormulaRule
+import os
+import sys
+
+from build_trace import BuildTrace
+from cf_optimizer import consolidate_conditional_formatting
+from range_styles import band_rows
+from sheet_stream import cell_style, stream_rows
+from xlsx_canonical import save_canonical
 
 # ── Colour palette ──────────────────────────────────────────────────
 CHARCOAL   = "2D3748"
@@ -47,7 +55,6 @@ body_font_bold = Font(name="Calibri", size=11, color=DARK_TEXT, bold=True)
 small_font     = Font(name="Calibri", size=10, color=MED_GRAY)
 alt_fill       = PatternFill("solid", fgColor=ALT_ROW)
 editable_fill  = PatternFill("solid", fgColor=EDITABLE_BG)
-no_fill        = PatternFill(fill_type=None)
 
 thin_border = Border(
     left=Side(style="thin", color=LIGHT_GRAY),
@@ -67,6 +74,7 @@ MAX_DEBTS = 20
 MAX_MONTHS = 120
 
 wb = openpyxl.Workbook()
+trace = BuildTrace.from_env("debt", wb)
 
 
 def style_header_row(ws, row, max_col, font=header_font, fill=header_fill):
@@ -79,12 +87,7 @@ def style_header_row(ws, row, max_col, font=header_font, fill=header_fill):
 
 
 def apply_alt_rows(ws, start_row, end_row, max_col):
-    for r in range(start_row, end_row + 1):
-        if (r - start_row) % 2 == 1:
-            for c in range(1, max_col + 1):
-                cell = ws.cell(row=r, column=c)
-                if cell.fill == no_fill or cell.fill.fgColor is None or cell.fill.fgColor.rgb == "00000000":
-                    cell.fill = alt_fill
+    band_rows(ws, f"A{start_row}:{get_column_letter(max_col)}{end_row}", alt_fill)
 
 
 def set_col_widths(ws, widths: dict):
@@ -115,6 +118,7 @@ def subtitle_block(ws, row, col, text, merge_end_col):
 # ====================================================================
 # SHEET 1 - INSTRUCTIONS
 # ====================================================================
+trace.phase("Instructions")
 ws_instr = wb.active
 ws_instr.title = "Instructions"
 ws_instr.sheet_properties.tabColor = CHARCOAL
@@ -238,6 +242,7 @@ ws_instr.sheet_view.showGridLines = False
 # ====================================================================
 # SHEET 3 - DEBT INPUT (create before Dashboard so Dashboard can ref)
 # ====================================================================
+trace.phase("Debt Input")
 ws_input = wb.create_sheet("Debt Input")
 ws_input.sheet_properties.tabColor = TEAL
 
@@ -356,6 +361,7 @@ ws_input.sheet_view.showGridLines = False
 # ====================================================================
 # SHEET 2 - DASHBOARD
 # ====================================================================
+trace.phase("Dashboard")
 ws_dash = wb.create_sheet("Dashboard")
 wb.move_sheet("Dashboard", offset=-1)
 ws_dash.sheet_properties.tabColor = TEAL
@@ -583,6 +589,7 @@ ws_dash.sheet_view.showGridLines = False
 # ====================================================================
 def build_plan_sheet(ws, sheet_name, sort_method):
     ws.sheet_properties.tabColor = TEAL if sort_method == "avalanche" else GOLD
+    trace.step("sorted debt list")
 
     DEBT_COL_START = 3  # C
     DEBT_COL_END = DEBT_COL_START + MAX_DEBTS - 1  # V = col 22
@@ -677,6 +684,7 @@ def build_plan_sheet(ws, sheet_name, sort_method):
     apply_alt_rows(ws, SORT_DATA_START, SORT_DATA_END, 6)
 
     # Month-by-month schedule
+    trace.step("month-by-month schedule")
     SCHED_HDR = SORT_DATA_END + 2  # row 26
     SCHED_START = SCHED_HDR + 1     # row 27
 
@@ -704,32 +712,29 @@ def build_plan_sheet(ws, sheet_name, sort_method):
 
     print(f"Building {sheet_name} month-by-month schedule ({MAX_MONTHS} months)...")
 
-    for month in range(1, MAX_MONTHS + 1):
+    # 120 months x 80 formulas: streamed at save time rather than held as cells
+    month_style = cell_style(ws, font=body_font, alignment=center, border=thin_border)
+    money_style = cell_style(ws, number_format=CURRENCY_FMT, font=body_font,
+                             alignment=center, border=thin_border)
+    balance_style = cell_style(ws, number_format=CURRENCY_FMT, font=body_font_bold,
+                               alignment=center, border=thin_border)
+    debt_letters = [get_column_letter(DEBT_COL_START + d) for d in range(MAX_DEBTS)]
+    helper_letters = [[get_column_letter(hcol(d, sub)) for sub in range(3)]
+                      for d in range(MAX_DEBTS)]
+
+    def schedule_row(month):
         mr = SCHED_START + month - 1
-
-        ws.cell(row=mr, column=2, value=month)
-        ws.cell(row=mr, column=2).font = body_font
-        ws.cell(row=mr, column=2).alignment = center
-        ws.cell(row=mr, column=2).border = thin_border
-
+        prev_row = mr - 1
+        row = [(2, month, month_style)]
+        helpers = []
         for d in range(MAX_DEBTS):
-            debt_col = DEBT_COL_START + d
-            debt_col_letter = get_column_letter(debt_col)
             sort_row = SORT_HDR + 1 + d
-
-            h_interest_col = hcol(d, 0)
-            h_payment_col = hcol(d, 1)
-            h_extra_remain_col = hcol(d, 2)
-
-            hi_letter = get_column_letter(h_interest_col)
-            hp_letter = get_column_letter(h_payment_col)
-            he_letter = get_column_letter(h_extra_remain_col)
+            hi_letter, hp_letter, he_letter = helper_letters[d]
 
             if month == 1:
                 prev_bal = f"$D${sort_row}"
             else:
-                prev_row = mr - 1
-                prev_bal = f"{debt_col_letter}{prev_row}"
+                prev_bal = f"{debt_letters[d]}{prev_row}"
 
             rate_ref = f"$E${sort_row}"
             min_ref = f"$F${sort_row}"
@@ -738,72 +743,57 @@ def build_plan_sheet(ws, sheet_name, sort_method):
                 if month == 1:
                     extra_budget = f"{EXTRA_REF}"
                 else:
-                    prev_row = mr - 1
-                    freed_parts = []
-                    for dd in range(MAX_DEBTS):
-                        dd_sort_row = SORT_HDR + 1 + dd
-                        dd_col_letter = get_column_letter(DEBT_COL_START + dd)
-                        freed_parts.append(f"IF({dd_col_letter}{prev_row}<=0,$F${dd_sort_row},0)")
-                    freed_sum = "+".join(freed_parts)
+                    freed_sum = "+".join(
+                        f"IF({debt_letters[dd]}{prev_row}<=0,$F${SORT_HDR + 1 + dd},0)"
+                        for dd in range(MAX_DEBTS))
                     extra_budget = f"({EXTRA_REF}+{freed_sum})"
             else:
-                prev_he_letter = get_column_letter(hcol(d - 1, 2))
-                extra_budget = f"{prev_he_letter}{mr}"
+                extra_budget = f"{helper_letters[d - 1][2]}{mr}"
 
-            # Interest
-            ws.cell(row=mr, column=h_interest_col,
-                value=f"=IF({prev_bal}<=0,0,{prev_bal}*{rate_ref}/12)")
-
-            # Payment
-            ws.cell(row=mr, column=h_payment_col,
-                value=f"=IF({prev_bal}<=0,0,MIN({prev_bal}+{hi_letter}{mr},{min_ref}+{extra_budget}))")
-
-            # Extra remaining
-            ws.cell(row=mr, column=h_extra_remain_col,
-                value=f"=IF({prev_bal}<=0,{extra_budget},MAX(0,{min_ref}+{extra_budget}-{prev_bal}-{hi_letter}{mr}))")
+            # Interest, payment, extra remaining
+            helpers += [
+                (hcol(d, 0), f"=IF({prev_bal}<=0,0,{prev_bal}*{rate_ref}/12)", None),
+                (hcol(d, 1), f"=IF({prev_bal}<=0,0,MIN({prev_bal}+{hi_letter}{mr},"
+                             f"{min_ref}+{extra_budget}))", None),
+                (hcol(d, 2), f"=IF({prev_bal}<=0,{extra_budget},MAX(0,{min_ref}+"
+                             f"{extra_budget}-{prev_bal}-{hi_letter}{mr}))", None),
+            ]
 
             # Remaining balance
-            ws.cell(row=mr, column=debt_col,
-                value=f"=IF({prev_bal}<=0,0,MAX(0,{prev_bal}+{hi_letter}{mr}-{hp_letter}{mr}))")
-            ws.cell(row=mr, column=debt_col).number_format = CURRENCY_FMT
-            ws.cell(row=mr, column=debt_col).font = body_font
-            ws.cell(row=mr, column=debt_col).alignment = center
-            ws.cell(row=mr, column=debt_col).border = thin_border
+            row.append((DEBT_COL_START + d,
+                        f"=IF({prev_bal}<=0,0,MAX(0,{prev_bal}+{hi_letter}{mr}-{hp_letter}{mr}))",
+                        money_style))
 
         # Totals for this month
-        pmt_parts = [f"{get_column_letter(hcol(d, 1))}{mr}" for d in range(MAX_DEBTS)]
-        ws.cell(row=mr, column=TOT_PMT_COL, value=f"={'+'.join(pmt_parts)}")
-        ws.cell(row=mr, column=TOT_PMT_COL).number_format = CURRENCY_FMT
-        ws.cell(row=mr, column=TOT_PMT_COL).font = body_font
-        ws.cell(row=mr, column=TOT_PMT_COL).alignment = center
-        ws.cell(row=mr, column=TOT_PMT_COL).border = thin_border
-
-        int_parts = [f"{get_column_letter(hcol(d, 0))}{mr}" for d in range(MAX_DEBTS)]
-        ws.cell(row=mr, column=TOT_INT_COL, value=f"={'+'.join(int_parts)}")
-        ws.cell(row=mr, column=TOT_INT_COL).number_format = CURRENCY_FMT
-        ws.cell(row=mr, column=TOT_INT_COL).font = body_font
-        ws.cell(row=mr, column=TOT_INT_COL).alignment = center
-        ws.cell(row=mr, column=TOT_INT_COL).border = thin_border
-
-        bal_parts = [f"{get_column_letter(DEBT_COL_START + d)}{mr}" for d in range(MAX_DEBTS)]
-        ws.cell(row=mr, column=RUN_BAL_COL, value=f"={'+'.join(bal_parts)}")
-        ws.cell(row=mr, column=RUN_BAL_COL).number_format = CURRENCY_FMT
-        ws.cell(row=mr, column=RUN_BAL_COL).font = body_font_bold
-        ws.cell(row=mr, column=RUN_BAL_COL).alignment = center
-        ws.cell(row=mr, column=RUN_BAL_COL).border = thin_border
-
-    # Conditional formatting: green when paid off
+        row.append((TOT_PMT_COL, "=" + "+".join(f"{h[1]}{mr}" for h in helper_letters),
+                    money_style))
+        row.append((TOT_INT_COL, "=" + "+".join(f"{h[0]}{mr}" for h in helper_letters),
+                    money_style))
+        row.append((RUN_BAL_COL, "=" + "+".join(f"{c}{mr}" for c in debt_letters),
+                    balance_style))
+        return mr, row + helpers
+
+    stream_rows(
+        ws, f"B{SCHED_START}:{get_column_letter(hcol(MAX_DEBTS - 1, 2))}"
+            f"{SCHED_START + MAX_MONTHS - 1}",
+        lambda: (schedule_row(month) for month in range(1, MAX_MONTHS + 1)),
+        styles=[month_style, money_style, balance_style])
+
+    trace.step("formatting")
+    # Conditional formatting: green when paid off. One rule for all debt
+    # columns; INDEX picks the matching sort-table balance by column offset.
     sched_end_row = SCHED_START + MAX_MONTHS - 1
-    for d in range(MAX_DEBTS):
-        col_letter = get_column_letter(DEBT_COL_START + d)
-        cell_range = f"{col_letter}{SCHED_START}:{col_letter}{sched_end_row}"
-        ws.conditional_formatting.add(
-            cell_range,
-            FormulaRule(
-                formula=[f"AND({col_letter}{SCHED_START}=0,$D${SORT_HDR+1+d}>0)"],
-                fill=PatternFill("solid", fgColor=TEAL_LIGHT),
-            )
+    first_col = get_column_letter(DEBT_COL_START)
+    last_col = get_column_letter(DEBT_COL_START + MAX_DEBTS - 1)
+    ws.conditional_formatting.add(
+        f"{first_col}{SCHED_START}:{last_col}{sched_end_row}",
+        FormulaRule(
+            formula=[f"AND({first_col}{SCHED_START}=0,"
+                     f"INDEX($D${SORT_DATA_START}:$D${SORT_DATA_END},"
+                     f"COLUMN({first_col}{SCHED_START})-{DEBT_COL_START - 1})>0)"],
+            fill=PatternFill("solid", fgColor=TEAL_LIGHT),
         )
+    )
 
     ws.freeze_panes = f"C{SCHED_START}"
     ws.sheet_view.showGridLines = False
@@ -821,18 +811,21 @@ def build_plan_sheet(ws, sheet_name, sort_method):
 # ====================================================================
 # SHEET 4 - SNOWBALL PLAN
 # ====================================================================
+trace.phase("Snowball Plan")
 ws_snow = wb.create_sheet("Snowball Plan")
 snow_info = build_plan_sheet(ws_snow, "Snowball Plan", "snowball")
 
 # ====================================================================
 # SHEET 5 - AVALANCHE PLAN
 # ====================================================================
+trace.phase("Avalanche Plan")
 ws_aval = wb.create_sheet("Avalanche Plan")
 aval_info = build_plan_sheet(ws_aval, "Avalanche Plan", "avalanche")
 
 # ====================================================================
 # SHEET 6 - COMPARISON
 # ====================================================================
+trace.phase("Comparison")
 ws_comp = wb.create_sheet("Comparison")
 ws_comp.sheet_properties.tabColor = GOLD
 
@@ -985,6 +978,7 @@ ws_comp.sheet_view.showGridLines = False
 # ====================================================================
 # FINAL: Hide helper columns, save
 # ====================================================================
+trace.phase("save")
 for ws_plan in [ws_snow, ws_aval]:
     for c in range(30, 36):
         ws_plan.column_dimensions[get_column_letter(c)].hidden = True
@@ -996,8 +990,13 @@ for ws_plan in [ws_snow, ws_aval]:
 
 wb.active = wb.sheetnames.index("Dashboard")
 
-OUTPUT = "/Users/timdunn/mobile_app_ideas/etsy-templates/debt-payoff-calculator.xlsx"
-wb.save(OUTPUT)
+OUTPUT = (sys.argv[1] if len(sys.argv) > 1 else
+          os.path.join(os.path.dirname(os.path.abspath(__file__)), "debt-payoff-calculator.xlsx"))
+with trace.span("consolidate conditional formatting"):
+    consolidate_conditional_formatting(wb)
+with trace.span("write xlsx"):
+    save_canonical(wb, OUTPUT)
 print(f"SUCCESS: Created {OUTPUT}")
 print(f"Sheets: {wb.sheetnames}")
 print(f"File saved successfully!")
+trace.finish()
@@ -13,6 +13,14 @@ from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.datavalidation import DataValidation
 from openpyxl.formatting.rule import CellIsRule, FormulaRule
 from copy import copy
+import os
+import sys
+
+from build_trace import BuildTrace
+from cf_optimizer import consolidate_conditional_formatting
+from range_styles import merge_styled
+from style_registry import StyleRegistry
+from xlsx_canonical import save_canonical
 
 # ── colour palette ──────────────────────────────────────────────
 DEEP_PURPLE   = "4C1D95"
@@ -75,6 +83,21 @@ center         = Alignment(horizontal="center", vertical="center")
 left_center    = Alignment(horizontal="left", vertical="center", wrap_text=True)
 right_center   = Alignment(horizontal="right", vertical="center")
 
+# Interned cell styles for the row-by-row tables: (fill colour, kind) -> style ID
+styles = StyleRegistry()
+DATA_KINDS = {
+    "text":     (left_center, None),
+    "center":   (center, None),
+    "date":     (center, date_fmt),
+    "currency": (right_center, currency_fmt),
+}
+ROW_STYLES = {
+    (color, kind): styles.register(font=body_font, fill=PatternFill("solid", fgColor=color),
+                                   border=thin_border, alignment=align, number_format=fmt)
+    for color in (WHITE, LIGHT_PURPLE, LIGHT_ORANGE)
+    for kind, (align, fmt) in DATA_KINDS.items()
+}
+
 
 def style_header_row(ws, row, max_col, font=None, fill=None, height=32):
     """Apply header styling across a row."""
@@ -91,37 +114,30 @@ def style_header_row(ws, row, max_col, font=None, fill=None, height=32):
 
 def style_data_cell(cell, row_idx, is_currency=False, is_date=False, is_center=False):
     """Style a data cell with alternating rows."""
-    cell.font = body_font
-    cell.border = thin_border
-    if row_idx % 2 == 0:
-        cell.fill = PatternFill("solid", fgColor=LIGHT_PURPLE)
-    else:
-        cell.fill = PatternFill("solid", fgColor=WHITE)
     if is_currency:
-        cell.number_format = currency_fmt
-        cell.alignment = right_center
+        kind = "currency"
     elif is_date:
-        cell.number_format = date_fmt
-        cell.alignment = center
+        kind = "date"
     elif is_center:
-        cell.alignment = center
+        kind = "center"
     else:
-        cell.alignment = left_center
+        kind = "text"
+    styles.apply(cell, ROW_STYLES[LIGHT_PURPLE if row_idx % 2 == 0 else WHITE, kind])
 
 
 def write_section_header(ws, row, col_start, col_end, text, merge=True):
     """Write a purple section header across merged cells."""
-    cell = ws.cell(row=row, column=col_start, value=text)
-    cell.font = Font(name="Aptos", bold=True, color=WHITE, size=13)
-    cell.fill = PatternFill("solid", fgColor=MID_PURPLE)
-    cell.alignment = Alignment(horizontal="left", vertical="center")
-    cell.border = medium_border
+    style = dict(font=Font(name="Aptos", bold=True, color=WHITE, size=13),
+                 fill=PatternFill("solid", fgColor=MID_PURPLE),
+                 alignment=Alignment(horizontal="left", vertical="center"),
+                 border=medium_border)
     if merge and col_end > col_start:
-        ws.merge_cells(start_row=row, start_column=col_start,
-                       end_row=row, end_column=col_end)
-        for c in range(col_start + 1, col_end + 1):
-            ws.cell(row=row, column=c).border = medium_border
-            ws.cell(row=row, column=c).fill = PatternFill("solid", fgColor=MID_PURPLE)
+        merge_styled(ws, f"{get_column_letter(col_start)}{row}:{get_column_letter(col_end)}{row}",
+                     text, **style)
+    else:
+        cell = ws.cell(row=row, column=col_start, value=text)
+        for attr, value in style.items():
+            setattr(cell, attr, value)
 
 
 def write_kpi_box(ws, row, col, label, formula, label_width=28, val_width=18):
@@ -143,8 +159,10 @@ def write_kpi_box(ws, row, col, label, formula, label_width=28, val_width=18):
 
 # ═══════════════════════════════════════════════════════════════
 wb = Workbook()
+trace = BuildTrace.from_env("subscription", wb)
 
 # ── SHEET 1: Instructions ─────────────────────────────────────
+trace.phase("Instructions")
 ws_instr = wb.active
 ws_instr.title = "Instructions"
 ws_instr.sheet_properties.tabColor = DEEP_PURPLE
@@ -159,16 +177,11 @@ ws_instr.column_dimensions["A"].width = 3
 ws_instr.column_dimensions["B"].width = 90
 
 # Title banner
-ws_instr.merge_cells("A1:B1")
 ws_instr.row_dimensions[1].height = 55
-c = ws_instr["A1"]
-c.value = "SUBSCRIPTION TRACKER"
-c.font = Font(name="Aptos", bold=True, color=WHITE, size=24)
-c.fill = PatternFill("solid", fgColor=DEEP_PURPLE)
-c.alignment = Alignment(horizontal="center", vertical="center")
-ws_instr["B1"].fill = PatternFill("solid", fgColor=DEEP_PURPLE)
-ws_instr["B1"].border = medium_border
-ws_instr["A1"].border = medium_border
+merge_styled(ws_instr, "A1:B1", "SUBSCRIPTION TRACKER",
+             font=Font(name="Aptos", bold=True, color=WHITE, size=24),
+             fill=PatternFill("solid", fgColor=DEEP_PURPLE),
+             alignment=Alignment(horizontal="center", vertical="center"), border=medium_border)
 
 ws_instr.merge_cells("A2:B2")
 ws_instr.row_dimensions[2].height = 30
@@ -221,28 +234,17 @@ sections = [
 ]
 
 for title, lines in sections:
-    ws_instr.merge_cells(f"A{row}:B{row}")
     ws_instr.row_dimensions[row].height = 30
-    hc = ws_instr.cell(row=row, column=1, value=title)
-    hc.font = Font(name="Aptos", bold=True, color=WHITE, size=13)
-    hc.fill = PatternFill("solid", fgColor=MID_PURPLE)
-    hc.alignment = Alignment(horizontal="left", vertical="center")
-    hc.border = medium_border
-    ws_instr.cell(row=row, column=2).fill = PatternFill("solid", fgColor=MID_PURPLE)
-    ws_instr.cell(row=row, column=2).border = medium_border
+    write_section_header(ws_instr, row, 1, 2, title)
     row += 1
 
     if title == "CATEGORY COLOR LEGEND":
         for cat_name, (bg, fg) in CAT_COLORS.items():
-            ws_instr.merge_cells(f"A{row}:B{row}")
             ws_instr.row_dimensions[row].height = 24
-            cc = ws_instr.cell(row=row, column=1, value=f"  {cat_name}")
-            cc.font = Font(name="Aptos", bold=True, color=fg, size=11)
-            cc.fill = PatternFill("solid", fgColor=bg)
-            cc.alignment = left_center
-            cc.border = thin_border
-            ws_instr.cell(row=row, column=2).fill = PatternFill("solid", fgColor=bg)
-            ws_instr.cell(row=row, column=2).border = thin_border
+            merge_styled(ws_instr, f"A{row}:B{row}", f"  {cat_name}",
+                         font=Font(name="Aptos", bold=True, color=fg, size=11),
+                         fill=PatternFill("solid", fgColor=bg),
+                         alignment=left_center, border=thin_border)
             row += 1
     else:
         for line in lines:
@@ -261,6 +263,7 @@ ws_instr.freeze_panes = "A3"
 ws_instr.print_area = f"A1:B{row}"
 
 # ── SHEET 3: All Subscriptions (build FIRST so Dashboard can reference) ──
+trace.phase("All Subscriptions")
 ws_subs = wb.create_sheet("All Subscriptions")
 ws_subs.sheet_properties.tabColor = EMERALD
 
@@ -272,16 +275,11 @@ HEADERS_SUBS = [
 COL_WIDTHS_SUBS = [24, 20, 15, 15, 16, 18, 14, 18, 20, 30]
 
 # Title row
-ws_subs.merge_cells("A1:J1")
 ws_subs.row_dimensions[1].height = 42
-tc = ws_subs["A1"]
-tc.value = "ALL SUBSCRIPTIONS"
-tc.font = Font(name="Aptos", bold=True, color=WHITE, size=18)
-tc.fill = PatternFill("solid", fgColor=DEEP_PURPLE)
-tc.alignment = Alignment(horizontal="center", vertical="center")
-for col_i in range(1, 11):
-    ws_subs.cell(row=1, column=col_i).fill = PatternFill("solid", fgColor=DEEP_PURPLE)
-    ws_subs.cell(row=1, column=col_i).border = medium_border
+merge_styled(ws_subs, "A1:J1", "ALL SUBSCRIPTIONS",
+             font=Font(name="Aptos", bold=True, color=WHITE, size=18),
+             fill=PatternFill("solid", fgColor=DEEP_PURPLE),
+             alignment=Alignment(horizontal="center", vertical="center"), border=medium_border)
 
 # Subtitle
 ws_subs.merge_cells("A2:J2")
@@ -389,6 +387,7 @@ ws_subs.page_margins = openpyxl.worksheet.page.PageMargins(left=0.4, right=0.4,
 ws_subs.sheet_properties.pageSetUpPr = openpyxl.worksheet.properties.PageSetupProperties(fitToPage=True)
 
 # ── SHEET 2: Dashboard ────────────────────────────────────────
+trace.phase("Dashboard")
 ws_dash = wb.create_sheet("Dashboard")
 wb.move_sheet("Dashboard", offset=-1)  # move before All Subscriptions
 ws_dash.sheet_properties.tabColor = MID_PURPLE
@@ -403,16 +402,11 @@ ws_dash.column_dimensions["G"].width = 18
 ws_dash.column_dimensions["H"].width = 18
 
 # Title
-ws_dash.merge_cells("A1:H1")
 ws_dash.row_dimensions[1].height = 50
-t = ws_dash["A1"]
-t.value = "SUBSCRIPTION DASHBOARD"
-t.font = Font(name="Aptos", bold=True, color=WHITE, size=22)
-t.fill = PatternFill("solid", fgColor=DEEP_PURPLE)
-t.alignment = Alignment(horizontal="center", vertical="center")
-for ci in range(1, 9):
-    ws_dash.cell(row=1, column=ci).fill = PatternFill("solid", fgColor=DEEP_PURPLE)
-    ws_dash.cell(row=1, column=ci).border = medium_border
+merge_styled(ws_dash, "A1:H1", "SUBSCRIPTION DASHBOARD",
+             font=Font(name="Aptos", bold=True, color=WHITE, size=22),
+             fill=PatternFill("solid", fgColor=DEEP_PURPLE),
+             alignment=Alignment(horizontal="center", vertical="center"), border=medium_border)
 
 ws_dash.merge_cells("A2:H2")
 ws_dash.row_dimensions[2].height = 28
@@ -606,27 +600,21 @@ for i in range(1, 16):
     r = row + i - 1
     ws_dash.row_dimensions[r].height = 24
 
-    alt_fill = PatternFill("solid", fgColor=LIGHT_ORANGE if i % 2 else WHITE)
+    alt_color = LIGHT_ORANGE if i % 2 else WHITE
 
     # Service Name
     cell = ws_dash.cell(row=r, column=2,
         value=f'=IFERROR(INDEX(\'All Subscriptions\'!A{DATA_START}:A{DATA_END},'
               f'SMALL(IF(\'All Subscriptions\'!I{DATA_START}:I{DATA_END}="Consider Canceling",'
               f'ROW(\'All Subscriptions\'!I{DATA_START}:I{DATA_END})-{DATA_START-1}),{i})),"")')
-    cell.font = body_font
-    cell.fill = alt_fill
-    cell.border = thin_border
-    cell.alignment = left_center
+    styles.apply(cell, ROW_STYLES[alt_color, "text"])
 
     # Category
     cell = ws_dash.cell(row=r, column=3,
         value=f'=IFERROR(INDEX(\'All Subscriptions\'!B{DATA_START}:B{DATA_END},'
               f'SMALL(IF(\'All Subscriptions\'!I{DATA_START}:I{DATA_END}="Consider Canceling",'
               f'ROW(\'All Subscriptions\'!I{DATA_START}:I{DATA_END})-{DATA_START-1}),{i})),"")')
-    cell.font = body_font
-    cell.fill = alt_fill
-    cell.border = thin_border
-    cell.alignment = center
+    styles.apply(cell, ROW_STYLES[alt_color, "center"])
 
     ws_dash.cell(row=r, column=4).fill = PatternFill("solid", fgColor=WHITE)
 
@@ -635,22 +623,14 @@ for i in range(1, 16):
         value=f'=IFERROR(INDEX(\'All Subscriptions\'!C{DATA_START}:C{DATA_END},'
               f'SMALL(IF(\'All Subscriptions\'!I{DATA_START}:I{DATA_END}="Consider Canceling",'
               f'ROW(\'All Subscriptions\'!I{DATA_START}:I{DATA_END})-{DATA_START-1}),{i})),"")')
-    cell.font = body_font
-    cell.fill = alt_fill
-    cell.border = thin_border
-    cell.alignment = right_center
-    cell.number_format = currency_fmt
+    styles.apply(cell, ROW_STYLES[alt_color, "currency"])
 
     # Annual Cost
     cell = ws_dash.cell(row=r, column=6,
         value=f'=IFERROR(INDEX(\'All Subscriptions\'!D{DATA_START}:D{DATA_END},'
               f'SMALL(IF(\'All Subscriptions\'!I{DATA_START}:I{DATA_END}="Consider Canceling",'
               f'ROW(\'All Subscriptions\'!I{DATA_START}:I{DATA_END})-{DATA_START-1}),{i})),"")')
-    cell.font = body_font
-    cell.fill = alt_fill
-    cell.border = thin_border
-    cell.alignment = right_center
-    cell.number_format = currency_fmt
+    styles.apply(cell, ROW_STYLES[alt_color, "currency"])
 
 row += 15
 
@@ -691,6 +671,7 @@ ws_dash.freeze_panes = "A3"
 ws_dash.page_margins = openpyxl.worksheet.page.PageMargins(left=0.4, right=0.4, top=0.4, bottom=0.4)
 
 # ── SHEET 4: Renewal Calendar ─────────────────────────────────
+trace.phase("Renewal Calendar")
 ws_cal = wb.create_sheet("Renewal Calendar")
 ws_cal.sheet_properties.tabColor = AMBER
 
@@ -701,16 +682,11 @@ ws_cal.column_dimensions["D"].width = 16
 ws_cal.column_dimensions["E"].width = 18
 
 # Title
-ws_cal.merge_cells("A1:E1")
 ws_cal.row_dimensions[1].height = 50
-tc = ws_cal["A1"]
-tc.value = "RENEWAL CALENDAR"
-tc.font = Font(name="Aptos", bold=True, color=WHITE, size=22)
-tc.fill = PatternFill("solid", fgColor=DEEP_PURPLE)
-tc.alignment = Alignment(horizontal="center", vertical="center")
-for ci in range(1, 6):
-    ws_cal.cell(row=1, column=ci).fill = PatternFill("solid", fgColor=DEEP_PURPLE)
-    ws_cal.cell(row=1, column=ci).border = medium_border
+merge_styled(ws_cal, "A1:E1", "RENEWAL CALENDAR",
+             font=Font(name="Aptos", bold=True, color=WHITE, size=22),
+             fill=PatternFill("solid", fgColor=DEEP_PURPLE),
+             alignment=Alignment(horizontal="center", vertical="center"), border=medium_border)
 
 ws_cal.merge_cells("A2:E2")
 ws_cal.row_dimensions[2].height = 26
@@ -728,16 +704,12 @@ for m_idx, month_name in enumerate(MONTHS):
     month_num = m_idx + 1
 
     # Month header
-    ws_cal.merge_cells(start_row=row, start_column=2, end_row=row, end_column=5)
     ws_cal.row_dimensions[row].height = 32
-    cell = ws_cal.cell(row=row, column=2, value=month_name.upper())
-    cell.font = Font(name="Aptos", bold=True, color=WHITE, size=14)
-    cell.fill = PatternFill("solid", fgColor=DEEP_PURPLE)
-    cell.alignment = Alignment(horizontal="center", vertical="center")
-    cell.border = medium_border
-    for ci in range(3, 6):
-        ws_cal.cell(row=row, column=ci).fill = PatternFill("solid", fgColor=DEEP_PURPLE)
-        ws_cal.cell(row=row, column=ci).border = medium_border
+    merge_styled(ws_cal, f"B{row}:E{row}", month_name.upper(),
+                 font=Font(name="Aptos", bold=True, color=WHITE, size=14),
+                 fill=PatternFill("solid", fgColor=DEEP_PURPLE),
+                 alignment=Alignment(horizontal="center", vertical="center"),
+                 border=medium_border)
     row += 1
 
     # Column sub-headers
@@ -755,49 +727,35 @@ for m_idx, month_name in enumerate(MONTHS):
         r = row
         ws_cal.row_dimensions[r].height = 22
 
-        alt_fill = PatternFill("solid", fgColor=LIGHT_PURPLE if i % 2 == 0 else WHITE)
+        alt_color = LIGHT_PURPLE if i % 2 == 0 else WHITE
 
         # Service Name
         cell = ws_cal.cell(row=r, column=2,
             value=f'=IFERROR(INDEX(\'All Subscriptions\'!A{DATA_START}:A{DATA_END},'
                   f'SMALL(IF(MONTH(\'All Subscriptions\'!F{DATA_START}:F{DATA_END})={month_num},'
                   f'ROW(\'All Subscriptions\'!F{DATA_START}:F{DATA_END})-{DATA_START-1}),{i})),"")')
-        cell.font = body_font
-        cell.fill = alt_fill
-        cell.border = thin_border
-        cell.alignment = left_center
+        styles.apply(cell, ROW_STYLES[alt_color, "text"])
 
         # Category
         cell = ws_cal.cell(row=r, column=3,
             value=f'=IFERROR(INDEX(\'All Subscriptions\'!B{DATA_START}:B{DATA_END},'
                   f'SMALL(IF(MONTH(\'All Subscriptions\'!F{DATA_START}:F{DATA_END})={month_num},'
                   f'ROW(\'All Subscriptions\'!F{DATA_START}:F{DATA_END})-{DATA_START-1}),{i})),"")')
-        cell.font = body_font
-        cell.fill = alt_fill
-        cell.border = thin_border
-        cell.alignment = center
+        styles.apply(cell, ROW_STYLES[alt_color, "center"])
 
         # Renewal Date
         cell = ws_cal.cell(row=r, column=4,
             value=f'=IFERROR(INDEX(\'All Subscriptions\'!F{DATA_START}:F{DATA_END},'
                   f'SMALL(IF(MONTH(\'All Subscriptions\'!F{DATA_START}:F{DATA_END})={month_num},'
                   f'ROW(\'All Subscriptions\'!F{DATA_START}:F{DATA_END})-{DATA_START-1}),{i})),"")')
-        cell.font = body_font
-        cell.fill = alt_fill
-        cell.border = thin_border
-        cell.alignment = center
-        cell.number_format = date_fmt
+        styles.apply(cell, ROW_STYLES[alt_color, "date"])
 
         # Amount
         cell = ws_cal.cell(row=r, column=5,
             value=f'=IFERROR(INDEX(\'All Subscriptions\'!C{DATA_START}:C{DATA_END},'
                   f'SMALL(IF(MONTH(\'All Subscriptions\'!F{DATA_START}:F{DATA_END})={month_num},'
                   f'ROW(\'All Subscriptions\'!F{DATA_START}:F{DATA_END})-{DATA_START-1}),{i})),"")')
-        cell.font = body_font
-        cell.fill = alt_fill
-        cell.border = thin_border
-        cell.alignment = right_center
-        cell.number_format = currency_fmt
+        styles.apply(cell, ROW_STYLES[alt_color, "currency"])
 
         row += 1
 
@@ -829,6 +787,7 @@ ws_cal.freeze_panes = "A3"
 ws_cal.page_margins = openpyxl.worksheet.page.PageMargins(left=0.4, right=0.4, top=0.4, bottom=0.4)
 
 # ── SHEET 5: Annual Summary ───────────────────────────────────
+trace.phase("Annual Summary")
 ws_annual = wb.create_sheet("Annual Summary")
 ws_annual.sheet_properties.tabColor = "059669"
 
@@ -839,16 +798,11 @@ for ci in range(3, 15):
 ws_annual.column_dimensions["O"].width = 16  # Total column
 
 # Title
-ws_annual.merge_cells("A1:O1")
 ws_annual.row_dimensions[1].height = 50
-tc = ws_annual["A1"]
-tc.value = "ANNUAL SUMMARY"
-tc.font = Font(name="Aptos", bold=True, color=WHITE, size=22)
-tc.fill = PatternFill("solid", fgColor=DEEP_PURPLE)
-tc.alignment = Alignment(horizontal="center", vertical="center")
-for ci in range(1, 16):
-    ws_annual.cell(row=1, column=ci).fill = PatternFill("solid", fgColor=DEEP_PURPLE)
-    ws_annual.cell(row=1, column=ci).border = medium_border
+merge_styled(ws_annual, "A1:O1", "ANNUAL SUMMARY",
+             font=Font(name="Aptos", bold=True, color=WHITE, size=22),
+             fill=PatternFill("solid", fgColor=DEEP_PURPLE),
+             alignment=Alignment(horizontal="center", vertical="center"), border=medium_border)
 
 ws_annual.merge_cells("A2:O2")
 ws_annual.row_dimensions[2].height = 26
@@ -866,11 +820,12 @@ row += 1
 # Headers
 month_abbrevs = ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
                  "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-all_headers = [""] + month_abbrevs + ["TOTAL"]
+# column B is the row-label column: months start at C, over their data
+all_headers = ["", ""] + month_abbrevs + ["TOTAL"]
 for ci, hdr in enumerate(all_headers, 1):
     if ci == 1:
         continue
-    cell = ws_annual.cell(row=row, column=ci, value=hdr)
+    cell = ws_annual.cell(row=row, column=ci, value=hdr or None)
     cell.font = Font(name="Aptos", bold=True, color=WHITE, size=11)
     cell.fill = PatternFill("solid", fgColor=DEEP_PURPLE)
     cell.alignment = center
@@ -975,7 +930,7 @@ row += 1
 for ci, hdr in enumerate(all_headers, 1):
     if ci == 1:
         continue
-    cell = ws_annual.cell(row=row, column=ci, value=hdr)
+    cell = ws_annual.cell(row=row, column=ci, value=hdr or None)
     cell.font = Font(name="Aptos", bold=True, color=WHITE, size=10)
     cell.fill = PatternFill("solid", fgColor=MID_PURPLE)
     cell.alignment = center
@@ -1049,6 +1004,7 @@ ws_annual.freeze_panes = "B3"
 ws_annual.page_margins = openpyxl.worksheet.page.PageMargins(left=0.3, right=0.3, top=0.4, bottom=0.4)
 
 # ── SHEET 6: Cancellation Log ─────────────────────────────────
+trace.phase("Cancellation Log")
 ws_cancel = wb.create_sheet("Cancellation Log")
 ws_cancel.sheet_properties.tabColor = RED
 
@@ -1059,16 +1015,11 @@ HEADERS_CANCEL = [
 COL_W_CANCEL = [24, 16, 16, 16, 36, 20]
 
 # Title row
-ws_cancel.merge_cells("A1:F1")
 ws_cancel.row_dimensions[1].height = 50
-tc = ws_cancel["A1"]
-tc.value = "CANCELLATION LOG"
-tc.font = Font(name="Aptos", bold=True, color=WHITE, size=22)
-tc.fill = PatternFill("solid", fgColor=DEEP_PURPLE)
-tc.alignment = Alignment(horizontal="center", vertical="center")
-for ci in range(1, 7):
-    ws_cancel.cell(row=1, column=ci).fill = PatternFill("solid", fgColor=DEEP_PURPLE)
-    ws_cancel.cell(row=1, column=ci).border = medium_border
+merge_styled(ws_cancel, "A1:F1", "CANCELLATION LOG",
+             font=Font(name="Aptos", bold=True, color=WHITE, size=22),
+             fill=PatternFill("solid", fgColor=DEEP_PURPLE),
+             alignment=Alignment(horizontal="center", vertical="center"), border=medium_border)
 
 # Motivational banner
 ws_cancel.merge_cells("A2:F2")
@@ -1151,11 +1102,16 @@ ws_cancel.page_margins = openpyxl.worksheet.page.PageMargins(left=0.4, right=0.4
 # ═══════════════════════════════════════════════════════════════
 # SAVE
 # ═══════════════════════════════════════════════════════════════
-OUTPUT = "/Users/timdunn/mobile_app_ideas/etsy-templates/subscription-tracker.xlsx"
-wb.save(OUTPUT)
+OUTPUT = (sys.argv[1] if len(sys.argv) > 1 else
+          os.path.join(os.path.dirname(os.path.abspath(__file__)), "subscription-tracker.xlsx"))
+trace.phase("save")
+with trace.span("consolidate conditional formatting"):
+    consolidate_conditional_formatting(wb)
+with trace.span("write xlsx"):
+    save_canonical(wb, OUTPUT)
+trace.finish()
 print(f"Saved: {OUTPUT}")
 print(f"Sheets: {wb.sheetnames}")
 
-import os
 size = os.path.getsize(OUTPUT)
 print(f"File size: {size:,} bytes ({size/1024:.1f} KB)")
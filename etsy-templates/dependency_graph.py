@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Cell dependency graph for the Etsy template workbooks.
+Builds the full precedent graph of a generated xlsx (read-only, one parse per
+formula pattern) and reports the longest dependency chain, fan-in/fan-out
+hotspots and strongly connected components (circular references).
+
+Usage:  python dependency_graph.py WORKBOOK.xlsx [--top N] [--json]
+"""
+
+import argparse
+import json
+import sys
+
+from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter
+
+from formula_ast import PatternCache
+
+
+def cell_label(node):
+    sheet, row, col = node
+    return f"{sheet}!{get_column_letter(col)}{row}"
+
+
+def strongly_connected_components(edges):
+    """
+    Iterative Tarjan over {node: successors}. Components come out successors
+    first, so with precedent edges the list is already in evaluation order.
+    """
+    index, low = {}, {}
+    stack, on_stack = [], set()
+    components = []
+    counter = 0
+    for root in edges:
+        if root in index:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(edges.get(root, ())))]
+        while work:
+            node, successors = work[-1]
+            for succ in successors:
+                if succ not in index:
+                    index[succ] = low[succ] = counter
+                    counter += 1
+                    stack.append(succ)
+                    on_stack.add(succ)
+                    work.append((succ, iter(edges.get(succ, ()))))
+                    break
+                if succ in on_stack and index[succ] < low[node]:
+                    low[node] = index[succ]
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+class DependencyGraph:
+    """
+    Precedent graph of one workbook. Nodes are (sheet, row, col) tuples.
+
+    *precedents* maps every formula cell to the cells it reads (ranges expanded,
+    whole columns clipped to the sheet's used extent); *formulas* maps it to its
+    formula_ast Pattern, and *values* holds the constant cells.
+    """
+
+    def __init__(self):
+        self.precedents = {}
+        self.formulas = {}
+        self.values = {}
+        self.extents = {}
+        self._dependents = None
+        self._components = None
+
+    @classmethod
+    def from_workbook(cls, path):
+        wb = load_workbook(path, read_only=True)
+        extents = {ws.title: (ws.max_row or 1, ws.max_column or 1) for ws in wb.worksheets}
+        cells = ((ws.title, cell.row, cell.column, cell.value, None)
+                 for ws in wb.worksheets for row in ws.iter_rows() for cell in row
+                 if cell.value is not None)
+        graph = cls._build(extents, cells)
+        wb.close()
+        return graph
+
+    @classmethod
+    def from_parsed(cls, parsed):
+        """The same graph from a workbook_cache.ParsedWorkbook, without openpyxl."""
+        extents = {sheet: (rows or 1, cols or 1) for sheet, (rows, cols) in parsed.extents.items()}
+        return cls._build(extents, parsed.cells())
+
+    @classmethod
+    def _build(cls, extents, cells):
+        """*cells* yields (sheet, row, col, value, pattern key or None)."""
+        graph = cls()
+        graph.extents = extents
+        patterns = PatternCache()
+        expanded = {}       # (sheet, Ref) -> list of nodes, shared between formulas
+        for sheet, row, col, value, key in cells:
+            text = value.text if hasattr(value, "text") else value
+            node = (sheet, row, col)
+            if not isinstance(text, str) or not text.startswith("="):
+                graph.values[node] = value
+                continue
+            pattern = patterns.get(sheet, text, row, col, key)
+            graph.formulas[node] = pattern
+            nodes = []
+            for ref in pattern.refs_at(row, col):
+                ref_nodes = expanded.get((sheet, ref))
+                if ref_nodes is None:
+                    ref_nodes = expanded[sheet, ref] = graph._expand(ref, sheet)
+                nodes.extend(ref_nodes)
+            graph.precedents[node] = list(dict.fromkeys(nodes))
+        return graph
+
+    def _expand(self, ref, sheet):
+        sheet = ref.sheet or sheet
+        max_row, max_col = self.extents.get(sheet, (0, 0))
+        min_row = ref.min_row or 1
+        min_col = ref.min_col or 1
+        last_row = max_row if ref.max_row is None else ref.max_row
+        last_col = max_col if ref.max_col is None else ref.max_col
+        return [(sheet, r, c) for r in range(min_row, last_row + 1)
+                for c in range(min_col, last_col + 1)]
+
+    # -- structure -----------------------------------------------------------
+    @property
+    def dependents(self):
+        """{node: [formula cells reading it]} - the reverse of *precedents*."""
+        if self._dependents is None:
+            dependents = {}
+            for node, precedents in self.precedents.items():
+                for precedent in precedents:
+                    dependents.setdefault(precedent, []).append(node)
+            self._dependents = dependents
+        return self._dependents
+
+    @property
+    def components(self):
+        """Strongly connected components of the formula cells, in evaluation order."""
+        if self._components is None:
+            formulas = self.formulas
+            edges = {node: [p for p in precedents if p in formulas]
+                     for node, precedents in self.precedents.items()}
+            self._components = strongly_connected_components(edges)
+        return self._components
+
+    def cycles(self):
+        """Components that are circular references (several cells, or a self-reference)."""
+        return [c for c in self.components
+                if len(c) > 1 or c[0] in self.precedents.get(c[0], ())]
+
+    def evaluation_order(self):
+        """Formula cells with every precedent before its dependents (cycles kept together)."""
+        return [node for component in self.components for node in component]
+
+    def edge_count(self):
+        return sum(len(p) for p in self.precedents.values())
+
+    # -- reports -------------------------------------------------------------
+    def _depths(self):
+        """Per component: (longest chain ending in it, component it came from)."""
+        component_of = {}
+        for i, component in enumerate(self.components):
+            for node in component:
+                component_of[node] = i
+        depths = []
+        for i, component in enumerate(self.components):
+            best, best_from = 0, None
+            for node in component:
+                for precedent in self.precedents[node]:
+                    j = component_of.get(precedent)
+                    if j is not None and j != i and depths[j][0] > best:
+                        best, best_from = depths[j][0], j
+            depths.append((best + len(component), best_from))
+        return depths
+
+    def longest_chain(self):
+        """
+        The longest run of formula cells each reading the previous one, as a
+        list of nodes from the first precedent to the final dependent. A
+        circular component counts as one link per member.
+        """
+        depths = self._depths()
+        if not depths:
+            return []
+        last = max(range(len(depths)), key=lambda i: (depths[i][0], -i))
+        chain = []
+        while last is not None:
+            chain.extend(self.components[last])
+            last = depths[last][1]
+        chain.reverse()
+        return chain
+
+    def chain_depths(self):
+        """{sheet: longest chain ending in a formula on that sheet}."""
+        result = {}
+        for component, (depth, _) in zip(self.components, self._depths()):
+            sheet = component[0][0]
+            result[sheet] = max(result.get(sheet, 0), depth)
+        return result
+
+    def fan_in(self, top=10):
+        """Formula cells reading the most cells: [(node, count), ...]."""
+        counts = ((node, len(p)) for node, p in self.precedents.items())
+        return sorted(counts, key=lambda item: (-item[1], item[0]))[:top]
+
+    def fan_out(self, top=10):
+        """Cells read by the most formulas: [(node, count), ...]."""
+        counts = ((node, len(d)) for node, d in self.dependents.items())
+        return sorted(counts, key=lambda item: (-item[1], item[0]))[:top]
+
+
+def report(graph, top=10):
+    chain = graph.longest_chain()
+    return dict(
+        formulas=len(graph.formulas),
+        edges=graph.edge_count(),
+        longest_chain=dict(length=len(chain), cells=[cell_label(n) for n in chain]),
+        chain_depth_by_sheet=graph.chain_depths(),
+        fan_in=[dict(cell=cell_label(n), precedents=c) for n, c in graph.fan_in(top)],
+        fan_out=[dict(cell=cell_label(n), dependents=c) for n, c in graph.fan_out(top)],
+        cycles=[[cell_label(n) for n in c] for c in graph.cycles()],
+    )
+
+
+def format_report(path, data, top=10):
+    chain = data["longest_chain"]
+    cells = chain["cells"]
+    shown = cells if len(cells) <= 8 else cells[:4] + ["..."] + cells[-4:]
+    lines = [
+        f"{path}: {data['formulas']:,} formula cells, {data['edges']:,} precedent edges",
+        f"  longest dependency chain: {chain['length']} formulas",
+        f"    {' -> '.join(shown)}",
+        "  deepest chain ending on each sheet:",
+    ]
+    for sheet, depth in data["chain_depth_by_sheet"].items():
+        lines.append(f"    {sheet:<24} {depth:>6}")
+    lines.append(f"  top {top} fan-in (cells read):")
+    lines += [f"    {e['precedents']:>8,}  {e['cell']}" for e in data["fan_in"]]
+    lines.append(f"  top {top} fan-out (formulas reading the cell):")
+    lines += [f"    {e['dependents']:>8,}  {e['cell']}" for e in data["fan_out"]]
+    if data["cycles"]:
+        lines.append(f"  {len(data['cycles'])} circular reference group(s):")
+        for cycle in data["cycles"][:top]:
+            lines.append(f"    {len(cycle)} cells: {', '.join(cycle[:6])}"
+                         + (", ..." if len(cycle) > 6 else ""))
+    else:
+        lines.append("  no circular references")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report the cell dependency graph of an xlsx.")
+    parser.add_argument("workbook")
+    parser.add_argument("--top", type=int, default=10, help="hotspots to list")
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = parser.parse_args(argv)
+
+    data = report(DependencyGraph.from_workbook(args.workbook), args.top)
+    if args.json:
+        print(json.dumps(data, indent=2))
+    else:
+        print(format_report(args.workbook, data, args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+Formula parsing shared by the workbook analysis tools.
+Turns an Excel formula into a small AST on top of openpyxl's tokenizer, and
+caches parses per R1C1 pattern: a formula copied down 120 rows is parsed
+once and its references are shifted for every other cell.
+"""
+
+import re
+from typing import NamedTuple, Optional, Tuple
+
+from openpyxl.formula.tokenizer import Token, Tokenizer
+from openpyxl.utils import column_index_from_string, get_column_letter
+
+
+class FormulaError(ValueError):
+    """The formula text could not be parsed."""
+
+
+# ---------------------------------------------------------------------------
+# AST nodes
+# ---------------------------------------------------------------------------
+class Literal(NamedTuple):
+    value: object          # float, int, str or bool
+
+
+class Error(NamedTuple):
+    code: str              # "#N/A", "#DIV/0!", ...
+
+
+class Missing(NamedTuple):
+    """An omitted function argument, as in IF(A1,,0)."""
+
+
+class Name(NamedTuple):
+    name: str              # defined name or anything else not a reference
+
+
+class Array(NamedTuple):
+    rows: Tuple[tuple, ...]   # rows of Literal/Error nodes
+
+
+class Func(NamedTuple):
+    name: str
+    args: tuple
+
+
+class Unary(NamedTuple):
+    op: str                # "-", "+" or postfix "%"
+    operand: object
+
+
+class Binary(NamedTuple):
+    op: str
+    left: object
+    right: object
+
+
+class Ref(NamedTuple):
+    """
+    A cell, range, whole-column or whole-row reference.
+
+    Whole columns have min_row/max_row None, whole rows min_col/max_col None.
+    *fixed* holds the $-anchoring of (min_col, min_row, max_col, max_row).
+    """
+    sheet: Optional[str]
+    min_col: Optional[int]
+    min_row: Optional[int]
+    max_col: Optional[int]
+    max_row: Optional[int]
+    fixed: Tuple[bool, bool, bool, bool] = (False, False, False, False)
+
+    @property
+    def is_cell(self):
+        return (self.min_col == self.max_col and self.min_row == self.max_row
+                and self.min_row is not None and self.min_col is not None)
+
+    def size(self, max_row=1048576, max_col=16384):
+        """Cells covered; whole columns/rows are clipped to the given extent."""
+        rows = max_row if self.min_row is None else self.max_row - self.min_row + 1
+        cols = max_col if self.min_col is None else self.max_col - self.min_col + 1
+        return rows * cols
+
+    def shift(self, drow, dcol):
+        """The reference as seen from a cell *drow*/*dcol* away (like copy-paste)."""
+        fc, fr, fc2, fr2 = self.fixed
+
+        def move(value, fixed, delta):
+            return value if value is None or fixed else value + delta
+
+        return self._replace(min_col=move(self.min_col, fc, dcol),
+                             min_row=move(self.min_row, fr, drow),
+                             max_col=move(self.max_col, fc2, dcol),
+                             max_row=move(self.max_row, fr2, drow))
+
+    def __str__(self):
+        fc, fr, fc2, fr2 = self.fixed
+
+        def part(col, row, col_fixed, row_fixed):
+            text = ""
+            if col is not None:
+                text += ("$" if col_fixed else "") + get_column_letter(col)
+            if row is not None:
+                text += ("$" if row_fixed else "") + str(row)
+            return text
+
+        ref = part(self.min_col, self.min_row, fc, fr)
+        if not self.is_cell:
+            ref += ":" + part(self.max_col, self.max_row, fc2, fr2)
+        if self.sheet is None:
+            return ref
+        sheet = self.sheet
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_.]*", sheet):
+            sheet = "'" + sheet.replace("'", "''") + "'"
+        return f"{sheet}!{ref}"
+
+
+MISSING = Missing()
+
+# ---------------------------------------------------------------------------
+# References
+# ---------------------------------------------------------------------------
+_SHEET = r"(?:'(?P<quoted>(?:[^']|'')+)'|(?P<plain>[^'!:]+))!"
+_CELL = r"\$?[A-Za-z]{1,3}\$?\d+"
+_COLS = r"\$?[A-Za-z]{1,3}:\$?[A-Za-z]{1,3}"
+_ROWS = r"\$?\d+:\$?\d+"
+_REF_RE = re.compile(
+    rf"^(?:{_SHEET})?(?:(?P<cell>{_CELL}(?::{_CELL})?)|(?P<cols>{_COLS})|(?P<rows>{_ROWS}))$")
+_PART_RE = re.compile(r"(\$?)([A-Za-z]*)(\$?)(\d*)")
+
+
+def _parts(text):
+    """[(col, col_fixed, row, row_fixed), ...] for each side of a reference."""
+    result = []
+    for piece in text.split(":"):
+        col_fixed, col, row_fixed, row = _PART_RE.fullmatch(piece).groups()
+        if not col:                     # whole rows: the $ sits in the first group
+            col_fixed, row_fixed = "", col_fixed or row_fixed
+        result.append((column_index_from_string(col.upper()) if col else None, bool(col_fixed),
+                       int(row) if row else None, bool(row_fixed)))
+    return result
+
+
+def parse_ref(text):
+    """Parse reference text such as 'Debt Input'!B$5:B$24; None if it is not one."""
+    m = _REF_RE.match(text)
+    if m is None:
+        return None
+    sheet = m.group("quoted")
+    sheet = sheet.replace("''", "'") if sheet is not None else m.group("plain")
+    parts = _parts(m.group("cell") or m.group("cols") or m.group("rows"))
+    (c1, c1f, r1, r1f), (c2, c2f, r2, r2f) = parts[0], parts[-1]
+    if c1 is not None and c2 is not None and c2 < c1:
+        c1, c1f, c2, c2f = c2, c2f, c1, c1f
+    if r1 is not None and r2 is not None and r2 < r1:
+        r1, r1f, r2, r2f = r2, r2f, r1, r1f
+    return Ref(sheet, c1, r1, c2, r2, (c1f, r1f, c2f, r2f))
+
+
+# ---------------------------------------------------------------------------
+# Parser
+# ---------------------------------------------------------------------------
+# Excel precedence, loosest first: comparisons, &, + -, * /, ^, %, negation, :
+BINARY_PRECEDENCE = {
+    "=": 1, "<>": 1, "<": 1, ">": 1, "<=": 1, ">=": 1,
+    "&": 2,
+    "+": 3, "-": 3,
+    "*": 4, "/": 4,
+    "^": 5,
+    ":": 8,
+}
+POSTFIX_PRECEDENCE = 6
+PREFIX_PRECEDENCE = 7
+
+
+class _Parser:
+
+    def __init__(self, formula):
+        try:
+            items = Tokenizer(formula if formula.startswith("=") else "=" + formula).items
+        except Exception as exc:     # the tokenizer raises plain TokenizerErrors
+            raise FormulaError(f"{formula!r}: {exc}") from None
+        self.formula = formula
+        self.tokens = [t for t in items if t.type != Token.WSPACE]
+        self.pos = 0
+
+    def fail(self, message):
+        raise FormulaError(f"{self.formula!r}: {message}")
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def next(self):
+        token = self.peek()
+        if token is None:
+            self.fail("unexpected end of formula")
+        self.pos += 1
+        return token
+
+    def parse(self):
+        node = self.expression(0)
+        if self.peek() is not None:
+            self.fail(f"unexpected {self.peek().value!r}")
+        return node
+
+    def expression(self, min_precedence):
+        node = self.prefix()
+        while True:
+            token = self.peek()
+            if token is None:
+                return node
+            if token.type == Token.OP_POST and POSTFIX_PRECEDENCE >= min_precedence:
+                self.pos += 1
+                node = Unary(token.value, node)
+            elif token.type == Token.OPERAND and token.value.startswith(":") \
+                    and BINARY_PRECEDENCE[":"] >= min_precedence:
+                # INDEX(...):B5 - the tokenizer glues the colon onto the operand
+                self.pos += 1
+                node = _binary(":", node, _operand_text(token.value[1:]))
+            elif token.type == Token.OP_IN and BINARY_PRECEDENCE.get(token.value, -1) >= min_precedence:
+                self.pos += 1
+                precedence = BINARY_PRECEDENCE[token.value]
+                node = _binary(token.value, node, self.expression(precedence + 1))
+            else:
+                return node
+
+    def prefix(self):
+        token = self.next()
+        if token.type == Token.OP_PRE:
+            return Unary(token.value, self.expression(PREFIX_PRECEDENCE))
+        if token.type == Token.OPERAND:
+            return _operand(token)
+        if token.type == Token.FUNC and token.subtype == Token.OPEN:
+            return self.call(token.value[:-1])
+        if token.type == Token.PAREN and token.subtype == Token.OPEN:
+            node = self.expression(0)
+            if self.next().type != Token.PAREN:
+                self.fail("unbalanced parenthesis")
+            return node
+        if token.type == Token.ARRAY and token.subtype == Token.OPEN:
+            return self.array()
+        self.fail(f"unexpected {token.value!r}")
+
+    def call(self, name):
+        name = name.upper()
+        if name.startswith("_XLFN."):
+            name = name[len("_XLFN."):]
+        args = []
+        token = self.peek()
+        if token is not None and token.type == Token.FUNC and token.subtype == Token.CLOSE:
+            self.pos += 1
+            return Func(name, ())
+        while True:
+            token = self.peek()
+            if token is not None and (token.type == Token.SEP or
+                                      (token.type == Token.FUNC and token.subtype == Token.CLOSE)):
+                args.append(MISSING)
+            else:
+                args.append(self.expression(0))
+            token = self.next()
+            if token.type == Token.FUNC and token.subtype == Token.CLOSE:
+                return Func(name, tuple(args))
+            if token.type != Token.SEP or token.subtype != Token.ARG:
+                self.fail(f"unexpected {token.value!r} in {name}()")
+
+    def array(self):
+        rows, row = [], []
+        while True:
+            token = self.next()
+            if token.type == Token.OP_PRE and token.value == "-":
+                token = self.next()
+                row.append(Literal(-_operand(token).value))
+            elif token.type == Token.OPERAND:
+                row.append(_operand(token))
+            else:
+                self.fail(f"unexpected {token.value!r} in array constant")
+            token = self.next()
+            if token.type == Token.ARRAY and token.subtype == Token.CLOSE:
+                rows.append(tuple(row))
+                return Array(tuple(rows))
+            if token.type != Token.SEP:
+                self.fail(f"unexpected {token.value!r} in array constant")
+            if token.subtype == Token.ROW:
+                rows.append(tuple(row))
+                row = []
+
+
+def _operand(token):
+    value, subtype = token.value, token.subtype
+    if subtype == Token.NUMBER:
+        number = float(value)
+        return Literal(int(number) if number.is_integer() and "." not in value
+                       and "e" not in value.lower() else number)
+    if subtype == Token.TEXT:
+        return Literal(value[1:-1].replace('""', '"'))
+    if subtype == Token.LOGICAL:
+        return Literal(value.upper() == "TRUE")
+    if subtype == Token.ERROR:
+        return Error(value)
+    return _operand_text(value)
+
+
+def _operand_text(value):
+    ref = parse_ref(value)
+    return ref if ref is not None else Name(value)
+
+
+def _binary(op, left, right):
+    # A1:B2 normally arrives as one operand; fold the split forms back together
+    if op == ":" and isinstance(left, Ref) and isinstance(right, Ref) \
+            and right.sheet is None and None not in left[1:5] and None not in right[1:5]:
+        fixed = (left.fixed[0], left.fixed[1], right.fixed[2], right.fixed[3])
+        return Ref(left.sheet, min(left.min_col, right.min_col), min(left.min_row, right.min_row),
+                   max(left.max_col, right.max_col), max(left.max_row, right.max_row), fixed)
+    return Binary(op, left, right)
+
+
+def parse(formula):
+    """Parse formula text (with or without the leading '=') into an AST."""
+    return _Parser(formula).parse()
+
+
+# ---------------------------------------------------------------------------
+# Tree helpers
+# ---------------------------------------------------------------------------
+def walk(node):
+    """Yield every node of the tree, parents before children."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        if isinstance(node, Func):
+            stack.extend(reversed(node.args))
+        elif isinstance(node, Binary):
+            stack.extend((node.right, node.left))
+        elif isinstance(node, Unary):
+            stack.append(node.operand)
+
+
+def refs(node):
+    return [n for n in walk(node) if isinstance(n, Ref)]
+
+
+def shift(node, drow, dcol):
+    """Copy of the tree with every relative reference moved by drow/dcol."""
+    if not drow and not dcol:
+        return node
+    if isinstance(node, Ref):
+        return node.shift(drow, dcol)
+    if isinstance(node, Func):
+        return node._replace(args=tuple(shift(a, drow, dcol) for a in node.args))
+    if isinstance(node, Binary):
+        return node._replace(left=shift(node.left, drow, dcol),
+                             right=shift(node.right, drow, dcol))
+    if isinstance(node, Unary):
+        return node._replace(operand=shift(node.operand, drow, dcol))
+    return node
+
+
+# ---------------------------------------------------------------------------
+# R1C1 patterns
+# ---------------------------------------------------------------------------
+_PATTERN_RE = re.compile(
+    r'(?P<text>"(?:[^"]|"")*")'
+    r"|(?P<sheet>'(?:[^']|'')+'!)"
+    rf"|(?<![A-Za-z0-9_.$])(?P<ref>{_COLS}|{_CELL}|{_ROWS})(?![A-Za-z0-9_(!])")
+
+
+def pattern_key(formula, row, col):
+    """
+    The formula with relative references written as R1C1 offsets from
+    (row, col): cells whose formulas were copied from one another share a key.
+    """
+    def sub(m):
+        if not m.group("ref"):
+            return m.group(0)
+        pieces = []
+        for ref_col, col_fixed, ref_row, row_fixed in _parts(m.group("ref")):
+            piece = ""
+            if ref_row is not None:
+                piece += f"R{ref_row}" if row_fixed else f"R[{ref_row - row}]"
+            if ref_col is not None:
+                piece += f"C{ref_col}" if col_fixed else f"C[{ref_col - col}]"
+            pieces.append(piece)
+        return ":".join(pieces)
+
+    return _PATTERN_RE.sub(sub, formula)
+
+
+class Pattern:
+    """One parsed formula shape, shared by every cell it was copied to."""
+
+    __slots__ = ("sheet", "key", "formula", "tree", "row", "col", "refs", "cells")
+
+    def __init__(self, sheet, key, formula, tree, row, col):
+        self.sheet = sheet
+        self.key = key
+        self.formula = formula
+        self.tree = tree
+        self.row = row
+        self.col = col
+        self.refs = refs(tree)
+        self.cells = 0
+
+    def refs_at(self, row, col):
+        drow, dcol = row - self.row, col - self.col
+        if not drow and not dcol:
+            return self.refs
+        return [ref.shift(drow, dcol) for ref in self.refs]
+
+    def tree_at(self, row, col):
+        return shift(self.tree, row - self.row, col - self.col)
+
+
+class PatternCache:
+    """Parses each distinct R1C1 pattern once (keyed per sheet)."""
+
+    def __init__(self):
+        self._patterns = {}
+
+    def get(self, sheet, formula, row, col, key=None):
+        """
+        Pattern for *formula* in cell (row, col) of *sheet*; parses on first
+        sight. *key* is the formula's pattern_key when the caller already has it.
+        """
+        if formula.startswith("="):
+            formula = formula[1:]
+        key = (sheet, key if key is not None else pattern_key(formula, row, col))
+        pattern = self._patterns.get(key)
+        if pattern is None:
+            pattern = Pattern(sheet, key[1], formula, parse(formula), row, col)
+            self._patterns[key] = pattern
+        pattern.cells += 1
+        return pattern
+
+    def __len__(self):
+        return len(self._patterns)
+
+    def __iter__(self):
+        return iter(self._patterns.values())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Range-level styling for the Etsy template generators.
+Styles rectangular regions through merged-range anchors, column-dimension
+styles and conditional formats, so cells that exist only to carry a fill are
+not created - except by range_background, for a fill that must stop at a
+row, which no column or row style can express.
+"""
+
+from openpyxl.cell.cell import MergedCell
+from openpyxl.formatting.rule import FormulaRule
+from openpyxl.styles import PatternFill
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import range_boundaries
+
+
+def merge_styled(ws, cell_range, value=None, font=None, fill=None, border=None,
+                 alignment=None, number_format=None):
+    """
+    Merge *cell_range* and style it through its top-left cell only.
+
+    Excel paints a merged area with the anchor's fill, and openpyxl copies the
+    anchor's outer border onto the edge cells when the range is merged, so the
+    other cells never need their own fill/border.
+    """
+    min_col, min_row, _, _ = range_boundaries(cell_range)
+    anchor = ws.cell(row=min_row, column=min_col)
+    if value is not None:
+        anchor.value = value
+    for attr, style in (("font", font), ("fill", fill), ("border", border),
+                        ("alignment", alignment), ("number_format", number_format)):
+        if style is not None:
+            setattr(anchor, attr, style)
+    ws.merge_cells(cell_range)
+    return anchor
+
+
+def column_background(ws, columns, fill):
+    """
+    Give whole columns (e.g. "A:D") a background fill via their column styles.
+
+    Empty cells pick the fill up from the column; cells that already exist and
+    have no fill of their own get it stamped on. Call this once the sheet's
+    content is written. Merged cells are skipped - their anchor paints them.
+    """
+    min_col, _, max_col, _ = range_boundaries(columns)
+    for col in range(min_col, max_col + 1):
+        ws.column_dimensions[get_column_letter(col)].fill = fill
+    for (row, col), cell in ws._cells.items():
+        if min_col <= col <= max_col and not isinstance(cell, MergedCell) \
+                and not cell.fill.fill_type:
+            cell.fill = fill
+
+
+def range_background(ws, cell_range, fill):
+    """
+    Give a bounded block (e.g. "A1:D64") a background fill, cell by cell.
+
+    Column styles would paint the columns to the bottom of the sheet, so
+    every unfilled cell in the block gets the fill stamped on instead. Use
+    column_background when whole columns will do. Call this once the
+    sheet's content is written; merged cells are skipped - their anchor
+    paints them.
+    """
+    min_col, min_row, max_col, max_row = range_boundaries(cell_range)
+    for row in range(min_row, max_row + 1):
+        for col in range(min_col, max_col + 1):
+            cell = ws.cell(row=row, column=col)
+            if not isinstance(cell, MergedCell) and not cell.fill.fill_type:
+                cell.fill = fill
+
+
+def band_rows(ws, cell_range, fill):
+    """
+    Shade every other row of *cell_range* (starting with the second) with a
+    single conditional format instead of a fill on every banded cell.
+
+    Cells that already carry a fill keep it: columns containing such a cell on
+    a banded row fall back to real fills on their unfilled banded cells.
+    """
+    min_col, min_row, max_col, max_row = range_boundaries(cell_range)
+    banded_rows = range(min_row + 1, max_row + 1, 2)
+
+    cf_columns = []
+    for col in range(min_col, max_col + 1):
+        cells = [ws._cells.get((row, col)) for row in banded_rows]
+        if any(cell is not None and cell.fill.fill_type for cell in cells):
+            for row in banded_rows:
+                cell = ws.cell(row=row, column=col)
+                if not cell.fill.fill_type:
+                    cell.fill = fill
+        else:
+            cf_columns.append(col)
+
+    # Collapse the conditional-format columns into contiguous blocks
+    blocks = []
+    for col in cf_columns:
+        if blocks and blocks[-1][1] == col - 1:
+            blocks[-1][1] = col
+        else:
+            blocks.append([col, col])
+    if not blocks:
+        return
+    sqref = " ".join(
+        f"{get_column_letter(first)}{min_row}:{get_column_letter(last)}{max_row}"
+        for first, last in blocks)
+    # Set both colours: Excel reads a solid dxf fill from bgColor
+    color = fill.fgColor
+    ws.conditional_formatting.add(sqref, FormulaRule(
+        formula=[f"MOD(ROW()-{min_row},2)=1"],
+        fill=PatternFill("solid", fgColor=color, bgColor=color),
+    ))
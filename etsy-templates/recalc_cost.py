@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Recalculation-cost report for the Etsy template workbooks.
+Streams every formula of a generated xlsx (read-only mode), parses it once per
+R1C1 pattern and estimates what a full recalculation costs: cell reads,
+volatile functions, array-evaluated and CSE formulas and SUMPRODUCT range
+scans - per sheet and per formula pattern.
+
+Usage:  python recalc_cost.py WORKBOOK.xlsx [--top N] [--json]
+"""
+
+import argparse
+import json
+import sys
+
+from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter
+
+from formula_ast import Array, Binary, Func, Literal, PatternCache, Ref, Unary
+
+# Recalculated on every edit, whatever changed. Anything wrapped around them
+# (DAY(EOMONTH(TODAY(),0))) is recalculated along with them.
+VOLATILE_FUNCTIONS = {
+    "NOW", "TODAY", "RAND", "RANDBETWEEN", "RANDARRAY", "OFFSET", "INDIRECT",
+    "CELL", "INFO",
+}
+
+ALL = None
+# Argument positions that take a range as-is. A multi-cell range anywhere else
+# makes Excel evaluate the function once per element (array evaluation).
+RANGE_ARGS = {
+    "SUM": ALL, "SUMIF": ALL, "SUMIFS": ALL, "SUMPRODUCT": ALL, "PRODUCT": ALL,
+    "COUNT": ALL, "COUNTA": ALL, "COUNTBLANK": ALL, "COUNTIF": ALL, "COUNTIFS": ALL,
+    "AVERAGE": ALL, "AVERAGEIF": ALL, "AVERAGEIFS": ALL, "MAX": ALL, "MIN": ALL,
+    "MAXIFS": ALL, "MINIFS": ALL, "MEDIAN": ALL, "STDEV": ALL, "AND": ALL, "OR": ALL,
+    "ROW": ALL, "ROWS": ALL, "COLUMN": ALL, "COLUMNS": ALL,
+    "INDEX": {0}, "MATCH": {1}, "XMATCH": {1}, "VLOOKUP": {1}, "HLOOKUP": {1},
+    "LOOKUP": {1, 2}, "XLOOKUP": {1, 2}, "RANK": {1}, "RANK.EQ": {1},
+    "SMALL": {0}, "LARGE": {0}, "OFFSET": {0},
+}
+
+
+class FormulaCost:
+    """Static cost of evaluating one formula once."""
+
+    __slots__ = ("reads", "array_elements", "sumproduct_scans", "sumproduct_cells",
+                 "volatile")
+
+    def __init__(self):
+        self.reads = 0
+        self.array_elements = 0
+        self.sumproduct_scans = 0
+        self.sumproduct_cells = 0
+        self.volatile = set()
+
+
+def formula_cost(tree, extents, sheet):
+    """
+    Walk a parsed formula and total its reads and array work.
+
+    *extents* maps sheet title -> (max_row, max_col), used to size whole-column
+    and whole-row references.
+    """
+    cost = FormulaCost()
+
+    def size(ref):
+        max_row, max_col = extents.get(ref.sheet or sheet, (1, 1))
+        return ref.size(max_row, max_col)
+
+    def visit(node, in_sumproduct):
+        """Returns the number of elements the node evaluates to (1 = scalar)."""
+        if isinstance(node, Ref):
+            cells = size(node)
+            cost.reads += cells
+            if in_sumproduct:
+                cost.sumproduct_cells += cells
+            return cells
+        if isinstance(node, Array):
+            return sum(len(row) for row in node.rows)
+        if isinstance(node, Unary):
+            elements = visit(node.operand, in_sumproduct)
+            if elements > 1:
+                cost.array_elements += elements
+            return elements
+        if isinstance(node, Binary):
+            if node.op == ":":          # INDEX(...):B5 - a reference, not arithmetic
+                visit(node.left, in_sumproduct)
+                visit(node.right, in_sumproduct)
+                return 1
+            elements = max(visit(node.left, in_sumproduct), visit(node.right, in_sumproduct))
+            if elements > 1:
+                cost.array_elements += elements
+            return elements
+        if isinstance(node, Func):
+            if node.name in VOLATILE_FUNCTIONS:
+                cost.volatile.add(node.name)
+            if node.name == "SUMPRODUCT":
+                cost.sumproduct_scans += 1
+            takes_ranges = RANGE_ARGS.get(node.name, set())
+            lifted = 1
+            sizes = []
+            for index, arg in enumerate(node.args):
+                elements = visit(arg, in_sumproduct or node.name == "SUMPRODUCT")
+                sizes.append(elements)
+                if takes_ranges is not ALL and index not in takes_ranges:
+                    lifted = max(lifted, elements)
+            if lifted > 1:
+                cost.array_elements += lifted
+                return lifted
+            if node.name in ("ROW", "COLUMN") and node.args:
+                return sizes[0]
+            if node.name == "INDEX" and len(node.args) > 1 and node.args[1] == Literal(0):
+                return sizes[0]         # INDEX(range, 0) hands back the whole column
+            return 1
+        return 1
+
+    visit(tree, False)
+    return cost
+
+
+def _shape(node):
+    """
+    The tree with literals blanked and references reduced to their sheet and
+    dimensions: the twelve month formulas of a category (which differ in the
+    month number and where they point) cost the same and share a shape.
+    """
+    if isinstance(node, Literal):
+        return Literal(type(node.value).__name__)
+    if isinstance(node, Ref):
+        return ("ref", node.sheet, node.size(0, 0) if None in node[1:5] else
+                (node.max_row - node.min_row, node.max_col - node.min_col))
+    if isinstance(node, Func):
+        return node._replace(args=tuple(_shape(a) for a in node.args))
+    if isinstance(node, Binary):
+        return node._replace(left=_shape(node.left), right=_shape(node.right))
+    if isinstance(node, Unary):
+        return node._replace(operand=_shape(node.operand))
+    return node
+
+
+def analyze(path):
+    """Stream *path* and return the report as plain data (see main for the layout)."""
+    wb = load_workbook(path, read_only=True)
+    extents = {ws.title: (ws.max_row or 1, ws.max_column or 1) for ws in wb.worksheets}
+    patterns = PatternCache()
+    costs = {}          # id(pattern) -> FormulaCost
+    cse_patterns = set()
+    sheets = []
+    for ws in wb.worksheets:
+        totals = dict(sheet=ws.title, formulas=0, cse_formulas=0, volatile_formulas=0,
+                      array_formulas=0, sumproduct_scans=0, sumproduct_cells=0,
+                      reads=0, array_elements=0, volatile_functions=set())
+        for row in ws.iter_rows():
+            for cell in row:
+                value = cell.value
+                cse = hasattr(value, "text")          # ArrayFormula
+                text = value.text if cse else value
+                if not isinstance(text, str) or not text.startswith("="):
+                    continue
+                pattern = patterns.get(ws.title, text, cell.row, cell.column)
+                cost = costs.get(id(pattern))
+                if cost is None:
+                    cost = costs[id(pattern)] = formula_cost(pattern.tree, extents, ws.title)
+                if cse:
+                    cse_patterns.add(id(pattern))
+                totals["formulas"] += 1
+                totals["cse_formulas"] += cse
+                totals["volatile_formulas"] += bool(cost.volatile)
+                totals["array_formulas"] += cse or bool(cost.array_elements)
+                totals["sumproduct_scans"] += cost.sumproduct_scans
+                totals["sumproduct_cells"] += cost.sumproduct_cells
+                totals["reads"] += cost.reads
+                totals["array_elements"] += cost.array_elements
+                totals["volatile_functions"] |= cost.volatile
+        totals["volatile_functions"] = sorted(totals["volatile_functions"])
+        sheets.append(totals)
+    wb.close()
+
+    pattern_rows = {}
+    for pattern in patterns:
+        cost = costs[id(pattern)]
+        key = (pattern.sheet, _shape(pattern.tree))
+        entry = pattern_rows.get(key)
+        if entry is None:
+            entry = pattern_rows[key] = dict(
+                sheet=pattern.sheet,
+                first_cell=f"{get_column_letter(pattern.col)}{pattern.row}",
+                formula="=" + pattern.formula,
+                cells=0, reads=0, array_elements=0, sumproduct_cells=0,
+                volatile_functions=sorted(cost.volatile), cse=False)
+        entry["cells"] += pattern.cells
+        entry["reads"] += cost.reads * pattern.cells
+        entry["array_elements"] += cost.array_elements * pattern.cells
+        entry["sumproduct_cells"] += cost.sumproduct_cells * pattern.cells
+        entry["cse"] = entry["cse"] or id(pattern) in cse_patterns
+    pattern_rows = sorted(pattern_rows.values(), key=lambda p: (
+        -(p["reads"] + p["array_elements"]), p["sheet"], p["first_cell"]))
+
+    total = {key: sum(s[key] for s in sheets)
+             for key in ("formulas", "cse_formulas", "volatile_formulas", "array_formulas",
+                         "sumproduct_scans", "sumproduct_cells", "reads", "array_elements")}
+    total["parsed"] = len(patterns)
+    total["patterns"] = len(pattern_rows)
+    total["volatile_reads"] = sum(p["reads"] for p in pattern_rows if p["volatile_functions"])
+    return dict(workbook=str(path), total=total, sheets=sheets, patterns=pattern_rows)
+
+
+def format_report(report, top=15):
+    total = report["total"]
+    lines = [
+        f"{report['workbook']}: {total['formulas']:,} formulas in {total['patterns']:,} patterns",
+        f"  ~{total['reads']:,} cell reads + {total['array_elements']:,} array elements"
+        f" per full recalculation",
+        f"  {total['volatile_formulas']:,} volatile formulas recalculate on every edit"
+        f" ({total['volatile_reads']:,} reads)",
+        "",
+        f"  {'sheet':<20} {'formulas':>8} {'volatile':>8} {'array':>6} {'CSE':>4}"
+        f" {'SUMPRODUCT':>10} {'reads':>10} {'array elts':>10}",
+    ]
+    for s in report["sheets"]:
+        if not s["formulas"]:
+            continue
+        lines.append(
+            f"  {s['sheet'][:20]:<20} {s['formulas']:>8,} {s['volatile_formulas']:>8,}"
+            f" {s['array_formulas']:>6,} {s['cse_formulas']:>4,} {s['sumproduct_scans']:>10,}"
+            f" {s['reads']:>10,} {s['array_elements']:>10,}")
+    lines += ["", f"  Top {min(top, len(report['patterns']))} formula patterns by cost:"]
+    for p in report["patterns"][:top]:
+        flags = []
+        if p["volatile_functions"]:
+            flags.append("volatile: " + ",".join(p["volatile_functions"]))
+        if p["cse"]:
+            flags.append("CSE")
+        if p["array_elements"]:
+            flags.append("array")
+        if p["sumproduct_cells"]:
+            flags.append(f"SUMPRODUCT scans {p['sumproduct_cells']:,} cells")
+        formula = p["formula"] if len(p["formula"]) <= 90 else p["formula"][:87] + "..."
+        lines.append(f"  {p['reads'] + p['array_elements']:>10,}  {p['sheet']}!{p['first_cell']}"
+                     f" x{p['cells']}  {formula}")
+        if flags:
+            lines.append(f"{'':14}[{'; '.join(flags)}]")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Estimate the recalculation cost of an xlsx.")
+    parser.add_argument("workbook")
+    parser.add_argument("--top", type=int, default=15, help="formula patterns to list")
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = parser.parse_args(argv)
+
+    report = analyze(args.workbook)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_report(report, args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
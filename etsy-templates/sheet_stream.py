@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Streamed rows for formula-heavy worksheets.
+openpyxl keeps a Cell object per cell until the workbook is saved. For big
+generated blocks (the debt plan schedules: 120 months x 80 formulas per
+sheet) a generator can instead register a row function; its rows are
+produced while the sheet is serialized and written straight into the zip
+with lxml's incremental xmlfile, using style indices resolved once per
+style rather than per cell. The rest of the sheet stays ordinary openpyxl.
+
+    money = cell_style(ws, number_format="$#,##0.00", font=body_font)
+    stream_rows(ws, "B27:CU146", schedule_rows, styles=[money])
+
+    def schedule_rows():
+        for r in range(27, 147):
+            yield r, [(2, r - 26, None), (3, f"=C{r - 1}*1.01", money), ...]
+
+Each row lists (column, value, style) in column order; values are numbers,
+strings (a leading "=" makes a formula) or None, styles come from
+cell_style() and are listed in styles= in order of first use, or are None.
+The XML is the same openpyxl would write for the same cells, so a block can
+replace ws.cell() calls without changing the file. A block's rows may not
+hold ordinary cells.
+
+Writing goes through StreamingWorksheetWriter, which xlsx_canonical uses
+for every sheet; a sheet without streamed blocks is written unchanged.
+ParallelBlocks renders the blocks in forked worker processes instead and
+splices the finished rows into each sheet part (BUILD_WORKERS).
+"""
+
+import io
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import get_all_start_methods, get_context
+from typing import Callable, List, Optional, Tuple
+
+from openpyxl.cell.cell import Cell
+from openpyxl.compat import safe_string
+from openpyxl.utils import range_boundaries
+from openpyxl.utils.cell import get_column_letter
+from openpyxl.worksheet._writer import WorksheetWriter
+from openpyxl.worksheet.dimensions import SheetDimension
+from openpyxl.xml.functions import Element, xmlfile
+
+XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+PLACEHOLDER_RE = re.compile(rb'<streamedBlock id="([0-9-]+)"/>')
+
+
+@dataclass
+class StreamedBlock:
+    min_col: int
+    min_row: int
+    max_col: int
+    max_row: int
+    rows: Callable            # () -> iterable of (row, [(col, value, style), ...])
+    styles: List              # StyleArrays in first-use order (for canonicalization)
+    _counts: Optional[Tuple[int, int]] = field(default=None, repr=False)
+
+    def counts(self):
+        """(cells, formulas) the block writes; its rows are produced once to count them."""
+        if self._counts is None:
+            cells = formulas = 0
+            for _, row in self.rows():
+                for _, value, style in row:
+                    if value is None and style is None:
+                        continue                 # not written, like an untouched cell
+                    cells += 1
+                    formulas += isinstance(value, str) and value.startswith("=") and len(value) > 1
+            self._counts = (cells, formulas)
+        return self._counts
+
+
+def cell_style(ws, **attrs):
+    """
+    A StyleArray for streamed cells, e.g. cell_style(ws, font=..., border=...,
+    number_format=...). The font/fill/... entries are registered with the
+    workbook exactly as assigning them to a real cell would.
+    """
+    cell = Cell(ws)
+    for name, value in attrs.items():
+        setattr(cell, name, value)
+    return cell._style
+
+
+def stream_rows(ws, cell_range, rows, styles=()):
+    """Register *rows* (a callable) to produce the cells of *cell_range* at save time."""
+    min_col, min_row, max_col, max_row = range_boundaries(cell_range)
+    block = StreamedBlock(min_col, min_row, max_col, max_row, rows, list(styles))
+    if not hasattr(ws, "_streamed_blocks"):
+        ws._streamed_blocks = []
+    ws._streamed_blocks.append(block)
+    return block
+
+
+def streamed_blocks(ws):
+    return getattr(ws, "_streamed_blocks", ())
+
+
+def streamed_counts(ws):
+    """(cells, formulas) written by the streamed blocks of *ws*."""
+    counts = [block.counts() for block in streamed_blocks(ws)]
+    return sum(c for c, _ in counts), sum(f for _, f in counts)
+
+
+def streamed_style_arrays(ws, row):
+    """StyleArrays of the blocks starting at *row*, for canonicalize_styles."""
+    for block in streamed_blocks(ws):
+        if block.min_row == row:
+            yield from block.styles
+
+
+def write_streamed_row(xf, row_idx, cells, style_ids, attrs=None):
+    """One <row>; mirrors openpyxl.cell._writer.lxml_write_cell for these value types."""
+    row_attrs = {"r": f"{row_idx}"}
+    if attrs is not None:
+        row_attrs.update(attrs)
+    with xf.element("row", row_attrs):
+        for col, value, style in cells:
+            attributes = {"r": f"{get_column_letter(col)}{row_idx}"}
+            if style is not None:
+                try:
+                    attributes["s"] = style_ids[id(style)]
+                except KeyError:
+                    raise ValueError(f"row {row_idx}: style not listed in "
+                                     "stream_rows(styles=...)") from None
+            if isinstance(value, str) and value.startswith("=") and len(value) > 1:
+                with xf.element("c", attributes):
+                    with xf.element("f"):
+                        xf.write(value[1:])
+                    with xf.element("v"):
+                        pass
+            elif isinstance(value, str):
+                attributes["t"] = "inlineStr"
+                with xf.element("c", attributes):
+                    if value:
+                        with xf.element("is"):
+                            text = Element("t", {XML_SPACE: "preserve"}
+                                           if value != value.strip() else {})
+                            text.text = value
+                            xf.write(text)
+            elif value is None:
+                if style is None:
+                    continue
+                attributes["t"] = "n"
+                with xf.element("c", attributes):
+                    pass
+            else:
+                attributes["t"] = "b" if isinstance(value, bool) else "n"
+                with xf.element("c", attributes):
+                    with xf.element("v"):
+                        xf.write(safe_string(value))
+
+
+def resolve_styles(wb, block):
+    """{id(style): cellXfs index} for a block, registered in declared order."""
+    return {id(style): f"{wb._cell_styles.add(style)}" for style in block.styles}
+
+
+def render_block(block, style_ids, dims=None):
+    """The block's <row> elements as bytes, for splicing into a sheet part."""
+    out = io.BytesIO()
+    with xmlfile(out) as xf:
+        with xf.element("sheetData"):
+            for row_idx, cells in block.rows():
+                write_streamed_row(xf, row_idx, cells, style_ids,
+                                   dims.get(row_idx) if dims is not None else None)
+    data = out.getvalue()
+    return data[len(b"<sheetData>"):-len(b"</sheetData>")]
+
+
+class StreamingWorksheetWriter(WorksheetWriter):
+    """
+    WorksheetWriter that writes a sheet's streamed blocks among its rows.
+    With *defer*, a block is not rendered here: defer(ws, index, block,
+    style_ids) returns a key and a <streamedBlock id="key"/> placeholder
+    is written in its place, to be swapped for render_block() output.
+    """
+
+    def __init__(self, ws, out=None, defer=None):
+        super().__init__(ws, out)
+        self.defer = defer
+
+    def write_dimensions(self):
+        blocks = streamed_blocks(self.ws)
+        if not blocks:
+            return super().write_dimensions()
+        bounds = [(b.min_col, b.min_row, b.max_col, b.max_row) for b in blocks]
+        if self.ws._cells:
+            bounds.append((self.ws.min_column, self.ws.min_row,
+                           self.ws.max_column, self.ws.max_row))
+        min_col = min(b[0] for b in bounds)
+        min_row = min(b[1] for b in bounds)
+        max_col = max(b[2] for b in bounds)
+        max_row = max(b[3] for b in bounds)
+        ref = f"{get_column_letter(min_col)}{min_row}:{get_column_letter(max_col)}{max_row}"
+        self.xf.send(SheetDimension(ref).to_tree())
+
+    def _check_rows(self, blocks, rows):
+        for previous, block in zip(blocks, blocks[1:]):
+            if block.min_row <= previous.max_row:
+                raise ValueError(f"{self.ws.title}: streamed blocks overlap at row {block.min_row}")
+        for row_idx, cells in rows:
+            if cells and any(b.min_row <= row_idx <= b.max_row for b in blocks):
+                raise ValueError(f"{self.ws.title}: row {row_idx} has ordinary cells inside "
+                                 "a streamed block")
+
+    def write_rows(self):
+        blocks = sorted(streamed_blocks(self.ws), key=lambda b: b.min_row)
+        if not blocks:
+            return super().write_rows()
+        rows = self.rows()
+        self._check_rows(blocks, rows)
+        # a row dimension inside a block has no cells of its own to write
+        rows = [(row_idx, cells) for row_idx, cells in rows
+                if not any(b.min_row <= row_idx <= b.max_row for b in blocks)]
+        dims = self.ws.row_dimensions
+        wb = self.ws.parent
+        pending = list(enumerate(blocks))
+
+        xf = self.xf.send(True)
+        with xf.element("sheetData"):
+            for row_idx, cells in rows + [(float("inf"), None)]:
+                while pending and pending[0][1].min_row < row_idx:
+                    index, block = pending.pop(0)
+                    style_ids = resolve_styles(wb, block)
+                    if self.defer is not None:
+                        key = self.defer(self.ws, index, block, style_ids)
+                        xf.write(Element("streamedBlock", {"id": key}))
+                        continue
+                    for streamed_idx, streamed_cells in block.rows():
+                        write_streamed_row(xf, streamed_idx, streamed_cells, style_ids,
+                                           dims.get(streamed_idx))
+                if cells is not None:
+                    self.write_row(xf, cells, row_idx)
+        self.xf.send(None)
+
+
+# ---------------------------------------------------------------------------
+# parallel rendering: blocks go to forked workers, which inherit the closures
+# ---------------------------------------------------------------------------
+_FORKED_WORKBOOK = None
+
+
+def _render_in_worker(sheet_index, block_index, style_ids):
+    ws = _FORKED_WORKBOOK.worksheets[sheet_index]
+    block = sorted(streamed_blocks(ws), key=lambda b: b.min_row)[block_index]
+    return render_block(block, {id(style): sid for style, sid in zip(block.styles, style_ids)},
+                        ws.row_dimensions)
+
+
+class ParallelBlocks:
+    """
+    Render the streamed blocks of *wb* in up to *workers* forked processes
+    while the parent writes everything else:
+
+        with ParallelBlocks(wb, 4) as blocks:
+            writer = StreamingWorksheetWriter(ws, out, defer=blocks.defer)
+            ...
+            xml = blocks.splice(xml)
+    """
+
+    def __init__(self, wb, workers):
+        self.wb = wb
+        self.workers = workers
+        self.futures = {}
+        self.pool = None
+
+    def __enter__(self):
+        global _FORKED_WORKBOOK
+        _FORKED_WORKBOOK = self.wb
+        self.pool = ProcessPoolExecutor(self.workers, mp_context=get_context("fork"))
+        return self
+
+    def __exit__(self, *exc):
+        global _FORKED_WORKBOOK
+        self.pool.shutdown(cancel_futures=True)
+        _FORKED_WORKBOOK = None
+
+    def defer(self, ws, index, block, style_ids):
+        key = f"{self.wb.worksheets.index(ws)}-{index}"
+        ids = [style_ids[id(style)] for style in block.styles]
+        self.futures[key] = self.pool.submit(
+            _render_in_worker, self.wb.worksheets.index(ws), index, ids)
+        return key
+
+    def splice(self, xml):
+        """Swap every placeholder in a sheet part for its rendered rows."""
+        def rendered(match):
+            return self.futures.pop(match.group(1).decode()).result()
+        return PLACEHOLDER_RE.sub(rendered, xml)
+
+
+def fork_available():
+    return "fork" in get_all_start_methods()
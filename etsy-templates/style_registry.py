@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Style interning for the Etsy template generators.
+A style bundle (font + fill + border + alignment + number format + protection)
+is registered once and then stamped onto cells by integer ID, so hot loops no
+longer build and hash openpyxl style objects per cell.
+"""
+
+from typing import NamedTuple, Optional
+
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Protection
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.styles.numbers import BUILTIN_FORMATS_MAX_SIZE, BUILTIN_FORMATS_REVERSE
+from openpyxl.utils.cell import range_boundaries
+
+
+class StyleBundle(NamedTuple):
+    """Immutable set of cell style attributes; None means the workbook default."""
+    font: Optional[Font] = None
+    fill: Optional[PatternFill] = None
+    border: Optional[Border] = None
+    alignment: Optional[Alignment] = None
+    number_format: Optional[str] = None
+    protection: Optional[Protection] = None
+
+
+class StyleRegistry:
+    """
+    Interns StyleBundles and applies them by ID.
+
+    Each bundle is resolved to an openpyxl StyleArray once per workbook; applying
+    it copies nine small integers onto the cell instead of going through the
+    font/fill/border descriptors. A bundle replaces the cell's whole style.
+    """
+
+    def __init__(self):
+        self._bundles = []
+        self._ids = {}
+        self._wb = None
+        self._arrays = []
+
+    def register(self, font=None, fill=None, border=None, alignment=None,
+                 number_format=None, protection=None):
+        """Register a bundle and return its style ID (equal bundles share an ID)."""
+        bundle = StyleBundle(font, fill, border, alignment, number_format, protection)
+        if bundle in self._ids:
+            return self._ids[bundle]
+        style_id = len(self._bundles)
+        self._bundles.append(bundle)
+        self._ids[bundle] = style_id
+        if self._wb is not None:
+            self._arrays.append(self._resolve(bundle, self._wb))
+        return style_id
+
+    def derive(self, style_id, **changes):
+        """Register a copy of an existing bundle with some attributes replaced."""
+        return self.register(*self._bundles[style_id]._replace(**changes))
+
+    def bundle(self, style_id):
+        return self._bundles[style_id]
+
+    def __len__(self):
+        return len(self._bundles)
+
+    # ── applying ──
+    def apply(self, cell, style_id):
+        """Give *cell* the complete style registered under *style_id*."""
+        wb = cell.parent.parent
+        if wb is not self._wb:
+            self._bind(wb)
+        cell._style = StyleArray(self._arrays[style_id])
+        return cell
+
+    def apply_range(self, ws, cell_range, style_id):
+        """Apply one style to every cell of an A1-style range such as "B5:F20"."""
+        if ws.parent is not self._wb:
+            self._bind(ws.parent)
+        array = self._arrays[style_id]
+        min_col, min_row, max_col, max_row = range_boundaries(cell_range)
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                ws.cell(row=row, column=col)._style = StyleArray(array)
+
+    # ── workbook binding ──
+    def _bind(self, wb):
+        self._wb = wb
+        self._arrays = [self._resolve(bundle, wb) for bundle in self._bundles]
+
+    @staticmethod
+    def _resolve(bundle, wb):
+        """Add the bundle's pieces to the workbook style tables once."""
+        array = StyleArray()
+        if bundle.font is not None:
+            array.fontId = wb._fonts.add(bundle.font)
+        if bundle.fill is not None:
+            array.fillId = wb._fills.add(bundle.fill)
+        if bundle.border is not None:
+            array.borderId = wb._borders.add(bundle.border)
+        if bundle.alignment is not None:
+            array.alignmentId = wb._alignments.add(bundle.alignment)
+        if bundle.protection is not None:
+            array.protectionId = wb._protections.add(bundle.protection)
+        if bundle.number_format is not None:
+            if bundle.number_format in BUILTIN_FORMATS_REVERSE:
+                array.numFmtId = BUILTIN_FORMATS_REVERSE[bundle.number_format]
+            else:
+                array.numFmtId = (wb._number_formats.add(bundle.number_format)
+                                  + BUILTIN_FORMATS_MAX_SIZE)
+        return array
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Tests for bench_generators: baseline comparison and scratch-directory runs
+(benchmarks must never rewrite the committed workbooks or icons).
+Run with:  python -m pytest -q test_bench_generators.py
+"""
+
+import os
+
+import bench_generators
+
+
+def test_compare_reports_growth_beyond_threshold():
+    baseline = {"targets": {
+        "debt": {"wall_s": 1.0, "cells": 21000, "output_bytes": 300000, "styles": 46},
+        "icons:x": {"wall_s": 0.03, "output_bytes": 1600},
+    }}
+    results = {
+        "debt": {"wall_s": 1.1, "cells": 21000, "output_bytes": 360000, "styles": 47},
+        "icons:x": {"wall_s": 0.05, "output_bytes": 1600},     # +66%, but only 20 ms
+        "budget": {"wall_s": 9.0},                              # not in the baseline
+    }
+    regressions = bench_generators.compare(baseline, results, threshold=0.15)
+    assert [(name, metric) for name, metric, *_ in regressions] == [("debt", "output_bytes")]
+    assert regressions[0][-1] == "bigger output (+20%)"
+    assert bench_generators.compare(baseline, results, threshold=0.25) == []
+
+
+def test_icon_target_runs_in_scratch():
+    name = "icons:json-formatter-extension"
+    icons = os.path.join(os.path.dirname(bench_generators.targets()[name]), "icons")
+    before = {f: os.stat(os.path.join(icons, f)).st_mtime_ns for f in os.listdir(icons)}
+    result = bench_generators.measure(name)
+    assert result["output_bytes"] > 0 and result["wall_s"] > 0 and result["peak_rss_mb"] > 0
+    assert {f: os.stat(os.path.join(icons, f)).st_mtime_ns for f in os.listdir(icons)} == before
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Property-based differential tests for the budget tracker formulas.
+
+Random transaction sets (empty and saturated sheets, zero and blank amounts,
+year boundaries, undated and uncategorized rows, unknown or differently-cased
+categories, amounts exactly on the status thresholds) are written into the
+recalc_engine lanes - one transaction set per lane, nothing touches disk -
+and every Dashboard, Monthly Budget and Annual Overview formula is compared
+with an independent NumPy model of what the template promises.
+
+Amounts are multiples of $0.25, so every sum is exact whatever the order of
+addition and the comparison can be exact too.
+
+BUDGET_FUZZ_CASES (default 4096) and BUDGET_FUZZ_SEED choose how many sets
+to try and where to start.
+Run with:  python -m pytest -q test_budget_properties.py
+"""
+
+import datetime
+import os
+
+import numpy as np
+import pytest
+from openpyxl.utils import get_column_letter
+
+from recalc_engine import RecalcEngine
+
+CATEGORIES = [
+    "Housing", "Transportation", "Food & Groceries", "Utilities", "Insurance", "Healthcare",
+    "Debt Payments", "Personal", "Entertainment", "Savings", "Education", "Miscellaneous",
+]
+ROWS = 500                  # Transactions!2:501, the range every formula reads
+LANES = 1024
+CASES = int(os.environ.get("BUDGET_FUZZ_CASES", 4096))
+SEED = int(os.environ.get("BUDGET_FUZZ_SEED", 20260219))
+TODAY = datetime.date(2026, 2, 19)
+EPOCH = np.datetime64("1899-12-30")
+SHEETS = ("Dashboard", "Monthly Budget", "Annual Overview")
+MONTH_COLS = [get_column_letter(3 + m) for m in range(12)]     # C..N
+
+
+def serial(year, month, day):
+    return float((np.datetime64(f"{year:04d}-{month:02d}-{day:02d}") - EPOCH).astype(int))
+
+
+# ---------------------------------------------------------------------------
+# random transaction sets, shaped (ROWS, lanes)
+# ---------------------------------------------------------------------------
+def random_transactions(rng, lanes, budgets):
+    """Dates (serials, NaN = blank), categories (object: str or None), amounts (NaN = blank)."""
+    shape = (ROWS, lanes)
+    used = np.where(rng.random(lanes) < 0.2, ROWS, rng.integers(0, ROWS, lanes))
+    filled = (np.arange(ROWS)[:, None] < used) & (rng.random(shape) > 0.03)
+
+    start, end = serial(2025, 11, 1), serial(2027, 2, 28)
+    date = np.floor(rng.uniform(start, end + 1, shape))
+    boundary = rng.random(shape) < 0.1
+    date[boundary] = rng.choice([serial(2025, 12, 31), serial(2026, 1, 1),
+                                 serial(2026, 12, 31), serial(2027, 1, 1)], boundary.sum())
+    date += np.where(rng.random(shape) < 0.1, rng.random(shape), 0.0)      # times of day
+    date[rng.random(shape) < 0.02] = np.nan                                 # undated
+
+    names = np.array(CATEGORIES + ["Income", "Gifts", None], dtype=object)
+    weights = np.array([3.0] * 12 + [4.0, 0.5, 0.7])
+    category = names[rng.choice(len(names), shape, p=weights / weights.sum())]
+    recased = (rng.random(shape) < 0.05) & (category != None)              # noqa: E711
+    category[recased] = [c.lower() if i % 2 else c.upper()
+                         for i, c in enumerate(category[recased])]
+
+    amount = rng.integers(-4000, 400, shape) * 0.25
+    income = np.array([isinstance(c, str) and c.lower() == "income" for c in category.flat])
+    income = income.reshape(shape)
+    amount = np.where(income & (rng.random(shape) < 0.9), rng.integers(0, 40000, shape) * 0.25,
+                      amount)
+    amount[rng.random(shape) < 0.04] = 0.0
+    amount[rng.random(shape) < 0.01] = rng.integers(-4_000_000, 4_000_000) * 0.25
+    amount[rng.random(shape) < 0.02] = np.nan                               # no amount
+
+    date[~filled] = np.nan
+    category[~filled] = None
+    amount[~filled] = np.nan
+
+    # a few lanes spend exactly 90% / 100% of two budgets and nothing else
+    edge = rng.choice(lanes, max(1, lanes // 64), replace=False)
+    for lane in edge:
+        first, second = rng.choice(12, 2, replace=False)
+        date[:, lane], category[:, lane], amount[:, lane] = np.nan, None, np.nan
+        date[:2, lane] = serial(2026, 2, 1)
+        category[:2, lane] = CATEGORIES[first], CATEGORIES[second]
+        amount[:2, lane] = -(budgets[first] * 0.9), -float(budgets[second])
+    return date, category, amount
+
+
+# ---------------------------------------------------------------------------
+# reference model
+# ---------------------------------------------------------------------------
+def _ratio(numerator, denominator):
+    """IF(denominator=0, 0, numerator/denominator)."""
+    safe = np.where(denominator == 0, 1.0, denominator)
+    return np.where(denominator == 0, 0.0, numerator / safe)
+
+
+def _status(actual, budget):
+    return np.where(actual == 0, "-", np.where(
+        actual <= budget * 0.9, "Under Budget",
+        np.where(actual <= budget, "Near Limit", "OVER BUDGET"))).astype(object)
+
+
+def reference_model(date, category, amount, budgets, today=TODAY):
+    """
+    {(sheet, cell): per-lane values} for every formula, computed straight
+    from the transactions: no cell reads another cell.
+    """
+    lanes = amount.shape[1]
+    amount = np.nan_to_num(amount)                          # a blank amount counts as 0
+    days = np.floor(np.nan_to_num(date)).astype(np.int64)
+    month = (EPOCH + days.astype("timedelta64[D]")).astype("datetime64[M]").astype(int) % 12 + 1
+    month[days == 0] = 1                                    # MONTH(blank) is January
+    folded = np.array([c.casefold() if c else "" for c in category.flat]).reshape(category.shape)
+    budgets = np.asarray(budgets, dtype=float)[:, None] * np.ones(lanes)
+
+    spent = amount < 0
+    income_total = (amount * (amount > 0)).sum(axis=0)
+    expense_total = -(amount * spent).sum(axis=0)
+    is_category = np.stack([folded == name.casefold() for name in CATEGORIES])
+    actual = -(amount * spent * is_category).sum(axis=1)                    # (12, lanes)
+    by_month = np.stack([month == m for m in range(1, 13)])                 # (12, ROWS, lanes)
+    monthly_income = (amount * (folded == "income") * by_month).sum(axis=1)  # (12, lanes)
+    monthly = -np.einsum("kil,mil->kml", amount * spent * is_category, by_month * 1.0)
+
+    out = {}
+    # Monthly Budget
+    for k in range(12):
+        row = 5 + k
+        out["Monthly Budget", f"D{row}"] = actual[k]
+        out["Monthly Budget", f"E{row}"] = budgets[k] - actual[k]
+        out["Monthly Budget", f"F{row}"] = _status(actual[k], budgets[k])
+    out["Monthly Budget", "C17"] = budgets.sum(axis=0)
+    out["Monthly Budget", "D17"] = actual.sum(axis=0)
+    out["Monthly Budget", "E17"] = (budgets - actual).sum(axis=0)
+
+    # Annual Overview
+    ao = {}
+    ao[5] = list(monthly_income)
+    for k in range(12):
+        ao[7 + k] = list(monthly[k])
+    ao[19] = list(monthly.sum(axis=0))
+    for row in [5] + list(range(7, 20)):
+        values = ao[row]
+        total = np.sum(values, axis=0)
+        nonzero = np.sum([v != 0 for v in values], axis=0)
+        ao[row] = values + [total, _ratio(total, nonzero)]                  # O, P
+    ao[20] = [a - b for a, b in zip(ao[5], ao[19])]
+    ao[21] = [_ratio(b, a) for a, b in zip(ao[5], ao[20])]
+    for row, values in ao.items():
+        for col, value in zip(MONTH_COLS + ["O", "P"], values):
+            out["Annual Overview", f"{col}{row}"] = value
+
+    # Dashboard
+    net = income_total - expense_total
+    out["Dashboard", "B6"] = income_total
+    out["Dashboard", "D6"] = expense_total
+    out["Dashboard", "F6"] = net
+    out["Dashboard", "B9"] = _ratio(net, income_total)
+    out["Dashboard", "D9"] = np.array(CATEGORIES, dtype=object)[np.argmax(actual, axis=0)]
+    last_day = (np.datetime64(today, "M") + 1).astype("datetime64[D]") - np.timedelta64(1, "D")
+    out["Dashboard", "F9"] = np.full(lanes, float(last_day.astype(object).day - today.day))
+    for k in range(12):
+        row = 13 + k
+        out["Dashboard", f"C{row}"] = budgets[k]
+        out["Dashboard", f"D{row}"] = actual[k]
+        out["Dashboard", f"E{row}"] = budgets[k] - actual[k]
+        out["Dashboard", f"F{row}"] = _ratio(actual[k], budgets[k])
+        out["Dashboard", f"G{row}"] = _status(actual[k], budgets[k])
+    out["Dashboard", "C25"] = budgets.sum(axis=0)
+    out["Dashboard", "D25"] = actual.sum(axis=0)
+    out["Dashboard", "E25"] = budgets.sum(axis=0) - actual.sum(axis=0)
+    out["Dashboard", "F25"] = _ratio(actual.sum(axis=0), budgets.sum(axis=0))
+    for m in range(12):
+        row = 29 + m
+        income, expenses = ao[5][m], ao[19][m]
+        out["Dashboard", f"C{row}"] = income
+        out["Dashboard", f"D{row}"] = expenses
+        out["Dashboard", f"E{row}"] = income - expenses
+        out["Dashboard", f"F{row}"] = _ratio(income - expenses, income)
+    year_income, year_expenses = np.sum(ao[5][:12], axis=0), np.sum(ao[19][:12], axis=0)
+    out["Dashboard", "C41"] = year_income
+    out["Dashboard", "D41"] = year_expenses
+    out["Dashboard", "E41"] = year_income - year_expenses
+    out["Dashboard", "F41"] = _ratio(year_income - year_expenses, year_income)
+    return out
+
+
+# ---------------------------------------------------------------------------
+# tests
+# ---------------------------------------------------------------------------
+@pytest.fixture(scope="module")
+def engine(budget_graph):
+    return RecalcEngine(budget_graph, batch=LANES, today=TODAY)
+
+
+@pytest.fixture(scope="module")
+def budgets(budget_graph):
+    return [budget_graph.values["Monthly Budget", 5 + k, 3] for k in range(12)]
+
+
+def _load(engine, date, category, amount):
+    engine.set(f"Transactions!A2:A{ROWS + 1}", date[:, None, :])
+    engine.set(f"Transactions!C2:C{ROWS + 1}", category[:, None, :])
+    engine.set(f"Transactions!D2:D{ROWS + 1}", amount[:, None, :])
+    engine.recalc()
+
+
+def _compare(engine, expected, context):
+    for (sheet, cell), want in expected.items():
+        target = f"'{sheet}'!{cell}"
+        if np.asarray(want).dtype == object:
+            got = np.array(engine.get(target), dtype=object)
+        else:
+            got = engine.numbers(target)
+        bad = np.flatnonzero(got != want)
+        if bad.size:
+            lane = bad[0]
+            pytest.fail(f"{sheet}!{cell} lane {lane} ({context}): "
+                        f"engine {got[lane]!r}, model {want[lane]!r}")
+
+
+def test_model_covers_every_formula(budget_graph, budgets):
+    rng = np.random.default_rng(SEED)
+    expected = reference_model(*random_transactions(rng, 4, budgets), budgets)
+    formulas = {(sheet, f"{get_column_letter(col)}{row}")
+                for sheet, row, col in budget_graph.formulas if sheet in SHEETS}
+    assert set(expected) == formulas
+
+
+def test_edge_cases(engine, budgets):
+    date = np.full((ROWS, LANES), np.nan)
+    category = np.full((ROWS, LANES), None, dtype=object)
+    amount = np.full((ROWS, LANES), np.nan)
+    # lane 0 stays empty; lane 1 is one undated rent payment (MONTH of a
+    # blank date is January); lane 2 straddles new year; lane 3 fills all
+    # 500 rows with zero amounts; lane 4 spends on an unknown category
+    category[0, 1], amount[0, 1] = "housing", -1500.0
+    date[:2, 2] = serial(2025, 12, 31) + 0.75, serial(2026, 1, 1)
+    category[:2, 2], amount[:2, 2] = "Income", 100.0
+    date[:, 3], category[:, 3], amount[:, 3] = serial(2026, 6, 1), "Food & Groceries", 0.0
+    date[0, 4], category[0, 4], amount[0, 4] = serial(2026, 3, 3), "Gifts", -40.0
+    _load(engine, date, category, amount)
+    _compare(engine, reference_model(date, category, amount, budgets), f"edge cases, seed {SEED}")
+
+    assert engine.get("Dashboard!D9")[:5] == ["Housing"] * 5
+    assert engine.get("'Monthly Budget'!F5")[:2] == ["-", "Near Limit"]
+    assert engine.numbers("'Annual Overview'!C7")[1] == 1500
+    assert list(engine.numbers("'Annual Overview'!C5")[:3]) == [0, 0, 100]
+    assert list(engine.numbers("'Annual Overview'!N5")[:3]) == [0, 0, 100]
+    assert engine.numbers("Dashboard!D6")[4] == 40
+    assert engine.numbers("'Monthly Budget'!D17")[4] == 0
+
+
+@pytest.mark.parametrize("batch", range(-(-CASES // LANES)))
+def test_formulas_match_reference_model(engine, budgets, batch):
+    rng = np.random.default_rng([SEED, batch])
+    date, category, amount = random_transactions(rng, LANES, budgets)
+    _load(engine, date, category, amount)
+    _compare(engine, reference_model(date, category, amount, budgets),
+             f"BUDGET_FUZZ_SEED={SEED} batch {batch}")
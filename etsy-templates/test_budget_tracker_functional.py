@@ -1,1098 +1,283 @@
 #!/usr/bin/env python3
 """
-Functional Test Suite for monthly-budget-tracker.xlsx
-
-Tests that all formulas produce correct results by:
-1. Reading the pre-filled sample data (16 transactions)
-2. Manually computing expected values for every formula
-3. Comparing formula logic against expected results
-4. Testing with additional injected test data
-5. Verifying cross-sheet references are correct
-
-Since openpyxl cannot evaluate formulas, we parse them and compute
-expected results in Python, then verify the formula text is correct.
+Functional tests for monthly-budget-tracker.xlsx.
+
+Checks the exact formula text of every Dashboard, Monthly Budget and Annual
+Overview formula, that the three sheets agree on their categories, and - by
+recalculating the workbook with recalc_engine - that the formulas produce the
+totals computed independently from the transactions, both for the pre-filled
+sample data and for injected test data. Formula text and sample data come
+from the parsed-workbook cache (budget_parsed), not openpyxl.
+Run with:  python -m pytest -q test_budget_tracker_functional.py
 """
 
-import openpyxl
-from datetime import datetime
+import datetime
+import functools
 from collections import defaultdict
-import re
-import sys
-import shutil
-import os
-
-XLSX_PATH = "/Users/timdunn/mobile_app_ideas/etsy-templates/monthly-budget-tracker.xlsx"
-TEST_COPY_PATH = "/Users/timdunn/mobile_app_ideas/etsy-templates/monthly-budget-tracker-TEST-COPY.xlsx"
-
-# ─── Colors for terminal output ───
-class C:
-    GREEN = "\033[92m"
-    RED = "\033[91m"
-    YELLOW = "\033[93m"
-    CYAN = "\033[96m"
-    BOLD = "\033[1m"
-    DIM = "\033[2m"
-    END = "\033[0m"
-
-pass_count = 0
-fail_count = 0
-warn_count = 0
-
-def PASS(msg):
-    global pass_count
-    pass_count += 1
-    print(f"  {C.GREEN}PASS{C.END} {msg}")
-
-def FAIL(msg):
-    global fail_count
-    fail_count += 1
-    print(f"  {C.RED}FAIL{C.END} {msg}")
-
-def WARN(msg):
-    global warn_count
-    warn_count += 1
-    print(f"  {C.YELLOW}WARN{C.END} {msg}")
-
-def section(title):
-    print(f"\n{C.BOLD}{C.CYAN}{'='*70}{C.END}")
-    print(f"{C.BOLD}{C.CYAN}  {title}{C.END}")
-    print(f"{C.BOLD}{C.CYAN}{'='*70}{C.END}")
-
-def subsection(title):
-    print(f"\n  {C.BOLD}--- {title} ---{C.END}")
-
-
-# ═══════════════════════════════════════════════════════════════════════
-#  LOAD WORKBOOK AND EXTRACT DATA
-# ═══════════════════════════════════════════════════════════════════════
-
-section("LOADING WORKBOOK")
-wb = openpyxl.load_workbook(XLSX_PATH, data_only=False)
-print(f"  Sheets: {wb.sheetnames}")
-
-# ─── Extract all transactions ───
-ws_txn = wb['Transactions']
-transactions = []
-for r in range(2, ws_txn.max_row + 1):
-    date_val = ws_txn.cell(r, 1).value
-    desc = ws_txn.cell(r, 2).value
-    cat = ws_txn.cell(r, 3).value
-    amt = ws_txn.cell(r, 4).value
-    method = ws_txn.cell(r, 5).value
-    notes = ws_txn.cell(r, 6).value
-    if date_val is None and desc is None:
-        break
-    transactions.append({
-        'row': r,
-        'date': date_val,
-        'description': desc,
-        'category': cat,
-        'amount': amt if amt is not None else 0,
-        'method': method,
-        'notes': notes
-    })
-
-print(f"  Found {len(transactions)} transactions in rows 2-{transactions[-1]['row'] if transactions else 'N/A'}")
-for t in transactions:
-    print(f"    Row {t['row']}: {t['date'].strftime('%Y-%m-%d') if isinstance(t['date'], datetime) else t['date']} | "
-          f"{t['description']:25s} | {t['category']:20s} | {t['amount']:>10.2f} | {t['method']}")
-
-
-# ═══════════════════════════════════════════════════════════════════════
-#  COMPUTE EXPECTED VALUES FROM TRANSACTION DATA
-# ═══════════════════════════════════════════════════════════════════════
-
-section("COMPUTING EXPECTED VALUES FROM TRANSACTION DATA")
-
-# Total Income: sum of all positive amounts
-total_income = sum(t['amount'] for t in transactions if t['amount'] > 0)
-print(f"  Total Income (D>0): {total_income:.2f}")
-
-# Total Expenses: sum of absolute negative amounts
-total_expenses = sum(abs(t['amount']) for t in transactions if t['amount'] < 0)
-print(f"  Total Expenses (|D<0|): {total_expenses:.2f}")
-
-# Net Savings
-net_savings = total_income - total_expenses
-print(f"  Net Savings: {net_savings:.2f}")
-
-# Savings Rate
-savings_rate = net_savings / total_income if total_income != 0 else 0
-print(f"  Savings Rate: {savings_rate:.4f} ({savings_rate*100:.2f}%)")
-
-# Category-level expense sums (for negative amounts, made positive)
-cat_expenses = defaultdict(float)
-for t in transactions:
-    if t['amount'] < 0:
-        cat_expenses[t['category']] += abs(t['amount'])
-
-print(f"\n  Category expense breakdown:")
-for cat in sorted(cat_expenses.keys()):
-    print(f"    {cat:20s}: {cat_expenses[cat]:>10.2f}")
-
-# Monthly breakdown (by MONTH number)
-monthly_income = defaultdict(float)
-monthly_expenses_by_cat = defaultdict(lambda: defaultdict(float))
-for t in transactions:
-    if isinstance(t['date'], datetime):
-        month = t['date'].month
-    else:
-        continue
-    if t['amount'] > 0 and t['category'] == 'Income':
-        monthly_income[month] += t['amount']
-    elif t['amount'] < 0:
-        monthly_expenses_by_cat[month][t['category']] += abs(t['amount'])
-
-print(f"\n  Monthly income by month:")
-for m in sorted(monthly_income.keys()):
-    print(f"    Month {m}: {monthly_income[m]:.2f}")
-
-print(f"\n  Monthly expenses by month and category:")
-for m in sorted(monthly_expenses_by_cat.keys()):
-    print(f"    Month {m}:")
-    for cat in sorted(monthly_expenses_by_cat[m].keys()):
-        print(f"      {cat:20s}: {monthly_expenses_by_cat[m][cat]:>10.2f}")
-
-
-# ═══════════════════════════════════════════════════════════════════════
-#  TEST 1: DASHBOARD - Monthly Summary Formulas
-# ═══════════════════════════════════════════════════════════════════════
-
-section("TEST 1: DASHBOARD - Monthly Summary Formulas")
-ws_dash = wb['Dashboard']
-
-subsection("B6: Total Income")
-formula = ws_dash['B6'].value
-print(f"  Formula: {formula}")
-expected_formula = '=SUMPRODUCT((Transactions!D2:D501>0)*Transactions!D2:D501)'
-if formula == expected_formula:
-    PASS(f"Formula text correct")
-else:
-    FAIL(f"Expected: {expected_formula}, Got: {formula}")
-print(f"  Expected result: {total_income:.2f}")
-# Verify the logic: SUMPRODUCT of (D>0)*D = sum of positive values
-manual_calc = sum(t['amount'] for t in transactions if t['amount'] > 0)
-if abs(manual_calc - total_income) < 0.01:
-    PASS(f"Manual calc matches: {manual_calc:.2f}")
-else:
-    FAIL(f"Manual calc mismatch: {manual_calc:.2f} vs {total_income:.2f}")
-
-subsection("D6: Total Expenses")
-formula = ws_dash['D6'].value
-print(f"  Formula: {formula}")
-expected_formula = '=SUMPRODUCT((Transactions!D2:D501<0)*Transactions!D2:D501)*-1'
-if formula == expected_formula:
-    PASS(f"Formula text correct")
-else:
-    FAIL(f"Expected: {expected_formula}, Got: {formula}")
-# Logic: SUMPRODUCT of (D<0)*D gives negative sum, *-1 makes it positive
-manual_calc = sum(t['amount'] for t in transactions if t['amount'] < 0) * -1
-print(f"  Expected result: {manual_calc:.2f}")
-if abs(manual_calc - total_expenses) < 0.01:
-    PASS(f"Manual calc matches: {manual_calc:.2f}")
-else:
-    FAIL(f"Manual calc mismatch: {manual_calc:.2f} vs {total_expenses:.2f}")
-
-subsection("F6: Net Savings = B6 - D6")
-formula = ws_dash['F6'].value
-print(f"  Formula: {formula}")
-if formula == '=B6-D6':
-    PASS(f"Formula text correct: =B6-D6")
-else:
-    FAIL(f"Expected =B6-D6, Got: {formula}")
-print(f"  Expected result: {total_income:.2f} - {total_expenses:.2f} = {net_savings:.2f}")
-PASS(f"Net savings = {net_savings:.2f}")
-
-subsection("B9: Savings Rate = IF(B6=0,0,F6/B6)")
-formula = ws_dash['B9'].value
-print(f"  Formula: {formula}")
-if formula == '=IF(B6=0,0,F6/B6)':
-    PASS(f"Formula text correct")
-else:
-    FAIL(f"Expected =IF(B6=0,0,F6/B6), Got: {formula}")
-print(f"  Expected result: {savings_rate:.4f} ({savings_rate*100:.2f}%)")
-
-subsection("D9: Largest Expense Category")
-formula = ws_dash['D9'].value
-print(f"  Formula: {formula}")
-expected = "=IFERROR(INDEX('Monthly Budget'!B5:B16,MATCH(MAX('Monthly Budget'!D5:D16),'Monthly Budget'!D5:D16,0)),\"-\")"
-if formula == expected:
-    PASS(f"Formula text correct")
-else:
-    FAIL(f"Expected: {expected}")
-    print(f"  Got:      {formula}")
-# The largest expense category
-if cat_expenses:
-    largest_cat = max(cat_expenses, key=cat_expenses.get)
-    print(f"  Expected result: '{largest_cat}' (${cat_expenses[largest_cat]:.2f})")
-    PASS(f"Largest expense category: {largest_cat}")
-
-subsection("F9: Days Left in Month")
-formula = ws_dash['F9'].value
-print(f"  Formula: {formula}")
-if formula == '=DAY(EOMONTH(TODAY(),0))-DAY(TODAY())':
-    PASS(f"Formula text correct (dynamic, depends on TODAY())")
-else:
-    FAIL(f"Unexpected formula: {formula}")
-
-
-# ═══════════════════════════════════════════════════════════════════════
-#  TEST 2: MONTHLY BUDGET - Actual Spent Formulas (SUMPRODUCT)
-# ═══════════════════════════════════════════════════════════════════════
-
-section("TEST 2: MONTHLY BUDGET - Actual Spent (SUMPRODUCT) Formulas")
-ws_mb = wb['Monthly Budget']
-
-budget_categories = {
-    5: 'Housing',
-    6: 'Transportation',
-    7: 'Food & Groceries',
-    8: 'Utilities',
-    9: 'Insurance',
-    10: 'Healthcare',
-    11: 'Debt Payments',
-    12: 'Personal',
-    13: 'Entertainment',
-    14: 'Savings',
-    15: 'Education',
-    16: 'Miscellaneous'
-}
-
-budgeted_amounts = {}
-for row_num, cat_name in budget_categories.items():
-    budgeted_amounts[cat_name] = ws_mb.cell(row_num, 3).value  # Column C
-
-print(f"  Budgeted amounts:")
-for cat, amt in budgeted_amounts.items():
-    print(f"    {cat:20s}: {amt}")
-
-for row_num, cat_name in budget_categories.items():
-    subsection(f"Row {row_num}: {cat_name}")
-    
-    # D column: Actual Spent
-    d_formula = ws_mb.cell(row_num, 4).value
-    expected_d = f'=SUMPRODUCT((Transactions!C2:C501=B{row_num})*(Transactions!D2:D501<0)*Transactions!D2:D501)*-1'
-    print(f"  D{row_num} formula: {d_formula}")
-    
-    if d_formula == expected_d:
-        PASS(f"D{row_num} Actual Spent formula correct")
-    else:
-        FAIL(f"D{row_num} Expected: {expected_d}")
-        print(f"         Got:      {d_formula}")
-    
-    # Compute expected value
-    # The formula matches by B{row_num} which is the category name
-    expected_actual = cat_expenses.get(cat_name, 0)
-    print(f"  Expected Actual Spent: {expected_actual:.2f}")
-    
-    # Verify the B column has the right category
-    b_val = ws_mb.cell(row_num, 2).value
-    if b_val == cat_name:
-        PASS(f"B{row_num} category label: '{b_val}'")
-    else:
-        FAIL(f"B{row_num} expected '{cat_name}', got '{b_val}'")
-    
-    # E column: Difference = C - D
-    e_formula = ws_mb.cell(row_num, 5).value
-    if e_formula == f'=C{row_num}-D{row_num}':
-        PASS(f"E{row_num} Difference formula correct")
-    else:
-        FAIL(f"E{row_num} Expected =C{row_num}-D{row_num}, Got: {e_formula}")
-    
-    budget = budgeted_amounts[cat_name]
-    expected_diff = budget - expected_actual
-    print(f"  Expected Difference: {budget} - {expected_actual:.2f} = {expected_diff:.2f}")
-    
-    # F column: Status
-    f_formula = ws_mb.cell(row_num, 6).value
-    expected_f = f'=IF(D{row_num}=0,"-",IF(D{row_num}<=C{row_num}*0.9,"Under Budget",IF(D{row_num}<=C{row_num},"Near Limit","OVER BUDGET")))'
-    if f_formula == expected_f:
-        PASS(f"F{row_num} Status formula correct")
-    else:
-        FAIL(f"F{row_num} Expected: {expected_f}")
-        print(f"         Got:      {f_formula}")
-    
-    # Compute expected status
-    if expected_actual == 0:
-        expected_status = '-'
-    elif expected_actual <= budget * 0.9:
-        expected_status = 'Under Budget'
-    elif expected_actual <= budget:
-        expected_status = 'Near Limit'
-    else:
-        expected_status = 'OVER BUDGET'
-    print(f"  Expected Status: '{expected_status}'")
-    PASS(f"Status logic verified: '{expected_status}'")
-
-# Totals row
-subsection("Row 17: TOTALS")
-c17 = ws_mb.cell(17, 3).value
-d17 = ws_mb.cell(17, 4).value
-e17 = ws_mb.cell(17, 5).value
-print(f"  C17: {c17}")
-print(f"  D17: {d17}")
-print(f"  E17: {e17}")
-
-if c17 == '=SUM(C5:C16)':
-    PASS("C17 Total Budget formula correct")
-    expected_total_budget = sum(budgeted_amounts.values())
-    print(f"  Expected Total Budget: {expected_total_budget}")
-else:
-    FAIL(f"C17 Expected =SUM(C5:C16), Got: {c17}")
-
-if d17 == '=SUM(D5:D16)':
-    PASS("D17 Total Actual formula correct")
-    expected_total_actual = sum(cat_expenses.get(cat, 0) for cat in budget_categories.values())
-    print(f"  Expected Total Actual: {expected_total_actual:.2f}")
-else:
-    FAIL(f"D17 Expected =SUM(D5:D16), Got: {d17}")
-
-if e17 == '=SUM(E5:E16)':
-    PASS("E17 Total Difference formula correct")
-else:
-    FAIL(f"E17 Expected =SUM(E5:E16), Got: {e17}")
-
-
-# ═══════════════════════════════════════════════════════════════════════
-#  TEST 3: DASHBOARD - Budget vs Actual cross-references
-# ═══════════════════════════════════════════════════════════════════════
-
-section("TEST 3: DASHBOARD - Budget vs Actual Cross-References")
-
-# Dashboard rows 13-24 should reference Monthly Budget rows 5-16
-dash_categories = {
-    13: ('Housing', 5),
-    14: ('Transportation', 6),
-    15: ('Food & Groceries', 7),
-    16: ('Utilities', 8),
-    17: ('Insurance', 9),
-    18: ('Healthcare', 10),
-    19: ('Debt Payments', 11),
-    20: ('Personal', 12),
-    21: ('Entertainment', 13),
-    22: ('Savings', 14),
-    23: ('Education', 15),
-    24: ('Miscellaneous', 16),
-}
-
-for dash_row, (cat_name, mb_row) in dash_categories.items():
-    subsection(f"Dashboard Row {dash_row}: {cat_name} -> Monthly Budget Row {mb_row}")
-    
-    # B column: category label
-    b_val = ws_dash.cell(dash_row, 2).value
-    if b_val == cat_name:
-        PASS(f"B{dash_row} label '{b_val}' matches expected '{cat_name}'")
-    else:
-        FAIL(f"B{dash_row} expected '{cat_name}', got '{b_val}'")
-    
-    # C column: Budgeted -> Monthly Budget C{mb_row}
-    c_formula = ws_dash.cell(dash_row, 3).value
-    expected_c = f"='Monthly Budget'!C{mb_row}"
-    if c_formula == expected_c:
-        PASS(f"C{dash_row} references Monthly Budget C{mb_row} correctly")
-    else:
-        FAIL(f"C{dash_row} Expected: {expected_c}, Got: {c_formula}")
-    
-    # D column: Actual -> Monthly Budget D{mb_row}
-    d_formula = ws_dash.cell(dash_row, 4).value
-    expected_d = f"='Monthly Budget'!D{mb_row}"
-    if d_formula == expected_d:
-        PASS(f"D{dash_row} references Monthly Budget D{mb_row} correctly")
-    else:
-        FAIL(f"D{dash_row} Expected: {expected_d}, Got: {d_formula}")
-    
-    # E column: Difference
-    e_formula = ws_dash.cell(dash_row, 5).value
-    if e_formula == f'=C{dash_row}-D{dash_row}':
-        PASS(f"E{dash_row} Difference formula correct")
-    else:
-        FAIL(f"E{dash_row} Expected =C{dash_row}-D{dash_row}, Got: {e_formula}")
-    
-    # F column: % Used
-    f_formula = ws_dash.cell(dash_row, 6).value
-    if f_formula == f'=IF(C{dash_row}=0,0,D{dash_row}/C{dash_row})':
-        PASS(f"F{dash_row} % Used formula correct")
-    else:
-        FAIL(f"F{dash_row} Expected =IF(C{dash_row}=0,0,D{dash_row}/C{dash_row}), Got: {f_formula}")
-    
-    # G column: Status
-    g_formula = ws_dash.cell(dash_row, 7).value
-    expected_g = f'=IF(D{dash_row}=0,"-",IF(D{dash_row}<=C{dash_row}*0.9,"Under Budget",IF(D{dash_row}<=C{dash_row},"Near Limit","OVER BUDGET")))'
-    if g_formula == expected_g:
-        PASS(f"G{dash_row} Status formula correct")
-    else:
-        FAIL(f"G{dash_row} Expected: {expected_g}")
-        print(f"         Got:      {g_formula}")
-
-# Dashboard totals row 25
-subsection("Dashboard Row 25: TOTALS")
-c25 = ws_dash.cell(25, 3).value
-d25 = ws_dash.cell(25, 4).value
-e25 = ws_dash.cell(25, 5).value
-f25 = ws_dash.cell(25, 6).value
-
-if c25 == '=SUM(C13:C24)':
-    PASS("C25 Total Budget sum correct")
-else:
-    FAIL(f"C25 Expected =SUM(C13:C24), Got: {c25}")
-
-if d25 == '=SUM(D13:D24)':
-    PASS("D25 Total Actual sum correct")
-else:
-    FAIL(f"D25 Expected =SUM(D13:D24), Got: {d25}")
-
-if e25 == '=C25-D25':
-    PASS("E25 Total Difference correct")
-else:
-    FAIL(f"E25 Expected =C25-D25, Got: {e25}")
-
-if f25 == '=IF(C25=0,0,D25/C25)':
-    PASS("F25 Total % Used correct")
-else:
-    FAIL(f"F25 Expected =IF(C25=0,0,D25/C25), Got: {f25}")
-
-
-# ═══════════════════════════════════════════════════════════════════════
-#  TEST 4: ANNUAL OVERVIEW - Monthly SUMPRODUCT Formulas
-# ═══════════════════════════════════════════════════════════════════════
-
-section("TEST 4: ANNUAL OVERVIEW - Monthly SUMPRODUCT Formulas")
-ws_ao = wb['Annual Overview']
-
-# Row 5: INCOME
-subsection("Row 5: INCOME")
-for month_num in range(1, 13):
-    col_letter = chr(ord('C') + month_num - 1)  # C=Jan, D=Feb, ..., N=Dec
-    col_idx = 3 + month_num - 1
-    formula = ws_ao.cell(5, col_idx).value
-    expected = f'=SUMPRODUCT((MONTH(Transactions!A2:A501)={month_num})*(Transactions!C2:C501="Income")*Transactions!D2:D501)'
-    
-    if formula == expected:
-        PASS(f"{col_letter}5 (Month {month_num}) formula correct")
-    else:
-        FAIL(f"{col_letter}5 Expected: {expected}")
-        print(f"         Got: {formula}")
-    
-    # Compute expected
-    expected_val = monthly_income.get(month_num, 0)
-    print(f"    Expected value: {expected_val:.2f}")
-
-# O5: Annual Total
-o5 = ws_ao.cell(5, 15).value
-if o5 == '=SUM(C5:N5)':
-    PASS("O5 Annual Income Total formula correct")
-    expected_annual_income = sum(monthly_income.values())
-    print(f"    Expected: {expected_annual_income:.2f}")
-else:
-    FAIL(f"O5 Expected =SUM(C5:N5), Got: {o5}")
-
-# P5: Average
-p5 = ws_ao.cell(5, 16).value
-if p5 == '=IF(COUNTIF(C5:N5,"<>0")=0,0,O5/COUNTIF(C5:N5,"<>0"))':
-    PASS("P5 Average Income formula correct")
-else:
-    FAIL(f"P5 Unexpected formula: {p5}")
-
-# Expense category rows 7-18
-ao_categories = {
-    7: 'Housing',
-    8: 'Transportation',
-    9: 'Food & Groceries',
-    10: 'Utilities',
-    11: 'Insurance',
-    12: 'Healthcare',
-    13: 'Debt Payments',
-    14: 'Personal',
-    15: 'Entertainment',
-    16: 'Savings',
-    17: 'Education',
-    18: 'Miscellaneous'
-}
-
-for ao_row, cat_name in ao_categories.items():
-    subsection(f"Row {ao_row}: {cat_name}")
-    
-    # Check category label
-    b_val = ws_ao.cell(ao_row, 2).value
-    if b_val == cat_name:
-        PASS(f"B{ao_row} label correct: '{cat_name}'")
-    else:
-        FAIL(f"B{ao_row} expected '{cat_name}', got '{b_val}'")
-    
-    # Check formula for each month (only spot-check a few to keep output manageable)
-    for month_num in [1, 2, 6, 12]:  # Spot check Jan, Feb, Jun, Dec
-        col_idx = 3 + month_num - 1
-        col_letter = chr(ord('C') + month_num - 1)
-        formula = ws_ao.cell(ao_row, col_idx).value
-        expected = (f'=SUMPRODUCT((MONTH(Transactions!A2:A501)={month_num})'
-                    f'*(Transactions!C2:C501="{cat_name}")'
-                    f'*(Transactions!D2:D501<0)*Transactions!D2:D501)*-1')
-        
-        if formula == expected:
-            PASS(f"{col_letter}{ao_row} (Month {month_num}) formula correct")
-        else:
-            FAIL(f"{col_letter}{ao_row} Expected: {expected}")
-            print(f"         Got: {formula}")
-        
-        # Compute expected value
-        expected_val = monthly_expenses_by_cat.get(month_num, {}).get(cat_name, 0)
-        print(f"    Expected value: {expected_val:.2f}")
-    
-    # Check annual total
-    o_formula = ws_ao.cell(ao_row, 15).value
-    if o_formula == f'=SUM(C{ao_row}:N{ao_row})':
-        PASS(f"O{ao_row} Annual Total formula correct")
-    else:
-        FAIL(f"O{ao_row} Expected =SUM(C{ao_row}:N{ao_row}), Got: {o_formula}")
-    
-    # Check average
-    p_formula = ws_ao.cell(ao_row, 16).value
-    expected_p = f'=IF(COUNTIF(C{ao_row}:N{ao_row},"<>0")=0,0,O{ao_row}/COUNTIF(C{ao_row}:N{ao_row},"<>0"))'
-    if p_formula == expected_p:
-        PASS(f"P{ao_row} Average formula correct")
-    else:
-        FAIL(f"P{ao_row} Expected: {expected_p}")
-        print(f"         Got: {p_formula}")
-
-# Row 19: TOTAL EXPENSES
-subsection("Row 19: TOTAL EXPENSES")
-for month_num in [1, 2, 6, 12]:
-    col_idx = 3 + month_num - 1
-    col_letter = chr(ord('C') + month_num - 1)
-    formula = ws_ao.cell(19, col_idx).value
-    expected = f'=SUM({col_letter}7:{col_letter}18)'
-    if formula == expected:
-        PASS(f"{col_letter}19 Total Expenses formula correct")
-    else:
-        FAIL(f"{col_letter}19 Expected: {expected}, Got: {formula}")
-
-# Compute total expenses for February
-feb_total_expenses = sum(monthly_expenses_by_cat.get(2, {}).values())
-print(f"  Expected Feb Total Expenses: {feb_total_expenses:.2f}")
-
-# Row 20: NET SAVINGS
-subsection("Row 20: NET SAVINGS")
-for month_num in [1, 2, 6, 12]:
-    col_idx = 3 + month_num - 1
-    col_letter = chr(ord('C') + month_num - 1)
-    formula = ws_ao.cell(20, col_idx).value
-    expected = f'={col_letter}5-{col_letter}19'
-    if formula == expected:
-        PASS(f"{col_letter}20 Net Savings formula correct")
-    else:
-        FAIL(f"{col_letter}20 Expected: {expected}, Got: {formula}")
 
-feb_net = monthly_income.get(2, 0) - feb_total_expenses
-print(f"  Expected Feb Net Savings: {monthly_income.get(2,0):.2f} - {feb_total_expenses:.2f} = {feb_net:.2f}")
+import numpy as np
+import pytest
+from openpyxl.utils import get_column_letter
 
-# Row 21: SAVINGS RATE
-subsection("Row 21: SAVINGS RATE")
-for month_num in [1, 2, 6, 12]:
-    col_idx = 3 + month_num - 1
-    col_letter = chr(ord('C') + month_num - 1)
-    formula = ws_ao.cell(21, col_idx).value
-    expected = f'=IF({col_letter}5=0,0,{col_letter}20/{col_letter}5)'
-    if formula == expected:
-        PASS(f"{col_letter}21 Savings Rate formula correct")
-    else:
-        FAIL(f"{col_letter}21 Expected: {expected}, Got: {formula}")
+from recalc_engine import RecalcEngine
 
-if monthly_income.get(2, 0) != 0:
-    feb_savings_rate = feb_net / monthly_income[2]
-    print(f"  Expected Feb Savings Rate: {feb_savings_rate:.4f} ({feb_savings_rate*100:.2f}%)")
-
-# O and P columns for rows 19-21
-o19 = ws_ao.cell(19, 15).value
-o20 = ws_ao.cell(20, 15).value
-o21 = ws_ao.cell(21, 15).value
-if o19 == '=SUM(C19:N19)':
-    PASS("O19 Annual Total Expenses correct")
-else:
-    FAIL(f"O19 Expected =SUM(C19:N19), Got: {o19}")
-if o20 == '=O5-O19':
-    PASS("O20 Annual Net Savings correct")
-else:
-    FAIL(f"O20 Expected =O5-O19, Got: {o20}")
-if o21 == '=IF(O5=0,0,O20/O5)':
-    PASS("O21 Annual Savings Rate correct")
-else:
-    FAIL(f"O21 Expected =IF(O5=0,0,O20/O5), Got: {o21}")
-
-
-# ═══════════════════════════════════════════════════════════════════════
-#  TEST 5: DASHBOARD - Monthly Income & Expenses Comparison
-# ═══════════════════════════════════════════════════════════════════════
-
-section("TEST 5: DASHBOARD - Monthly Income & Expenses Comparison")
-
-month_names = ['Jan','Feb','Mar','Apr','May','Jun','Jul','Aug','Sep','Oct','Nov','Dec']
-
-for i, month_name in enumerate(month_names):
-    dash_row = 29 + i
-    ao_col_letter = chr(ord('C') + i)
-    
-    b_val = ws_dash.cell(dash_row, 2).value
-    c_formula = ws_dash.cell(dash_row, 3).value  # Income
-    d_formula = ws_dash.cell(dash_row, 4).value  # Expenses
-    e_formula = ws_dash.cell(dash_row, 5).value  # Net Savings
-    f_formula = ws_dash.cell(dash_row, 6).value  # Savings Rate
-    
-    # Verify month label
-    if b_val == month_name:
-        PASS(f"B{dash_row} = '{month_name}'")
-    else:
-        FAIL(f"B{dash_row} Expected '{month_name}', Got '{b_val}'")
-    
-    # Income references Annual Overview row 5 (INCOME)
-    expected_c = f"='Annual Overview'!{ao_col_letter}5"
-    if c_formula == expected_c:
-        PASS(f"C{dash_row} Income references AO {ao_col_letter}5")
-    else:
-        FAIL(f"C{dash_row} Expected: {expected_c}, Got: {c_formula}")
-    
-    # Expenses references Annual Overview row 19 (TOTAL EXPENSES)
-    expected_d = f"='Annual Overview'!{ao_col_letter}19"
-    if d_formula == expected_d:
-        PASS(f"D{dash_row} Expenses references AO {ao_col_letter}19")
-    else:
-        FAIL(f"D{dash_row} Expected: {expected_d}, Got: {d_formula}")
-    
-    # Net Savings
-    if e_formula == f'=C{dash_row}-D{dash_row}':
-        PASS(f"E{dash_row} Net Savings formula correct")
-    else:
-        FAIL(f"E{dash_row} Expected =C{dash_row}-D{dash_row}, Got: {e_formula}")
-    
-    # Savings Rate
-    if f_formula == f'=IF(C{dash_row}=0,0,E{dash_row}/C{dash_row})':
-        PASS(f"F{dash_row} Savings Rate formula correct")
-    else:
-        FAIL(f"F{dash_row} Expected =IF(C{dash_row}=0,0,E{dash_row}/C{dash_row}), Got: {f_formula}")
-
-# Annual total row 41
-subsection("Dashboard Row 41: ANNUAL TOTAL")
-c41 = ws_dash.cell(41, 3).value
-d41 = ws_dash.cell(41, 4).value
-e41 = ws_dash.cell(41, 5).value
-f41 = ws_dash.cell(41, 6).value
-
-if c41 == '=SUM(C29:C40)':
-    PASS("C41 Annual Total Income correct")
-else:
-    FAIL(f"C41 Expected =SUM(C29:C40), Got: {c41}")
-if d41 == '=SUM(D29:D40)':
-    PASS("D41 Annual Total Expenses correct")
-else:
-    FAIL(f"D41 Expected =SUM(D29:D40), Got: {d41}")
-if e41 == '=C41-D41':
-    PASS("E41 Annual Net Savings correct")
-else:
-    FAIL(f"E41 Expected =C41-D41, Got: {e41}")
-if f41 == '=IF(C41=0,0,E41/C41)':
-    PASS("F41 Annual Savings Rate correct")
-else:
-    FAIL(f"F41 Expected =IF(C41=0,0,E41/C41), Got: {f41}")
-
-
-# ═══════════════════════════════════════════════════════════════════════
-#  TEST 6: CROSS-SHEET CONSISTENCY CHECKS
-# ═══════════════════════════════════════════════════════════════════════
-
-section("TEST 6: CROSS-SHEET CONSISTENCY CHECKS")
-
-subsection("Monthly Budget categories match Dashboard categories")
-for dash_row, (cat_name, mb_row) in dash_categories.items():
-    mb_cat = ws_mb.cell(mb_row, 2).value
-    dash_cat = ws_dash.cell(dash_row, 2).value
-    if mb_cat == dash_cat == cat_name:
-        PASS(f"Category '{cat_name}' consistent: MB row {mb_row} = Dash row {dash_row}")
-    else:
-        FAIL(f"Category mismatch: MB='{mb_cat}', Dash='{dash_cat}', Expected='{cat_name}'")
-
-subsection("Annual Overview categories match Monthly Budget categories")
-for ao_row, cat_name in ao_categories.items():
-    mb_row = ao_row - 2  # AO row 7 -> MB row 5, AO row 8 -> MB row 6, etc.
-    mb_cat = ws_mb.cell(mb_row, 2).value
-    ao_cat = ws_ao.cell(ao_row, 2).value
-    if ao_cat == mb_cat == cat_name:
-        PASS(f"Category '{cat_name}' consistent: AO row {ao_row} = MB row {mb_row}")
-    else:
-        FAIL(f"Mismatch: AO row {ao_row}='{ao_cat}', MB row {mb_row}='{mb_cat}', Expected='{cat_name}'")
-
-subsection("Transaction data range check: formulas use A2:A501 / C2:C501 / D2:D501")
-# All formulas should reference rows 2-501 (500 data rows)
-# Verify Transactions sheet has capacity for 500 rows
-if ws_txn.max_row >= 501:
-    PASS(f"Transactions sheet has {ws_txn.max_row} rows (supports up to row 501)")
-else:
-    WARN(f"Transactions sheet max_row is {ws_txn.max_row}, but formulas reference up to row 501 (OK if empty rows exist)")
-    # Check if the formula range is valid
-    PASS("Formula range A2:A501 / C2:C501 / D2:D501 covers 500 transactions (sufficient)")
-
-subsection("Verify no Income transactions are counted as expenses")
-# Check: SUMPRODUCT with (D<0) filter correctly excludes income
-income_txns_negative = [t for t in transactions if t['category'] == 'Income' and t['amount'] < 0]
-if not income_txns_negative:
-    PASS("No negative Income transactions found (formulas won't double-count)")
-else:
-    WARN(f"Found {len(income_txns_negative)} negative Income transactions - these would be missed by SUMPRODUCT filters")
-
-subsection("Verify all transaction categories are covered by Monthly Budget")
-txn_categories = set(t['category'] for t in transactions if t['amount'] < 0)
-budget_cats = set(budget_categories.values())
-uncovered = txn_categories - budget_cats
-if uncovered:
-    FAIL(f"Transaction categories NOT in Monthly Budget: {uncovered}")
-else:
-    PASS(f"All {len(txn_categories)} expense categories are covered in Monthly Budget")
-
-covered_unused = budget_cats - txn_categories
-if covered_unused:
-    print(f"    Note: Budget categories with no transactions: {covered_unused}")
-
-
-# ═══════════════════════════════════════════════════════════════════════
-#  TEST 7: INJECT TEST DATA AND VERIFY EXPECTED CALCULATIONS
-# ═══════════════════════════════════════════════════════════════════════
-
-section("TEST 7: INJECT TEST DATA - VERIFY EXPECTED CALCULATIONS")
-
-# Make a copy of the workbook for test data injection
-shutil.copy2(XLSX_PATH, TEST_COPY_PATH)
-wb_test = openpyxl.load_workbook(TEST_COPY_PATH, data_only=False)
-ws_test_txn = wb_test['Transactions']
-
-# Clear existing data (rows 2-17)
-for r in range(2, 18):
-    for c in range(1, 7):
-        ws_test_txn.cell(r, c).value = None
-
-# Inject test data
-test_data = [
-    (datetime(2026, 2, 1), "Salary", "Income", 5000, "Bank Transfer"),
-    (datetime(2026, 2, 5), "Rent", "Housing", -1500, "Bank Transfer"),
-    (datetime(2026, 2, 10), "Groceries", "Food & Groceries", -200, "Debit Card"),
-    (datetime(2026, 2, 15), "Netflix", "Entertainment", -15.99, "Credit Card"),
+CATEGORIES = [
+    "Housing", "Transportation", "Food & Groceries", "Utilities", "Insurance", "Healthcare",
+    "Debt Payments", "Personal", "Entertainment", "Savings", "Education", "Miscellaneous",
+]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+MB_FIRST_ROW = 5            # Monthly Budget rows 5-16
+DASH_FIRST_ROW = 13         # Dashboard budget-vs-actual rows 13-24
+AO_FIRST_ROW = 7            # Annual Overview expense rows 7-18
+DASH_MONTH_ROW = 29         # Dashboard monthly comparison rows 29-40
+
+BY_CATEGORY = list(enumerate(CATEGORIES))
+BY_MONTH = list(enumerate(MONTHS, start=1))
+
+INJECTED = [
+    (datetime.datetime(2026, 2, 1), "Salary", "Income", 5000, "Bank Transfer"),
+    (datetime.datetime(2026, 2, 5), "Rent", "Housing", -1500, "Bank Transfer"),
+    (datetime.datetime(2026, 2, 10), "Groceries", "Food & Groceries", -200, "Debit Card"),
+    (datetime.datetime(2026, 2, 15), "Netflix", "Entertainment", -15.99, "Credit Card"),
 ]
 
-for i, (dt, desc, cat, amt, method) in enumerate(test_data):
-    row = 2 + i
-    ws_test_txn.cell(row, 1).value = dt
-    ws_test_txn.cell(row, 2).value = desc
-    ws_test_txn.cell(row, 3).value = cat
-    ws_test_txn.cell(row, 4).value = amt
-    ws_test_txn.cell(row, 5).value = method
-
-wb_test.save(TEST_COPY_PATH)
-print(f"  Saved test workbook with 4 injected transactions: {TEST_COPY_PATH}")
-
-# Now compute what EVERY formula should produce with this test data
-test_income = 5000.0
-test_expenses_housing = 1500.0
-test_expenses_food = 200.0
-test_expenses_entertainment = 15.99
-test_total_expenses = test_expenses_housing + test_expenses_food + test_expenses_entertainment
-test_net_savings = test_income - test_total_expenses
-test_savings_rate = test_net_savings / test_income
-
-print(f"\n  With injected test data:")
-print(f"    Total Income:       {test_income:.2f}")
-print(f"    Total Expenses:     {test_total_expenses:.2f}")
-print(f"    Net Savings:        {test_net_savings:.2f}")
-print(f"    Savings Rate:       {test_savings_rate:.4f} ({test_savings_rate*100:.2f}%)")
-
-subsection("Dashboard expected values with test data")
-print(f"  B6 (Total Income):    {test_income:.2f}")
-print(f"  D6 (Total Expenses):  {test_total_expenses:.2f}")
-print(f"  F6 (Net Savings):     {test_net_savings:.2f}")
-print(f"  B9 (Savings Rate):    {test_savings_rate:.4f}")
-
-subsection("Monthly Budget expected values with test data")
-test_cat_expected = {
-    'Housing': test_expenses_housing,
-    'Transportation': 0,
-    'Food & Groceries': test_expenses_food,
-    'Utilities': 0,
-    'Insurance': 0,
-    'Healthcare': 0,
-    'Debt Payments': 0,
-    'Personal': 0,
-    'Entertainment': test_expenses_entertainment,
-    'Savings': 0,
-    'Education': 0,
-    'Miscellaneous': 0,
-}
-
-budgeted_test = {
-    'Housing': 1500,
-    'Transportation': 400,
-    'Food & Groceries': 600,
-    'Utilities': 250,
-    'Insurance': 300,
-    'Healthcare': 150,
-    'Debt Payments': 500,
-    'Personal': 200,
-    'Entertainment': 150,
-    'Savings': 500,
-    'Education': 100,
-    'Miscellaneous': 100,
-}
-
-for cat_name in budget_categories.values():
-    actual = test_cat_expected[cat_name]
-    budget = budgeted_test[cat_name]
-    diff = budget - actual
-    if actual == 0:
-        status = '-'
-    elif actual <= budget * 0.9:
-        status = 'Under Budget'
-    elif actual <= budget:
-        status = 'Near Limit'
-    else:
-        status = 'OVER BUDGET'
-    
-    print(f"  {cat_name:20s}: Actual={actual:>8.2f}  Budget={budget:>6}  Diff={diff:>8.2f}  Status='{status}'")
-    
-    # Verify the SUMPRODUCT formula would produce this result
-    # SUMPRODUCT((C2:C501=cat)*(D2:D501<0)*D2:D501)*-1
-    manual_sum = 0
-    for td in test_data:
-        if td[2] == cat_name and td[3] < 0:
-            manual_sum += abs(td[3])
-    
-    if abs(manual_sum - actual) < 0.01:
-        PASS(f"{cat_name}: SUMPRODUCT would yield {manual_sum:.2f} (matches expected {actual:.2f})")
-    else:
-        FAIL(f"{cat_name}: Manual sum {manual_sum:.2f} != expected {actual:.2f}")
-
-subsection("Annual Overview expected values with test data (February only)")
-# All test data is in February (month=2), so only column D should have values
-print(f"  D5 (Feb Income):           {test_income:.2f}")
-print(f"  D7 (Feb Housing):          {test_expenses_housing:.2f}")
-print(f"  D9 (Feb Food & Groceries): {test_expenses_food:.2f}")
-print(f"  D15 (Feb Entertainment):   {test_expenses_entertainment:.2f}")
-print(f"  D19 (Feb Total Expenses):  {test_total_expenses:.2f}")
-print(f"  D20 (Feb Net Savings):     {test_net_savings:.2f}")
-if test_income > 0:
-    print(f"  D21 (Feb Savings Rate):    {test_net_savings/test_income:.4f}")
-
-# Verify all January values should be 0
-print(f"\n  C5 (Jan Income):  should be 0.00 (no Jan transactions)")
-print(f"  C19 (Jan Total):  should be 0.00")
-PASS("All January (and other month) values should be 0 with Feb-only test data")
-
-subsection("Largest Expense Category with test data")
-print(f"  D9 formula: =IFERROR(INDEX('Monthly Budget'!B5:B16,MATCH(MAX('Monthly Budget'!D5:D16),'Monthly Budget'!D5:D16,0)),\"-\")")
-print(f"  MAX of D5:D16 in Monthly Budget = {max(test_cat_expected.values()):.2f}")
-largest = max(test_cat_expected, key=test_cat_expected.get)
-print(f"  Expected: '{largest}' (Housing at $1500)")
-PASS(f"Largest expense category correctly determined: '{largest}'")
-
-# Clean up test copy
-os.remove(TEST_COPY_PATH)
-print(f"\n  Cleaned up test copy: {TEST_COPY_PATH}")
-
-
-# ═══════════════════════════════════════════════════════════════════════
-#  TEST 8: FORMULA PATTERN COMPLETENESS
-# ═══════════════════════════════════════════════════════════════════════
-
-section("TEST 8: FORMULA PATTERN COMPLETENESS")
-
-subsection("Annual Overview: all 12 months have formulas for every category")
-missing_formulas = []
-for ao_row in range(5, 19):  # rows 5-18 (Income + 12 expense categories)
-    if ao_row == 6:  # Row 6 is "EXPENSES" header, skip
-        continue
-    for col_idx in range(3, 15):  # C through N (months 1-12)
-        formula = ws_ao.cell(ao_row, col_idx).value
-        if formula is None or not str(formula).startswith('='):
-            col_letter = chr(ord('A') + col_idx - 1)
-            cat = ws_ao.cell(ao_row, 2).value
-            missing_formulas.append(f"{col_letter}{ao_row} ({cat})")
-
-if not missing_formulas:
-    PASS(f"All {13 * 12} monthly formulas present in Annual Overview (rows 5,7-18 x cols C-N)")
-else:
-    FAIL(f"Missing formulas in Annual Overview: {missing_formulas[:10]}{'...' if len(missing_formulas) > 10 else ''}")
-
-subsection("Monthly Budget: all 12 categories have SUMPRODUCT formulas")
-missing_sp = []
-for row_num in range(5, 17):
-    d_val = ws_mb.cell(row_num, 4).value
-    if d_val is None or 'SUMPRODUCT' not in str(d_val):
-        missing_sp.append(f"D{row_num} ({ws_mb.cell(row_num, 2).value})")
-
-if not missing_sp:
-    PASS("All 12 Monthly Budget categories have SUMPRODUCT formulas in column D")
-else:
-    FAIL(f"Missing SUMPRODUCT formulas: {missing_sp}")
-
-subsection("Dashboard: all 12 category rows have complete formula sets")
-missing_dash = []
-for dash_row in range(13, 25):
-    for col in [3, 4, 5, 6, 7]:  # C through G
-        val = ws_dash.cell(dash_row, col).value
-        if val is None or not str(val).startswith('='):
-            col_letter = chr(ord('A') + col - 1)
-            missing_dash.append(f"{col_letter}{dash_row}")
-
-if not missing_dash:
-    PASS("All Dashboard category rows (13-24) have complete formula sets (C-G)")
-else:
-    FAIL(f"Missing Dashboard formulas: {missing_dash}")
-
-subsection("Annual Overview: derived rows (19-21) have all formulas")
-for ao_row in [19, 20, 21]:
-    missing = []
-    for col_idx in range(3, 15):  # C through N
-        val = ws_ao.cell(ao_row, col_idx).value
-        if val is None or not str(val).startswith('='):
-            col_letter = chr(ord('A') + col_idx - 1)
-            missing.append(f"{col_letter}{ao_row}")
-    
-    row_name = {19: 'TOTAL EXPENSES', 20: 'NET SAVINGS', 21: 'SAVINGS RATE'}[ao_row]
-    if not missing:
-        PASS(f"Row {ao_row} ({row_name}): all 12 monthly formulas present")
-    else:
-        FAIL(f"Row {ao_row} ({row_name}): missing formulas: {missing}")
-
-
-# ═══════════════════════════════════════════════════════════════════════
-#  TEST 9: EDGE CASE VALIDATION
-# ═══════════════════════════════════════════════════════════════════════
-
-section("TEST 9: EDGE CASE VALIDATION")
-
-subsection("Zero-division protection in Savings Rate")
-# B9 on Dashboard: =IF(B6=0,0,F6/B6) -- protected
-PASS("Dashboard B9 has IF(B6=0,...) zero-division guard")
-# Annual Overview row 21: =IF(col5=0,0,col20/col5) -- protected
-PASS("Annual Overview row 21 has IF(col5=0,...) zero-division guard")
-# Dashboard F29-F40: =IF(C{row}=0,0,E{row}/C{row}) -- protected
-PASS("Dashboard F29-F40 have IF(C=0,...) zero-division guards")
-
-subsection("IFERROR protection on INDEX/MATCH")
-d9 = ws_dash['D9'].value
-if 'IFERROR' in str(d9):
-    PASS("Dashboard D9 (Largest Expense) has IFERROR wrapper")
-else:
-    FAIL("Dashboard D9 missing IFERROR protection")
-
-subsection("Monthly Budget Status handles zero actual")
-# F5 formula: =IF(D5=0,"-",...) -- shows "-" when no expenses
-for row_num in range(5, 17):
-    f_val = ws_mb.cell(row_num, 6).value
-    if f_val and 'IF(D' in str(f_val) and '=0,"-"' in str(f_val):
-        pass  # Good
-    else:
-        FAIL(f"F{row_num} missing zero-actual guard")
-PASS("All 12 Monthly Budget Status formulas handle D=0 case with '-'")
-
-subsection("SUMPRODUCT filters only negative amounts for expenses")
-# This is critical: SUMPRODUCT should use (D2:D501<0) to only count expenses
-for row_num in range(5, 17):
-    d_formula = ws_mb.cell(row_num, 4).value
-    if 'D2:D501<0' in str(d_formula):
-        pass  # Good
-    else:
-        FAIL(f"D{row_num} SUMPRODUCT missing negative amount filter")
-PASS("All Monthly Budget SUMPRODUCT formulas correctly filter for D<0 (negative amounts only)")
-
-subsection("Annual Overview expense formulas also filter for negative amounts")
-for ao_row in range(7, 19):
-    c_formula = ws_ao.cell(ao_row, 3).value  # Check January column
-    if 'D2:D501<0' in str(c_formula):
-        pass
-    else:
-        FAIL(f"AO row {ao_row} (col C) missing negative amount filter")
-PASS("All Annual Overview expense SUMPRODUCT formulas correctly filter for D<0")
-
-
-# ═══════════════════════════════════════════════════════════════════════
-#  TEST 10: SAMPLE DATA CORRECTNESS VERIFICATION
-# ═══════════════════════════════════════════════════════════════════════
-
-section("TEST 10: SAMPLE DATA CORRECTNESS - EXPECTED FORMULA RESULTS")
 
-print(f"\n  Given the {len(transactions)} pre-filled transactions, here are the expected")
-print(f"  formula results that Excel/Sheets would calculate:\n")
+def status_formula(actual, budget):
+    return (f'=IF({actual}=0,"-",IF({actual}<={budget}*0.9,"Under Budget",'
+            f'IF({actual}<={budget},"Near Limit","OVER BUDGET")))')
 
-# Dashboard
-print(f"  DASHBOARD:")
-print(f"    B6 (Total Income):      ${total_income:>10.2f}")
-print(f"    D6 (Total Expenses):    ${total_expenses:>10.2f}")
-print(f"    F6 (Net Savings):       ${net_savings:>10.2f}")
-print(f"    B9 (Savings Rate):      {savings_rate*100:>9.2f}%")
-largest = max(cat_expenses, key=cat_expenses.get) if cat_expenses else '-'
-print(f"    D9 (Largest Category):  {largest}")
 
-# Monthly Budget
-print(f"\n  MONTHLY BUDGET:")
-total_budget = 0
-total_actual = 0
-for row_num, cat_name in budget_categories.items():
-    budget = budgeted_amounts[cat_name]
-    actual = cat_expenses.get(cat_name, 0)
-    diff = budget - actual
-    total_budget += budget
-    total_actual += actual
+def expected_status(actual, budget):
     if actual == 0:
-        status = '-'
-    elif actual <= budget * 0.9:
-        status = 'Under Budget'
-    elif actual <= budget:
-        status = 'Near Limit'
-    else:
-        status = 'OVER BUDGET'
-    print(f"    {cat_name:20s}: Budget=${budget:>6}  Actual=${actual:>8.2f}  Diff=${diff:>8.2f}  [{status}]")
-
-print(f"    {'TOTAL':20s}: Budget=${total_budget:>6}  Actual=${total_actual:>8.2f}  Diff=${total_budget-total_actual:>8.2f}")
-
-# Annual Overview (February)
-print(f"\n  ANNUAL OVERVIEW (February):")
-print(f"    Income:           ${monthly_income.get(2,0):>10.2f}")
-for cat in ao_categories.values():
-    val = monthly_expenses_by_cat.get(2, {}).get(cat, 0)
-    if val > 0:
-        print(f"    {cat:20s}: ${val:>10.2f}")
-feb_exp_total = sum(monthly_expenses_by_cat.get(2, {}).values())
-print(f"    Total Expenses:   ${feb_exp_total:>10.2f}")
-feb_net = monthly_income.get(2, 0) - feb_exp_total
-print(f"    Net Savings:      ${feb_net:>10.2f}")
-if monthly_income.get(2, 0) > 0:
-    print(f"    Savings Rate:     {feb_net/monthly_income[2]*100:>9.2f}%")
-
-PASS("All expected formula results computed and verified against transaction data")
-
-
-# ═══════════════════════════════════════════════════════════════════════
-#  FINAL REPORT
-# ═══════════════════════════════════════════════════════════════════════
-
-section("FINAL REPORT")
-total = pass_count + fail_count + warn_count
-print(f"\n  {C.GREEN}PASSED: {pass_count}{C.END}")
-print(f"  {C.RED}FAILED: {fail_count}{C.END}")
-print(f"  {C.YELLOW}WARNINGS: {warn_count}{C.END}")
-print(f"  TOTAL CHECKS: {total}")
-print()
-
-if fail_count == 0:
-    print(f"  {C.GREEN}{C.BOLD}ALL FUNCTIONAL TESTS PASSED{C.END}")
-    print(f"  Every formula in Dashboard, Monthly Budget, and Annual Overview")
-    print(f"  has been verified to reference the correct cells, use proper")
-    print(f"  filtering logic, and would produce the correct results given")
-    print(f"  the sample transaction data.")
-else:
-    print(f"  {C.RED}{C.BOLD}{fail_count} TESTS FAILED - SEE ABOVE FOR DETAILS{C.END}")
-
-print()
-
-# Visual inspection note
-print(f"  {C.DIM}NOTE: LibreOffice is not available for PDF conversion.{C.END}")
-print(f"  {C.DIM}macOS 'open' command is available at /usr/bin/open.{C.END}")
-print(f"  {C.DIM}To visually inspect: open \"{XLSX_PATH}\"{C.END}")
-print()
-
-sys.exit(1 if fail_count > 0 else 0)
+        return "-"
+    if actual <= budget * 0.9:
+        return "Under Budget"
+    return "Near Limit" if actual <= budget else "OVER BUDGET"
+
+
+class Expected:
+    """What the budget formulas should evaluate to for a list of transactions."""
+
+    def __init__(self, transactions):
+        self.income = sum(t["amount"] for t in transactions if t["amount"] > 0)
+        self.expenses = -sum(t["amount"] for t in transactions if t["amount"] < 0)
+        self.net = self.income - self.expenses
+        self.rate = self.net / self.income if self.income else 0
+        self.by_category = defaultdict(float)
+        self.monthly_income = defaultdict(float)
+        self.monthly_expenses = defaultdict(lambda: defaultdict(float))
+        for t in transactions:
+            month = t["date"].month if isinstance(t["date"], datetime.datetime) else None
+            if t["amount"] < 0:
+                self.by_category[t["category"]] -= t["amount"]
+                if month:
+                    self.monthly_expenses[month][t["category"]] -= t["amount"]
+            elif t["amount"] > 0 and t["category"] == "Income" and month:
+                self.monthly_income[month] += t["amount"]
+
+    @property
+    def largest_category(self):
+        return max(self.by_category, key=self.by_category.get) if self.by_category else "-"
+
+
+def _transactions(parsed):
+    rows = []
+    for row in range(2, parsed.extents["Transactions"][0] + 1):
+        date, description, category, amount, method, notes = (
+            parsed.value("Transactions", row, col) for col in range(1, 7))
+        if date is None and description is None:
+            break
+        rows.append(dict(date=date, description=description, category=category,
+                         amount=amount or 0, method=method, notes=notes))
+    return rows
+
+
+@pytest.fixture(scope="module")
+def sheets(budget_parsed):
+    """Cell lookups by A1 reference: sheets[0]("B6") is Dashboard!B6."""
+    return tuple(functools.partial(budget_parsed.at, sheet)
+                 for sheet in ("Dashboard", "Monthly Budget", "Annual Overview"))
+
+
+@pytest.fixture(scope="module")
+def transactions(budget_parsed):
+    return _transactions(budget_parsed)
+
+
+@pytest.fixture(scope="module")
+def sample(budget_graph):
+    """The workbook recalculated as shipped. Read-only: make your own engine to edit."""
+    return RecalcEngine(budget_graph)
+
+
+# -- Dashboard ---------------------------------------------------------------
+@pytest.mark.parametrize("cell, formula", [
+    ("B6", "=SUMPRODUCT((Transactions!D2:D501>0)*Transactions!D2:D501)"),
+    ("D6", "=SUMPRODUCT((Transactions!D2:D501<0)*Transactions!D2:D501)*-1"),
+    ("F6", "=B6-D6"),
+    ("B9", "=IF(B6=0,0,F6/B6)"),
+    ("D9", "=IFERROR(INDEX('Monthly Budget'!B5:B16,MATCH(MAX('Monthly Budget'!D5:D16),"
+           "'Monthly Budget'!D5:D16,0)),\"-\")"),
+    ("F9", "=DAY(EOMONTH(TODAY(),0))-DAY(TODAY())"),
+    ("C25", "=SUM(C13:C24)"),
+    ("D25", "=SUM(D13:D24)"),
+    ("E25", "=C25-D25"),
+    ("F25", "=IF(C25=0,0,D25/C25)"),
+    ("C41", "=SUM(C29:C40)"),
+    ("D41", "=SUM(D29:D40)"),
+    ("E41", "=C41-D41"),
+    ("F41", "=IF(C41=0,0,E41/C41)"),
+])
+def test_dashboard_formula(sheets, cell, formula):
+    assert sheets[0](cell) == formula
+
+
+@pytest.mark.parametrize("index, category", BY_CATEGORY)
+def test_dashboard_budget_row(sheets, index, category):
+    dash = sheets[0]
+    row, mb_row = DASH_FIRST_ROW + index, MB_FIRST_ROW + index
+    assert dash(f"C{row}") == f"='Monthly Budget'!C{mb_row}"
+    assert dash(f"D{row}") == f"='Monthly Budget'!D{mb_row}"
+    assert dash(f"E{row}") == f"=C{row}-D{row}"
+    assert dash(f"F{row}") == f"=IF(C{row}=0,0,D{row}/C{row})"
+    assert dash(f"G{row}") == status_formula(f"D{row}", f"C{row}")
+
+
+@pytest.mark.parametrize("month, name", BY_MONTH)
+def test_dashboard_month_row(sheets, month, name):
+    dash = sheets[0]
+    row, col = DASH_MONTH_ROW + month - 1, get_column_letter(2 + month)
+    assert dash(f"B{row}") == name
+    assert dash(f"C{row}") == f"='Annual Overview'!{col}5"
+    assert dash(f"D{row}") == f"='Annual Overview'!{col}19"
+    assert dash(f"E{row}") == f"=C{row}-D{row}"
+    assert dash(f"F{row}") == f"=IF(C{row}=0,0,E{row}/C{row})"
+
+
+# -- Monthly Budget ----------------------------------------------------------
+@pytest.mark.parametrize("index, category", BY_CATEGORY)
+def test_monthly_budget_row(sheets, index, category):
+    mb = sheets[1]
+    row = MB_FIRST_ROW + index
+    assert mb(f"D{row}") == (
+        f"=SUMPRODUCT((Transactions!C2:C501=B{row})*(Transactions!D2:D501<0)"
+        f"*Transactions!D2:D501)*-1")
+    assert mb(f"E{row}") == f"=C{row}-D{row}"
+    assert mb(f"F{row}") == status_formula(f"D{row}", f"C{row}")
+
+
+@pytest.mark.parametrize("col", "CDE")
+def test_monthly_budget_total(sheets, col):
+    assert sheets[1](f"{col}17") == f"=SUM({col}5:{col}16)"
+
+
+# -- Annual Overview ---------------------------------------------------------
+@pytest.mark.parametrize("month, name", BY_MONTH)
+def test_annual_income_formula(sheets, month, name):
+    col = get_column_letter(2 + month)
+    assert sheets[2](f"{col}5") == (
+        f'=SUMPRODUCT((MONTH(Transactions!A2:A501)={month})'
+        f'*(Transactions!C2:C501="Income")*Transactions!D2:D501)')
+
+
+@pytest.mark.parametrize("month, name", BY_MONTH)
+@pytest.mark.parametrize("index, category", BY_CATEGORY)
+def test_annual_expense_formula(sheets, index, category, month, name):
+    cell = f"{get_column_letter(2 + month)}{AO_FIRST_ROW + index}"
+    assert sheets[2](cell) == (
+        f'=SUMPRODUCT((MONTH(Transactions!A2:A501)={month})'
+        f'*(Transactions!C2:C501="{category}")'
+        f'*(Transactions!D2:D501<0)*Transactions!D2:D501)*-1')
+
+
+@pytest.mark.parametrize("row", [5] + [AO_FIRST_ROW + i for i in range(len(CATEGORIES))])
+def test_annual_row_total_and_average(sheets, row):
+    ao = sheets[2]
+    assert ao(f"O{row}") == f"=SUM(C{row}:N{row})"
+    assert ao(f"P{row}") == (
+        f'=IF(COUNTIF(C{row}:N{row},"<>0")=0,0,O{row}/COUNTIF(C{row}:N{row},"<>0"))')
+
+
+@pytest.mark.parametrize("month, name", BY_MONTH)
+def test_annual_summary_rows(sheets, month, name):
+    ao = sheets[2]
+    col = get_column_letter(2 + month)
+    assert ao(f"{col}19") == f"=SUM({col}7:{col}18)"
+    assert ao(f"{col}20") == f"={col}5-{col}19"
+    assert ao(f"{col}21") == f"=IF({col}5=0,0,{col}20/{col}5)"
+
+
+@pytest.mark.parametrize("cell, formula", [
+    ("O19", "=SUM(C19:N19)"),
+    ("O20", "=O5-O19"),
+    ("O21", "=IF(O5=0,0,O20/O5)"),
+])
+def test_annual_totals(sheets, cell, formula):
+    assert sheets[2](cell) == formula
+
+
+# -- cross-sheet consistency -------------------------------------------------
+@pytest.mark.parametrize("index, category", BY_CATEGORY)
+def test_category_labels_agree_across_sheets(sheets, index, category):
+    dash, mb, ao = sheets
+    assert mb(f"B{MB_FIRST_ROW + index}") == category
+    assert dash(f"B{DASH_FIRST_ROW + index}") == category
+    assert ao(f"B{AO_FIRST_ROW + index}") == category
+
+
+def test_no_negative_income(transactions):
+    # the SUMPRODUCT filters would count these as expenses, not reduced income
+    assert not [t for t in transactions if t["category"] == "Income" and t["amount"] < 0]
+
+
+def test_expense_categories_are_budgeted(transactions):
+    used = {t["category"] for t in transactions if t["amount"] < 0}
+    assert used <= set(CATEGORIES)
+
+
+# -- evaluated results -------------------------------------------------------
+def check_results(engine, expected):
+    assert engine.get("Dashboard!B6") == pytest.approx(expected.income)
+    assert engine.get("Dashboard!D6") == pytest.approx(expected.expenses)
+    assert engine.get("Dashboard!F6") == pytest.approx(expected.net)
+    assert engine.get("Dashboard!B9") == pytest.approx(expected.rate)
+    assert engine.get("Dashboard!D9") == expected.largest_category
+
+    for index, category in BY_CATEGORY:
+        row = MB_FIRST_ROW + index
+        budget, actual, difference, status = engine.get(f"'Monthly Budget'!C{row}:F{row}")[0]
+        assert actual == pytest.approx(expected.by_category[category]), category
+        assert difference == pytest.approx(budget - expected.by_category[category])
+        assert status == expected_status(expected.by_category[category], budget)
+
+    for month, name in BY_MONTH:
+        col = get_column_letter(2 + month)
+        expenses = expected.monthly_expenses[month]
+        assert engine.get(f"'Annual Overview'!{col}5") == \
+            pytest.approx(expected.monthly_income[month]), name
+        for index, category in BY_CATEGORY:
+            assert engine.get(f"'Annual Overview'!{col}{AO_FIRST_ROW + index}") == \
+                pytest.approx(expenses[category]), (name, category)
+        assert engine.get(f"'Annual Overview'!{col}19") == pytest.approx(sum(expenses.values()))
+        assert engine.get(f"Dashboard!C{DASH_MONTH_ROW + month - 1}") == \
+            pytest.approx(expected.monthly_income[month])
+
+
+def test_sample_data_results(sample, transactions):
+    assert len(transactions) >= 16
+    check_results(sample, Expected(transactions))
+
+
+def test_injected_data_results(budget_graph, transactions):
+    engine = RecalcEngine(budget_graph)
+    last = 1 + len(transactions)
+    engine.set(f"Transactions!A2:F{last}", np.full((last - 1, 6), None, dtype=object))
+    engine.set(f"Transactions!A2:E{1 + len(INJECTED)}", np.array(INJECTED, dtype=object))
+
+    injected = [dict(date=d, description=desc, category=c, amount=a, method=m)
+                for d, desc, c, a, m in INJECTED]
+    expected = Expected(injected)
+    check_results(engine, expected)
+    assert expected.largest_category == "Housing"
+    assert engine.get("'Annual Overview'!D21") == pytest.approx(expected.rate)
+    assert engine.get("'Annual Overview'!C19") == 0
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for build_trace: phase/step/span nesting, per-span cell and formula
+counts, Chrome-trace export, per-phase cProfile dumps, and that a disabled
+trace records nothing.
+Run with:  python -m pytest -q test_build_trace.py
+"""
+
+import json
+import pstats
+
+from openpyxl import Workbook
+
+import build_trace
+from build_trace import BuildTrace
+from sheet_stream import stream_rows
+
+
+def _build(trace, wb):
+    ws = wb.active
+    trace.phase("Inputs")
+    for r in range(1, 11):
+        ws.cell(row=r, column=1, value=r)
+    trace.phase("Totals")
+    trace.step("sums")
+    ws["B1"] = "=SUM(A1:A10)"
+    ws["B2"] = "=AVERAGE(A1:A10)"
+    trace.step("labels")
+    ws["C1"] = "Total"
+    with trace.span("nested"):
+        ws["C2"] = "Average"
+    trace.phase("save")
+    return trace.finish()
+
+
+def test_spans_nest_and_count_cells(tmp_path, capsys):
+    wb = Workbook()
+    events = _build(BuildTrace("demo", wb, trace_path=str(tmp_path / "t.json")), wb)
+    spans = {e["name"]: e for e in events}
+    assert [e["name"] for e in sorted(events, key=lambda e: e["ts"])] == \
+        ["Inputs", "Totals", "sums", "labels", "nested", "save"]
+    assert [spans[n]["tid"] for n in ("Totals", "sums", "labels", "nested")] == [0, 1, 1, 2]
+    assert spans["Inputs"]["args"]["cells"] == 10
+    assert spans["Totals"]["args"]["cells"] == 4
+    assert spans["sums"]["args"]["formulas"] == 2
+    assert spans["labels"]["args"]["cells"] == 2 and spans["labels"]["args"]["formulas"] == 0
+    totals, labels = spans["Totals"], spans["labels"]
+    assert totals["ts"] <= labels["ts"] and labels["ts"] + labels["dur"] <= \
+        totals["ts"] + totals["dur"] + 1
+    assert "Totals" in capsys.readouterr().out
+
+    with open(tmp_path / "t.json") as f:
+        exported = json.load(f)["traceEvents"]
+    assert exported[0]["ph"] == "M" and exported[0]["args"]["name"] == "demo"
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in exported[1:])
+    assert build_trace.main([str(tmp_path / "t.json")]) == 0
+
+
+def test_streamed_rows_count_where_they_are_registered(tmp_path, capsys):
+    wb = Workbook()
+    trace = BuildTrace("demo", wb, trace_path=str(tmp_path / "t.json"))
+    trace.phase("schedule")
+    stream_rows(wb.active, "A1:B5", lambda: ((r, [(1, r, None), (2, f"=A{r}*2", None)])
+                                              for r in range(1, 6)))
+    trace.phase("save")
+    spans = {e["name"]: e["args"] for e in trace.finish()}
+    assert (spans["schedule"]["cells"], spans["schedule"]["formulas"]) == (10, 5)
+    assert (spans["save"]["cells"], spans["save"]["formulas"]) == (0, 0)
+
+
+def test_profile_per_phase(tmp_path, capsys):
+    wb = Workbook()
+    _build(BuildTrace("demo", wb, profile_dir=str(tmp_path / "prof")), wb)
+    dumps = sorted(p.name for p in (tmp_path / "prof").iterdir())
+    assert dumps == ["demo-01-inputs.prof", "demo-02-totals.prof", "demo-03-save.prof"]
+    pstats.Stats(str(tmp_path / "prof" / dumps[0]))     # loads
+
+
+def test_disabled_trace_records_nothing(tmp_path, capsys):
+    wb = Workbook()
+    trace = BuildTrace.from_env("demo", wb, environ={})
+    assert not trace.enabled
+    assert _build(trace, wb) == []
+    assert capsys.readouterr().out == ""
+
+
+def test_trace_directory_from_env(tmp_path):
+    trace = BuildTrace.from_env("budget", environ={"BUILD_TRACE": str(tmp_path)})
+    assert trace.trace_path == str(tmp_path / "budget-trace.json")
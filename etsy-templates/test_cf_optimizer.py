@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tests for cf_optimizer: consolidating conditional formats must not change
+which rules (and which DXF styles) apply to any cell, or in what order.
+Run with:  python -m pytest -q test_cf_optimizer.py
+"""
+
+import os
+import runpy
+import sys
+
+import pytest
+from openpyxl import Workbook
+from openpyxl.formatting.rule import CellIsRule, FormulaRule
+from openpyxl.styles import Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+import cf_optimizer
+from cf_optimizer import (
+    cells_to_sqref, consolidate_conditional_formatting, count_rules, dxf_key,
+    move_formula, sqref_anchor,
+)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GRAY = PatternFill("solid", fgColor="F3F4F6")
+GREEN = PatternFill("solid", fgColor="D1FAE5")
+RED = PatternFill("solid", fgColor="FEE2E2")
+
+
+def rendered_formatting(wb):
+    """Per cell: the rules that apply, in evaluation order, as seen from that cell."""
+    result = {}
+    for ws in wb.worksheets:
+        entries = sorted(((rule.priority, cf.sqref, rule)
+                          for cf in ws.conditional_formatting for rule in cf.rules),
+                         key=lambda e: e[0])
+        for _, sqref, rule in entries:
+            anchor = sqref_anchor(sqref)
+            for rng in sqref.ranges:
+                for row, col in rng.cells:
+                    coord = f"{get_column_letter(col)}{row}"
+                    result.setdefault((ws.title, coord), []).append((
+                        rule.type, rule.operator, rule.stopIfTrue, dxf_key(rule.dxf),
+                        tuple(move_formula(f, anchor, coord) for f in rule.formula),
+                    ))
+    return result
+
+
+def test_cells_to_sqref_builds_rectangles():
+    cells = {(r, c) for r in range(4, 104) for c in (1, 2, 3, 4, 5, 6, 7, 8, 10)}
+    assert cells_to_sqref(cells) == "A4:H103 J4:J103"
+    assert cells_to_sqref({(5, 3)}) == "C5"
+
+
+def test_per_column_rules_merge_into_one():
+    wb = Workbook()
+    ws = wb.active
+    for col in "ABCDEFGHJ":
+        ws.conditional_formatting.add(
+            f"{col}4:{col}103",
+            FormulaRule(formula=['$I4="Canceled"'], fill=GRAY, font=Font(strike=True)))
+    before = rendered_formatting(wb)
+
+    assert consolidate_conditional_formatting(wb) == 8
+    assert [str(cf.sqref) for cf in ws.conditional_formatting] == ["A4:H103 J4:J103"]
+    assert rendered_formatting(wb) == before
+
+
+def test_interleaved_rules_keep_their_order():
+    wb = Workbook()
+    ws = wb.active
+    for col in "CDEFGHIJKLMNOP":
+        ws.conditional_formatting.add(
+            f"{col}20", CellIsRule(operator="greaterThanOrEqual", formula=["0"], fill=GREEN))
+        ws.conditional_formatting.add(
+            f"{col}20", CellIsRule(operator="lessThan", formula=["0"], fill=RED))
+    before = rendered_formatting(wb)
+
+    consolidate_conditional_formatting(wb)
+    assert count_rules(wb) == 2
+    assert rendered_formatting(wb) == before
+
+
+def test_relative_formulas_only_merge_when_equivalent():
+    wb = Workbook()
+    ws = wb.active
+    for row in (5, 6, 7):
+        ws.conditional_formatting.add(
+            f"C{row}", CellIsRule(operator="lessThan", formula=[f"D{row}"], fill=GREEN))
+        ws.conditional_formatting.add(
+            f"D{row}", CellIsRule(operator="lessThan", formula=[f"C{row}"], fill=GREEN))
+    ws.conditional_formatting.add("E5", FormulaRule(formula=["$B$1>0"], fill=GREEN))
+    ws.conditional_formatting.add("E6", FormulaRule(formula=["$B$2>0"], fill=GREEN))
+    before = rendered_formatting(wb)
+
+    consolidate_conditional_formatting(wb)
+    assert sorted(str(cf.sqref) for cf in ws.conditional_formatting) == \
+        ["C5:C7", "D5:D7", "E5", "E6"]
+    assert rendered_formatting(wb) == before
+
+
+def test_merge_that_would_reorder_rules_is_skipped():
+    wb = Workbook()
+    ws = wb.active
+    ws.conditional_formatting.add("A1", FormulaRule(formula=["A1>0"], fill=GREEN))
+    ws.conditional_formatting.add("B1", FormulaRule(formula=["B1<0"], fill=RED))
+    ws.conditional_formatting.add("B1", FormulaRule(formula=["B1>0"], fill=GREEN))
+    before = rendered_formatting(wb)
+
+    assert consolidate_conditional_formatting(wb) == 0
+    assert rendered_formatting(wb) == before
+
+
+@pytest.mark.parametrize("script", [
+    "create_budget_tracker.py",
+    "create_debt_calculator.py",
+    "create_subscription_tracker.py",
+])
+def test_generated_workbooks_render_the_same(script, tmp_path, monkeypatch):
+    monkeypatch.setattr(cf_optimizer, "consolidate_conditional_formatting", lambda wb: 0)
+    monkeypatch.setattr(sys, "argv", [script, str(tmp_path / "out.xlsx")])
+    wb = runpy.run_path(os.path.join(HERE, script), run_name="__main__")["wb"]
+
+    before = rendered_formatting(wb)
+    rules_before = count_rules(wb)
+    consolidate_conditional_formatting(wb)
+    assert rendered_formatting(wb) == before
+    assert count_rules(wb) < rules_before
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Fuzz tests for the debt payoff calculator's Snowball and Avalanche plans.
+
+Random portfolios (1 to MAX_DEBTS debts scattered over the input rows, APRs
+from 0 to 35%, balances from a cent to ten million, minimums below the
+monthly interest or above the balance, no or huge extra payments) are fed
+through the generated formulas with recalc_engine, one portfolio per lane,
+and every month's balances plus the Comparison totals are checked against
+an independent payoff simulation written directly in NumPy.
+
+DEBT_FUZZ_CASES (default 10240) and DEBT_FUZZ_SEED choose how many
+portfolios to try and where to start.
+Run with:  python -m pytest -q test_debt_plan_fuzz.py
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from recalc_engine import RecalcEngine
+
+MAX_DEBTS = 20
+MAX_MONTHS = 120
+LANES = 1024
+CASES = int(os.environ.get("DEBT_FUZZ_CASES", 10240))
+SEED = int(os.environ.get("DEBT_FUZZ_SEED", 20260301))
+INPUT = "'Debt Input'!{}5:{}24"            # one row per debt
+EXTRA = "Dashboard!C11"
+PLANS = {"snowball": "'Snowball Plan'", "avalanche": "'Avalanche Plan'"}
+COMPARISON_COL = {"snowball": "C", "avalanche": "D"}
+
+
+# ---------------------------------------------------------------------------
+# random portfolios, shaped (lanes, MAX_DEBTS); NaN marks an empty input row
+# ---------------------------------------------------------------------------
+def random_portfolios(rng, lanes):
+    shape = (lanes, MAX_DEBTS)
+    count = rng.integers(1, MAX_DEBTS + 1, lanes)
+    count[rng.random(lanes) < 0.1] = MAX_DEBTS
+    count[rng.random(lanes) < 0.1] = 1
+    present = rng.random(shape).argsort(axis=1).argsort(axis=1) < count[:, None]
+
+    balance = np.round(10 ** rng.uniform(-2, 7, shape), 2)
+    tiny = rng.random(shape) < 0.1
+    balance[tiny] = rng.integers(1, 500, tiny.sum()) / 100
+    balance = np.maximum(balance, 0.01)
+
+    apr = rng.integers(0, 3501, shape) / 10000
+    apr[rng.random(shape) < 0.1] = 0.0
+    apr[rng.random(shape) < 0.05] = 0.35
+
+    minimum = np.round(np.maximum(25.0, balance * 0.02), 2)
+    below = rng.random(shape) < 0.2                 # never keeps up with interest
+    minimum[below] = np.floor(balance * apr / 12 * rng.random(shape) * 100)[below] / 100
+    above = rng.random(shape) < 0.1                 # more than the whole balance
+    minimum[above] = np.round(balance * rng.uniform(1, 3, shape), 2)[above]
+    minimum[rng.random(shape) < 0.05] = 0.0
+
+    extra = rng.integers(0, 4001, lanes) * 0.5
+    extra[rng.random(lanes) < 0.3] = 0.0
+    extra[rng.random(lanes) < 0.05] = 100000.0
+
+    for values in (balance, apr, minimum):
+        values[~present] = np.nan
+    return balance, apr, minimum, extra
+
+
+# ---------------------------------------------------------------------------
+# oracle
+# ---------------------------------------------------------------------------
+def payoff_oracle(balance, apr, minimum, extra, strategy):
+    """
+    Month-by-month schedule of a rollover plan: each month the extra payment
+    plus the minimums of every debt already paid off goes, with that debt's
+    own minimum, to the first unpaid debt in priority order; whatever a debt
+    does not need rolls on to the next one. Sums run left to right, the way
+    the sheet adds them, so the two agree to the last bit on every branch.
+
+    Returns the priority-ordered (balance, apr, minimum), balances shaped
+    (lanes, MAX_MONTHS, MAX_DEBTS), and per-month payment and interest totals.
+    """
+    lanes = balance.shape[0]
+    present = ~np.isnan(balance)
+    index = np.arange(MAX_DEBTS)
+    if strategy == "snowball":
+        key = np.where(present, balance, np.inf)
+    else:
+        key = np.where(present, -apr, np.inf)
+    order = np.lexsort((np.broadcast_to(index, key.shape), key), axis=1)
+    balance, apr, minimum = (np.take_along_axis(np.nan_to_num(v), order, axis=1)
+                             for v in (balance, apr, minimum))
+
+    schedule = np.zeros((lanes, MAX_MONTHS, MAX_DEBTS))
+    payments = np.zeros((lanes, MAX_MONTHS))
+    interest_paid = np.zeros((lanes, MAX_MONTHS))
+    current = balance.copy()
+    for month in range(MAX_MONTHS):
+        pool = extra.copy()
+        if month:
+            for d in range(MAX_DEBTS):
+                pool = pool + np.where(current[:, d] <= 0, minimum[:, d], 0.0)
+        for d in range(MAX_DEBTS):
+            owing = current[:, d]
+            active = owing > 0
+            interest = np.where(active, owing * apr[:, d] / 12, 0.0)
+            paid = np.where(active, np.minimum(owing + interest, minimum[:, d] + pool), 0.0)
+            pool = np.where(active, np.maximum(0.0, minimum[:, d] + pool - owing - interest), pool)
+            current[:, d] = np.where(active, np.maximum(0.0, owing + interest - paid), 0.0)
+            payments[:, month] += paid
+            interest_paid[:, month] += interest
+        schedule[:, month] = current
+    return (balance, apr, minimum), schedule, payments, interest_paid
+
+
+# ---------------------------------------------------------------------------
+# tests
+# ---------------------------------------------------------------------------
+@pytest.fixture(scope="module")
+def engine(debt_graph):
+    return RecalcEngine(debt_graph, batch=LANES)
+
+
+def _load(engine, balance, apr, minimum, extra):
+    names = np.where(np.isnan(balance), None, [f"Debt {i + 1}" for i in range(MAX_DEBTS)])
+    engine.set(INPUT.format("B", "B"), names.T[:, None, :].astype(object))
+    for col, values in zip("CDE", (balance, apr, minimum)):
+        engine.set(INPUT.format(col, col), values.T[:, None, :])
+    engine.set(EXTRA, extra)
+    engine.recalc()
+
+
+def _check(got, want, what, context):
+    close = np.isclose(got, want, rtol=1e-9, atol=1e-6)
+    if not close.all():
+        lane = np.argwhere(~close)[0][-1]
+        pytest.fail(f"{what} lane {lane} ({context}): engine {np.asarray(got)[..., lane]!r}, "
+                    f"oracle {np.asarray(want)[..., lane]!r}")
+
+
+def test_sample_plan_matches_oracle(debt_graph):
+    engine = RecalcEngine(debt_graph)
+    balance, apr, minimum = (engine.numbers(INPUT.format(col, col))[None, :, 0, 0]
+                             for col in "CDE")
+    present = np.array([row[0] is not None for row in engine.get(INPUT.format("C", "C"))])
+    balance = np.where(present, balance, np.nan)
+    extra = np.atleast_1d(engine.numbers(EXTRA))
+    for strategy, sheet in PLANS.items():
+        _, schedule, _, _ = payoff_oracle(balance, apr, minimum, extra, strategy)
+        got = engine.numbers(f"{sheet}!C27:V146")[..., 0]
+        assert np.allclose(got, schedule[0], rtol=1e-9, atol=1e-6)
+
+
+@pytest.mark.parametrize("batch", range(-(-CASES // LANES)))
+def test_plans_match_oracle(engine, batch):
+    rng = np.random.default_rng([SEED, batch])
+    balance, apr, minimum, extra = random_portfolios(rng, LANES)
+    _load(engine, balance, apr, minimum, extra)
+    for strategy, sheet in PLANS.items():
+        context = f"{strategy}, DEBT_FUZZ_SEED={SEED} batch {batch}"
+        ordered, schedule, payments, interest = payoff_oracle(
+            balance, apr, minimum, extra, strategy)
+        # the sorted debt list, then every month of every debt
+        for col, values in zip("DEF", ordered):
+            _check(engine.numbers(f"{sheet}!{col}5:{col}24")[:, 0], values.T,
+                   f"{sheet}!{col}5:{col}24", context)
+        _check(engine.numbers(f"{sheet}!C27:V146"), schedule.transpose(1, 2, 0),
+               f"{sheet}!C27:V146", context)
+        _check(engine.numbers(f"{sheet}!W27:W146")[:, 0], payments.T, "total payment", context)
+        _check(engine.numbers(f"{sheet}!X27:X146")[:, 0], interest.T, "interest", context)
+
+        cleared = schedule.sum(axis=2) <= 0
+        months = np.where(cleared.any(axis=1), cleared.argmax(axis=1) + 1, MAX_MONTHS)
+        col = COMPARISON_COL[strategy]
+        _check(engine.numbers(f"Comparison!{col}5"), months, "months to payoff", context)
+        _check(engine.numbers(f"Comparison!{col}6"), interest.sum(axis=1),
+               "total interest", context)
+        _check(engine.numbers(f"Comparison!{col}7"), payments.sum(axis=1), "total paid", context)
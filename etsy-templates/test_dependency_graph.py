@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for dependency_graph: graph construction, Tarjan components and the
+chain / hotspot reports.
+Run with:  python -m pytest -q test_dependency_graph.py
+"""
+
+from openpyxl import Workbook
+
+from dependency_graph import DependencyGraph, cell_label, strongly_connected_components
+
+
+def test_tarjan_orders_precedents_first():
+    edges = {"d": ["c"], "c": ["b"], "b": ["a", "c2"], "c2": ["b"], "a": []}
+    components = strongly_connected_components(edges)
+    assert [sorted(c) for c in components] == [["a"], ["b", "c2"], ["c"], ["d"]]
+
+
+def test_deep_chain_does_not_recurse():
+    edges = {i: [i - 1] for i in range(1, 50000)}
+    assert len(strongly_connected_components(edges)) == 50000
+
+
+def _build(tmp_path, fill):
+    wb = Workbook()
+    fill(wb)
+    path = tmp_path / "graph.xlsx"
+    wb.save(path)
+    return DependencyGraph.from_workbook(path)
+
+
+def test_chain_fan_out_and_cycles(tmp_path):
+    def fill(wb):
+        ws = wb.active
+        ws.title = "Plan"
+        ws["A1"] = 100
+        for r in range(2, 6):
+            ws[f"A{r}"] = f"=A{r - 1}*1.01+$C$1"
+        ws["C1"] = 5
+        ws["B1"] = "=SUM(A1:A5)"
+        other = wb.create_sheet("Loop")
+        other["A1"] = "=B1+1"
+        other["B1"] = "=A1+Plan!A5"
+
+    graph = _build(tmp_path, fill)
+    assert [cell_label(n) for n in graph.longest_chain()] == \
+        ["Plan!A2", "Plan!A3", "Plan!A4", "Plan!A5", "Loop!A1", "Loop!B1"]
+    assert graph.fan_out(1) == [(("Plan", 1, 3), 4)]
+    assert graph.fan_in(1) == [(("Plan", 1, 2), 5)]
+    assert [sorted(cell_label(n) for n in c) for c in graph.cycles()] == \
+        [["Loop!A1", "Loop!B1"]]
+    order = graph.evaluation_order()
+    assert order.index(("Plan", 2, 1)) < order.index(("Plan", 5, 1)) < order.index(("Plan", 1, 2))
+
+
+def test_debt_plan_chain_spans_every_month(debt_graph):
+    graph = debt_graph
+    assert not graph.cycles()
+    depths = graph.chain_depths()
+    assert depths["Snowball Plan"] == depths["Avalanche Plan"] > 120
+    chain = graph.longest_chain()
+    # every link reads the previous one
+    for before, after in zip(chain, chain[1:]):
+        assert before in graph.precedents[after]
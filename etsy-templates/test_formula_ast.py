@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for formula_ast: the parser must follow Excel's precedence and
+reference syntax, and copied formulas must share one parsed pattern.
+Run with:  python -m pytest -q test_formula_ast.py
+"""
+
+import pytest
+
+from formula_ast import (
+    Binary, Func, FormulaError, Literal, MISSING, Name, PatternCache, Ref, Unary,
+    parse, parse_ref, pattern_key,
+)
+
+
+def test_references():
+    ref = parse_ref("'Debt Input'!B$5:B$24")
+    assert ref == Ref("Debt Input", 2, 5, 2, 24, (False, True, False, True))
+    assert str(ref) == "'Debt Input'!B$5:B$24"
+    assert parse_ref("Transactions!A:A").size(max_row=501) == 501
+    assert parse_ref("$1:$3") == Ref(None, None, 1, None, 3, (False, True, False, True))
+    assert parse_ref("TaxRate") is None
+
+
+def test_precedence():
+    # negation binds tighter than ^, ^ tighter than *, & looser than +
+    assert parse("=-2^2") == Binary("^", Unary("-", Literal(2)), Literal(2))
+    assert parse("=1+2*3&\"x\"") == Binary(
+        "&", Binary("+", Literal(1), Binary("*", Literal(2), Literal(3))), Literal("x"))
+    assert parse("=1-2-3") == Binary("-", Binary("-", Literal(1), Literal(2)), Literal(3))
+    assert parse("=A1=10%") == Binary("=", Ref(None, 1, 1, 1, 1), Unary("%", Literal(10)))
+
+
+def test_functions_and_operands():
+    tree = parse('=IF(A1,,TRUE)+SUM(Rate, #N/A)')
+    assert tree.left == Func("IF", (Ref(None, 1, 1, 1, 1), MISSING, Literal(True)))
+    assert tree.right.args[0] == Name("Rate")
+    assert parse("=INDEX(A1:A3,2):B5").op == ":"
+    assert parse("=_xlfn.XLOOKUP(1,A:A,B:B)").name == "XLOOKUP"
+    with pytest.raises(FormulaError):
+        parse("=SUM(1,")
+
+
+def test_copied_formulas_share_a_pattern():
+    assert pattern_key("IF($D$6<=0,AP27,MAX(0,$F$6+AP27))", 27, 45) == \
+        pattern_key("IF($D$6<=0,AP28,MAX(0,$F$6+AP28))", 28, 45)
+    assert pattern_key('"A1"&LOG10(B2)', 1, 1) == '"A1"&LOG10(R[1]C[1])'
+
+    cache = PatternCache()
+    first = cache.get("Plan", "=C27+AN28", 28, 41)
+    again = cache.get("Plan", "=C28+AN29", 29, 41)
+    assert again is first and len(cache) == 1 and first.cells == 2
+    assert [str(r) for r in again.refs_at(29, 41)] == ["C28", "AN29"]
+    assert cache.get("Other", "=C27+AN28", 28, 41) is not first
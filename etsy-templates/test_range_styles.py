@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for range_styles: range-level styling must look the same as styling
+every cell, while creating fewer cells.
+Run with:  python -m pytest -q test_range_styles.py
+"""
+
+from openpyxl import Workbook
+from openpyxl.cell.cell import MergedCell
+from openpyxl.styles import Border, Font, PatternFill, Side
+
+from range_styles import band_rows, column_background, merge_styled, range_background
+
+NAVY = PatternFill("solid", fgColor="1B2A4A")
+WHITE = PatternFill("solid", fgColor="FFFFFF")
+ALT = PatternFill("solid", fgColor="F7FAFC")
+YELLOW = PatternFill("solid", fgColor="FFFDE7")
+MEDIUM = Border(*(Side(style="medium") for _ in range(4)))
+
+
+def test_merge_styled_styles_anchor_and_edges():
+    ws = Workbook().active
+    anchor = merge_styled(ws, "B2:D3", "TITLE", font=Font(bold=True),
+                          fill=NAVY, border=MEDIUM)
+    assert anchor.coordinate == "B2" and anchor.value == "TITLE"
+    assert anchor.fill.fgColor.rgb == "001B2A4A"
+    assert "B2:D3" in ws.merged_cells
+    # edge cells carry the outer border so Excel draws the full frame
+    assert ws["D3"].border.right.style == "medium"
+    assert ws["D3"].border.bottom.style == "medium"
+    assert not ws["C2"].fill.fill_type
+
+
+def test_column_background_uses_column_styles():
+    ws = Workbook().active
+    ws["B5"].value = "text"
+    ws["C5"].fill = YELLOW
+    ws.merge_cells("B7:C7")
+    column_background(ws, "A:C", WHITE)
+
+    assert ws.column_dimensions["A"].fill.fgColor.rgb == "00FFFFFF"
+    assert ws["B5"].fill.fgColor.rgb == "00FFFFFF"
+    assert ws["C5"].fill.fgColor.rgb == "00FFFDE7"
+    assert isinstance(ws["C7"], MergedCell) and not ws["C7"].fill.fill_type
+    assert (20, 1) not in ws._cells
+
+
+def test_range_background_stops_at_the_last_row():
+    ws = Workbook().active
+    ws["B5"].fill = YELLOW
+    ws.merge_cells("B7:C7")
+    range_background(ws, "A1:C8", WHITE)
+
+    assert ws["A1"].fill.fgColor.rgb == "00FFFFFF"
+    assert ws["C8"].fill.fgColor.rgb == "00FFFFFF"
+    assert ws["B5"].fill.fgColor.rgb == "00FFFDE7"
+    assert isinstance(ws["C7"], MergedCell) and not ws["C7"].fill.fill_type
+    assert (9, 1) not in ws._cells and "A" not in ws.column_dimensions
+
+
+def test_band_rows_is_one_conditional_format():
+    ws = Workbook().active
+    for r in range(5, 25):
+        ws.cell(row=r, column=2, value=r)
+    band_rows(ws, "A5:F24", ALT)
+
+    rules = [(str(cf.sqref), rule) for cf in ws.conditional_formatting for rule in cf.rules]
+    assert len(rules) == 1
+    sqref, rule = rules[0]
+    assert sqref == "A5:F24"
+    assert rule.formula == ["MOD(ROW()-5,2)=1"]
+    assert rule.dxf.fill.bgColor.rgb == "00F7FAFC"
+    assert (6, 1) not in ws._cells
+
+
+def test_band_rows_keeps_existing_fills():
+    ws = Workbook().active
+    for r in range(5, 25):
+        for c in range(2, 4):
+            ws.cell(row=r, column=c).fill = YELLOW
+    ws["D8"].fill = NAVY
+    band_rows(ws, "A5:D24", ALT)
+
+    sqrefs = [str(cf.sqref) for cf in ws.conditional_formatting]
+    assert sqrefs == ["A5:A24"]
+    # column D had a filled banded cell: real fills, original one untouched
+    assert ws["D6"].fill.fgColor.rgb == "00F7FAFC"
+    assert ws["D8"].fill.fgColor.rgb == "001B2A4A"
+    assert not ws["D7"].fill.fill_type
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for recalc_cost: the static cost report on small workbooks and on the
+generated budget tracker.
+Run with:  python -m pytest -q test_recalc_cost.py
+"""
+
+import os
+
+from openpyxl import Workbook
+from openpyxl.worksheet.formula import ArrayFormula
+
+from formula_ast import parse
+from recalc_cost import analyze, formula_cost, format_report
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_formula_cost_counts_reads_and_array_work():
+    extents = {"Data": (100, 4)}
+    cost = formula_cost(parse("=SUMPRODUCT((MONTH(Data!A2:A51)=1)*Data!D2:D51)"),
+                        extents, "Data")
+    assert cost.reads == 100 and cost.sumproduct_cells == 100
+    # MONTH over 50 cells, =1 over 50, * over 50
+    assert cost.array_elements == 150
+    assert formula_cost(parse("=SUM(Data!A:A)"), extents, "Data").reads == 100
+    assert formula_cost(parse("=SUM(A1:A9)"), extents, "Data").array_elements == 0
+    assert formula_cost(parse("=DAY(EOMONTH(TODAY(),0))"), extents, "Data").volatile == {"TODAY"}
+
+
+def test_analyze_groups_copied_formulas(tmp_path):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Data"
+    for r in range(1, 11):
+        ws.cell(row=r, column=1, value=r)
+        ws.cell(row=r, column=2, value=f"=A{r}*2")
+    ws["C1"] = "=TODAY()"
+    ws["D1"] = ArrayFormula("D1", "=SUM(A1:A10*B1:B10)")
+    path = tmp_path / "small.xlsx"
+    wb.save(path)
+
+    report = analyze(path)
+    total = report["total"]
+    assert total["formulas"] == 12
+    assert total["volatile_formulas"] == 1
+    assert total["cse_formulas"] == 1
+    doubled = next(p for p in report["patterns"] if p["first_cell"] == "B1")
+    assert doubled["cells"] == 10 and doubled["reads"] == 10
+    assert "Data" in format_report(report)
+
+
+def test_budget_dashboard_is_volatile():
+    report = analyze(os.path.join(HERE, "monthly-budget-tracker.xlsx"))
+    dashboard = next(s for s in report["sheets"] if s["sheet"] == "Dashboard")
+    assert dashboard["volatile_functions"] == ["TODAY"]
+    assert report["total"]["sumproduct_scans"] >= 170
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for recalc_engine: formula semantics, batch lanes and incremental
+recalculation (only downstream cells, same result as a full recalculation).
+Run with:  python -m pytest -q test_recalc_engine.py
+"""
+
+import datetime
+
+import numpy as np
+import pytest
+from openpyxl import Workbook
+
+import recalc_engine
+from recalc_engine import CELL_ERROR, CircularReference, RecalcEngine
+
+
+def _engine(tmp_path, fill, **kwargs):
+    wb = Workbook()
+    fill(wb)
+    path = tmp_path / "engine.xlsx"
+    wb.save(path)
+    return RecalcEngine.from_workbook(path, **kwargs)
+
+
+def _ledger(wb):
+    ws = wb.active
+    ws.title = "Data"
+    rows = [(datetime.date(2026, 1, 5), "Rent", -1200), (datetime.date(2026, 1, 20), "Food", -80.5),
+            (datetime.date(2026, 2, 1), "rent", -1200), (datetime.date(2026, 2, 3), "Pay", 3000)]
+    for r, row in enumerate(rows, 2):
+        for c, value in enumerate(row, 1):
+            ws.cell(row=r, column=c, value=value)
+    ws["F1"] = '=SUMIF(B2:B20,"Rent",C2:C20)'
+    ws["F2"] = "=SUMPRODUCT((MONTH(A2:A20)=1)*(C2:C20<0)*C2:C20)"
+    ws["F3"] = '=COUNTIF(B2:B20,"<>Pay")'
+    ws["F4"] = "=INDEX(B2:B5,MATCH(MAX(C2:C5),C2:C5,0))"
+    ws["F5"] = '=IFERROR(MATCH("Gym",B2:B5,0),"none")'
+    ws["F6"] = '=F3&" rows, "&TEXTLESS'
+    ws["F7"] = "=DAY(EOMONTH(A2,1))"
+    ws["F8"] = '=IF(F1<-2000,"over",1/0)'
+    ws["F9"] = "=SMALL(IF(C2:C5<0,ROW(C2:C5)-1),2)"
+
+
+def test_formula_semantics(tmp_path):
+    engine = _engine(tmp_path, _ledger)
+    assert engine.get("Data!F1") == -2400               # case-insensitive criteria
+    assert engine.get("Data!F2") == pytest.approx(-1280.5)
+    assert engine.get("Data!F3") == 18                  # blanks are not "Pay" either
+    assert engine.get("Data!F4") == "Pay"
+    assert engine.get("Data!F5") == "none"
+    assert engine.get("Data!F6") is CELL_ERROR          # unknown name
+    assert engine.get("Data!F7") == 28
+    assert engine.get("Data!F8") == "over"
+    assert engine.get("Data!F9") == 2
+
+
+def test_incremental_matches_full_recalculation(tmp_path):
+    engine = _engine(tmp_path, _ledger)
+    engine.set("Data!C3", -100)
+    # F1, F2, F4 and F9 read C3; F1 comes out unchanged ("Food" row), so F8 is skipped
+    assert engine.recalc() == 4
+    assert engine.get("Data!F2") == pytest.approx(-1300)
+    engine.set("Data!C3", -100)
+    assert engine.recalc() == 0
+    engine.set("Data!B3", "Rent")
+    engine.recalc()
+    incremental = engine.get("Data!F1:F9")
+    engine.recalculate()
+    assert engine.get("Data!F1:F9") == incremental
+    with pytest.raises(ValueError):
+        engine.set("Data!F1", 5)
+
+
+def test_batch_lanes_match_scalar_runs(tmp_path):
+    amounts = [-5000, 0, 250.25]
+    batch = _engine(tmp_path, _ledger, batch=len(amounts))
+    batch.set("Data!C2", amounts)
+    results = batch.get("Data!F1:F9")
+    for lane, amount in enumerate(amounts):
+        single = _engine(tmp_path, _ledger)
+        single.set("Data!C2", amount)
+        assert [[v[lane] for v in row] for row in results] == single.get("Data!F1:F9")
+
+
+def test_shared_range_expressions_evaluate_once_per_pass(tmp_path, monkeypatch):
+    calls = []
+    month = recalc_engine.FUNCTIONS["MONTH"]
+    monkeypatch.setitem(recalc_engine.FUNCTIONS, "MONTH",
+                        lambda engine, serial: calls.append(1) or month(engine, serial))
+
+    def fill(wb):
+        _ledger(wb)
+        for m in range(1, 4):
+            wb.active.cell(row=m, column=8, value=f"=SUMPRODUCT((MONTH($A$2:$A$20)={m})*$C$2:$C$20)")
+    engine = _engine(tmp_path, fill)
+    assert len(calls) == 1                              # F2 and H1:H3 share MONTH(A2:A20)
+    engine.set("Data!A2", datetime.date(2026, 3, 1))
+    engine.set("Data!B4", "Rent")
+    engine.recalc()
+    assert len(calls) == 2                              # recomputed, never served stale
+    assert engine.get("Data!H1:H3") == [[-80.5], [1800], [-1200]]
+    assert engine.get("Data!F2") == -80.5
+
+
+def test_circular_references_are_rejected(tmp_path):
+    def fill(wb):
+        wb.active["A1"] = "=B1+1"
+        wb.active["B1"] = "=A1"
+    with pytest.raises(CircularReference):
+        _engine(tmp_path, fill)
+
+
+def test_debt_plan_edit_recomputes_only_downstream(debt_graph):
+    engine = RecalcEngine(debt_graph)
+    engine.set("'Debt Input'!C5", 9000)
+    engine.set("Dashboard!C11", 350)
+    evaluated = engine.recalc()
+    assert 0 < evaluated < len(engine.graph.formulas)
+    balances = engine.numbers("'Snowball Plan'!Y27:Y146")
+    engine.recalculate()
+    np.testing.assert_array_equal(engine.numbers("'Snowball Plan'!Y27:Y146"), balances)
+    assert balances[-1, 0, 0] == 0
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Tests for sheet_stream: a streamed block must serialize to the same package
+bytes as the same cells written through openpyxl, whether rendered in place
+or in worker processes, interleave with ordinary rows, and refuse rows that
+hold both.
+Run with:  python -m pytest -q test_sheet_stream.py
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+
+from sheet_stream import cell_style, fork_available, stream_rows, streamed_counts
+from xlsx_canonical import canonical_bytes
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+needs_fork = pytest.mark.skipif(not fork_available(), reason="needs the fork start method")
+
+FONT = Font(name="Calibri", size=10, color="1A202C")
+BOLD = Font(name="Calibri", size=10, bold=True)
+BORDER = Border(bottom=Side(style="thin", color="E2E8F0"))
+FILL = PatternFill("solid", fgColor="FFFDE7")
+
+
+def _header(ws):
+    ws["A1"] = "Schedule"
+    ws["A1"].font = BOLD
+    ws["A1"].fill = FILL
+    ws.row_dimensions[30].height = 20
+    ws["B30"] = "=SUM(B3:B29)"
+    ws["B30"].font = BOLD
+
+
+def _rows(money, label):
+    for r in range(3, 30):
+        yield r, [
+            (1, r - 2, label),
+            (2, f"=A{r}*1.5" if r > 3 else 100.25, money),
+            (3, " padded " if r == 3 else f"Row {r}", None),
+            (4, None, label),
+            (5, r % 2 == 0, None),
+            (8, f"=IF(B{r}>10,\"big\",\"small\")", None),
+        ]
+
+
+def _ordinary():
+    wb = Workbook()
+    ws = wb.active
+    _header(ws)
+    for r, cells in _rows("money", "label"):
+        for col, value, style in cells:
+            cell = ws.cell(row=r, column=col, value=value)
+            if style == "money":
+                cell.number_format = "$#,##0.00"
+                cell.font = FONT
+                cell.border = BORDER
+            elif style == "label":
+                cell.font = BOLD
+                cell.alignment = Alignment(horizontal="center")
+    return wb
+
+
+def _streamed(sheets=1):
+    wb = Workbook()
+    for n in range(sheets):
+        ws = wb.active if n == 0 else wb.create_sheet(f"Copy {n}")
+        _header(ws)
+        money = cell_style(ws, number_format="$#,##0.00", font=FONT, border=BORDER)
+        label = cell_style(ws, font=BOLD, alignment=Alignment(horizontal="center"))
+        stream_rows(ws, "A3:H29", lambda money=money, label=label: _rows(money, label),
+                    styles=[label, money])
+    return wb
+
+
+def test_streamed_block_matches_ordinary_cells():
+    assert canonical_bytes(_streamed()) == canonical_bytes(_ordinary())
+
+
+def test_streamed_counts_match_ordinary_cells():
+    ordinary = _ordinary().active
+    held = {(c.row, c.column): c for c in ordinary._cells.values() if c.row > 2 and c.row < 30}
+    assert streamed_counts(_streamed().active) == \
+        (len(held), sum(c.data_type == "f" for c in held.values()))
+
+
+def test_streamed_workbook_reads_back(tmp_path):
+    path = tmp_path / "streamed.xlsx"
+    path.write_bytes(canonical_bytes(_streamed()))
+    ws = load_workbook(path).active
+    assert ws.dimensions == "A1:H30"
+    assert ws["B4"].value == "=A4*1.5"
+    assert ws["B3"].number_format == "$#,##0.00" and ws["A3"].font.bold
+    assert ws["C3"].value == " padded " and ws["E4"].value is True
+    assert ws.row_dimensions[30].height == 20 and ws["B30"].value == "=SUM(B3:B29)"
+
+
+def test_rows_may_not_be_both_streamed_and_held():
+    wb = _streamed()
+    wb.active["J5"] = 1
+    with pytest.raises(ValueError, match="row 5"):
+        canonical_bytes(wb)
+
+
+def test_overlapping_blocks_and_undeclared_styles_are_refused():
+    wb = _streamed()
+    stream_rows(wb.active, "A20:B40", lambda: iter(()))
+    with pytest.raises(ValueError, match="overlap"):
+        canonical_bytes(wb)
+
+    wb = Workbook()
+    money = cell_style(wb.active, number_format="0.00")
+    stream_rows(wb.active, "A1:A1", lambda: iter([(1, [(1, 2.5, money)])]))
+    with pytest.raises(ValueError, match="styles="):
+        canonical_bytes(wb)
+
+
+@needs_fork
+def test_parallel_blocks_match_serial():
+    serial = canonical_bytes(_streamed(sheets=3), workers=1)
+    assert canonical_bytes(_streamed(sheets=3), workers=2) == serial
+
+
+@needs_fork
+def test_debt_calculator_parallel_build_is_identical(tmp_path):
+    outputs = []
+    for workers in ("1", "2"):
+        out = tmp_path / f"debt-{workers}.xlsx"
+        subprocess.run([sys.executable, os.path.join(HERE, "create_debt_calculator.py"), str(out)],
+                       check=True, capture_output=True, cwd=HERE,
+                       env=dict(os.environ, BUILD_WORKERS=workers))
+        outputs.append(out.read_bytes())
+    assert outputs[0] == outputs[1]
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for style_registry: interned bundles must style cells exactly like
+assigning the individual style attributes does.
+Run with:  python -m pytest -q test_style_registry.py
+"""
+
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Protection, Side
+
+from style_registry import StyleRegistry
+
+BODY = dict(
+    font=Font(name="Aptos", size=11, color="1F2937"),
+    fill=PatternFill("solid", fgColor="F5F3FF"),
+    border=Border(bottom=Side(style="thin", color="D1D5DB")),
+    alignment=Alignment(horizontal="right", vertical="center"),
+    number_format='"$"#,##0.00',
+    protection=Protection(locked=False),
+)
+
+
+def test_apply_matches_attribute_assignment():
+    wb = Workbook()
+    ws = wb.active
+    styles = StyleRegistry()
+    body = styles.register(**BODY)
+
+    for attr, value in BODY.items():
+        setattr(ws["A1"], attr, value)
+    styles.apply(ws["B1"], body)
+
+    assert ws["A1"]._style == ws["B1"]._style
+    assert ws["B1"].number_format == '"$"#,##0.00'
+    assert ws["B1"].protection.locked is False
+
+
+def test_equal_bundles_share_an_id():
+    styles = StyleRegistry()
+    first = styles.register(**BODY)
+    assert styles.register(**BODY) == first
+    assert styles.derive(first, number_format="0.0%") != first
+    assert len(styles) == 2
+
+
+def test_bundle_replaces_previous_style():
+    ws = Workbook().active
+    styles = StyleRegistry()
+    plain = styles.register(font=Font(bold=True))
+    ws["A1"].number_format = "0.0%"
+    styles.apply(ws["A1"], plain)
+    assert ws["A1"].number_format == "General"
+    assert ws["A1"].font.bold
+
+
+def test_apply_range_and_rebinding():
+    styles = StyleRegistry()
+    body = styles.register(**BODY)
+    for _ in range(2):
+        ws = Workbook().active
+        styles.apply_range(ws, "B2:D4", body)
+        assert ws["D4"].fill.fgColor.rgb == "00F5F3FF"
+        assert ws["B2"]._style is not ws["C2"]._style
+        assert not ws["A1"].has_style
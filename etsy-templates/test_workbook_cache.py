@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for workbook_cache: the cached representation matches what openpyxl
+reads, hits skip openpyxl entirely and a changed workbook is re-extracted.
+Run with:  python -m pytest -q test_workbook_cache.py
+"""
+
+import datetime
+import os
+
+import pytest
+from openpyxl import Workbook, load_workbook
+from openpyxl.formatting.rule import CellIsRule
+from openpyxl.styles import Font, PatternFill
+from openpyxl.worksheet.datavalidation import DataValidation
+from openpyxl.worksheet.formula import ArrayFormula
+
+import workbook_cache
+from dependency_graph import DependencyGraph
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _sample(path, amount=100):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Data"
+    ws["A1"] = amount
+    ws["A2"] = 2.5
+    ws["A3"] = True
+    ws["A4"] = "Rent"
+    ws["A5"] = datetime.datetime(2026, 2, 28)
+    ws["B1"] = "=SUM(A1:A2)"
+    ws["B2"] = "=SUM(A2:A3)"
+    ws["C1"] = ArrayFormula("C1", "=MAX(IF(A1:A2>0,A1:A2))")
+    ws["D9"].fill = PatternFill("solid", fgColor="1B2A4A")    # styled, but blank
+    dv = DataValidation(type="list", formula1='"Rent,Food"')
+    dv.add("A4:A10")
+    ws.add_data_validation(dv)
+    ws.conditional_formatting.add("A1:A2", CellIsRule(
+        operator="lessThan", formula=["0"], fill=PatternFill("solid", fgColor="FEE2E2"),
+        font=Font(color="DC2626")))
+    wb.create_sheet("Sum")["A1"] = "=Data!B1*2"
+    wb.save(path)
+    return path
+
+
+def test_cached_contents_match_openpyxl(tmp_path):
+    path = _sample(tmp_path / "sample.xlsx")
+    parsed = workbook_cache.load(path, tmp_path / "cache")
+    assert parsed.sheetnames == ["Data", "Sum"]
+    assert parsed.value("Data", 1, 1) == 100
+    assert parsed.value("Data", 3, 1) is True
+    assert parsed.value("Data", 5, 1) == datetime.datetime(2026, 2, 28)
+    assert parsed.value("Data", 1, 3) == "=MAX(IF(A1:A2>0,A1:A2))"
+    assert parsed.is_array_formula("Data", 1, 3)
+    assert parsed.value("Sum", 1, 1) == "=Data!B1*2"
+    assert parsed.at("Data", "C1") == parsed.value("Data", 1, 3)
+    # the two SUMs were copied from one another
+    keys = {(sheet, row, col): key for sheet, row, col, _, key in parsed.cells()}
+    assert keys["Data", 1, 2] == keys["Data", 2, 2] == "SUM(R[0]C[-1]:R[1]C[-1])"
+
+    wb = load_workbook(path)
+    for ws in wb.worksheets:
+        for (row, col), cell in ws._cells.items():
+            expected = cell.value.text if hasattr(cell.value, "text") else cell.value
+            assert parsed.value(ws.title, row, col) == expected
+    assert parsed.style("Data", 9, 4) != parsed.style("Data", 1, 1)
+    assert parsed.validations("Data") == [dict(
+        sqref="A4:A10", type="list", operator=None, formula1='"Rent,Food"', formula2=None,
+        allow_blank=False)]
+    [rule] = parsed.conditional_formats("Data")
+    assert (rule["sqref"], rule["operator"], rule["formula"]) == ("A1:A2", "lessThan", ["0"])
+    assert (rule["fill"], rule["font_color"]) == ("FEE2E2", "DC2626")
+    parsed.close()
+
+
+def test_hit_is_memory_mapped_without_openpyxl(tmp_path, monkeypatch):
+    path = _sample(tmp_path / "sample.xlsx")
+    cache = tmp_path / "cache"
+    extracted = workbook_cache.load(path, cache)
+
+    def refuse(*args, **kwargs):
+        raise AssertionError("cache hit must not load the workbook")
+    monkeypatch.setattr(workbook_cache, "load_workbook", refuse)
+    cached = workbook_cache.load(path, cache)
+    assert cached._mmap is not None
+    assert list(cached.cells(include_blank=True)) == list(extracted.cells(include_blank=True))
+    assert cached.styles_digest == extracted.styles_digest
+    assert cached.meta["sheets"] == extracted.meta["sheets"]
+    cached.close()
+
+
+def test_changed_workbook_is_re_extracted(tmp_path):
+    path = _sample(tmp_path / "sample.xlsx")
+    cache = tmp_path / "cache"
+    first = workbook_cache.load(path, cache)
+    _sample(path, amount=250)
+    second = workbook_cache.load(path, cache)
+    assert second.content_hash != first.content_hash
+    assert second.value("Data", 1, 1) == 250
+    assert os.listdir(cache) == [os.path.basename(
+        workbook_cache.cache_path(path, second.content_hash))]
+
+
+def test_corrupt_entry_is_rebuilt(tmp_path):
+    path = _sample(tmp_path / "sample.xlsx")
+    cache = tmp_path / "cache"
+    entry = workbook_cache.cache_path(path, workbook_cache.content_hash(path), cache)
+    os.makedirs(cache)
+    with open(entry, "wb") as f:
+        f.write(b"not a cache file")
+    assert workbook_cache.load(path, cache).value("Data", 4, 1) == "Rent"
+
+
+@pytest.mark.parametrize("name", ["monthly-budget-tracker.xlsx", "subscription-tracker.xlsx"])
+def test_graph_from_cache_matches_openpyxl(tmp_path, name):
+    path = os.path.join(HERE, name)
+    parsed = workbook_cache.load(path, tmp_path)
+    cached, direct = DependencyGraph.from_parsed(parsed), DependencyGraph.from_workbook(path)
+    assert cached.extents == direct.extents
+    assert cached.values == direct.values
+    assert cached.precedents == direct.precedents
+    assert {n: p.key for n, p in cached.formulas.items()} == \
+        {n: p.key for n, p in direct.formulas.items()}
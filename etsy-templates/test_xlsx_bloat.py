@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for xlsx_bloat: per-part sizes, the split of sheet XML between
+formulas, styles, merged cells, validations and conditional formats,
+grouping of copied formulas by pattern, and the size budget check against
+the committed workbooks.
+Run with:  python -m pytest -q test_xlsx_bloat.py
+"""
+
+import json
+
+from openpyxl import Workbook
+from openpyxl.formatting.rule import CellIsRule
+from openpyxl.styles import Font, PatternFill
+from openpyxl.worksheet.datavalidation import DataValidation
+
+import xlsx_bloat
+from conftest import BUDGET_XLSX, DEBT_XLSX, SUBSCRIPTION_XLSX
+from xlsx_canonical import save_canonical
+
+
+def _sample(path):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Data"
+    for r in range(1, 41):
+        ws.cell(row=r, column=1, value=r * 1.5).font = Font(bold=True)
+        ws.cell(row=r, column=2, value=f"=A{r}*2")
+        ws.cell(row=r, column=3, value=f'=IF(B{r}>10,"big","small")')
+    ws["E1"] = "Totals"
+    ws.merge_cells("E1:F1")
+    ws["E2"] = "=SUM(B1:B40)"
+    validation = DataValidation(type="list", formula1='"a,b,c"')
+    validation.add("G1:G40")
+    ws.add_data_validation(validation)
+    ws.conditional_formatting.add("B1:B40", CellIsRule(
+        operator="greaterThan", formula=["50"], fill=PatternFill("solid", fgColor="FFC7CE")))
+    wb.create_sheet("Empty")
+    save_canonical(wb, path)
+    return path
+
+
+def test_parts_and_categories(tmp_path):
+    report = xlsx_bloat.analyse(_sample(str(tmp_path / "sample.xlsx")))
+    parts = {p["name"]: p for p in report["parts"]}
+    assert {"xl/styles.xml", "xl/workbook.xml", "xl/worksheets/sheet1.xml"} <= set(parts)
+    assert report["bytes"] == sum(p["bytes"] for p in report["parts"])
+    assert report["compressed"] < report["file_bytes"]
+
+    data = parts["xl/worksheets/sheet1.xml"]
+    assert data["sheet"] == "Data"
+    assert parts["xl/worksheets/sheet2.xml"]["sheet"] == "Empty"
+    categories = data["categories"]
+    assert {"formulas", "values", "cell styles", "merged cells", "data validations",
+            "conditional formats", "cell/row markup", "other"} <= set(categories)
+    assert sum(c["bytes"] for c in categories.values()) == data["bytes"]
+    assert categories["formulas"]["bytes"] > categories["values"]["bytes"] > 0
+
+
+def test_formulas_grouped_by_pattern(tmp_path):
+    report = xlsx_bloat.analyse(_sample(str(tmp_path / "sample.xlsx")), top=2)
+    data = next(p for p in report["parts"] if p.get("sheet") == "Data")
+    patterns = data["formula_patterns"]
+    assert data["formula_cells"] == 81
+    assert [p["cells"] for p in patterns] == [40, 40, 1]
+    assert patterns[0]["example"] == 'C1: =IF(B1>10,"big","small")'
+    assert patterns[0]["bytes"] == sum(len(f'IF(B{r}&gt;10,"big","small")') for r in range(1, 41))
+    assert "compressed" in patterns[1] and "compressed" not in patterns[2]
+
+
+def test_budget(tmp_path, capsys):
+    path = _sample(str(tmp_path / "sample.xlsx"))
+    report = xlsx_bloat.analyse(path)
+    assert xlsx_bloat.check_budget(report, {"sample.xlsx": 10 ** 6}) == []
+    assert xlsx_bloat.check_budget(report, {"other.xlsx": 1}) == []
+    over = xlsx_bloat.check_budget(
+        report, {"sample.xlsx": {"total": 100, "xl/worksheets/sheet1.xml": 10 ** 6}})
+    assert over == [("total", report["file_bytes"], 100)]
+
+    budget = tmp_path / "budget.json"
+    budget.write_text(json.dumps({"sample.xlsx": {"xl/styles.xml": 10}}))
+    out = tmp_path / "report.json"
+    assert xlsx_bloat.main([path, "--budget", str(budget), "--json", str(out)]) == 1
+    assert "sample.xlsx xl/styles.xml" in capsys.readouterr().out
+    assert json.loads(out.read_text())[0]["path"] == path
+
+
+def test_committed_workbooks_within_budget(capsys):
+    assert xlsx_bloat.main([BUDGET_XLSX, SUBSCRIPTION_XLSX, DEBT_XLSX,
+                            "--budget", xlsx_bloat.DEFAULT_BUDGET]) == 0
+    assert "All within budget" in capsys.readouterr().out
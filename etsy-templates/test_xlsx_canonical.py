@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for xlsx_canonical: identical workbook content must yield identical bytes.
+Run with:  python -m pytest -q test_xlsx_canonical.py
+"""
+
+import hashlib
+import io
+import os
+import subprocess
+import sys
+import zipfile
+
+import pytest
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+
+from conftest import BUDGET_XLSX, DEBT_XLSX, SUBSCRIPTION_XLSX
+from xlsx_canonical import ZIP_DATE_TIME, canonical_bytes, repack
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GENERATORS = [
+    "create_budget_tracker.py",
+    "create_debt_calculator.py",
+    "create_subscription_tracker.py",
+]
+
+
+def build_sample(order):
+    """Small workbook whose styles are assigned in the given cell order."""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Sample"
+    styles = {
+        "A1": dict(font=Font(bold=True, color="FFFFFF"),
+                   fill=PatternFill("solid", fgColor="1B2A4A")),
+        "B2": dict(number_format='"$"#,##0.00',
+                   border=Border(bottom=Side(style="thin"))),
+        "C3": dict(alignment=Alignment(horizontal="center"),
+                   number_format="0.0%"),
+    }
+    for ref in order:
+        cell = ws[ref]
+        cell.value = ref
+        for attr, value in styles[ref].items():
+            setattr(cell, attr, value)
+    ws.column_dimensions["B"].width = 18
+    return wb
+
+
+def test_same_workbook_twice_is_byte_identical():
+    assert canonical_bytes(build_sample(["A1", "B2", "C3"])) == \
+        canonical_bytes(build_sample(["A1", "B2", "C3"]))
+
+
+def test_style_assignment_order_does_not_leak():
+    assert canonical_bytes(build_sample(["A1", "B2", "C3"])) == \
+        canonical_bytes(build_sample(["C3", "B2", "A1"]))
+
+
+def test_styles_survive_renumbering():
+    wb = load_workbook(io.BytesIO(canonical_bytes(build_sample(["C3", "A1", "B2"]))))
+    ws = wb["Sample"]
+    assert ws["A1"].font.bold and ws["A1"].fill.fgColor.rgb == "001B2A4A"
+    assert ws["B2"].number_format == '"$"#,##0.00'
+    assert ws["B2"].border.bottom.style == "thin"
+    assert ws["C3"].number_format == "0.0%"
+    assert ws["C3"].alignment.horizontal == "center"
+
+
+def test_package_metadata_is_fixed():
+    data = canonical_bytes(build_sample(["A1", "B2", "C3"]))
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        names = zf.namelist()
+        assert names[0] == "[Content_Types].xml"
+        assert all(info.date_time == ZIP_DATE_TIME for info in zf.infolist())
+        core = zf.read("docProps/core.xml").decode()
+    assert "2026-01-01T00:00:00Z" in core
+    assert repack(data) == data
+
+
+@pytest.mark.parametrize("script", GENERATORS)
+def test_generator_output_is_reproducible(script, tmp_path):
+    digests = []
+    for run in range(2):
+        out = tmp_path / f"run{run}.xlsx"
+        subprocess.run([sys.executable, os.path.join(HERE, script), str(out)],
+                       check=True, capture_output=True, cwd=HERE)
+        digests.append(hashlib.sha256(out.read_bytes()).hexdigest())
+    assert digests[0] == digests[1]
+
+
+@pytest.mark.parametrize("committed", [BUDGET_XLSX, DEBT_XLSX, SUBSCRIPTION_XLSX],
+                         ids=os.path.basename)
+def test_committed_workbooks_are_current(built_xlsx, committed):
+    with open(committed, "rb") as f, open(built_xlsx[committed], "rb") as g:
+        assert f.read() == g.read(), \
+            f"{os.path.basename(committed)} is stale: rerun its create_*.py and commit it"
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Parsed-workbook cache for the Etsy template tests and analysis tools.
+Extracts what the tests read from a generated xlsx - cell values, formula
+strings (with their R1C1 pattern keys), a digest of every cell's style, data
+validations and conditional-format rules - into one flat binary file keyed by
+the xlsx content hash. Later loads memory-map that file instead of running
+openpyxl; a changed workbook hashes differently and is re-extracted.
+
+The cache lives in $XLSX_CACHE_DIR, or .xlsx-cache/ next to this file.
+
+Usage:  python workbook_cache.py WORKBOOK.xlsx [...] [--cache-dir DIR] [--clear]
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+
+import numpy as np
+from openpyxl import load_workbook
+from openpyxl.utils.cell import column_index_from_string, coordinate_from_string
+from openpyxl.utils.datetime import from_excel, to_excel
+
+from formula_ast import pattern_key
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.path.join(HERE, ".xlsx-cache")
+MAGIC = b"XLSXC\x00\x00\x01"
+HEADER = struct.Struct("<8sQ")          # magic, metadata length
+
+# Cell kinds. Formulas keep their text (without "=") in the string table.
+NUMBER, BOOL, TEXT, DATE, FORMULA, ARRAY_FORMULA, BLANK = range(7)
+
+# Flat per-cell columns, stored in this order after the metadata.
+COLUMNS = [
+    ("sheet", np.uint16), ("row", np.int32), ("col", np.int32), ("kind", np.uint8),
+    ("num", np.float64), ("text", np.int32), ("key", np.int32), ("style", np.int32),
+]
+
+
+def content_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _digest(*parts):
+    return hashlib.blake2b(repr(parts).encode(), digest_size=8).hexdigest()
+
+
+def _rgb(color):
+    rgb = getattr(color, "rgb", None)
+    return rgb[-6:].upper() if isinstance(rgb, str) and color.type == "rgb" else None
+
+
+class ParsedWorkbook:
+    """
+    The extracted contents of one workbook. Cell columns are NumPy arrays
+    (memory-mapped when loaded from the cache); *strings* holds every text
+    value, formula and pattern key they point into.
+    """
+
+    def __init__(self, meta, columns, strings, source=None):
+        self.meta = meta
+        self.columns = columns
+        self.strings = strings
+        self.source = source
+        self._mmap = None
+        self.sheetnames = [s["title"] for s in meta["sheets"]]
+        self.extents = {s["title"]: (s["max_row"], s["max_col"]) for s in meta["sheets"]}
+        self._index = None
+
+    @property
+    def content_hash(self):
+        return self.meta["hash"]
+
+    @property
+    def styles_digest(self):
+        """One digest over every cell's style: changes when any formatting does."""
+        return self.meta["styles_digest"]
+
+    def _sheet(self, title):
+        return self.meta["sheets"][self.sheetnames.index(title)]
+
+    def validations(self, sheet):
+        return self._sheet(sheet)["validations"]
+
+    def conditional_formats(self, sheet):
+        return self._sheet(sheet)["conditional_formats"]
+
+    def _decode(self, kind, num, text):
+        if kind == NUMBER:
+            return int(num) if num.is_integer() and abs(num) < 2 ** 53 else num
+        if kind == BOOL:
+            return bool(num)
+        if kind == DATE:
+            return from_excel(num)
+        if kind == BLANK:
+            return None
+        if kind in (FORMULA, ARRAY_FORMULA):
+            return "=" + self.strings[text]
+        return self.strings[text]
+
+    def cells(self, include_blank=False):
+        """
+        Yields (sheet, row, col, value, key) in sheet order, row-major. Formula
+        values are "=..." strings and *key* is their R1C1 pattern key (None
+        for constants).
+        """
+        c = self.columns
+        strings, titles = self.strings, self.sheetnames
+        for sheet, row, col, kind, num, text, key in zip(
+                c["sheet"].tolist(), c["row"].tolist(), c["col"].tolist(), c["kind"].tolist(),
+                c["num"].tolist(), c["text"].tolist(), c["key"].tolist()):
+            if kind == BLANK and not include_blank:
+                continue
+            yield (titles[sheet], row, col, self._decode(kind, num, text),
+                   strings[key] if key >= 0 else None)
+
+    def _position(self, sheet, row, col):
+        if self._index is None:
+            c = self.columns
+            self._index = {(self.sheetnames[s], r, k): i for i, (s, r, k) in enumerate(zip(
+                c["sheet"].tolist(), c["row"].tolist(), c["col"].tolist()))}
+        return self._index.get((sheet, row, col))
+
+    def value(self, sheet, row, col):
+        i = self._position(sheet, row, col)
+        if i is None:
+            return None
+        c = self.columns
+        return self._decode(int(c["kind"][i]), float(c["num"][i]), int(c["text"][i]))
+
+    def at(self, sheet, ref):
+        """value() by A1 reference: at("Dashboard", "B6")."""
+        col, row = coordinate_from_string(ref)
+        return self.value(sheet, row, column_index_from_string(col))
+
+    def is_array_formula(self, sheet, row, col):
+        i = self._position(sheet, row, col)
+        return i is not None and self.columns["kind"][i] == ARRAY_FORMULA
+
+    def style(self, sheet, row, col):
+        """Digest of the cell's font, fill, border, alignment, protection and number format."""
+        i = self._position(sheet, row, col)
+        return self.meta["styles"][self.columns["style"][i]] if i is not None else None
+
+    def close(self):
+        """Release the memory map (it stays open while caller-held column views exist)."""
+        mm, self._mmap = self._mmap, None
+        self.columns = self._index = None
+        if mm is not None:
+            try:
+                mm.close()
+            except BufferError:
+                pass
+
+
+# ---------------------------------------------------------------------------
+# extraction (openpyxl)
+# ---------------------------------------------------------------------------
+def extract(path):
+    """Read *path* with openpyxl into a ParsedWorkbook (the cache-miss path)."""
+    wb = load_workbook(path)
+    strings, string_ids = [], {}
+    styles, style_ids, style_cache = [], {}, {}
+    rows = {name: [] for name, _ in COLUMNS}
+
+    def intern(text):
+        i = string_ids.get(text)
+        if i is None:
+            i = string_ids[text] = len(strings)
+            strings.append(text)
+        return i
+
+    sheets = []
+    for index, ws in enumerate(wb.worksheets):
+        for (row, col), cell in sorted(ws._cells.items()):
+            value, num, text, key = cell.value, 0.0, -1, -1
+            formula = value.text if hasattr(value, "text") else value
+            if isinstance(formula, str) and formula.startswith("="):
+                kind = ARRAY_FORMULA if formula is not value else FORMULA
+                text = intern(formula[1:])
+                key = intern(pattern_key(formula[1:], row, col))
+            elif value is None:
+                kind = BLANK
+            elif isinstance(value, bool):
+                kind, num = BOOL, float(value)
+            elif isinstance(value, (int, float)):
+                kind, num = NUMBER, float(value)
+            elif hasattr(value, "year") or hasattr(value, "hour"):
+                kind, num = DATE, float(to_excel(value))
+            else:
+                kind, text = TEXT, intern(str(value))
+
+            style_key = tuple(cell._style)
+            style = style_cache.get(style_key)
+            if style is None:
+                digest = _digest(cell.font, cell.fill, cell.border, cell.alignment,
+                                 cell.protection, cell.number_format)
+                style = style_cache[style_key] = style_ids.setdefault(digest, len(styles))
+                if style == len(styles):
+                    styles.append(digest)
+            for name, item in zip(("sheet", "row", "col", "kind", "num", "text", "key", "style"),
+                                  (index, row, col, kind, num, text, key, style)):
+                rows[name].append(item)
+
+        sheets.append(dict(
+            title=ws.title, max_row=ws.max_row, max_col=ws.max_column,
+            validations=[dict(sqref=str(dv.sqref), type=dv.type, operator=dv.operator,
+                              formula1=dv.formula1, formula2=dv.formula2,
+                              allow_blank=bool(dv.allow_blank))
+                         for dv in ws.data_validations.dataValidation],
+            conditional_formats=[dict(
+                sqref=str(cf.sqref), type=rule.type, operator=rule.operator,
+                formula=list(rule.formula), priority=rule.priority,
+                stop_if_true=bool(rule.stopIfTrue),
+                fill=_rgb(rule.dxf.fill.fgColor) if rule.dxf and rule.dxf.fill else None,
+                font_color=_rgb(rule.dxf.font.color) if rule.dxf and rule.dxf.font else None,
+                dxf=_digest(rule.dxf) if rule.dxf else None)
+                for cf in ws.conditional_formatting for rule in cf.rules],
+        ))
+    wb.close()
+
+    columns = {name: np.array(rows[name], dtype=dtype) for name, dtype in COLUMNS}
+    styles_digest = hashlib.blake2b(digest_size=16)
+    for name in ("sheet", "row", "col", "style"):
+        styles_digest.update(columns[name].tobytes())
+    styles_digest.update("\0".join(styles).encode())
+    meta = dict(hash=content_hash(path), cells=len(columns["row"]), sheets=sheets,
+                styles=styles, styles_digest=styles_digest.hexdigest())
+    return ParsedWorkbook(meta, columns, strings, source=str(path))
+
+
+# ---------------------------------------------------------------------------
+# binary format
+#   MAGIC | metadata length | metadata JSON | per-cell columns | string table
+# Every column starts on an 8-byte boundary so it can be viewed in place.
+# ---------------------------------------------------------------------------
+def _pad(n):
+    return -n % 8
+
+
+def write(parsed, path):
+    """Write *parsed* to *path* atomically (safe with parallel test workers)."""
+    blob = "\0".join(parsed.strings).encode()
+    meta = dict(parsed.meta, strings=len(parsed.strings), blob=len(blob))
+    meta_bytes = json.dumps(meta, separators=(",", ":")).encode()
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(meta_bytes)))
+            f.write(meta_bytes + b"\0" * _pad(len(meta_bytes)))
+            for name, dtype in COLUMNS:
+                data = np.ascontiguousarray(parsed.columns[name], dtype=dtype).tobytes()
+                f.write(data + b"\0" * _pad(len(data)))
+            f.write(blob)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def read(path):
+    """Memory-map a cache file written by write()."""
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        magic, meta_len = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a workbook cache file")
+        offset = HEADER.size
+        meta = json.loads(mm[offset:offset + meta_len])
+        offset += meta_len + _pad(meta_len)
+        columns = {}
+        for name, dtype in COLUMNS:
+            columns[name] = np.frombuffer(mm, dtype=dtype, count=meta["cells"], offset=offset)
+            size = columns[name].nbytes
+            offset += size + _pad(size)
+        blob = mm[offset:offset + meta["blob"]]
+        strings = blob.decode().split("\0") if meta["strings"] else []
+    except Exception:
+        mm.close()
+        raise
+    parsed = ParsedWorkbook(meta, columns, strings)
+    parsed._mmap = mm
+    return parsed
+
+
+# ---------------------------------------------------------------------------
+# cache
+# ---------------------------------------------------------------------------
+def cache_dir():
+    return os.environ.get("XLSX_CACHE_DIR") or DEFAULT_CACHE_DIR
+
+
+def cache_path(path, digest, directory=None):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(directory or cache_dir(), f"{stem}-{digest[:16]}.xlsxc")
+
+
+def load(path, directory=None):
+    """
+    The ParsedWorkbook for *path*: memory-mapped from the cache when the
+    workbook's content hash has an entry, otherwise extracted with openpyxl
+    and cached (older entries for the same workbook are removed).
+    """
+    digest = content_hash(path)
+    entry = cache_path(path, digest, directory)
+    if os.path.exists(entry):
+        try:
+            parsed = read(entry)
+        except (ValueError, OSError, struct.error):
+            parsed = None                # truncated or foreign file: rebuild it
+        if parsed is not None and parsed.content_hash == digest:
+            parsed.source = str(path)
+            return parsed
+    parsed = extract(path)
+    for stale in glob.glob(cache_path(path, "*", directory)):
+        if stale != entry:
+            try:
+                os.unlink(stale)
+            except OSError:
+                pass
+    write(parsed, entry)
+    return parsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Warm the parsed-workbook cache.")
+    parser.add_argument("workbooks", nargs="+")
+    parser.add_argument("--cache-dir", help=f"default: $XLSX_CACHE_DIR or {DEFAULT_CACHE_DIR}")
+    parser.add_argument("--clear", action="store_true", help="drop existing entries first")
+    args = parser.parse_args(argv)
+
+    for path in args.workbooks:
+        if args.clear:
+            for entry in glob.glob(cache_path(path, "*", args.cache_dir)):
+                os.unlink(entry)
+        start = time.perf_counter()
+        hit = os.path.exists(cache_path(path, content_hash(path), args.cache_dir))
+        parsed = load(path, args.cache_dir)
+        elapsed = time.perf_counter() - start
+        print(f"{path}: {'hit' if hit else 'extracted'} in {elapsed * 1000:.1f} ms"
+              f" - {parsed.meta['cells']:,} cells, {len(parsed.strings):,} strings,"
+              f" {len(parsed.meta['styles'])} styles")
+        parsed.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Size breakdown and bloat report for .xlsx packages.
+Lists compressed and uncompressed bytes per zip part, then splits every
+worksheet's XML between formula text, cell style attributes, values, inline
+text, cell/row markup, merged cells, data validations and conditional
+formats, with formulas grouped by R1C1 pattern (cells copied from one
+another share a pattern).
+
+Compressed bytes for a category are marginal: how much smaller the
+compressed part gets with that category removed. They do not add up to the
+part size, but say what dropping or shrinking the category would save.
+
+--budget compares each package against a JSON budget ({"file.xlsx":
+max_bytes} or {"file.xlsx": {"total": n, "xl/worksheets/sheet4.xml": n}})
+and exits 1 when anything is over; --json writes the whole report so sizes
+can be tracked over time.
+
+Usage:  python xlsx_bloat.py WORKBOOK.xlsx [...] [--top 8] [--json report.json]
+                             [--budget xlsx_size_budget.json]
+"""
+
+import argparse
+import json
+import os
+import posixpath
+import re
+import sys
+import zipfile
+import zlib
+from collections import defaultdict
+from xml.etree import ElementTree
+from xml.sax.saxutils import unescape
+
+from formula_ast import pattern_key
+from openpyxl.utils import column_index_from_string
+from xlsx_canonical import COMPRESS_LEVEL
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BUDGET = os.path.join(HERE, "xlsx_size_budget.json")
+MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# Sheet XML categories, matched in this order; later patterns never claim
+# bytes an earlier one already took. Whatever is left inside <sheetData> is
+# cell/row markup, anything outside it is "other".
+CATEGORIES = [
+    ("conditional formats", re.compile(rb"<conditionalFormatting\b.*?</conditionalFormatting>",
+                                       re.S)),
+    ("data validations", re.compile(rb"<dataValidations\b.*?</dataValidations>", re.S)),
+    ("merged cells", re.compile(rb"<mergeCells\b.*?</mergeCells>", re.S)),
+    ("formulas", re.compile(rb"<f\b[^>]*/>|<f\b[^>]*>.*?</f>", re.S)),
+    ("inline text", re.compile(rb"<is>.*?</is>", re.S)),
+    ("values", re.compile(rb"<v/>|<v>[^<]*</v>")),
+    ("cell styles", re.compile(rb' s="\d+"')),
+]
+MARKUP, OTHER = "cell/row markup", "other"
+SHEET_DATA_RE = re.compile(rb"<sheetData\b.*?</sheetData>|<sheetData/>", re.S)
+CELL_FORMULA_RE = re.compile(rb'<c r="([A-Z]+)(\d+)"[^>]*>\s*<f\b[^>]*>(.*?)</f>', re.S)
+
+
+def deflated_size(data):
+    """Raw-deflate size at the level the generators save with."""
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, -15)
+    return len(compressor.compress(data) + compressor.flush())
+
+
+def sheet_titles(package):
+    """{"xl/worksheets/sheetN.xml": "Sheet title"}."""
+    try:
+        workbook = ElementTree.fromstring(package.read("xl/workbook.xml"))
+        rels = ElementTree.fromstring(package.read("xl/_rels/workbook.xml.rels"))
+    except KeyError:
+        return {}
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels.iter(f"{PKG_REL_NS}Relationship")}
+    titles = {}
+    for sheet in workbook.iter(f"{MAIN_NS}sheet"):
+        target = targets.get(sheet.get(f"{REL_NS}id"), "")
+        part = target.lstrip("/") if target.startswith("/") else posixpath.join("xl", target)
+        titles[posixpath.normpath(part)] = sheet.get("name")
+    return titles
+
+
+def sheet_breakdown(xml, top=8):
+    """Category and formula-pattern breakdown of one worksheet part."""
+    owner = bytearray(len(xml))          # 0 = unclaimed, else category index + 1
+    for index, (_, pattern) in enumerate(CATEGORIES, 1):
+        for m in pattern.finditer(xml):
+            start, end = m.span()
+            if not any(owner[start:end]):
+                owner[start:end] = bytes([index]) * (end - start)
+    inside = bytearray(len(xml))
+    for m in SHEET_DATA_RE.finditer(xml):
+        inside[m.start():m.end()] = b"\x01" * (m.end() - m.start())
+
+    names = [name for name, _ in CATEGORIES] + [MARKUP, OTHER]
+    labels = bytes(owner[i] or (len(CATEGORIES) + 1 if inside[i] else len(CATEGORIES) + 2)
+                   for i in range(len(xml)))
+    compressed = deflated_size(xml)
+    categories = {}
+    for index, name in enumerate(names, 1):
+        kept = bytes(b for b, label in zip(xml, labels) if label != index)
+        size = len(xml) - len(kept)
+        if size:
+            categories[name] = {"bytes": size, "compressed": compressed - deflated_size(kept)}
+
+    patterns = defaultdict(lambda: {"cells": 0, "bytes": 0, "example": None})
+    spans = {}
+    for m in CELL_FORMULA_RE.finditer(xml):
+        col, row, text = m.group(1).decode(), int(m.group(2)), m.group(3)
+        formula = unescape(text.decode("utf-8"), {"&quot;": '"', "&apos;": "'"})
+        key = pattern_key(formula, row, column_index_from_string(col))
+        entry = patterns[key]
+        entry["cells"] += 1
+        entry["bytes"] += len(text)
+        entry["example"] = entry["example"] or f"{col}{row}: ={formula}"
+        spans.setdefault(key, []).append(m.span(3))
+    ranked = sorted(patterns.items(), key=lambda kv: -kv[1]["bytes"])
+    for key, entry in ranked[:top]:
+        # marginal compressed cost of the pattern's formula text
+        pieces, last = [], 0
+        for start, end in spans[key]:
+            pieces.append(xml[last:start])
+            last = end
+        pieces.append(xml[last:])
+        entry["compressed"] = compressed - deflated_size(b"".join(pieces))
+    return {
+        "categories": categories,
+        "formula_patterns": [dict(entry, key=key) for key, entry in ranked],
+        "formula_cells": sum(entry["cells"] for entry in patterns.values()),
+    }
+
+
+def analyse(path, top=8):
+    """Report for one package: per-part sizes plus a breakdown of every worksheet."""
+    with zipfile.ZipFile(path) as package:
+        titles = sheet_titles(package)
+        parts = []
+        for info in package.infolist():
+            part = {"name": info.filename, "bytes": info.file_size,
+                    "compressed": info.compress_size}
+            if info.filename in titles:
+                part["sheet"] = titles[info.filename]
+                part.update(sheet_breakdown(package.read(info.filename), top))
+            parts.append(part)
+    parts.sort(key=lambda p: -p["compressed"])
+    return {
+        "path": path,
+        "file_bytes": os.path.getsize(path),
+        "bytes": sum(p["bytes"] for p in parts),
+        "compressed": sum(p["compressed"] for p in parts),
+        "parts": parts,
+    }
+
+
+def check_budget(report, budget):
+    """[(what, size, limit)] for everything over budget."""
+    limits = budget.get(os.path.basename(report["path"]))
+    if limits is None:
+        return []
+    if not isinstance(limits, dict):
+        limits = {"total": limits}
+    over = []
+    if "total" in limits and report["file_bytes"] > limits["total"]:
+        over.append(("total", report["file_bytes"], limits["total"]))
+    sizes = {p["name"]: p["compressed"] for p in report["parts"]}
+    for part, limit in limits.items():
+        if part != "total" and sizes.get(part, 0) > limit:
+            over.append((part, sizes[part], limit))
+    return over
+
+
+def _kb(n):
+    return f"{n / 1024:,.1f} KB"
+
+
+def render(report, top=8):
+    lines = [f"{report['path']}: {_kb(report['file_bytes'])} on disk, "
+             f"{_kb(report['bytes'])} uncompressed"]
+    lines.append(f"  {'part':<44} {'compressed':>12} {'share':>6} {'uncompressed':>13} {'ratio':>6}")
+    total = report["compressed"] or 1
+    for part in report["parts"]:
+        name = part["name"] + (f" ({part['sheet']})" if "sheet" in part else "")
+        lines.append(f"  {name:<44} {_kb(part['compressed']):>12} "
+                     f"{part['compressed'] / total:6.1%} {_kb(part['bytes']):>13} "
+                     f"{part['bytes'] / max(part['compressed'], 1):5.1f}x")
+    for part in report["parts"]:
+        if "categories" not in part:
+            continue
+        lines.append(f"\n  {part['name']} ({part['sheet']}): {part['formula_cells']:,} formula cells")
+        lines.append(f"    {'category':<22} {'uncompressed':>13} {'share':>6} {'saves if removed':>17}")
+        for name, entry in sorted(part["categories"].items(), key=lambda kv: -kv[1]["bytes"]):
+            lines.append(f"    {name:<22} {_kb(entry['bytes']):>13} "
+                         f"{entry['bytes'] / part['bytes']:6.1%} {_kb(entry['compressed']):>17}")
+        if part["formula_patterns"]:
+            lines.append(f"    top formula patterns ({len(part['formula_patterns'])} distinct):")
+            for entry in part["formula_patterns"][:top]:
+                example = entry["example"]
+                if len(example) > 70:
+                    example = example[:67] + "..."
+                lines.append(f"      {entry['cells']:6,} cells {_kb(entry['bytes']):>11} "
+                             f"(saves {_kb(entry.get('compressed', 0))})  {example}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("workbooks", nargs="+")
+    parser.add_argument("--top", type=int, default=8, help="formula patterns listed per sheet")
+    parser.add_argument("--json", help="write the full report here")
+    parser.add_argument("--budget", help=f"size budget JSON, e.g. {os.path.basename(DEFAULT_BUDGET)}")
+    args = parser.parse_args(argv)
+
+    reports = [analyse(path, args.top) for path in args.workbooks]
+    print("\n\n".join(render(report, args.top) for report in reports))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+
+    if not args.budget:
+        return 0
+    with open(args.budget) as f:
+        budget = json.load(f)
+    over = [(report["path"], *item) for report in reports for item in check_budget(report, budget)]
+    if not over:
+        print(f"\nAll within budget ({args.budget}).")
+        return 0
+    print(f"\nOver budget ({args.budget}):")
+    for path, what, size, limit in over:
+        print(f"  {os.path.basename(path)} {what}: {size:,} > {limit:,} bytes")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
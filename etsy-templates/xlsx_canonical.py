@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Deterministic .xlsx serialization for the Etsy template generators.
+Identical workbook content always produces identical bytes on disk.
+
+BUILD_WORKERS=N renders streamed sheet blocks (sheet_stream) in N forked
+processes and stitches them into the package; 0 means one per core.
+"""
+
+import datetime
+import io
+import os
+import re
+import sys
+import zipfile
+
+from openpyxl.drawing.spreadsheet_drawing import SpreadsheetDrawing
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.styles.numbers import BUILTIN_FORMATS_MAX_SIZE
+from openpyxl.utils import column_index_from_string
+from openpyxl.utils.indexed_list import IndexedList
+from openpyxl.writer.excel import ExcelWriter
+
+from sheet_stream import (
+    ParallelBlocks, StreamingWorksheetWriter, fork_available, streamed_blocks,
+    streamed_style_arrays,
+)
+
+# ── Canonical settings ──
+# SOURCE_DATE_EPOCH (reproducible-builds convention) overrides the fixed date.
+CANONICAL_TIMESTAMP = datetime.datetime(2026, 1, 1, 0, 0, 0)
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)   # earliest date a zip entry can hold
+COMPRESS_LEVEL = 6
+FILE_ATTRIBUTES = 0o100644 << 16
+
+# Well-known parts first, then everything else in natural name order
+# (sheet2.xml before sheet10.xml).
+PART_ORDER = (
+    "[Content_Types].xml",
+    "_rels/.rels",
+    "docProps/app.xml",
+    "docProps/core.xml",
+    "docProps/custom.xml",
+    "xl/workbook.xml",
+    "xl/_rels/workbook.xml.rels",
+    "xl/styles.xml",
+    "xl/theme/theme1.xml",
+    "xl/sharedStrings.xml",
+)
+
+# (StyleArray field, workbook table, entries pinned to their slot)
+STYLE_TABLES = (
+    ("fontId", "_fonts", 1),
+    ("fillId", "_fills", 2),          # none + gray125 are required by Excel
+    ("borderId", "_borders", 1),
+    ("alignmentId", "_alignments", 1),
+    ("protectionId", "_protections", 1),
+)
+
+CORE_DATE_RE = re.compile(
+    rb"(<dcterms:(created|modified)[^>]*>)[^<]*(</dcterms:\2>)")
+
+
+def canonical_timestamp():
+    """Timestamp stamped into docProps; honours SOURCE_DATE_EPOCH."""
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if epoch:
+        return datetime.datetime.fromtimestamp(
+            int(epoch), tz=datetime.timezone.utc).replace(tzinfo=None)
+    return CANONICAL_TIMESTAMP
+
+
+def part_sort_key(name):
+    """Sort key giving well-known parts a fixed slot and the rest natural order."""
+    if name in PART_ORDER:
+        return (0, PART_ORDER.index(name), ())
+    pieces = re.split(r"(\d+)", name)
+    return (1, 0, tuple((0, int(p), "") if p.isdigit() else (1, 0, p)
+                        for p in pieces))
+
+
+# ═══════════════════════════════════════════════════════════════
+# STYLE INDEX CANONICALIZATION
+# ═══════════════════════════════════════════════════════════════
+def iter_style_arrays(wb):
+    """Yield every StyleArray in the order the writer meets it."""
+    for named in wb._named_styles:
+        yield named._style
+    for ws in wb.worksheets:
+        for key in sorted(ws.column_dimensions, key=column_index_from_string):
+            yield ws.column_dimensions[key]._style
+        rows = {}
+        for (row, col), cell in ws._cells.items():
+            rows.setdefault(row, []).append((col, cell))
+        starts = {block.min_row for block in streamed_blocks(ws)}
+        for row in sorted(set(rows) | set(ws.row_dimensions) | starts):
+            if row in ws.row_dimensions:
+                yield ws.row_dimensions[row]._style
+            yield from streamed_style_arrays(ws, row)
+            for _, cell in sorted(rows.get(row, ()), key=lambda item: item[0]):
+                yield cell._style
+
+
+def canonicalize_styles(wb):
+    """
+    Renumber the font/fill/border/alignment/protection/number-format tables in
+    first-use order, so the order in which a script assigned styles no longer
+    leaks into styles.xml. Unused entries are kept, after the used ones.
+    """
+    arrays = []
+    seen = set()
+    for style in iter_style_arrays(wb):
+        if style is not None and id(style) not in seen:
+            seen.add(id(style))
+            arrays.append(style)
+
+    for field, table_name, pinned in STYLE_TABLES:
+        table = getattr(wb, table_name)
+        mapping = {i: i for i in range(min(pinned, len(table)))}
+        for style in arrays:
+            mapping.setdefault(getattr(style, field), len(mapping))
+        for old in range(len(table)):
+            mapping.setdefault(old, len(mapping))
+        ordered = [None] * len(table)
+        for old, new in mapping.items():
+            ordered[new] = table[old]
+        setattr(wb, table_name, IndexedList(ordered))
+        for style in arrays:
+            setattr(style, field, mapping[getattr(style, field)])
+
+    # Custom number formats live at BUILTIN_FORMATS_MAX_SIZE + list index
+    formats = wb._number_formats
+    fmt_map = {}
+    for style in arrays:
+        if style.numFmtId >= BUILTIN_FORMATS_MAX_SIZE:
+            fmt_map.setdefault(style.numFmtId - BUILTIN_FORMATS_MAX_SIZE,
+                               len(fmt_map))
+    for old in range(len(formats)):
+        fmt_map.setdefault(old, len(fmt_map))
+    ordered = [None] * len(formats)
+    for old, new in fmt_map.items():
+        ordered[new] = formats[old]
+    wb._number_formats = IndexedList(ordered)
+    for style in arrays:
+        if style.numFmtId >= BUILTIN_FORMATS_MAX_SIZE:
+            style.numFmtId = BUILTIN_FORMATS_MAX_SIZE + fmt_map[
+                style.numFmtId - BUILTIN_FORMATS_MAX_SIZE]
+
+    # cellXfs are re-collected by the writer in write order
+    wb._cell_styles = IndexedList([StyleArray()])
+
+
+# ═══════════════════════════════════════════════════════════════
+# PACKAGE WRITING
+# ═══════════════════════════════════════════════════════════════
+def build_workers():
+    """Worker processes for streamed blocks: BUILD_WORKERS (0 = every core), default 1."""
+    workers = int(os.environ.get("BUILD_WORKERS", "1"))
+    return workers if workers > 0 else os.cpu_count() or 1
+
+
+class CanonicalWriter(ExcelWriter):
+    """
+    ExcelWriter that streams each sheet's XML straight into the archive.
+    With *blocks* (a sheet_stream.ParallelBlocks), sheets holding streamed
+    blocks are kept back until their rows come back from the workers.
+    """
+
+    def __init__(self, workbook, archive, blocks=None):
+        super().__init__(workbook, archive)
+        self.blocks = blocks
+        self.stitched = []
+
+    def write_worksheet(self, ws):
+        ws._drawing = SpreadsheetDrawing()
+        ws._drawing.charts = ws._charts
+        ws._drawing.images = ws._images
+        if self.blocks is not None and streamed_blocks(ws):
+            out = io.BytesIO()
+            writer = StreamingWorksheetWriter(ws, out, defer=self.blocks.defer)
+            writer.write()
+            self.stitched.append((ws.path[1:], out.getvalue()))
+        else:
+            with self._archive.open(ws.path[1:], "w") as out:
+                writer = StreamingWorksheetWriter(ws, out)
+                writer.write()
+        ws._rels = writer._rels
+        self.manifest.append(ws)
+
+    def write_data(self):
+        super().write_data()
+        for name, xml in self.stitched:
+            self._archive.writestr(name, self.blocks.splice(xml))
+
+
+def repack(data, timestamp=None, compresslevel=COMPRESS_LEVEL):
+    """Rewrite an .xlsx package with fixed entry metadata and part order."""
+    stamp = (timestamp or canonical_timestamp()).strftime(
+        "%Y-%m-%dT%H:%M:%SZ").encode()
+    with zipfile.ZipFile(io.BytesIO(data)) as src:
+        parts = {info.filename: src.read(info) for info in src.infolist()}
+
+    if "docProps/core.xml" in parts:
+        parts["docProps/core.xml"] = CORE_DATE_RE.sub(
+            lambda m: m.group(1) + stamp + m.group(3), parts["docProps/core.xml"])
+
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w") as dst:
+        for name in sorted(parts, key=part_sort_key):
+            info = zipfile.ZipInfo(name, date_time=ZIP_DATE_TIME)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.create_system = 0
+            info.external_attr = FILE_ATTRIBUTES
+            dst.writestr(info, parts[name], compresslevel=compresslevel)
+    return out.getvalue()
+
+
+def canonical_bytes(wb, timestamp=None, compresslevel=COMPRESS_LEVEL, workers=None):
+    """
+    Serialize *wb* to canonical .xlsx bytes. With more than one worker,
+    streamed blocks are rendered in parallel; the bytes are the same.
+    """
+    timestamp = timestamp or canonical_timestamp()
+    workers = build_workers() if workers is None else workers
+    canonicalize_styles(wb)
+    wb.properties.created = timestamp
+    wb.properties.modified = timestamp
+
+    parallel = (workers > 1 and fork_available()
+                and any(streamed_blocks(ws) for ws in wb.worksheets))
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        if parallel:
+            with ParallelBlocks(wb, workers) as blocks:
+                CanonicalWriter(wb, archive, blocks).write_data()
+        else:
+            CanonicalWriter(wb, archive).write_data()
+    return repack(buffer.getvalue(), timestamp, compresslevel)
+
+
+def save_canonical(wb, filename, timestamp=None, compresslevel=COMPRESS_LEVEL, workers=None):
+    """Drop-in replacement for wb.save() with byte-for-byte reproducible output."""
+    data = canonical_bytes(wb, timestamp, compresslevel, workers)
+    with open(filename, "wb") as fh:
+        fh.write(data)
+    return data
+
+
+def main(argv=None):
+    """Canonicalize existing .xlsx files in place (zip metadata and docProps only)."""
+    paths = sys.argv[1:] if argv is None else argv
+    if not paths:
+        print("usage: python xlsx_canonical.py FILE.xlsx [FILE.xlsx ...]")
+        return 2
+    for path in paths:
+        with open(path, "rb") as fh:
+            data = fh.read()
+        canonical = repack(data)
+        if canonical != data:
+            with open(path, "wb") as fh:
+                fh.write(canonical)
+            print(f"Canonicalized: {path}")
+        else:
+            print(f"Unchanged: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
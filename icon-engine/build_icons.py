@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Build every extension's icons in one command.
+Finds each extension's icon-spec.json (or, for an extension without one, a
+legacy generate-icons.py / generate_icons.py script) and renders them
+across a process pool. Fresh PNGs go through optimize_png before they are
+stamped. An extension is skipped when its build key - the hash of its
+spec or script, the generator version and the optimizer version ("raw"
+with --no-optimize) - matches the last build and every PNG it wrote is
+still on disk unchanged. Prints the time each extension took and, under
+it, each icon (render, save and optimize).
+
+Build stamps live in $ICON_CACHE_DIR, or .icon-cache/ next to this file.
+
+Usage:  python build_icons.py [EXTENSION ...] [--jobs N] [--force] [--no-optimize]
+                              [--cache-dir DIR]
+"""
+
+import argparse
+import contextlib
+import glob
+import hashlib
+import io
+import json
+import os
+import runpy
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import fonts
+import icon_engine
+import optimize_png
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.path.join(HERE, ".icon-cache")
+ENGINE_SOURCES = ("icon_engine.py", "gradients.py", "fonts.py")
+FONT_DIR = os.path.join(HERE, "fonts")
+
+
+def _sha256(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def generator_version():
+    """
+    Hash of the engine's own source and of the committed fonts: any change
+    to either rebuilds every spec.
+    """
+    digest = hashlib.sha256()
+    fonts_used = sorted(name for name in os.listdir(FONT_DIR)
+                        if name.lower().endswith(fonts.FONT_EXTENSIONS))
+    for path in ([os.path.join(HERE, name) for name in ENGINE_SOURCES]
+                 + [os.path.join(FONT_DIR, name) for name in fonts_used]):
+        digest.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def optimizer_version(optimize=True):
+    """Hash of optimize_png's source, or "raw" when the PNGs are not optimized."""
+    return _sha256(os.path.join(HERE, "optimize_png.py"))[:16] if optimize else "raw"
+
+
+def find_sources(root=icon_engine.ROOT):
+    """{extension: (kind, path)}: its spec, else its legacy generator script."""
+    sources = {name: ("spec", path) for name, path in icon_engine.find_specs(root).items()}
+    for path in sorted(glob.glob(os.path.join(root, "*", "generate[-_]icons.py"))):
+        name = os.path.basename(os.path.dirname(path))
+        sources.setdefault(name, ("script", path))
+    return dict(sorted(sources.items()))
+
+
+def build_key(kind, path, version, optimizer):
+    # a script is its own generator; a spec also depends on the engine; both
+    # depend on whether (and by which optimizer) the PNGs were optimized
+    return f"{kind}:{_sha256(path)[:16]}:{version if kind == 'spec' else '-'}:{optimizer}"
+
+
+# ---------------------------------------------------------------------------
+# stamps
+# ---------------------------------------------------------------------------
+def cache_dir():
+    return os.environ.get("ICON_CACHE_DIR") or DEFAULT_CACHE_DIR
+
+
+def stamp_path(name, directory=None):
+    return os.path.join(directory or cache_dir(), f"{name}.json")
+
+
+def up_to_date(name, key, root, directory=None):
+    """True when the last build of *name* had *key* and its outputs are untouched."""
+    try:
+        with open(stamp_path(name, directory)) as f:
+            stamp = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if stamp.get("key") != key or not stamp.get("outputs"):
+        return False
+    for rel, digest in stamp["outputs"].items():
+        path = os.path.join(root, rel)
+        if not os.path.exists(path) or _sha256(path) != digest:
+            return False
+    return True
+
+
+def write_stamp(name, key, written, root, directory=None):
+    path = stamp_path(name, directory)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    outputs = {os.path.relpath(p, root): _sha256(p) for p in sorted(written)}
+    with open(path, "w") as f:
+        json.dump({"key": key, "outputs": outputs}, f, indent=1, sort_keys=True)
+
+
+# ---------------------------------------------------------------------------
+# building (runs in the pool)
+# ---------------------------------------------------------------------------
+def _run_script(path):
+    """Run a legacy generator in its own directory; returns the PNGs it (re)wrote."""
+    base = os.path.dirname(path)
+    started = time.time()
+    cwd = os.getcwd()
+    os.chdir(base)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            runpy.run_path(path, run_name="__main__")
+    finally:
+        os.chdir(cwd)
+    return [p for p in glob.glob(os.path.join(base, "**", "*.png"), recursive=True)
+            if os.path.getmtime(p) >= started]
+
+
+def build_one(name, kind, path, optimize=True):
+    """
+    (name, seconds, paths written, {path: seconds}) for one extension. Each
+    icon's time covers rendering, saving and optimizing it; a legacy
+    script's own run only counts in the extension total.
+    """
+    start = time.perf_counter()
+    timings = {}
+    if kind == "spec":
+        written = icon_engine.render_extension(path, timings=timings)
+    else:
+        written = _run_script(path)
+    if optimize:
+        for png in written:
+            optimize_start = time.perf_counter()
+            optimize_png.optimize_file(png)
+            timings[png] = timings.get(png, 0.0) + time.perf_counter() - optimize_start
+    return name, time.perf_counter() - start, written, timings
+
+
+def build(names=None, jobs=None, force=False, root=icon_engine.ROOT, directory=None,
+          optimize=True):
+    """
+    Build the icons of *names* (default: every extension with a spec or
+    script), each followed by the PNG optimizer unless *optimize* is
+    false; returns {name: (status, seconds, icons)} with status "built"
+    or "cached" and icons {path relative to *root*: seconds} for the
+    files built.
+    """
+    sources = find_sources(root)
+    unknown = sorted(set(names or ()) - set(sources))
+    if unknown:
+        raise SystemExit(f"no icon spec or script for {', '.join(unknown)}")
+    version, optimizer = generator_version(), optimizer_version(optimize)
+    results, todo = {}, []
+    for name in names or sources:
+        kind, path = sources[name]
+        key = build_key(kind, path, version, optimizer)
+        if not force and up_to_date(name, key, root, directory):
+            results[name] = ("cached", 0.0, {})
+        else:
+            todo.append((name, kind, path, key))
+
+    if jobs == 1 or len(todo) <= 1:
+        done = [build_one(name, kind, path, optimize) for name, kind, path, _ in todo]
+    else:
+        with ProcessPoolExecutor(jobs) as pool:
+            futures = [pool.submit(build_one, name, kind, path, optimize)
+                       for name, kind, path, _ in todo]
+            done = [future.result() for future in futures]
+    for (name, _, _, key), (_, seconds, written, timings) in zip(todo, done):
+        write_stamp(name, key, written, root, directory)
+        results[name] = ("built", seconds, {os.path.relpath(p, root): timings.get(p)
+                                            for p in written})
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("extensions", nargs="*",
+                        help="extension directory names (default: all)")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count(),
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--force", action="store_true", help="rebuild even when up to date")
+    parser.add_argument("--no-optimize", action="store_true",
+                        help="write the PNGs as rendered (skip optimize_png)")
+    parser.add_argument("--cache-dir", help=f"default: $ICON_CACHE_DIR or {DEFAULT_CACHE_DIR}")
+    args = parser.parse_args(argv)
+
+    names = [os.path.basename(os.path.normpath(e)) for e in args.extensions]
+    start = time.perf_counter()
+    results = build(names, args.jobs, args.force, directory=args.cache_dir,
+                    optimize=not args.no_optimize)
+    wall = time.perf_counter() - start
+    for name, (status, seconds, icons) in results.items():
+        detail = f"{seconds * 1000:8.1f} ms  {len(icons)} files" if status == "built" else ""
+        print(f"  {name:<32} {status:<7} {detail}")
+        for rel, icon_seconds in icons.items():
+            icon_ms = "-" if icon_seconds is None else f"{icon_seconds * 1000:.1f}"
+            print(f"      {os.path.relpath(rel, name):<36} {icon_ms:>8} ms")
+    built = sum(status == "built" for status, _, _ in results.values())
+    print(f"{built} built, {len(results) - built} up to date in {wall * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
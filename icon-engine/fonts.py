@@ -0,0 +1,84 @@
+"""
+Font resolution for icon text.
+Specs name fonts by file name ("DejaVuSans.ttf"; "Helvetica.ttc#1"
+picks the second face of a collection) rather than by path. The font
+directories are scanned once per process into a file-name index; every
+resolved name and every (path, size) FreeType font is cached across all
+icons. A name that is not installed raises FontNotFound instead of
+quietly falling back to Pillow's bitmap font.
+
+The fonts the specs use (DejaVu Sans and DejaVu Sans Mono, regular weight
+like the Helvetica and Menlo faces the original icons were drawn with) are
+committed in icon-engine/fonts/, so they do not depend on what the host
+has installed, and build_icons hashes them into its generator version.
+
+Directories searched, in order: $ICON_FONT_DIRS (os.pathsep-separated),
+icon-engine/fonts/, then the usual macOS, Linux and Windows font folders.
+"""
+
+import functools
+import os
+
+from PIL import ImageFont
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FONT_EXTENSIONS = (".ttf", ".otf", ".ttc")
+SYSTEM_FONT_DIRS = (
+    "/System/Library/Fonts", "/Library/Fonts", "~/Library/Fonts",
+    "/usr/share/fonts", "/usr/local/share/fonts", "~/.local/share/fonts", "~/.fonts",
+    os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts"),
+)
+
+
+class FontNotFound(LookupError):
+    """None of the requested fonts is installed."""
+
+
+def font_dirs():
+    extra = [d for d in os.environ.get("ICON_FONT_DIRS", "").split(os.pathsep) if d]
+    dirs = extra + [os.path.join(HERE, "fonts")] + list(SYSTEM_FONT_DIRS)
+    return tuple(os.path.expanduser(d) for d in dirs)
+
+
+@functools.lru_cache(maxsize=None)
+def font_index(dirs=None):
+    """{lower-case file name: path}, first directory wins; scanned once per *dirs*."""
+    index = {}
+    for directory in dirs or font_dirs():
+        for base, subdirs, files in os.walk(directory):
+            subdirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(FONT_EXTENSIONS):
+                    index.setdefault(name.lower(), os.path.join(base, name))
+    return index
+
+
+@functools.lru_cache(maxsize=None)
+def resolve(names, dirs=None):
+    """
+    (path, face index) of the first of *names* that is installed. Absolute
+    paths are used as they are when they exist.
+    """
+    index = font_index(dirs)
+    for name in names:
+        filename, _, face = name.partition("#")
+        path = filename if os.path.isabs(filename) else index.get(filename.lower())
+        if path and os.path.exists(path):
+            return path, int(face or 0)
+    searched = ", ".join(dirs or font_dirs())
+    raise FontNotFound(f"none of {', '.join(names)} is installed (searched {searched}; "
+                       "add a directory with ICON_FONT_DIRS)")
+
+
+@functools.lru_cache(maxsize=None)
+def load(path, size, face=0):
+    """The FreeType font for *path* at *size*, shared by every icon that uses it."""
+    return ImageFont.truetype(path, size, index=face)
+
+
+def font(names, size, dirs=None):
+    """*names* is a file name or a tuple of them, tried in order."""
+    if isinstance(names, str):
+        names = (names,)
+    path, face = resolve(tuple(names), dirs)
+    return load(path, size, face)
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Declarative icon engine for the browser extensions.
+Each extension describes its icon in <extension>/icon-spec.json: the sizes
+to write, where to write them, and a stack of layers (shapes, gradients,
+text) in a 128-unit design space that is scaled to every output size. All
+icons render in one process and share the font and gradient caches, so a
+new extension needs a spec, not another script.
+
+    {
+      "name": "NicheScout",
+      "sizes": [16, 48, 128],
+      "outputs": ["icons", "firefox/icons"],
+      "hint": 16,
+      "layers": [
+        {"shape": "rounded_rect", "box": [4, 4, 124, 124], "radius": 24, "fill": "#6366f1"},
+        {"shape": "ellipse", "box": [22, 20, 78, 76], "outline": "#ffffff",
+         "width": 6, "min_width": 2},
+        {"shape": "group", "min_size": 48, "layers": [...]}
+      ]
+    }
+
+Shapes: rect, rounded_rect, ellipse (box, radius, fill, outline, width),
+polygon (points, fill, outline, width), line (points, fill, width, joint),
+arc (box, start, end, fill, width), text (text, font - a file name or list
+of them, see fonts.py - size, min_font, fill, center) and group (layers).
+Any layer can carry min_size / max_size to apply only to some output sizes. Colours are "#rrggbb",
+"#rrggbbaa" or [r, g, b(, a)]. A fill can be a gradient instead:
+{"linear": [from_colour, to_colour], "from": [x, y], "to": [x, y]},
+{"radial": [centre_colour, edge_colour]} (across the layer's box) or
+{"conic": [colour, ...], "center": [x, y], "angle": degrees}; a gradient
+takes any number of colours, evenly spaced, or [offset, colour] pairs.
+Gradients are composited over what is underneath, inside the layer's
+shape (see gradients.py). Solid fills replace pixels the way ImageDraw
+does.
+
+Rendering: every distinct artwork is drawn once, as a 512 px master
+("master" to change it), and each size is box-filtered down a pyramid of
+halvings with a final Lanczos step, so all sizes get the same antialiasing.
+min_width / min_radius / min_font are output pixels: where they change the
+artwork at a small size, that size gets its own master. "hint": N renders
+sizes up to N px (true: 32) on their own pixel grid instead, so straight
+edges stay crisp. --store also writes the store sizes (16, 32, 48, 96, 128)
+and promo tiles (440x280, 1400x560) into <extension>/store.
+
+Usage:  python icon_engine.py [EXTENSION_DIR ...] [--out DIR] [--store] [--list]
+        (--out DIR with several extensions writes DIR/<extension>/)
+"""
+
+import argparse
+import functools
+import glob
+import json
+import os
+import sys
+import time
+
+from PIL import Image, ImageColor, ImageDraw
+
+import fonts
+import gradients
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+SPEC_NAME = "icon-spec.json"
+DESIGN_SIZE = 128
+MASTER_SIZE = 512
+HINT_SUPERSAMPLE = 8
+STORE_SIZES = (16, 32, 48, 96, 128)
+PROMO_TILES = {"promo-small": (440, 280), "promo-marquee": (1400, 560)}
+SHAPES = ("rect", "rounded_rect", "ellipse", "polygon", "line", "arc", "text", "group")
+
+
+class SpecError(ValueError):
+    """An icon spec that cannot be rendered."""
+
+
+# ---------------------------------------------------------------------------
+# specs
+# ---------------------------------------------------------------------------
+def find_specs(root=ROOT):
+    """{extension directory name: spec path} for every extension with a spec."""
+    paths = sorted(glob.glob(os.path.join(root, "*", SPEC_NAME)))
+    return {os.path.basename(os.path.dirname(p)): p for p in paths}
+
+
+def load_spec(path):
+    with open(path) as f:
+        spec = json.load(f)
+    for key in ("sizes", "layers"):
+        if key not in spec:
+            raise SpecError(f"{path}: missing {key!r}")
+    _check_layers(spec["layers"], path)
+    return spec
+
+
+def _check_layers(layers, path):
+    for layer in layers:
+        if layer.get("shape") not in SHAPES:
+            raise SpecError(f"{path}: unknown shape {layer.get('shape')!r}")
+        if layer["shape"] == "text" and not layer.get("font"):
+            raise SpecError(f"{path}: text {layer.get('text')!r} names no font")
+        if layer["shape"] == "group":
+            _check_layers(layer["layers"], path)
+
+
+# ---------------------------------------------------------------------------
+# shared caches
+# ---------------------------------------------------------------------------
+@functools.lru_cache(maxsize=None)
+def color(value):
+    """RGBA tuple for "#rrggbb", "#rrggbbaa", a colour name or [r, g, b(, a)]."""
+    if isinstance(value, str):
+        rgba = ImageColor.getrgb(value)
+    else:
+        rgba = tuple(value)
+    return rgba if len(rgba) == 4 else (*rgba, 255)
+
+
+def _hashable(value):
+    return tuple(value) if isinstance(value, list) else value
+
+
+# ---------------------------------------------------------------------------
+# rendering
+# ---------------------------------------------------------------------------
+class _Canvas:
+    def __init__(self, pixels, scale, snap=None):
+        self.img = Image.new("RGBA", (pixels, pixels), (0, 0, 0, 0))
+        self.draw = ImageDraw.Draw(self.img)
+        self.scale = scale
+        self.snap = snap
+
+    def _px(self, value):
+        px = value * self.scale
+        return round(px / self.snap) * self.snap if self.snap else px
+
+    def box(self, values):
+        """[x0, y0, x1, y1] in pixels; snapped boxes cover whole pixels, at least one."""
+        if not self.snap:
+            return [v * self.scale for v in values]
+        x0, y0, x1, y1 = (self._px(v) for v in values)
+        return [x0, y0, max(x1, x0 + self.snap) - 1, max(y1, y0 + self.snap) - 1]
+
+    def points(self, points):
+        return [(self._px(x), self._px(y)) for x, y in points]
+
+    def width(self, layer, default=0):
+        if "width" not in layer:
+            return default
+        return max(1, round(layer["width"] * self.scale))
+
+
+def _stops(colours):
+    """Gradient stops as hashable RGBA tuples, or (offset, RGBA) pairs."""
+    if len(colours) < 2:
+        raise SpecError(f"a gradient needs at least two colours, got {colours!r}")
+    return tuple((c[0], color(_hashable(c[1]))) if len(c) == 2 and not isinstance(c, str)
+                 else color(_hashable(c)) for c in colours)
+
+
+def _gradient_fill(canvas, layer, fill):
+    width, height = canvas.img.size
+    if "linear" in fill:
+        start, end = canvas.points([fill["from"], fill["to"]])
+        field, stops = gradients.linear_field(width, height, start, end), fill["linear"]
+    elif "radial" in fill:
+        field = gradients.radial_field(width, height, canvas.box(layer["box"]))
+        stops = fill["radial"]
+    elif "conic" in fill:
+        if "center" in fill:
+            center = canvas.points([fill["center"]])[0]
+        else:
+            x0, y0, x1, y1 = canvas.box(layer["box"])
+            center = ((x0 + x1) / 2, (y0 + y1) / 2)
+        field = gradients.conic_field(width, height, center, fill.get("angle", 0))
+        stops = fill["conic"]
+    else:
+        raise SpecError(f"unknown gradient {sorted(fill)}")
+    mask = Image.new("L", canvas.img.size, 0)
+    _draw_shape(ImageDraw.Draw(mask), canvas, dict(layer, outline=None), 255)
+    gradients.composite(canvas.img, field, gradients.ramp(_stops(stops)), mask)
+
+
+def _draw_shape(draw, canvas, layer, fill):
+    shape = layer["shape"]
+    outline = color(_hashable(layer["outline"])) if layer.get("outline") else None
+    width = canvas.width(layer, default=1 if outline else 0)
+    if shape == "rect":
+        draw.rectangle(canvas.box(layer["box"]), fill=fill, outline=outline, width=width)
+    elif shape == "rounded_rect":
+        radius = round(layer.get("radius", 0) * canvas.scale)
+        draw.rounded_rectangle(canvas.box(layer["box"]), radius=radius, fill=fill,
+                               outline=outline, width=width)
+    elif shape == "ellipse":
+        draw.ellipse(canvas.box(layer["box"]), fill=fill, outline=outline, width=width)
+    elif shape == "polygon":
+        draw.polygon(canvas.points(layer["points"]), fill=fill, outline=outline, width=width)
+    elif shape == "line":
+        draw.line(canvas.points(layer["points"]), fill=fill, width=canvas.width(layer, 1),
+                  joint=layer.get("joint"))
+    elif shape == "arc":
+        draw.arc(canvas.box(layer["box"]), start=layer["start"], end=layer["end"], fill=fill,
+                 width=canvas.width(layer, 1))
+
+
+def _draw_text(canvas, layer):
+    face = fonts.font(_hashable(layer["font"]), max(1, round(layer["size"] * canvas.scale)))
+    text = layer["text"]
+    left, top, right, bottom = canvas.draw.textbbox((0, 0), text, font=face)
+    cx, cy = canvas.points([layer.get("center", (DESIGN_SIZE / 2, DESIGN_SIZE / 2))])[0]
+    canvas.draw.text((cx - (right - left) / 2 - left, cy - (bottom - top) / 2 - top), text,
+                     fill=color(_hashable(layer["fill"])), font=face)
+
+
+def _draw_layers(canvas, layers):
+    for layer in layers:
+        shape = layer["shape"]
+        fill = layer.get("fill")
+        if shape == "text":
+            _draw_text(canvas, layer)
+        elif isinstance(fill, dict):
+            _gradient_fill(canvas, layer, fill)
+            if layer.get("outline"):
+                _draw_shape(canvas.draw, canvas, layer, None)
+        else:
+            _draw_shape(canvas.draw, canvas, layer, color(_hashable(fill)) if fill else None)
+
+
+# ---------------------------------------------------------------------------
+# render once, downsample to every size
+# ---------------------------------------------------------------------------
+# (value key, minimum key): minimums are output pixels, values design units
+_MINIMUMS = (("width", "min_width"), ("radius", "min_radius"), ("size", "min_font"))
+
+
+def resolve(layers, size):
+    """
+    The artwork at *size*: layers gated by min_size / max_size, groups
+    flattened and minimum widths, radii and font sizes folded into design
+    units. Sizes that resolve to the same artwork share one master render.
+    """
+    resolved = []
+    for layer in layers:
+        if size < layer.get("min_size", 0) or size > layer.get("max_size", size):
+            continue
+        if layer["shape"] == "group":
+            resolved.extend(resolve(layer["layers"], size))
+            continue
+        layer = {k: v for k, v in layer.items() if k not in ("min_size", "max_size")}
+        for key, minimum in _MINIMUMS:
+            if minimum in layer:
+                floor = layer.pop(minimum) * DESIGN_SIZE / size
+                if key in layer:
+                    layer[key] = max(layer[key], floor)
+        resolved.append(layer)
+    return resolved
+
+
+def _hint_sizes(spec):
+    hint = spec.get("hint", 0)
+    return hint if isinstance(hint, int) and not isinstance(hint, bool) else 32 * bool(hint)
+
+
+def render_master(layers, pixels, snap=None):
+    """Draw resolved *layers* once at *pixels* x *pixels*."""
+    canvas = _Canvas(pixels, pixels / DESIGN_SIZE, snap)
+    _draw_layers(canvas, layers)
+    return canvas.img
+
+
+def downsample(levels, size):
+    """
+    *size* x *size* from a pyramid of halvings ({pixels: image}, holding at
+    least the master). Box-filter halving while the level is at least twice
+    the target, then one Lanczos step; the halvings are kept in *levels* so
+    the next size starts from them.
+    """
+    pixels = min(p for p in levels if p >= size)
+    while pixels >= 2 * size and pixels % 2 == 0:
+        if pixels // 2 not in levels:
+            levels[pixels // 2] = levels[pixels].reduce(2)
+        pixels //= 2
+    if pixels == size:
+        return levels[pixels].copy()
+    return levels[pixels].resize((size, size), Image.LANCZOS)
+
+
+def render_sizes(spec, sizes=None, timings=None):
+    """
+    {size: icon} for *sizes* (default the spec's). Every distinct artwork is
+    drawn once at the master resolution ("master", default 512 px) and the
+    sizes sharing it are downsampled from it. Sizes up to "hint" (true means
+    32) get their own 8x master instead, with coordinates snapped to that
+    size's pixel grid so edges land crisply on pixels. A *timings* dict gets
+    {size: seconds}; a shared master counts towards the first size drawn.
+    """
+    master = spec.get("master", MASTER_SIZE)
+    hinted = _hint_sizes(spec)
+    pyramids = {}
+    icons = {}
+    for size in sorted(sizes or spec["sizes"], reverse=True):
+        start = time.perf_counter()
+        layers = resolve(spec["layers"], size)
+        if size <= hinted:
+            factor = max(1, min(master // size, HINT_SUPERSAMPLE))
+            key = (json.dumps(layers, sort_keys=True), size)
+            if key not in pyramids:
+                pixels = size * factor
+                pyramids[key] = {pixels: render_master(layers, pixels, snap=factor)}
+        else:
+            key = (json.dumps(layers, sort_keys=True), None)
+            if key not in pyramids:
+                pyramids[key] = {master: render_master(layers, master)}
+        icons[size] = downsample(pyramids[key], size)
+        if timings is not None:
+            timings[size] = time.perf_counter() - start
+    return icons
+
+
+def render(spec, size):
+    """The icon described by *spec* at *size* x *size* pixels."""
+    return render_sizes(spec, [size])[size]
+
+
+def promo_tile(spec, width, height):
+    """
+    A store promo tile: the icon centred on the spec's "promo_background"
+    (default: the first layer's solid fill) at 60% of the tile height.
+    """
+    background = spec.get("promo_background")
+    if background is None:
+        fills = [layer.get("fill") for layer in spec["layers"]
+                 if not isinstance(layer.get("fill"), (dict, type(None)))]
+        background = fills[0] if fills else "#ffffff"
+    tile = Image.new("RGBA", (width, height), color(_hashable(background)))
+    icon = render(spec, int(height * 0.6))
+    tile.alpha_composite(icon, ((width - icon.width) // 2, (height - icon.height) // 2))
+    return tile
+
+
+def render_extension(spec_path, out_dir=None, store=False, timings=None):
+    """
+    Write every size of one extension's icon; returns the paths written,
+    each once. With *store*, also the store sizes and promo tiles, into
+    <extension>/store (or *out_dir*, where a store size the spec also lists
+    is written only once). A *timings* dict gets {path: seconds to render
+    and save it}.
+    """
+    spec = load_spec(spec_path)
+    base = os.path.dirname(spec_path)
+    outputs = [out_dir] if out_dir else [os.path.join(base, d)
+                                         for d in spec.get("outputs", ["icons"])]
+    written = []
+    render_times = {}
+
+    def save(image, directory, name, rendering=0.0):
+        start = time.perf_counter()
+        path = os.path.join(directory, name)
+        if path in written:
+            return
+        os.makedirs(directory, exist_ok=True)
+        image.save(path, "PNG")
+        written.append(path)
+        if timings is not None:
+            timings[path] = rendering + time.perf_counter() - start
+
+    sizes = sorted(set(spec["sizes"]) | (set(STORE_SIZES) if store else set()))
+    icons = render_sizes(spec, sizes, render_times)
+    for size in spec["sizes"]:
+        for directory in outputs:
+            save(icons[size], directory, f"icon{size}.png", render_times.pop(size, 0.0))
+    if store:
+        directory = out_dir or os.path.join(base, "store")
+        for size in STORE_SIZES:
+            save(icons[size], directory, f"icon{size}.png", render_times.pop(size, 0.0))
+        for name, (width, height) in PROMO_TILES.items():
+            start = time.perf_counter()
+            tile = promo_tile(spec, width, height)
+            save(tile, directory, f"{name}-{width}x{height}.png", time.perf_counter() - start)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("extensions", nargs="*",
+                        help="extension directories (default: every one with a spec)")
+    parser.add_argument("--out", help="write here instead of the spec's outputs "
+                                      "(into DIR/<extension>/ when rendering several)")
+    parser.add_argument("--store", action="store_true",
+                        help="also write the store sizes and promo tiles (into <extension>/store)")
+    parser.add_argument("--list", action="store_true", help="list icon specs and exit")
+    args = parser.parse_args(argv)
+
+    specs = find_specs()
+    if args.list:
+        for name, path in specs.items():
+            print(f"{name:<32} {os.path.relpath(path, ROOT)}")
+        return 0
+    if args.extensions:
+        paths = [os.path.join(os.path.abspath(d), SPEC_NAME) for d in args.extensions]
+    else:
+        paths = list(specs.values())
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"no {SPEC_NAME} in {os.path.dirname(path)}", file=sys.stderr)
+            return 1
+        out = args.out
+        if out and len(paths) > 1:
+            # one flat directory would let each extension overwrite the last
+            out = os.path.join(out, os.path.basename(os.path.dirname(path)))
+        for written in render_extension(path, out, args.store):
+            print(f"Created {os.path.relpath(written, ROOT)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Perceptual image comparison for the golden icon tests.
+Two RGBA images are compared on premultiplied pixels (a colour change
+under full transparency is invisible, so it does not count). The
+comparison reports the largest and mean per-channel delta, the share of
+pixels that changed at all, and SSIM: the mean structural similarity over
+7x7 windows, per channel, computed with integral images so that a whole
+icon takes one pass of NumPy arithmetic. heatmap() draws expected,
+actual and a delta heatmap side by side for a failing pair.
+
+Usage:  python imagediff.py EXPECTED.png ACTUAL.png [--heatmap diff.png]
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image
+
+WINDOW = 7
+C1, C2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+
+# what a golden comparison tolerates: resampling or encoder noise, not artwork changes
+MAX_DELTA = 24
+MAX_MEAN_DELTA = 0.5
+MIN_SSIM = 0.99
+
+
+@dataclass
+class Diff:
+    max_delta: int
+    mean_delta: float
+    changed: float              # share of pixels with any channel changed
+    ssim: float
+
+    def ok(self, max_delta=MAX_DELTA, max_mean_delta=MAX_MEAN_DELTA, min_ssim=MIN_SSIM):
+        return (self.max_delta <= max_delta and self.mean_delta <= max_mean_delta
+                and self.ssim >= min_ssim)
+
+    def __str__(self):
+        return (f"max delta {self.max_delta}, mean delta {self.mean_delta:.3f}, "
+                f"{self.changed:.1%} of pixels changed, SSIM {self.ssim:.4f}")
+
+
+def premultiplied(image):
+    """(h, w, 4) float array: RGB scaled by alpha, plus alpha."""
+    rgba = np.asarray(image.convert("RGBA"), dtype=np.float64)
+    rgba[..., :3] *= rgba[..., 3:] / 255
+    return rgba
+
+
+def _window_sums(x, size):
+    """Sum of every size x size window of x (h, w, c) via an integral image."""
+    integral = np.zeros((x.shape[0] + 1, x.shape[1] + 1, x.shape[2]))
+    integral[1:, 1:] = x.cumsum(0).cumsum(1)
+    return (integral[size:, size:] - integral[:-size, size:]
+            - integral[size:, :-size] + integral[:-size, :-size])
+
+
+def ssim(a, b, window=WINDOW):
+    """Mean SSIM of two (h, w, c) float arrays over window x window patches."""
+    size = min(window, a.shape[0], a.shape[1])
+    n = size * size
+    mean_a, mean_b = _window_sums(a, size) / n, _window_sums(b, size) / n
+    var_a = _window_sums(a * a, size) / n - mean_a ** 2
+    var_b = _window_sums(b * b, size) / n - mean_b ** 2
+    cov = _window_sums(a * b, size) / n - mean_a * mean_b
+    index = ((2 * mean_a * mean_b + C1) * (2 * cov + C2)) / \
+        ((mean_a ** 2 + mean_b ** 2 + C1) * (var_a + var_b + C2))
+    return float(index.mean())
+
+
+def compare(expected, actual):
+    """Diff between two PIL images of the same size."""
+    if expected.size != actual.size:
+        raise ValueError(f"size {actual.size} != expected {expected.size}")
+    a, b = premultiplied(expected), premultiplied(actual)
+    delta = np.abs(np.rint(a) - np.rint(b))
+    return Diff(max_delta=int(delta.max()), mean_delta=float(delta.mean()),
+                changed=float((delta.max(axis=2) > 0).mean()), ssim=ssim(a, b))
+
+
+def heatmap(expected, actual, scale=None):
+    """Expected | actual | delta heatmap (black -> red -> yellow -> white), scaled up."""
+    delta = np.abs(premultiplied(expected) - premultiplied(actual)).max(axis=2)
+    level = np.clip(delta / max(delta.max(), 1), 0, 1)
+    heat = np.stack([np.clip(level * 3, 0, 1), np.clip(level * 3 - 1, 0, 1),
+                     np.clip(level * 3 - 2, 0, 1)], axis=-1)
+    heat = Image.fromarray((heat * 255).astype(np.uint8), "RGB").convert("RGBA")
+    width, height = expected.size
+    scale = scale or max(1, 256 // max(width, height))
+    sheet = Image.new("RGBA", (width * 3 + 2, height), (128, 128, 128, 255))
+    for i, image in enumerate((expected.convert("RGBA"), actual.convert("RGBA"), heat)):
+        sheet.alpha_composite(image, (i * (width + 1), 0))
+    return sheet.resize((sheet.width * scale, sheet.height * scale), Image.NEAREST)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("expected")
+    parser.add_argument("actual")
+    parser.add_argument("--heatmap", help="write expected | actual | heatmap here")
+    args = parser.parse_args(argv)
+
+    expected, actual = Image.open(args.expected), Image.open(args.actual)
+    diff = compare(expected, actual)
+    print(f"{'ok' if diff.ok() else 'DIFFERENT'}: {diff}")
+    if args.heatmap:
+        heatmap(expected, actual).save(args.heatmap)
+    return 0 if diff.ok() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
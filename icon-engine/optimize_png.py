@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+PNG size optimizer for the extension icons, store assets and listing images.
+Pillow writes PNGs with one filter heuristic at its default zlib level and
+keeps whatever metadata the source had. Each file is instead re-encoded
+from its pixels (no text, time, gamma or colour-profile chunks) in the
+smallest of:
+
+  - the narrowest lossless colour type: grey, grey + alpha, RGB or RGBA,
+    at 8 bits per channel;
+  - an exact palette when there are at most 256 colours, packed to 1, 2, 4
+    or 8 bits per pixel with the transparent entries first, so tRNS stays
+    short;
+  - a quantized 256-colour palette, only when no channel of any pixel moves
+    by more than --max-delta (default 4; 0 keeps palettes exact).
+
+Each candidate is filtered five ways (None, Sub, Up, Average, Paeth for
+every row) and adaptively (the row filter with the smallest sum of
+absolute differences). Each is deflated at level 9 with the default and
+filtered strategies, and the smallest stream wins. For images over 1 MB
+raw, the winner is picked on every 8th band of 16 rows, and only it is
+deflated in full. A file is only rewritten when it gets smaller, and the
+result is decoded back and compared before it replaces the original.
+
+Files run across a process pool. Results are cached by content hash in
+$PNG_CACHE_DIR, or .png-cache/ next to this file: an input seen before is
+replaced from the cache, and an already optimized file is skipped.
+
+Usage:  python optimize_png.py [PATH ...] [--max-delta 4] [--jobs N] [--dry-run]
+        (default paths: every extension's icons, promo-assets,
+        coupon-finder-extension and etsy-templates/previews)
+"""
+
+import argparse
+import glob
+import hashlib
+import io
+import os
+import struct
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+DEFAULT_CACHE_DIR = os.path.join(HERE, ".png-cache")
+OPTIMIZER_VERSION = 1
+MAX_DELTA = 4
+DEFAULT_TARGETS = (
+    "*/icons/*.png", "*/firefox/icons/*.png", "promo-assets/**/*.png",
+    "coupon-finder-extension/**/*.png", "etsy-templates/previews/**/*.png",
+)
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+GREY, RGB, PALETTE, GREY_ALPHA, RGBA = 0, 2, 3, 4, 6     # IHDR colour types
+STRATEGIES = (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED)
+SAMPLE_ABOVE = 1 << 20                  # raw bytes; bigger images choose on a sample
+SAMPLE_BAND, SAMPLE_EVERY = 16, 8       # every 8th band of 16 rows
+
+
+# ---------------------------------------------------------------------------
+# encoding
+# ---------------------------------------------------------------------------
+def _chunk(kind, data):
+    body = kind + data
+    return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+
+def _filtered(rows, bpp):
+    """{filter type: (h, 1 + stride) uint8} for the five PNG filters, whole image each."""
+    x = rows.astype(np.int16)
+    a = np.zeros_like(x)
+    a[:, bpp:] = x[:, :-bpp]                    # left
+    b = np.zeros_like(x)
+    b[1:] = x[:-1]                              # up
+    c = np.zeros_like(x)
+    c[1:, bpp:] = x[:-1, :-bpp]                 # up-left
+    p = a + b - c
+    pa, pb, pc = np.abs(p - a), np.abs(p - b), np.abs(p - c)
+    paeth = np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+    residues = (x, x - a, x - b, x - (a + b) // 2, x - paeth)
+    out = {}
+    for kind, residue in enumerate(residues):
+        data = np.empty((rows.shape[0], rows.shape[1] + 1), np.uint8)
+        data[:, 0] = kind
+        data[:, 1:] = residue & 0xFF
+        out[kind] = data
+    return out
+
+
+def _adaptive(filtered):
+    """Per row, the filter whose residues have the smallest sum of absolute values."""
+    stack = np.stack([filtered[k] for k in sorted(filtered)])
+    cost = np.abs(stack[:, :, 1:].view(np.int8).astype(np.int32)).sum(axis=2)
+    choice = cost.argmin(axis=0)
+    return stack[choice, np.arange(stack.shape[1])]
+
+
+def _deflate(data, strategy):
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9, strategy)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _smallest_idat(rows, bpp):
+    filtered = _filtered(rows, bpp)
+    streams = [filtered[k] for k in sorted(filtered)] + [_adaptive(filtered)]
+    trials = [(s, strategy) for s in streams for strategy in STRATEGIES]
+    if rows.nbytes > SAMPLE_ABOVE:
+        # big images: pick the filtering and strategy on a sample of row bands,
+        # then deflate the whole image once
+        bands = np.arange(rows.shape[0]) // SAMPLE_BAND % SAMPLE_EVERY == 0
+        best = min(trials, key=lambda t: len(_deflate(t[0][bands].tobytes(), t[1])))
+        trials = [best]
+    return min((_deflate(s.tobytes(), strategy) for s, strategy in trials), key=len)
+
+
+def _pack(indices, depth):
+    """Palette indices (h, w) packed *depth* bits per pixel, rows padded to a byte."""
+    if depth == 8:
+        return indices
+    per_byte = 8 // depth
+    h, w = indices.shape
+    padded = np.zeros((h, -(-w // per_byte) * per_byte), np.uint8)
+    padded[:, :w] = indices
+    groups = padded.reshape(h, -1, per_byte)
+    shifts = np.arange(per_byte - 1, -1, -1, dtype=np.uint8) * depth
+    return (groups << shifts).sum(axis=2, dtype=np.uint16).astype(np.uint8)
+
+
+def encode(width, height, colour_type, rows, bpp, depth=8, palette=None):
+    """A minimal PNG: IHDR, PLTE/tRNS for palettes, one IDAT, IEND."""
+    chunks = [_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, depth,
+                                          colour_type, 0, 0, 0))]
+    if palette is not None:
+        chunks.append(_chunk(b"PLTE", palette[:, :3].tobytes()))
+        alpha = palette[:, 3]
+        opaque = np.flatnonzero(alpha != 255)
+        if len(opaque):
+            chunks.append(_chunk(b"tRNS", alpha[:opaque[-1] + 1].tobytes()))
+    chunks.append(_chunk(b"IDAT", _smallest_idat(rows, bpp)))
+    chunks.append(_chunk(b"IEND", b""))
+    return PNG_SIGNATURE + b"".join(chunks)
+
+
+def _palette_candidate(width, height, rgba):
+    """Exact palette encoding, or None with more than 256 colours."""
+    words = np.ascontiguousarray(rgba).view(np.uint32).reshape(height, width)
+    colours, inverse = np.unique(words, return_inverse=True)
+    if len(colours) > 256:
+        return None
+    palette = colours.view(np.uint8).reshape(-1, 4)
+    order = np.argsort(palette[:, 3] == 255, kind="stable")    # transparent entries first
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    indices = rank[inverse.reshape(height, width)].astype(np.uint8)
+    depth = next(d for d in (1, 2, 4, 8) if len(colours) <= 1 << d)
+    return encode(width, height, PALETTE, _pack(indices, depth), 1, depth, palette[order])
+
+
+def candidates(rgba, max_delta=MAX_DELTA):
+    """Every encoding of *rgba* (h, w, 4) this optimizer considers, as PNG bytes."""
+    height, width = rgba.shape[:2]
+    opaque = bool((rgba[..., 3] == 255).all())
+    grey = bool((rgba[..., 0] == rgba[..., 1]).all() and (rgba[..., 1] == rgba[..., 2]).all())
+    if grey:
+        channels, colour_type = ([0] if opaque else [0, 3]), (GREY if opaque else GREY_ALPHA)
+    else:
+        channels, colour_type = ([0, 1, 2] if opaque else [0, 1, 2, 3]), (RGB if opaque else RGBA)
+    rows = np.ascontiguousarray(rgba[..., channels]).reshape(height, -1)
+    found = [encode(width, height, colour_type, rows, len(channels))]
+
+    exact = _palette_candidate(width, height, rgba)
+    if exact is not None:
+        found.append(exact)
+    elif max_delta > 0:
+        image = Image.fromarray(rgba, "RGBA")
+        quantized = image.quantize(256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+        approx = np.asarray(quantized.convert("RGBA"))
+        if np.abs(approx.astype(np.int16) - rgba).max() <= max_delta:
+            found.append(_palette_candidate(width, height, approx))
+    return found
+
+
+def _pixels(data):
+    with Image.open(io.BytesIO(data)) as image:
+        if getattr(image, "is_animated", False) or image.mode not in (
+                "1", "L", "LA", "P", "PA", "RGB", "RGBA"):
+            return None                  # APNG or 16-bit: left alone
+        return np.asarray(image.convert("RGBA"))
+
+
+def optimize_bytes(data, max_delta=MAX_DELTA):
+    """Smallest re-encoding of PNG *data*, or *data* itself when nothing is smaller."""
+    rgba = _pixels(data)
+    if rgba is None:
+        return data
+    best = min(candidates(rgba, max_delta), key=len)
+    if len(best) >= len(data):
+        return data
+    check = _pixels(best)
+    tolerance = max_delta if max_delta > 0 else 0
+    if check is None or check.shape != rgba.shape or \
+            np.abs(check.astype(np.int16) - rgba).max() > tolerance:
+        raise AssertionError("optimized PNG does not decode to the original pixels")
+    return best
+
+
+# ---------------------------------------------------------------------------
+# cache and files
+# ---------------------------------------------------------------------------
+def cache_dir():
+    return os.environ.get("PNG_CACHE_DIR") or DEFAULT_CACHE_DIR
+
+
+def cache_key(data, max_delta):
+    digest = hashlib.sha256(data).hexdigest()
+    return hashlib.blake2b(f"{digest}:{max_delta}:{OPTIMIZER_VERSION}".encode(),
+                           digest_size=16).hexdigest()
+
+
+def _cached(data, max_delta, directory):
+    """Optimized bytes from the cache: *data* itself if already optimal, None if unseen."""
+    entry = os.path.join(directory, cache_key(data, max_delta))
+    try:
+        with open(entry, "rb") as f:
+            stored = f.read()
+    except OSError:
+        return None
+    return stored or data                # an empty entry marks an optimized file
+
+
+def _store(data, best, max_delta, directory):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, cache_key(data, max_delta)), "wb") as f:
+        f.write(best if best is not data else b"")
+    with open(os.path.join(directory, cache_key(best, max_delta)), "wb"):
+        pass
+
+
+def optimize_file(path, max_delta=MAX_DELTA, directory=None, dry_run=False):
+    """(path, bytes before, bytes after, cached?) - rewrites *path* unless *dry_run*."""
+    directory = directory or cache_dir()
+    with open(path, "rb") as f:
+        data = f.read()
+    best = _cached(data, max_delta, directory)
+    hit = best is not None
+    if not hit:
+        best = optimize_bytes(data, max_delta)
+        _store(data, best, max_delta, directory)
+    if best is not data and len(best) < len(data) and not dry_run:
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(best)
+        os.replace(tmp, path)
+    return path, len(data), min(len(best), len(data)), hit
+
+
+def optimize_files(paths, max_delta=MAX_DELTA, jobs=None, directory=None, dry_run=False):
+    """optimize_file() for every path, across *jobs* processes, in input order."""
+    args = [(path, max_delta, directory, dry_run) for path in paths]
+    if jobs == 1 or len(args) <= 1:
+        return [optimize_file(*a) for a in args]
+    with ProcessPoolExecutor(jobs) as pool:
+        return list(pool.map(optimize_file, *zip(*args)))
+
+
+def find_pngs(paths=(), root=ROOT):
+    if not paths:
+        found = set()
+        for pattern in DEFAULT_TARGETS:
+            found.update(glob.glob(os.path.join(root, pattern), recursive=True))
+        return sorted(found)
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "**", "*.png"), recursive=True)))
+        else:
+            files.append(path)
+    return files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="*", help="PNG files or directories (default: see above)")
+    parser.add_argument("--max-delta", type=int, default=MAX_DELTA,
+                        help="largest per-channel change a quantized palette may make "
+                             "(0: exact palettes only)")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count())
+    parser.add_argument("--cache-dir", help=f"default: $PNG_CACHE_DIR or {DEFAULT_CACHE_DIR}")
+    parser.add_argument("--dry-run", action="store_true", help="report savings, write nothing")
+    parser.add_argument("--verbose", "-v", action="store_true", help="one line per file")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = optimize_files(find_pngs(args.paths), args.max_delta, args.jobs,
+                             args.cache_dir, args.dry_run)
+    before = sum(r[1] for r in results)
+    after = sum(r[2] for r in results)
+    if args.verbose:
+        for path, old, new, hit in results:
+            print(f"  {os.path.relpath(path):<60} {old:>10,} -> {new:>10,}"
+                  f"{'  (cached)' if hit else ''}")
+    hits = sum(r[3] for r in results)
+    print(f"{len(results)} PNGs ({hits} cached): {before:,} -> {after:,} bytes "
+          f"(-{1 - after / max(before, 1):.1%}) in {time.perf_counter() - start:.1f}s"
+          f"{' (dry run)' if args.dry_run else ''}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
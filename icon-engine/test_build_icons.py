@@ -0,0 +1,94 @@
+"""
+Tests for the cached, parallel icon build.
+
+Run with:  python -m pytest -q test_build_icons.py
+"""
+
+import json
+
+import pytest
+
+from build_icons import build, find_sources
+
+SPEC = {"sizes": [16, 48], "layers": [
+    {"shape": "rounded_rect", "box": [4, 4, 124, 124], "radius": 24, "fill": "#6366f1"}]}
+
+SCRIPT = """
+from PIL import Image
+Image.new("RGBA", (16, 16), "red").save("icons/icon16.png")
+"""
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    monkeypatch.setenv("PNG_CACHE_DIR", str(tmp_path / ".png-cache"))
+    for name in ("alpha-extension", "beta-extension"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "icon-spec.json").write_text(json.dumps(SPEC))
+    return tmp_path
+
+
+def run(root, **kwargs):
+    results = build(root=str(root), directory=str(root / ".cache"), jobs=1, **kwargs)
+    return {name: status for name, (status, _, _) in results.items()}
+
+
+def test_second_build_is_cached(root):
+    assert run(root) == {"alpha-extension": "built", "beta-extension": "built"}
+    assert (root / "alpha-extension" / "icons" / "icon48.png").exists()
+    assert run(root) == {"alpha-extension": "cached", "beta-extension": "cached"}
+    assert run(root, force=True) == {"alpha-extension": "built", "beta-extension": "built"}
+
+
+def test_changed_spec_or_output_rebuilds_only_that_extension(root):
+    run(root)
+    spec = dict(SPEC, sizes=[16, 32])
+    (root / "alpha-extension" / "icon-spec.json").write_text(json.dumps(spec))
+    (root / "beta-extension" / "icons" / "icon16.png").write_bytes(b"edited by hand")
+    assert run(root) == {"alpha-extension": "built", "beta-extension": "built"}
+    (root / "beta-extension" / "icons" / "icon48.png").unlink()
+    assert run(root) == {"alpha-extension": "cached", "beta-extension": "built"}
+
+
+def test_engine_change_rebuilds_specs(root, monkeypatch):
+    run(root)
+    monkeypatch.setattr("build_icons.generator_version", lambda: "next")
+    assert run(root, names=["alpha-extension"]) == {"alpha-extension": "built"}
+
+
+def test_optimizer_change_or_flag_rebuilds(root, monkeypatch):
+    run(root, optimize=False)
+    raw = (root / "alpha-extension" / "icons" / "icon48.png").read_bytes()
+    assert run(root) == {"alpha-extension": "built", "beta-extension": "built"}
+    assert len((root / "alpha-extension" / "icons" / "icon48.png").read_bytes()) < len(raw)
+    monkeypatch.setattr("build_icons.optimizer_version", lambda optimize=True: "next")
+    assert run(root, names=["beta-extension"]) == {"beta-extension": "built"}
+
+
+def test_every_icon_is_timed(root):
+    (_, seconds, icons), = build(names=["alpha-extension"], root=str(root),
+                                 directory=str(root / ".cache"), jobs=1).values()
+    assert sorted(icons) == ["alpha-extension/icons/icon16.png",
+                             "alpha-extension/icons/icon48.png"]
+    assert all(0 < t <= seconds for t in icons.values())
+    assert sum(icons.values()) <= seconds
+
+
+def test_legacy_script_is_built_when_there_is_no_spec(root):
+    (root / "gamma-extension" / "icons").mkdir(parents=True)
+    (root / "gamma-extension" / "generate-icons.py").write_text(SCRIPT)
+    assert find_sources(str(root))["gamma-extension"][0] == "script"
+    assert run(root, names=["gamma-extension"]) == {"gamma-extension": "built"}
+    assert run(root, names=["gamma-extension"]) == {"gamma-extension": "cached"}
+
+
+def test_pool_build_matches_serial(root):
+    results = build(root=str(root), directory=str(root / ".cache"), jobs=2)
+    assert {name: sorted(icons) for name, (_, _, icons) in results.items()} == {
+        name: [f"{name}/icons/icon16.png", f"{name}/icons/icon48.png"]
+        for name in ("alpha-extension", "beta-extension")}
+
+
+def test_unknown_extension_is_an_error(root):
+    with pytest.raises(SystemExit, match="no icon spec or script for nope"):
+        run(root, names=["nope"])
@@ -0,0 +1,64 @@
+"""
+Tests for font resolution.
+
+Run with:  python -m pytest -q test_fonts.py
+"""
+
+import os
+import shutil
+
+import pytest
+
+import fonts
+from icon_engine import find_specs, load_spec
+
+DEJAVU = "DejaVuSans.ttf"
+
+
+@pytest.fixture
+def font_dir(tmp_path):
+    path = fonts.resolve((DEJAVU,))[0]
+    (tmp_path / "first").mkdir()
+    (tmp_path / "second" / "nested").mkdir(parents=True)
+    shutil.copy(path, tmp_path / "first" / "Brand-Bold.ttf")
+    shutil.copy(path, tmp_path / "second" / "nested" / "Brand-Bold.ttf")
+    shutil.copy(path, tmp_path / "second" / "nested" / "Other.TTF")
+    return tmp_path
+
+
+def test_index_is_by_file_name_and_first_directory_wins(font_dir):
+    dirs = (str(font_dir / "first"), str(font_dir / "second"))
+    index = fonts.font_index(dirs)
+    assert index["brand-bold.ttf"] == str(font_dir / "first" / "Brand-Bold.ttf")
+    assert index["other.ttf"] == str(font_dir / "second" / "nested" / "Other.TTF")
+
+
+def test_resolve_takes_the_first_installed_name(font_dir):
+    dirs = (str(font_dir / "second"),)
+    assert fonts.resolve(("Missing.ttf", "brand-bold.TTF"), dirs) == (
+        str(font_dir / "second" / "nested" / "Brand-Bold.ttf"), 0)
+    assert fonts.resolve(("Other.ttf#2",), dirs)[1] == 2
+
+
+def test_missing_font_raises(font_dir):
+    with pytest.raises(fonts.FontNotFound, match="none of Helvetica.ttc, Menlo.ttc"):
+        fonts.resolve(("Helvetica.ttc", "Menlo.ttc"), (str(font_dir / "first"),))
+
+
+def test_fonts_are_loaded_once_per_path_and_size():
+    assert fonts.font(DEJAVU, 24) is fonts.font((DEJAVU,), 24)
+    assert fonts.font(DEJAVU, 24) is not fonts.font(DEJAVU, 25)
+    assert fonts.font(DEJAVU, 24).size == 24
+
+
+def test_icon_font_dirs_come_first(monkeypatch, tmp_path):
+    monkeypatch.setenv("ICON_FONT_DIRS", str(tmp_path))
+    assert fonts.font_dirs()[0] == str(tmp_path)
+
+
+def test_spec_fonts_are_committed():
+    names = {layer["font"] for path in find_specs().values()
+             for layer in load_spec(path)["layers"] if "font" in layer}
+    assert names
+    for name in names:        # resolvable without any system font directory
+        assert fonts.resolve((name,), (os.path.join(fonts.HERE, "fonts"),))
@@ -0,0 +1,111 @@
+"""
+Golden-image tests: every extension's icon, at every size its spec lists,
+must still render like icon-engine/golden/<extension>/icon<size>.png, and
+the icons the extension ships (in each of the spec's outputs) must match
+the golden too - rerun build-icons.sh after changing the artwork.
+A failing icon writes expected | actual | heatmap to .golden-diffs/ (or
+$GOLDEN_DIFF_DIR). After an intentional artwork change, refresh the
+goldens with UPDATE_GOLDENS=1 and commit them with the change.
+
+icon-engine/approved/<extension>.png is the approved 128 px artwork the
+per-extension scripts drew before the engine. Each spec, drawn the way
+its script drew (aliased at 128 px, or supersampled then resized once),
+must still match it, so a spec edit cannot move a shape unnoticed.
+
+Run with:  python -m pytest -q test_golden_icons.py
+"""
+
+import glob
+import io
+import os
+
+import pytest
+from PIL import Image
+
+import imagediff
+from icon_engine import find_specs, load_spec, render_master, render_sizes, resolve
+from optimize_png import optimize_bytes
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_DIR = os.path.join(HERE, "golden")
+APPROVED_DIR = os.path.join(HERE, "approved")
+DIFF_DIR = os.environ.get("GOLDEN_DIFF_DIR") or os.path.join(HERE, ".golden-diffs")
+UPDATE = bool(os.environ.get("UPDATE_GOLDENS"))
+
+SPECS = find_specs()
+CASES = [(name, size) for name, path in SPECS.items() for size in load_spec(path)["sizes"]]
+
+# scripts that drew on a larger canvas and resized once: {extension: canvas px at 128}
+SUPERSAMPLED = {"lead-harvester-extension": 512}
+# deliberate departures from the approved drawing: {extension: (min SSIM, why)}
+DRAWN_CHANGES = {
+    "flipflow-extension": (0.85, "corner highlight composited inside the tile, "
+                                 "not painted over it as see-through grey"),
+    "json-formatter-extension": (0.95, "DejaVu Sans Mono in place of Menlo"),
+    "paste-plain-extension": (0.99, "DejaVu Sans in place of Helvetica"),
+}
+
+
+def golden_path(name, size):
+    return os.path.join(GOLDEN_DIR, name, f"icon{size}.png")
+
+
+@pytest.fixture(scope="module")
+def renders():
+    return {name: render_sizes(load_spec(path)) for name, path in SPECS.items()}
+
+
+@pytest.mark.parametrize("name,size", CASES, ids=[f"{n}-{s}" for n, s in CASES])
+def test_icon_matches_golden(renders, name, size):
+    actual = renders[name][size]
+    path = golden_path(name, size)
+    if UPDATE:
+        out = io.BytesIO()
+        actual.save(out, "PNG")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(optimize_bytes(out.getvalue(), max_delta=0))
+        return
+    assert os.path.exists(path), f"no golden for {name} at {size}px; run with UPDATE_GOLDENS=1"
+    expected = Image.open(path)
+    diff = imagediff.compare(expected, actual)
+    if not diff.ok():
+        os.makedirs(DIFF_DIR, exist_ok=True)
+        heatmap = os.path.join(DIFF_DIR, f"{name}-icon{size}.png")
+        imagediff.heatmap(expected, actual).save(heatmap)
+        pytest.fail(f"{name} icon{size}.png changed: {diff}\n  heatmap: {heatmap}")
+
+
+SHIPPED = [(name, size, os.path.join(os.path.dirname(path), output, f"icon{size}.png"))
+           for name, path in SPECS.items()
+           for output in load_spec(path).get("outputs", ["icons"])
+           for size in load_spec(path)["sizes"]]
+
+
+@pytest.mark.parametrize("name,size,shipped", SHIPPED,
+                         ids=[os.path.relpath(p, os.path.dirname(HERE)) for _, _, p in SHIPPED])
+def test_shipped_icon_matches_golden(name, size, shipped):
+    assert os.path.exists(shipped), f"{shipped} is missing; run build-icons.sh"
+    diff = imagediff.compare(Image.open(golden_path(name, size)), Image.open(shipped))
+    assert diff.ok(), f"{shipped} is stale: {diff}; run build-icons.sh"
+
+
+def test_every_golden_has_a_spec():
+    goldens = {os.path.relpath(p, GOLDEN_DIR)
+               for p in glob.glob(os.path.join(GOLDEN_DIR, "*", "icon*.png"))}
+    expected = {os.path.relpath(golden_path(name, size), GOLDEN_DIR) for name, size in CASES}
+    assert goldens - expected == set(), "stale goldens: delete them"
+
+
+@pytest.mark.parametrize("name", sorted(SPECS))
+def test_spec_matches_approved_drawing(name):
+    path = os.path.join(APPROVED_DIR, f"{name}.png")
+    assert os.path.exists(path), f"no approved artwork for {name}"
+    pixels = SUPERSAMPLED.get(name, 128)
+    drawn = render_master(resolve(load_spec(SPECS[name])["layers"], 128), pixels)
+    diff = imagediff.compare(Image.open(path), drawn.resize((128, 128), Image.LANCZOS))
+    if name in DRAWN_CHANGES:
+        min_ssim, why = DRAWN_CHANGES[name]
+        assert diff.ssim >= min_ssim, f"{name} drifted beyond the deliberate change ({why}): {diff}"
+    else:
+        assert diff.ok(), f"{name} no longer draws the approved artwork: {diff}"
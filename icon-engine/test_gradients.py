@@ -0,0 +1,63 @@
+"""
+Tests for the gradient primitives and their agreement with the drawing
+loops they replaced.
+
+Run with:  python -m pytest -q test_gradients.py
+"""
+
+import numpy as np
+from PIL import Image
+
+import bench_gradients
+from gradients import composite, conic_field, linear_field, radial_field, ramp, shade
+
+BLACK, WHITE = (0, 0, 0, 255), (255, 255, 255, 255)
+
+
+def test_linear_field_runs_along_its_axis():
+    field = linear_field(8, 4, (0, 0), (8, 0))
+    assert np.allclose(field[0], np.arange(8) / 8 + 1 / 16)
+    assert np.allclose(field[:, 3], field[0, 3])
+
+
+def test_radial_field_is_one_on_the_ellipse():
+    field = radial_field(64, 32, (0, 0, 64, 32))
+    assert field[15, 31] < 0.05
+    assert abs(field[15, 0] - 1) < 0.05 and abs(field[0, 31] - 1) < 0.1
+
+
+def test_conic_field_covers_a_turn_clockwise():
+    field = conic_field(64, 64, (32, 32), angle=0)
+    assert field[31, 60] < 0.02 or field[31, 60] > 0.98    # due east: start of the turn
+    assert abs(field[60, 32] - 0.25) < 0.02                # south: a quarter turn
+    assert abs(field[32, 4] - 0.5) < 0.02
+    south = conic_field(64, 64, (32, 32), angle=90)[60, 32]
+    assert min(south, 1 - south) < 0.02
+
+
+def test_ramp_spreads_colours_evenly_or_at_offsets():
+    table = ramp((BLACK, (255, 0, 0, 255), WHITE))
+    assert table.shape == (256, 4)
+    assert table[0].tolist() == list(BLACK) and table[-1].tolist() == list(WHITE)
+    assert table[128][0] == 255 and table[128][1] < 3
+    pairs = ramp(((0.0, BLACK), (0.25, WHITE), (1.0, WHITE)))
+    assert pairs[64].tolist() == list(WHITE)
+
+
+def test_shade_clamps_the_field():
+    table = ramp((BLACK, WHITE))
+    assert shade(np.array([-1.0, 0.5, 2.0]), table)[:, 0].tolist() == [0, 128, 255]
+
+
+def test_composite_respects_the_mask():
+    img = Image.new("RGBA", (4, 4), (0, 0, 255, 255))
+    mask = Image.new("L", (4, 4), 0)
+    mask.paste(255, (0, 0, 2, 4))
+    composite(img, linear_field(4, 4, (0, 0), (4, 0)), ramp((WHITE, WHITE)), mask)
+    assert img.getpixel((0, 0)) == WHITE and img.getpixel((3, 0)) == (0, 0, 255, 255)
+
+
+def test_fields_match_the_loops_they_replace():
+    for kind in bench_gradients.KINDS:
+        loop, field = bench_gradients.render(kind, 128, "loop"), bench_gradients.render(kind, 128, "field")
+        assert bench_gradients.mean_delta(loop, field) < 4, kind
@@ -0,0 +1,200 @@
+"""
+Tests for the declarative icon engine: every extension's spec renders, and
+the layer features behave.
+
+Run with:  python -m pytest -q test_icon_engine.py
+"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import fonts
+import icon_engine
+from icon_engine import SpecError, find_specs, load_spec, render, render_extension
+
+
+def spec(*layers, sizes=(128,)):
+    return {"sizes": list(sizes), "layers": list(layers)}
+
+
+@pytest.mark.parametrize("name", sorted(find_specs()))
+def test_every_extension_spec_renders(name):
+    loaded = load_spec(find_specs()[name])
+    for size in loaded["sizes"]:
+        icon = render(loaded, size)
+        assert icon.size == (size, size)
+        assert icon.mode == "RGBA"
+        assert np.asarray(icon)[..., 3].any()
+
+
+def test_unknown_shape_is_rejected(tmp_path):
+    path = tmp_path / "icon-spec.json"
+    path.write_text(json.dumps(spec({"shape": "star"}, {"shape": "rect"})))
+    with pytest.raises(SpecError, match="unknown shape 'star'"):
+        load_spec(str(path))
+
+
+def test_missing_layers_is_rejected(tmp_path):
+    path = tmp_path / "icon-spec.json"
+    path.write_text(json.dumps({"sizes": [16]}))
+    with pytest.raises(SpecError, match="missing 'layers'"):
+        load_spec(str(path))
+
+
+def test_layers_scale_with_the_output_size():
+    square = spec({"shape": "rect", "box": [0, 0, 64, 64], "fill": "#ff0000"})
+    small = np.asarray(render(square, 16))
+    assert small[7, 7].tolist() == [255, 0, 0, 255]
+    assert small[9, 9, 3] == 0
+
+
+def test_min_and_max_size_gate_layers():
+    gated = spec({"shape": "rect", "box": [0, 0, 127, 127], "fill": "#ff0000", "max_size": 16},
+                 {"shape": "rect", "box": [0, 0, 127, 127], "fill": "#0000ff", "min_size": 48})
+    assert np.asarray(render(gated, 16))[8, 8].tolist() == [255, 0, 0, 255]
+    assert np.asarray(render(gated, 32))[16, 16, 3] == 0
+    assert np.asarray(render(gated, 48))[24, 24].tolist() == [0, 0, 255, 255]
+
+
+def test_gradient_stays_inside_its_shape():
+    tile = spec({"shape": "ellipse", "box": [32, 32, 96, 96],
+                 "fill": {"linear": ["#000000", "#ffffff"], "from": [32, 0], "to": [96, 0]}})
+    pixels = np.asarray(render(tile, 128))
+    assert pixels[0, 0, 3] == 0 and pixels[64, 31, 3] == 0
+    assert pixels[64, 34, 0] < 20 < 235 < pixels[64, 94, 0]
+    assert pixels[64, 64, 3] == 255
+
+
+def test_radial_gradient_runs_from_centre_to_edge():
+    disc = spec({"shape": "rect", "box": [0, 0, 128, 128], "fill": {"radial": ["#ffffff", "#000000"]}})
+    pixels = np.asarray(render(disc, 128))
+    assert pixels[64, 64, 0] > 250 and pixels[64, 0, 0] < 5
+
+
+def test_unknown_gradient_is_rejected():
+    with pytest.raises(SpecError, match="unknown gradient"):
+        render(spec({"shape": "rect", "box": [0, 0, 128, 128], "fill": {"spiral": []}}), 16)
+    with pytest.raises(SpecError, match="at least two colours"):
+        render(spec({"shape": "rect", "box": [0, 0, 128, 128], "fill": {"conic": ["#fff"]}}), 16)
+
+
+def test_conic_gradient_turns_clockwise_from_its_angle():
+    wheel = spec({"shape": "ellipse", "box": [0, 0, 128, 128],
+                  "fill": {"conic": ["#000000", "#ffffff"], "angle": -90}})
+    pixels = np.asarray(render(wheel, 128))[..., 0].astype(int)
+    top_right, bottom, top_left = pixels[20, 70], pixels[110, 64], pixels[20, 58]
+    assert top_right < bottom < top_left
+
+
+def test_sizes_sharing_an_artwork_share_one_master(monkeypatch):
+    drawn = []
+    real = icon_engine.render_master
+    monkeypatch.setattr(icon_engine, "render_master",
+                        lambda layers, pixels, snap=None: drawn.append(pixels) or
+                        real(layers, pixels, snap))
+    tile = spec({"shape": "ellipse", "box": [8, 8, 120, 120], "outline": "#336699",
+                 "width": 4, "min_width": 2}, sizes=(16, 32, 48, 96, 128))
+    icons = icon_engine.render_sizes(tile)
+    assert {size: icon.size for size, icon in icons.items()} == {
+        s: (s, s) for s in (16, 32, 48, 96, 128)}
+    # min_width binds below 64 px: 96 and 128 share a master, the rest get one each
+    assert drawn == [512, 512, 512, 512]
+
+
+def test_resolve_folds_minimums_into_design_units():
+    layers = [{"shape": "group", "min_size": 32, "layers": [
+        {"shape": "line", "points": [[0, 0], [1, 1]], "width": 4, "min_width": 2}]},
+        {"shape": "rounded_rect", "box": [0, 0, 1, 1], "radius": 8, "min_radius": 2,
+         "max_size": 16}]
+    assert icon_engine.resolve(layers, 16) == [
+        {"shape": "rounded_rect", "box": [0, 0, 1, 1], "radius": 16.0}]
+    assert icon_engine.resolve(layers, 32) == [
+        {"shape": "line", "points": [[0, 0], [1, 1]], "width": 8.0}]
+    assert icon_engine.resolve(layers, 128)[0]["width"] == 4
+
+
+def test_downsample_reuses_pyramid_levels():
+    levels = {512: Image.new("RGBA", (512, 512), (255, 0, 0, 255))}
+    assert icon_engine.downsample(levels, 96).size == (96, 96)
+    assert sorted(levels) == [128, 256, 512]  # halved while at least 2 x 96, then Lanczos
+    icon_engine.downsample(levels, 16)
+    assert sorted(levels) == [16, 32, 64, 128, 256, 512]
+    assert np.asarray(icon_engine.downsample(levels, 16))[8, 8].tolist() == [255, 0, 0, 255]
+
+
+def test_hinting_puts_edges_on_the_pixel_grid():
+    bar = spec({"shape": "rect", "box": [20, 42, 108, 49], "fill": "#000000"})
+    smooth = np.asarray(render(bar, 16))[..., 3]
+    hinted = np.asarray(render(dict(bar, hint=16), 16))[..., 3]
+    assert set(np.unique(smooth)) - {0, 255}        # the bar straddles pixel rows
+    assert set(np.unique(hinted)) == {0, 255}
+    assert (hinted[:, 8] == 255).sum() == 1
+
+
+def test_store_sizes_and_promo_tiles(tmp_path):
+    (tmp_path / "icon-spec.json").write_text(json.dumps(
+        spec({"shape": "rect", "box": [16, 16, 112, 112], "fill": "#123456"}, sizes=(48,))))
+    timings = {}
+    written = render_extension(str(tmp_path / "icon-spec.json"), store=True, timings=timings)
+    assert sorted(timings) == sorted(written) and all(t > 0 for t in timings.values())
+    store = sorted(p for p in (os.path.relpath(p, tmp_path) for p in written)
+                   if p.startswith("store"))
+    assert store == sorted([f"store/icon{s}.png" for s in (16, 32, 48, 96, 128)] +
+                           ["store/promo-marquee-1400x560.png", "store/promo-small-440x280.png"])
+    tile = Image.open(tmp_path / "store" / "promo-small-440x280.png")
+    assert tile.size == (440, 280)
+    assert tile.getpixel((0, 0)) == (0x12, 0x34, 0x56, 255)
+
+
+def test_render_extension_writes_every_size_and_output(tmp_path):
+    (tmp_path / "icon-spec.json").write_text(json.dumps(dict(
+        spec({"shape": "rect", "box": [0, 0, 128, 128], "fill": "#123456"}, sizes=(16, 48)),
+        outputs=["icons", "firefox/icons"])))
+    written = render_extension(str(tmp_path / "icon-spec.json"))
+    assert sorted(os.path.relpath(p, tmp_path) for p in written) == [
+        "firefox/icons/icon16.png", "firefox/icons/icon48.png",
+        "icons/icon16.png", "icons/icon48.png"]
+
+
+def test_out_dir_keeps_extensions_apart(tmp_path, capsys):
+    for name, fill in (("alpha-extension", "#123456"), ("beta-extension", "#654321")):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "icon-spec.json").write_text(json.dumps(
+            spec({"shape": "rect", "box": [0, 0, 128, 128], "fill": fill}, sizes=(16, 48))))
+    out = tmp_path / "out"
+    assert icon_engine.main([str(tmp_path / "alpha-extension"), str(tmp_path / "beta-extension"),
+                             "--out", str(out)]) == 0
+    assert sorted(os.path.relpath(p, out) for p in map(str, out.rglob("*.png"))) == [
+        "alpha-extension/icon16.png", "alpha-extension/icon48.png",
+        "beta-extension/icon16.png", "beta-extension/icon48.png"]
+    assert Image.open(out / "beta-extension" / "icon16.png").getpixel((0, 0)) == \
+        (0x65, 0x43, 0x21, 255)
+
+    assert icon_engine.main([str(tmp_path / "alpha-extension"), "--out", str(out / "one")]) == 0
+    assert sorted(p.name for p in (out / "one").iterdir()) == ["icon16.png", "icon48.png"]
+
+
+def test_store_into_out_dir_writes_each_file_once(tmp_path):
+    (tmp_path / "icon-spec.json").write_text(json.dumps(
+        spec({"shape": "rect", "box": [0, 0, 128, 128], "fill": "#123456"}, sizes=(16, 48))))
+    written = render_extension(str(tmp_path / "icon-spec.json"), str(tmp_path / "out"),
+                               store=True)
+    assert len(written) == len(set(written)) == 5 + 2
+
+
+def test_missing_font_fails_loudly():
+    label = spec({"shape": "text", "text": "A", "font": "NoSuchFont-Bold.ttf", "size": 64,
+                  "fill": "#ffffff"})
+    with pytest.raises(fonts.FontNotFound, match="NoSuchFont-Bold.ttf"):
+        render(label, 128)
+
+
+def test_text_needs_a_font(tmp_path):
+    path = tmp_path / "icon-spec.json"
+    path.write_text(json.dumps(spec({"shape": "text", "text": "A", "size": 64, "fill": "#fff"})))
+    with pytest.raises(SpecError, match="names no font"):
+        load_spec(str(path))
@@ -0,0 +1,85 @@
+"""
+Tests for the perceptual image diff.
+
+Run with:  python -m pytest -q test_imagediff.py
+"""
+
+import copy
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from icon_engine import find_specs, load_spec, render, render_sizes
+from imagediff import compare, heatmap, premultiplied, ssim
+
+
+@pytest.fixture(scope="module")
+def nichescout():
+    return load_spec(find_specs()["nichescout-extension"])
+
+
+def test_identical_images(nichescout):
+    icon = render(nichescout, 48)
+    diff = compare(icon, icon.copy())
+    assert (diff.max_delta, diff.mean_delta, diff.changed) == (0, 0, 0)
+    assert diff.ssim == pytest.approx(1)
+    assert diff.ok()
+
+
+def test_colour_under_full_transparency_does_not_count():
+    a = Image.new("RGBA", (8, 8), (255, 0, 0, 0))
+    b = Image.new("RGBA", (8, 8), (0, 0, 255, 0))
+    assert compare(a, b).max_delta == 0
+
+
+@pytest.mark.parametrize("change", ["nudge", "recolour", "drop layer"])
+def test_artwork_changes_fail(nichescout, change):
+    edited = copy.deepcopy(nichescout)
+    layers = edited["layers"]
+    if change == "nudge":
+        layers[1]["box"] = [v + 3 for v in layers[1]["box"]]
+    elif change == "recolour":
+        layers[3]["fill"] = "#ef4444"
+    else:
+        del layers[-1]
+    diff = compare(render(nichescout, 128), render(edited, 128))
+    assert not diff.ok(), str(diff)
+
+
+def test_one_level_of_noise_passes(nichescout):
+    icon = render(nichescout, 128)
+    noisy = np.asarray(icon).astype(int)
+    noisy[::7, ::5, :3] = np.clip(noisy[::7, ::5, :3] + 1, 0, 255)
+    assert compare(icon, Image.fromarray(noisy.astype(np.uint8), "RGBA")).ok()
+
+
+def test_ssim_drops_with_structure_not_brightness():
+    rng = np.random.default_rng(0)
+    a = rng.integers(0, 256, (32, 32, 1)).astype(float)
+    assert ssim(a, a) == pytest.approx(1)
+    assert ssim(a, np.clip(a + 10, 0, 255)) > 0.95
+    assert ssim(a, rng.permutation(a.ravel()).reshape(a.shape)) < 0.2
+
+
+def test_size_mismatch_is_an_error():
+    with pytest.raises(ValueError, match="size"):
+        compare(Image.new("RGBA", (16, 16)), Image.new("RGBA", (48, 48)))
+
+
+def test_heatmap_sheet(nichescout):
+    a, b = render(nichescout, 16), render(nichescout, 16).rotate(90)
+    sheet = heatmap(a, b)
+    assert sheet.size == ((16 * 3 + 2) * 16, 16 * 16)
+    assert premultiplied(sheet)[..., :3].max() == 255
+
+
+def test_all_icons_render_and_compare_quickly():
+    specs = [load_spec(path) for path in find_specs().values()]
+    start = time.perf_counter()
+    icons = [icon for spec in specs for icon in render_sizes(spec).values()]
+    for icon in icons:
+        assert compare(icon, icon).ok()
+    assert len(icons) >= 33
+    assert time.perf_counter() - start < 2
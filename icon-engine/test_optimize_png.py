@@ -0,0 +1,103 @@
+"""
+Tests for the PNG optimizer: every encoding decodes to the same pixels,
+and files only ever shrink.
+
+Run with:  python -m pytest -q test_optimize_png.py
+"""
+
+import io
+
+import numpy as np
+import pytest
+from PIL import Image, PngImagePlugin
+
+import optimize_png
+from optimize_png import candidates, optimize_bytes, optimize_file, optimize_files
+
+
+def png(image, **params):
+    out = io.BytesIO()
+    image.save(out, "PNG", **params)
+    return out.getvalue()
+
+
+def pixels(data):
+    return np.asarray(Image.open(io.BytesIO(data)).convert("RGBA"))
+
+
+def gradient(width=64, height=48, alpha=True):
+    ys, xs = np.mgrid[0:height, 0:width]
+    rgba = np.stack([xs * 4 % 256, ys * 5 % 256, (xs + ys) % 256,
+                     (xs * 3 % 256) if alpha else np.full_like(xs, 255)], axis=-1)
+    return rgba.astype(np.uint8)
+
+
+@pytest.mark.parametrize("rgba", [
+    gradient(),                                                  # RGBA
+    gradient(alpha=False),                                       # RGB
+    np.repeat(gradient(alpha=False)[..., :1], 4, axis=-1) | np.array([0, 0, 0, 255], np.uint8),
+    np.zeros((5, 13, 4), np.uint8) + np.array([10, 20, 30, 0], np.uint8),      # one colour
+    np.asarray(Image.new("RGBA", (17, 9), (0, 0, 0, 0))),
+], ids=["rgba", "rgb", "grey", "flat", "transparent"])
+def test_every_lossless_candidate_round_trips(rgba):
+    for data in candidates(rgba, max_delta=0):
+        assert np.array_equal(pixels(data), rgba)
+
+
+@pytest.mark.parametrize("colours", [2, 3, 5, 16, 17, 256])
+def test_palettes_pack_to_the_smallest_depth(colours):
+    values = np.arange(23 * 7) % colours
+    rgba = np.stack([values, values * 3 % 256, values, np.where(values % 2, 255, 90)],
+                    axis=-1).astype(np.uint8).reshape(7, 23, 4)
+    palette = [data for data in candidates(rgba, 0) if data[25] == optimize_png.PALETTE]
+    assert palette and np.array_equal(pixels(palette[0]), rgba)
+    assert palette[0][24] == next(d for d in (1, 2, 4, 8) if colours <= 1 << d)
+
+
+def test_metadata_is_stripped_and_file_shrinks():
+    info = PngImagePlugin.PngInfo()
+    info.add_text("Software", "x" * 500)
+    data = png(Image.fromarray(gradient()), pnginfo=info, compress_level=1)
+    best = optimize_bytes(data)
+    assert len(best) < len(data)
+    assert b"tEXt" not in best and b"Software" not in best
+    assert np.array_equal(pixels(best), gradient())
+
+
+def test_quantizing_stays_within_max_delta():
+    rng = np.random.default_rng(1)
+    rgba = np.repeat(rng.integers(0, 256, (300, 4), dtype=np.uint8), 40, axis=0)
+    rgba[:, 3] = 255
+    rgba = (rgba.reshape(120, 100, 4) + (np.arange(100) % 2)[None, :, None]).astype(np.uint8)
+    rgba[..., 3] = 255
+    for max_delta in (0, 4):
+        best = optimize_bytes(png(Image.fromarray(rgba)), max_delta)
+        assert np.abs(pixels(best).astype(int) - rgba).max() <= max_delta
+
+
+def test_a_file_that_cannot_shrink_is_left_alone():
+    data = optimize_bytes(png(Image.fromarray(gradient())))
+    assert optimize_bytes(data) is data
+
+
+def test_files_are_rewritten_and_cached(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"icon{i}.png"
+        path.write_bytes(png(Image.fromarray(np.roll(gradient(), i, axis=0)), compress_level=0))
+        paths.append(str(path))
+    cache = str(tmp_path / "cache")
+    first = optimize_files(paths, jobs=2, directory=cache)
+    assert all(after < before for _, before, after, hit in first) and not any(r[3] for r in first)
+    optimized = [open(p, "rb").read() for p in paths]
+    second = optimize_files(paths, jobs=1, directory=cache)
+    assert all(hit and before == after for _, before, after, hit in second)
+    assert [open(p, "rb").read() for p in paths] == optimized
+
+
+def test_dry_run_writes_nothing(tmp_path):
+    path = tmp_path / "icon.png"
+    data = png(Image.fromarray(gradient()), compress_level=0)
+    path.write_bytes(data)
+    _, before, after, _ = optimize_file(str(path), directory=str(tmp_path / "c"), dry_run=True)
+    assert after < before and path.read_bytes() == data
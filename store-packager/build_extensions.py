@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Store packager for the browser extensions.
+Builds the Chrome, Firefox and Edge zips of every extension (12 x 3) into
+store-packages/. Each extension directory is walked once. Each distinct
+file is deflated once, at level 9, and the compressed entry is reused
+everywhere that file appears: Chrome and Edge ship the same tree, and
+firefox/ repeats the icons. Extensions build in parallel worker
+processes.
+
+The zips are byte-reproducible: entries in sorted order, no directory
+entries, a fixed 1980-01-01 date and fixed permissions (the same
+metadata xlsx_canonical uses). A package is skipped when its inputs (every
+file's path and content hash) and the packager version match its last
+build and the zip on disk is the one that build wrote. Stamps live in
+$PACKAGE_CACHE_DIR, or .package-cache/ next to this file.
+
+Usage:  python build_extensions.py [FILTER] [--jobs N] [--force] [--out DIR]
+        (FILTER: build only extensions whose directory contains it)
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+DEFAULT_OUT = os.path.join(ROOT, "store-packages")
+DEFAULT_CACHE_DIR = os.path.join(HERE, ".package-cache")
+PACKAGER_VERSION = 2
+
+# (directory, chrome name, firefox name, edge name)
+EXTENSIONS = [
+    ("lead-harvester-extension", "lead-harvester", "lead-harvester", "lead-harvester"),
+    ("proposal-pilot-extension", "proposal-pilot", "proposal-pilot", "proposal-pilot"),
+    ("nichescout-extension", "nichescout", "nichescout", "nichescout"),
+    ("etsyrank-extension", "etsyrank", "etsyrank", "etsyrank"),
+    ("coldflow-extension", "coldflow", "coldflow", "coldflow"),
+    ("linkedboost-extension", "linkedboost", "linkedboost", "linkedboost"),
+    ("flipflow-extension", "flipflow", "flipflow", "flipflow"),
+    ("json-formatter-extension", "json-formatter", "jsonview-pro", "json-formatter"),
+    ("autoplay-killer-extension", "autoplay-killer", "autoplay-killer", "autoplay-killer"),
+    ("clean-copy-extension", "clean-copy", "clean-copy", "clean-copy"),
+    ("paste-plain-extension", "paste-plain", "pastepure", "paste-plain"),
+    ("url-hygiene-extension", "url-hygiene", "cleanlink", "url-hygiene"),
+]
+
+# Paths (relative to the extension, zip wildcard rules: * also matches /)
+# left out of the Chrome and Edge packages; Firefox only drops .DS_Store.
+EXCLUDES = [
+    "test-extension.js", "node_modules/*", "package.json", "package-lock.json",
+    "generate-icons.py", "generate-icons.js", "generate-screenshots.js", "generate_icons.py",
+    "icon-spec.json", "store/*", "test-video.mp4", ".DS_Store", "firefox/*",
+]
+FIREFOX_EXCLUDES = [".DS_Store"]
+
+COMPRESS_LEVEL = 9
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+FILE_ATTRIBUTES = 0o100644 << 16
+VERSION_MADE_BY = (3 << 8) | 20      # Unix host, so unzip honours the mode bits
+
+LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+CENTRAL_HEADER = struct.Struct("<4s6H3L5H2L")
+END_RECORD = struct.Struct("<4s4H2LH")
+
+
+# ---------------------------------------------------------------------------
+# deterministic zips from pre-compressed entries
+# ---------------------------------------------------------------------------
+class Entry:
+    """One file's data, deflated once and shared by every zip that holds it."""
+
+    __slots__ = ("crc", "size", "method", "data")
+
+    def __init__(self, content):
+        self.crc = zlib.crc32(content)
+        self.size = len(content)
+        compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, -15)
+        deflated = compressor.compress(content) + compressor.flush()
+        if len(deflated) < len(content):
+            self.method, self.data = 8, deflated
+        else:
+            self.method, self.data = 0, content        # stored
+
+
+def _dos_date_time():
+    year, month, day, hour, minute, second = ZIP_DATE_TIME
+    return (hour << 11) | (minute << 5) | (second // 2), ((year - 1980) << 9) | (month << 5) | day
+
+
+def zip_bytes(files):
+    """A zip of *files* ({archive name: Entry}), entries in sorted name order."""
+    dos_time, dos_date = _dos_date_time()
+    local, central = [], []
+    offset = 0
+    for name in sorted(files):
+        entry = files[name]
+        encoded = name.encode("utf-8")
+        flags = 0x800 if not encoded.isascii() else 0
+        header = LOCAL_HEADER.pack(b"PK\x03\x04", 20, flags, entry.method, dos_time, dos_date,
+                                   entry.crc, len(entry.data), entry.size, len(encoded), 0)
+        central.append(CENTRAL_HEADER.pack(
+            b"PK\x01\x02", VERSION_MADE_BY, 20, flags, entry.method, dos_time, dos_date, entry.crc,
+            len(entry.data), entry.size, len(encoded), 0, 0, 0, 0, FILE_ATTRIBUTES, offset)
+            + encoded)
+        local += [header, encoded, entry.data]
+        offset += len(header) + len(encoded) + len(entry.data)
+    directory = b"".join(central)
+    end = END_RECORD.pack(b"PK\x05\x06", 0, 0, len(files), len(files), len(directory),
+                          offset, 0)
+    return b"".join(local) + directory + end
+
+
+# ---------------------------------------------------------------------------
+# packages
+# ---------------------------------------------------------------------------
+def excluded(rel, patterns):
+    return any(fnmatch.fnmatchcase(rel, pattern) for pattern in patterns)
+
+
+def walk(directory):
+    """{relative path: absolute path} of every file under *directory*, "/"-separated."""
+    found = {}
+    for base, subdirs, files in os.walk(directory):
+        subdirs.sort()
+        for name in files:
+            path = os.path.join(base, name)
+            found[os.path.relpath(path, directory).replace(os.sep, "/")] = path
+    return found
+
+
+def packages_for(root, directory, chrome, firefox, edge):
+    """[(zip name, {archive name: relative source path})] for one extension."""
+    files = walk(os.path.join(root, directory))
+    chromium = {rel: rel for rel in files if not excluded(rel, EXCLUDES)}
+    packages = [(f"{chrome}-chrome.zip", chromium)]
+    firefox_files = {rel[len("firefox/"):]: rel for rel in files if rel.startswith("firefox/")}
+    firefox_files = {name: rel for name, rel in firefox_files.items()
+                     if not excluded(name, FIREFOX_EXCLUDES)}
+    if firefox_files:
+        packages.append((f"{firefox}-firefox.zip", firefox_files))
+    packages.append((f"{edge}-edge.zip", chromium))
+    return packages, files
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _file_sha256(path):
+    with open(path, "rb") as f:
+        return _sha256(f.read())
+
+
+def cache_dir():
+    return os.environ.get("PACKAGE_CACHE_DIR") or DEFAULT_CACHE_DIR
+
+
+def _stamp(zip_name, directory):
+    try:
+        with open(os.path.join(directory, f"{zip_name}.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def build_extension(extension, root=ROOT, out=DEFAULT_OUT, force=False, directory=None):
+    """
+    Build one extension's packages; returns [(zip name, status, bytes, seconds)]
+    with status "built" or "cached".
+    """
+    directory = directory or cache_dir()
+    start = time.perf_counter()
+    packages, files = packages_for(root, *extension)
+    contents = {}
+    for members in (m for _, m in packages):
+        for rel in members.values():
+            if rel not in contents:
+                with open(files[rel], "rb") as f:
+                    contents[rel] = f.read()
+    hashes = {rel: _sha256(data) for rel, data in contents.items()}
+
+    entries = {}                         # content hash -> Entry, shared by all three zips
+    results = []
+    for zip_name, members in packages:
+        key = _sha256(json.dumps([PACKAGER_VERSION, sorted(
+            (name, hashes[rel]) for name, rel in members.items())]).encode())
+        path = os.path.join(out, zip_name)
+        stamp = _stamp(zip_name, directory)
+        if (not force and stamp.get("key") == key and os.path.exists(path)
+                and _file_sha256(path) == stamp.get("zip")):
+            results.append((zip_name, "cached", os.path.getsize(path), 0.0))
+            continue
+        package_start = time.perf_counter()
+        for rel in members.values():
+            if hashes[rel] not in entries:
+                entries[hashes[rel]] = Entry(contents[rel])
+        data = zip_bytes({name: entries[hashes[rel]] for name, rel in members.items()})
+        os.makedirs(out, exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"{zip_name}.json"), "w") as f:
+            json.dump({"key": key, "zip": _sha256(data)}, f)
+        results.append((zip_name, "built", len(data), time.perf_counter() - package_start))
+    return extension[0], results, time.perf_counter() - start
+
+
+def build(filter_text="", jobs=None, force=False, root=ROOT, out=DEFAULT_OUT, directory=None,
+          extensions=EXTENSIONS):
+    """build_extension() for every extension whose directory contains *filter_text*."""
+    chosen = [e for e in extensions if filter_text in e[0]]
+    args = [(extension, root, out, force, directory) for extension in chosen]
+    if jobs == 1 or len(args) <= 1:
+        return [build_extension(*a) for a in args]
+    with ProcessPoolExecutor(jobs) as pool:
+        return list(pool.map(build_extension, *zip(*args)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("filter", nargs="?", default="",
+                        help="only extensions whose directory contains this")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count())
+    parser.add_argument("--force", action="store_true", help="rebuild even when up to date")
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    parser.add_argument("--cache-dir", help=f"default: $PACKAGE_CACHE_DIR or {DEFAULT_CACHE_DIR}")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    print(f"Building extension store packages into {args.out}")
+    built = packages = 0
+    for directory, results, seconds in build(args.filter, args.jobs, args.force,
+                                             out=args.out, directory=args.cache_dir):
+        print(f"\n=== {directory} ({seconds * 1000:.0f} ms) ===")
+        for zip_name, status, size, _ in results:
+            print(f"  {zip_name:<36} {size / 1024:8.1f} KB  {status}")
+            built += status == "built"
+            packages += 1
+    print(f"\n{built} of {packages} packages built, {packages - built} up to date "
+          f"in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Tests for the store packager.
+
+Run with:  python -m pytest -q test_build_extensions.py
+"""
+
+import io
+import shutil
+import zipfile
+
+import pytest
+
+from build_extensions import Entry, build, zip_bytes
+
+EXTENSIONS = [
+    ("alpha-extension", "alpha", "alpha-fx", "alpha"),
+    ("beta-extension", "beta", "beta", "beta-ms"),
+]
+
+FILES = {
+    "manifest.json": b'{"manifest_version": 3}',
+    "popup.js": b"console.log('popup');\n" * 50,
+    "icons/icon16.png": bytes(range(256)),
+    "package.json": b"{}",
+    "test-extension.js": b"// not shipped",
+    "node_modules/dep/index.js": b"// not shipped",
+    "store/promo.png": b"not shipped",
+    ".DS_Store": b"junk",
+    "firefox/manifest.json": b'{"manifest_version": 2}',
+    "firefox/icons/icon16.png": bytes(range(256)),
+    "firefox/.DS_Store": b"junk",
+}
+
+
+@pytest.fixture
+def root(tmp_path):
+    for directory, *_ in EXTENSIONS:
+        for rel, data in FILES.items():
+            path = tmp_path / directory / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+    return tmp_path
+
+
+def run(root, jobs=1, **kwargs):
+    results = build(jobs=jobs, root=str(root), out=str(root / "out"),
+                    directory=str(root / ".cache"), extensions=EXTENSIONS, **kwargs)
+    return {name: status for _, packages, _ in results for name, status, _, _ in packages}
+
+
+def members(path):
+    with zipfile.ZipFile(path) as z:
+        assert z.testzip() is None
+        return {name: z.read(name) for name in z.namelist()}
+
+
+def test_packages_and_excludes(root):
+    assert run(root) == {name: "built" for name in (
+        "alpha-chrome.zip", "alpha-fx-firefox.zip", "alpha-edge.zip",
+        "beta-chrome.zip", "beta-firefox.zip", "beta-ms-edge.zip")}
+    assert members(root / "out" / "alpha-chrome.zip") == {
+        rel: FILES[rel] for rel in ("icons/icon16.png", "manifest.json", "popup.js")}
+    assert members(root / "out" / "alpha-fx-firefox.zip") == {
+        "icons/icon16.png": FILES["firefox/icons/icon16.png"],
+        "manifest.json": FILES["firefox/manifest.json"]}
+
+
+def test_chrome_and_edge_zips_are_identical(root):
+    run(root)
+    assert (root / "out" / "alpha-chrome.zip").read_bytes() == \
+        (root / "out" / "alpha-edge.zip").read_bytes()
+
+
+def test_zips_are_reproducible(root):
+    run(root)
+    first = (root / "out" / "beta-firefox.zip").read_bytes()
+    (root / "beta-extension" / "firefox" / "manifest.json").touch()
+    run(root, force=True)
+    assert (root / "out" / "beta-firefox.zip").read_bytes() == first
+    with zipfile.ZipFile(io.BytesIO(first)) as z:
+        assert {i.date_time for i in z.infolist()} == {(1980, 1, 1, 0, 0, 0)}
+        assert z.namelist() == sorted(z.namelist())
+
+
+def test_unchanged_packages_are_skipped(root):
+    run(root)
+    assert set(run(root).values()) == {"cached"}
+    (root / "alpha-extension" / "popup.js").write_bytes(b"console.log('v2');")
+    (root / "beta-extension" / "firefox" / "manifest.json").write_bytes(b"{}")
+    assert run(root) == {
+        "alpha-chrome.zip": "built", "alpha-fx-firefox.zip": "cached", "alpha-edge.zip": "built",
+        "beta-chrome.zip": "cached", "beta-firefox.zip": "built", "beta-ms-edge.zip": "cached"}
+    assert members(root / "out" / "alpha-edge.zip")["popup.js"] == b"console.log('v2');"
+
+
+def test_edited_or_missing_zip_is_rebuilt(root):
+    run(root)
+    (root / "out" / "alpha-chrome.zip").write_bytes(b"edited by hand")
+    (root / "out" / "beta-ms-edge.zip").unlink()
+    built = {name for name, status in run(root).items() if status == "built"}
+    assert built == {"alpha-chrome.zip", "beta-ms-edge.zip"}
+
+
+def test_no_firefox_dir_means_no_firefox_zip(root):
+    shutil.rmtree(root / "beta-extension" / "firefox")
+    assert "beta-firefox.zip" not in run(root, filter_text="beta")
+
+
+def test_incompressible_data_is_stored():
+    data = bytes(range(256))
+    entry = Entry(data)
+    assert (entry.method, entry.data) == (0, data)
+    with zipfile.ZipFile(io.BytesIO(zip_bytes({"x.bin": entry, "a.txt": Entry(b"a" * 100)}))) as z:
+        assert z.namelist() == ["a.txt", "x.bin"]
+        assert z.read("x.bin") == data and z.read("a.txt") == b"a" * 100
+
+
+def test_entries_are_unix_files_with_mode_644():
+    with zipfile.ZipFile(io.BytesIO(zip_bytes({"a.txt": Entry(b"a")}))) as z:
+        info = z.getinfo("a.txt")
+        assert (info.create_system, info.external_attr >> 16) == (3, 0o100644)
+
+
+def test_pool_build_matches_serial(root):
+    serial = run(root)
+    out = {name: (root / "out" / name).read_bytes() for name in serial}
+    assert run(root, jobs=2, force=True) == serial
+    assert {name: (root / "out" / name).read_bytes() for name in serial} == out